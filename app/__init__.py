@@ -2,39 +2,41 @@ from flask import Flask
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from .models import db
+from .conexiones import opciones_motor
+from .perfilador import instalar as instalar_perfilador, leer_tasas_por_ruta, muestreo_por_ruta
 import os
-try:
-    import sentry_sdk
-    from sentry_sdk.integrations.flask import FlaskIntegration
-except ImportError:
-    pass # Managed in create_app
 import logging
+import click
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+logging.getLogger('alembic').setLevel(logging.WARNING)
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     
     # Inicializar Sentry para monitoreo de errores (GitHub Student Pack)
+    # Solo se importa con SENTRY_DSN: los scripts y los tests no pagan su arranque
     sentry_dsn = os.environ.get('SENTRY_DSN')
-    try:
-        import sentry_sdk
-        from sentry_sdk.integrations.flask import FlaskIntegration
-        if sentry_dsn:
+    if sentry_dsn:
+        try:
+            import sentry_sdk
+            from sentry_sdk.integrations.flask import FlaskIntegration
+            # Muestreo de trazas por ruta (ver app/perfilador.py): trazar todo es caro en producción
+            tasas = leer_tasas_por_ruta(os.environ.get('SENTRY_TRACES_RUTAS'))
             sentry_sdk.init(
                 dsn=sentry_dsn,
                 integrations=[FlaskIntegration()],
-                traces_sample_rate=1.0,  # 100% de transacciones en producción
+                traces_sampler=muestreo_por_ruta(tasas, float(os.environ.get('SENTRY_TRACES_SAMPLE_RATE', 0.1))),
                 environment=os.environ.get('FLASK_ENV', 'production'),
                 release=os.environ.get('HEROKU_SLUG_COMMIT', 'dev')
             )
             logger.info("✅ Sentry inicializado - Monitoreo activo")
-        else:
-            logger.info("⚠️ Sentry no configurado - Agregar SENTRY_DSN")
-    except ImportError:
-        logger.warning("⚠️ Sentry SDK no instalado - Se omite monitoreo")
+        except ImportError:
+            logger.warning("⚠️ Sentry SDK no instalado - Se omite monitoreo")
+    else:
+        logger.info("⚠️ Sentry no configurado - Agregar SENTRY_DSN")
     
     # Configuración - Detectar entorno
     if os.environ.get('DATABASE_URL'):
@@ -57,10 +59,46 @@ def create_app():
     app.config['JWT_HEADER_NAME'] = 'Authorization'
     app.config['JWT_HEADER_TYPE'] = 'Bearer'
     
+    # Imágenes de recibos y comprobantes: PNG, JPEG o WEBP y ancho en px (WEBP 720 pesa mucho menos para WhatsApp)
+    app.config['RECIBO_FORMATO'] = os.environ.get('RECIBO_FORMATO', 'PNG')
+    app.config['RECIBO_ANCHO'] = int(os.environ.get('RECIBO_ANCHO', 1080))
+    # Caché de recibos generados: 'disco', 's3' (AWS_BUCKET_NAME) o vacío para desactivar (ver app/artefactos.py)
+    app.config['RECIBOS_CACHE'] = os.environ.get('RECIBOS_CACHE', 'disco')
+    app.config['RECIBOS_CACHE_DIR'] = os.environ.get('RECIBOS_CACHE_DIR')
+    app.config['RECIBOS_CACHE_MAX_MB'] = int(os.environ.get('RECIBOS_CACHE_MAX_MB', 200))
+    # Procesos para generar PDF de cuadres en segundo plano (0 = hilos del mismo proceso)
+    app.config['PDF_PROCESOS'] = int(os.environ.get('PDF_PROCESOS', 2))
+    # 'worker': los PDF los genera el proceso 'pdf' del Procfile, no el web (ver app/cuadres.py)
+    app.config['PDF_COLA'] = os.environ.get('PDF_COLA', 'local')
+    # Fotos de evidencia: 's3', 'local' o 'memoria'; vacío = s3 si hay AWS_BUCKET_NAME (ver app/almacenamiento.py)
+    app.config['ALMACENAMIENTO'] = os.environ.get('ALMACENAMIENTO')
+    app.config['ALMACENAMIENTO_HILOS'] = int(os.environ.get('ALMACENAMIENTO_HILOS', 2))
+    # 'completo' (web + API) o 'api' (solo la API REST de la app móvil, arranca más rápido)
+    app.config['APP_MODO'] = os.environ.get('APP_MODO', 'completo')
+    # Consultas y tiempo por petición en Server-Timing y /estado/metrics (ver app/perfilador.py)
+    app.config['PERFILADOR'] = os.environ.get('PERFILADOR', '1').lower() not in ('0', 'false', 'no')
+
+    # Sobrescrituras explícitas (tests, benchmarks, scripts)
+    if config:
+        app.config.update(config)
+    
+    # Pool de conexiones y statement_timeout desde variables de entorno (ver app/conexiones.py)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', opciones_motor(app.config['SQLALCHEMY_DATABASE_URI']))
+    
     # Inicializar extensiones
     db.init_app(app)
     jwt = JWTManager(app)
     
+    # Migraciones de esquema (flask db upgrade). render_as_batch permite ALTER en SQLite
+    # Flask-Migrate carga alembic: solo se registra cuando la app la carga el CLI de flask
+    # (hay un contexto de click), no en gunicorn ni en los scripts
+    if click.get_current_context(silent=True) is not None:
+        try:
+            from flask_migrate import Migrate
+            Migrate(app, db, render_as_batch=True)
+        except ImportError:
+            logger.warning("⚠️ Flask-Migrate no instalado - Comandos 'flask db' no disponibles")
+    
     # Configurar CORS - Aceptar peticiones desde cualquier origen (localhost, web, etc.)
     CORS(app, 
          origins="*",
@@ -74,9 +112,16 @@ def create_app():
         with app.app_context():
             db.create_all()
     
-    # Conectar rutas web
-    from . import routes
-    routes.init_routes(app)
+    # Conectar vistas web (no en el modo API: el proceso de la app móvil no las carga)
+    if app.config['APP_MODO'] != 'api':
+        from .vistas import registrar_vistas
+        registrar_vistas(app)
+    
+    # Salud y métricas (todos los modos)
+    from .estado import estado_bp
+    app.register_blueprint(estado_bp)
+    if app.config['PERFILADOR']:
+        instalar_perfilador(app)
     
     # Conectar API REST para app móvil
     from .api import api
@@ -0,0 +1,251 @@
+"""
+Almacenamiento de archivos subidos (fotos de evidencia de gastos) de DIAMANTE PRO
+
+El request no espera a S3: la foto se copia a un archivo temporal (en memoria si
+es pequeña, en disco si es grande), se responde con la URL definitiva y un hilo
+la sube en segundo plano (las fotos se reducen y se les genera una miniatura
+en ese mismo hilo, ver app/imagenes.py). Si S3 falla después de los reintentos,
+la foto queda en el disco local y se corrige la URL guardada en la transacción.
+
+Backends (ALMACENAMIENTO=s3|local|memoria; por defecto s3 si hay AWS_BUCKET_NAME):
+- AlmacenS3: un solo cliente boto3 por proceso, subida multipart para fotos grandes.
+  Con AWS_S3_ENDPOINT_URL apunta a MinIO o a un S3 local de pruebas.
+- AlmacenLocal: app/static/uploads (temporal en Heroku)
+- AlmacenMemoria: tests
+"""
+import logging
+import os
+import shutil
+import tempfile
+import importlib.util
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from flask import current_app
+from .imagenes import procesar_foto, clave_miniatura
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Estados de una subida
+PENDIENTE = 'PENDIENTE'
+SUBIDO = 'SUBIDO'
+LOCAL = 'LOCAL'  # S3 falló y quedó en el disco local
+ERROR = 'ERROR'
+
+_cliente_s3 = None
+_cliente_pid = None
+_cliente_lock = threading.Lock()
+
+
+def hay_boto3():
+    """boto3 instalado (sin importarlo: tarda y solo lo necesitan los caminos de S3)"""
+    return importlib.util.find_spec('boto3') is not None
+
+
+def cliente_s3():
+    """
+    Cliente S3 compartido por todo el proceso. Los clientes de boto3 son seguros entre
+    hilos y mantienen el pool de conexiones; crearlos es lo costoso. Tras un fork
+    (workers de gunicorn) cada proceso crea el suyo.
+    """
+    global _cliente_s3, _cliente_pid
+    import boto3
+    from botocore.config import Config
+    with _cliente_lock:
+        if _cliente_s3 is None or _cliente_pid != os.getpid():
+            _cliente_s3 = boto3.client(
+                's3',
+                aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
+                aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY'),
+                region_name=os.environ.get('AWS_REGION', 'us-east-1'),
+                endpoint_url=os.environ.get('AWS_S3_ENDPOINT_URL') or None,
+                config=Config(max_pool_connections=20, retries={'max_attempts': 3, 'mode': 'standard'})
+            )
+            _cliente_pid = os.getpid()
+        return _cliente_s3
+
+
+class AlmacenS3:
+    """Bucket S3 (o compatible). Las fotos de más de umbral_multipart se suben por partes"""
+
+    def __init__(self, bucket, region='us-east-1', endpoint=None, cliente=None,
+                 umbral_multipart=8 * MB, tamano_parte=8 * MB):
+        self.bucket = bucket
+        self.region = region
+        self.endpoint = endpoint
+        self.cliente = cliente or cliente_s3()
+        from boto3.s3.transfer import TransferConfig
+        self.transferencia = TransferConfig(multipart_threshold=umbral_multipart,
+                                            multipart_chunksize=tamano_parte, max_concurrency=4)
+
+    def subir(self, clave, archivo, content_type):
+        self.cliente.upload_fileobj(archivo, self.bucket, clave,
+                                    ExtraArgs={'ContentType': content_type, 'ACL': 'public-read'},
+                                    Config=self.transferencia)
+
+    def url(self, clave):
+        if self.endpoint:
+            return f"{self.endpoint.rstrip('/')}/{self.bucket}/{clave}"
+        return f"https://{self.bucket}.s3.{self.region}.amazonaws.com/{clave}"
+
+
+class AlmacenLocal:
+    """Directorio dentro de static/; la URL es relativa para url_for('static', ...)"""
+
+    def __init__(self, directorio, prefijo_url):
+        self.directorio = directorio
+        self.prefijo_url = prefijo_url
+
+    def subir(self, clave, archivo, content_type):
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = os.path.join(self.directorio, clave)
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporal, 'wb') as destino:
+            shutil.copyfileobj(archivo, destino)
+        os.replace(temporal, ruta)
+
+    def url(self, clave):
+        return f"{self.prefijo_url}/{clave}"
+
+
+class AlmacenMemoria:
+    """Archivos en un diccionario (tests)"""
+
+    def __init__(self):
+        self.archivos = {}
+
+    def subir(self, clave, archivo, content_type):
+        self.archivos[clave] = (archivo.read(), content_type)
+
+    def url(self, clave):
+        return f"memoria://{clave}"
+
+
+class ServicioSubidas:
+    """
+    Cola de subidas en hilos. encolar() devuelve la URL de inmediato; el estado
+    de cada clave queda en PENDIENTE hasta que termina.
+    """
+
+    def __init__(self, almacen, respaldo=None, hilos=2, reintentos=3, espera=0.5):
+        self.almacen = almacen
+        self.respaldo = respaldo
+        self.reintentos = reintentos
+        self.espera = espera
+        self._executor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='subidas')
+        self._estados = {}
+        self._futuros = {}
+        self._lock = threading.Lock()
+
+    def url(self, clave):
+        return self.almacen.url(clave)
+
+    def encolar(self, clave, origen, content_type, app=None, foto=False):
+        """
+        Copia origen (stream del request) a un temporal y lo sube en segundo plano.
+        app: aplicación para corregir la URL en la base de datos si se usa el respaldo.
+        foto: reducir a WebP sin EXIF y subir también la miniatura (ver app/imagenes.py).
+        """
+        archivo = tempfile.SpooledTemporaryFile(max_size=MB)
+        shutil.copyfileobj(origen, archivo)
+        archivo.seek(0)
+        with self._lock:
+            self._estados[clave] = PENDIENTE
+            self._futuros[clave] = self._executor.submit(self._subir, clave, archivo, content_type, app, foto)
+        return self.url(clave)
+
+    def estado(self, clave):
+        return self._estados.get(clave)
+
+    def esperar(self, timeout=None):
+        """Espera a que terminen las subidas encoladas (tests y apagado)"""
+        with self._lock:
+            futuros = list(self._futuros.values())
+        for futuro in futuros:
+            futuro.result(timeout)
+
+    def _partes(self, clave, archivo, content_type, foto):
+        """Archivos a subir: la foto procesada y su miniatura, o el archivo tal cual"""
+        if foto:
+            try:
+                reducida, miniatura = procesar_foto(archivo)
+                return [(clave, BytesIO(reducida), 'image/webp'),
+                        (clave_miniatura(clave), BytesIO(miniatura), 'image/webp')]
+            except Exception as e:
+                logger.warning(f"⚠️ {clave} no se pudo procesar como imagen, se guarda original: {e}")
+                archivo.seek(0)
+        return [(clave, archivo, content_type)]
+
+    def _subir(self, clave, archivo, content_type, app, foto=False):
+        try:
+            partes = self._partes(clave, archivo, content_type, foto)
+            for intento in range(1, self.reintentos + 1):
+                try:
+                    for clave_parte, contenido, tipo in partes:
+                        contenido.seek(0)
+                        self.almacen.subir(clave_parte, contenido, tipo)
+                    self._terminar(clave, SUBIDO)
+                    return
+                except Exception as e:
+                    logger.warning(f"⚠️ Error subiendo {clave} (intento {intento}/{self.reintentos}): {e}")
+                    if intento < self.reintentos:
+                        time.sleep(self.espera * 2 ** (intento - 1))
+
+            if self.respaldo is None:
+                logger.error(f"❌ No se pudo subir {clave}")
+                self._terminar(clave, ERROR)
+                return
+            for clave_parte, contenido, tipo in partes:
+                contenido.seek(0)
+                self.respaldo.subir(clave_parte, contenido, tipo)
+            logger.error(f"❌ {clave} quedó en el almacenamiento local temporal")
+            if app is not None:
+                with app.app_context():
+                    corregir_url(self.almacen.url(clave), self.respaldo.url(clave))
+            self._terminar(clave, LOCAL)
+        except Exception as e:
+            logger.error(f"❌ Error guardando {clave}: {e}")
+            self._terminar(clave, ERROR)
+        finally:
+            archivo.close()
+
+    def _terminar(self, clave, estado):
+        with self._lock:
+            self._estados[clave] = estado
+            self._futuros.pop(clave, None)
+
+
+def corregir_url(anterior, nueva):
+    """Apunta a la copia local las transacciones que guardaron la URL de S3"""
+    from .models import db, Transaccion
+    db.session.query(Transaccion).filter(Transaccion.foto_evidencia == anterior).update(
+        {Transaccion.foto_evidencia: nueva}, synchronize_session=False)
+    db.session.commit()
+
+
+def crear_servicio(app):
+    """Servicio según la configuración de la aplicación"""
+    local = AlmacenLocal(os.path.join(app.root_path, 'static', 'uploads', 'recibos'), 'uploads/recibos')
+    bucket = os.environ.get('AWS_BUCKET_NAME')
+    tipo = (app.config.get('ALMACENAMIENTO') or ('s3' if hay_boto3() and bucket else 'local')).lower()
+    hilos = app.config.get('ALMACENAMIENTO_HILOS', 2)
+
+    if tipo == 'memoria':
+        return ServicioSubidas(AlmacenMemoria(), hilos=hilos)
+    if tipo == 's3':
+        if hay_boto3() and bucket:
+            s3 = AlmacenS3(bucket, os.environ.get('AWS_REGION', 'us-east-1'),
+                           os.environ.get('AWS_S3_ENDPOINT_URL'))
+            return ServicioSubidas(s3, respaldo=local, hilos=hilos)
+        logger.warning("⚠️ ALMACENAMIENTO=s3 sin boto3 o AWS_BUCKET_NAME - Usando almacenamiento local")
+    return ServicioSubidas(local, hilos=hilos)
+
+
+def servicio_subidas():
+    """Servicio de la aplicación actual (una instancia por proceso)"""
+    if 'servicio_subidas' not in current_app.extensions:
+        current_app.extensions['servicio_subidas'] = crear_servicio(current_app)
+    return current_app.extensions['servicio_subidas']
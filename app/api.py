@@ -4,9 +4,16 @@ Endpoints JSON para sincronización con la app
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from .models import Usuario, Cliente, Prestamo, Pago, Ruta, Transaccion, db
+from .models import Usuario, Cliente, Prestamo, Pago, Ruta, Transaccion, RegistroEliminado, ESTADOS_VIGENTES, db
+from .cobranza import prestamos_pendientes
+from .fechas import rango_del_dia, hoy_en, zona_de_cobrador, momento_del_dia
+from .pagos import aplicar_pago, aplicar_lote, pago_por_clave, error_clave, error_monto
+from .contadores import contar_prestamo_nuevo, contar_cobro
+from .cuotas import crear_plan_cuotas, marcar_cuotas_pagadas, dias_de_atraso, tiene_plan
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import case, or_
+from sqlalchemy.orm import joinedload
+from sqlalchemy.exc import IntegrityError
 
 # Crear blueprint para la API
 api = Blueprint('api', __name__, url_prefix='/api/v1')
@@ -87,7 +94,7 @@ def api_obtener_clientes():
     # Obtener clientes con préstamos activos del cobrador
     clientes_ids = db.session.query(Prestamo.cliente_id).filter(
         Prestamo.cobrador_id == usuario_id,
-        Prestamo.estado == 'ACTIVO'
+        Prestamo.estado.in_(ESTADOS_VIGENTES)
     ).distinct().all()
     
     clientes_ids = [c[0] for c in clientes_ids]
@@ -218,6 +225,8 @@ def api_crear_prestamo():
         )
         
         db.session.add(nuevo_prestamo)
+        crear_plan_cuotas(nuevo_prestamo, ruta.pais)
+        contar_prestamo_nuevo(nuevo_prestamo)
         db.session.commit()
         
         return jsonify({
@@ -237,23 +246,40 @@ def api_obtener_prestamos():
     """
     Obtener préstamos activos del cobrador
     Headers: Authorization: Bearer TOKEN
-    Query params: ?cliente_id=1 (opcional)
-    Returns: [{"id": 1, "cliente": {...}, ...}]
+    Query params (opcionales):
+        ?cliente_id=1
+        ?orden=dias_atraso            los más atrasados primero (por defecto, los más recientes)
+        ?dias_atraso_min=1&dias_atraso_max=30
+    Returns: [{"id": 1, "cliente": {...}, "dias_atraso": 8, ...}]
     """
     usuario_id = int(get_jwt_identity())
     cliente_id = request.args.get('cliente_id', type=int)
-    
+    dias_min = request.args.get('dias_atraso_min', type=int)
+    dias_max = request.args.get('dias_atraso_max', type=int)
+
+    # Días de atraso calculados en la misma consulta desde el plan de cuotas
+    # ("hoy" es el del país de la ruta del cobrador). Sin plan todavía no se sabe: null, no 0
+    atraso = case((tiene_plan(), dias_de_atraso(hoy_en(zona_de_cobrador(usuario_id)))), else_=None)
+    dias_atraso = atraso.label('dias_atraso')
+
     # Query base - préstamos del cobrador
-    query = Prestamo.query.filter(
+    query = db.session.query(Prestamo, dias_atraso).options(joinedload(Prestamo.cliente)).filter(
         Prestamo.cobrador_id == usuario_id,
-        Prestamo.estado == 'ACTIVO'
+        Prestamo.estado.in_(ESTADOS_VIGENTES)
     )
     
     # Filtrar por cliente si se especifica
     if cliente_id:
-        query = query.filter_by(cliente_id=cliente_id)
-    
-    prestamos = query.order_by(Prestamo.fecha_inicio.desc()).all()
+        query = query.filter(Prestamo.cliente_id == cliente_id)
+    if dias_min is not None:
+        query = query.filter(atraso >= dias_min)
+    if dias_max is not None:
+        query = query.filter(atraso <= dias_max)
+
+    if request.args.get('orden') == 'dias_atraso':
+        query = query.order_by(dias_atraso.desc().nulls_last(), Prestamo.id)
+    else:
+        query = query.order_by(Prestamo.fecha_inicio.desc())
     
     return jsonify([{
         'id': prestamo.id,
@@ -272,11 +298,11 @@ def api_obtener_prestamos():
         'numero_cuotas': prestamo.numero_cuotas,
         'cuotas_pagadas': prestamo.cuotas_pagadas,
         'cuotas_atrasadas': prestamo.cuotas_atrasadas,
-        'dias_atraso': 0, # TODO: Calcular dias reales si es necesario. Por ahora enviamos 0 para compatibilidad
+        'dias_atraso': dias,
         'fecha_inicio': prestamo.fecha_inicio.isoformat(),
         'fecha_ultimo_pago': prestamo.fecha_ultimo_pago.isoformat() if prestamo.fecha_ultimo_pago else None,
         'estado': prestamo.estado
-    } for prestamo in prestamos]), 200
+    } for prestamo, dias in query.all()]), 200
 
 # ==================== PAGOS DE UN PRÉSTAMO ====================
 @api.route('/cobrador/prestamos/<int:prestamo_id>/pagos', methods=['GET'])
@@ -329,7 +355,7 @@ def api_crear_gasto():
         fecha = datetime.now()
         if data.get('fecha'):
             try:
-                fecha = datetime.strptime(data['fecha'], '%Y-%m-%d')
+                fecha = momento_del_dia(datetime.strptime(data['fecha'], '%Y-%m-%d'), zona_de_cobrador(usuario_id))
             except:
                 pass # Usar hoy si falla formato
                 
@@ -367,41 +393,29 @@ def api_ruta_cobro():
     """
     usuario_id = int(get_jwt_identity())
     
-    # Obtener préstamos activos del cobrador
-    prestamos_activos = Prestamo.query.filter(
-        Prestamo.cobrador_id == usuario_id,
-        Prestamo.estado == 'ACTIVO'
-    ).all()
-    
-    # Filtrar los que NO han pagado hoy
-    hoy = datetime.now().date()
-    ruta_cobro = []
+    # Préstamos activos del cobrador que NO han pagado hoy (una sola consulta)
+    # "Hoy" es el día en el país de la ruta del cobrador, no el del servidor
+    zona = zona_de_cobrador(usuario_id)
+    pendientes = prestamos_pendientes(hoy_en(zona), cobrador_id=usuario_id, frecuencias=['DIARIO', 'BISEMANAL'],
+                                      zona=zona)
     
-    for prestamo in prestamos_activos:
-        # Verificar si ya pagó hoy
-        pago_hoy = Pago.query.filter(
-            Pago.prestamo_id == prestamo.id,
-            func.date(Pago.fecha_pago) == hoy
-        ).first()
-        
-        if not pago_hoy and prestamo.frecuencia in ['DIARIO', 'BISEMANAL']:
-            ruta_cobro.append({
-                'prestamo_id': prestamo.id,
-                'cliente': {
-                    'id': prestamo.cliente.id,
-                    'nombre': prestamo.cliente.nombre,
-                    'telefono': prestamo.cliente.telefono,
-                    'whatsapp': prestamo.cliente.whatsapp_completo,
-                    'direccion': prestamo.cliente.direccion_negocio,
-                    'gps_latitud': prestamo.cliente.gps_latitud,
-                    'gps_longitud': prestamo.cliente.gps_longitud
-                },
-                'valor_cuota': float(prestamo.valor_cuota),
-                'saldo_actual': float(prestamo.saldo_actual),
-                'moneda': prestamo.moneda,
-                'cuotas_atrasadas': prestamo.cuotas_atrasadas,
-                'estado_mora': 'GRAVE' if prestamo.cuotas_atrasadas > 3 else 'LEVE' if prestamo.cuotas_atrasadas > 0 else 'AL_DIA'
-            })
+    ruta_cobro = [{
+        'prestamo_id': prestamo.id,
+        'cliente': {
+            'id': prestamo.cliente.id,
+            'nombre': prestamo.cliente.nombre,
+            'telefono': prestamo.cliente.telefono,
+            'whatsapp': prestamo.cliente.whatsapp_completo,
+            'direccion': prestamo.cliente.direccion_negocio,
+            'gps_latitud': prestamo.cliente.gps_latitud,
+            'gps_longitud': prestamo.cliente.gps_longitud
+        },
+        'valor_cuota': float(prestamo.valor_cuota),
+        'saldo_actual': float(prestamo.saldo_actual),
+        'moneda': prestamo.moneda,
+        'cuotas_atrasadas': prestamo.cuotas_atrasadas,
+        'estado_mora': 'GRAVE' if prestamo.cuotas_atrasadas > 3 else 'LEVE' if prestamo.cuotas_atrasadas > 0 else 'AL_DIA'
+    } for prestamo in pendientes]
     
     return jsonify({
         'total_cobros': len(ruta_cobro),
@@ -419,7 +433,8 @@ def api_registrar_pago():
     Body: {
         "prestamo_id": 1,
         "monto": 120.00,
-        "observaciones": "Pago completo"
+        "observaciones": "Pago completo",
+        "clave_idempotencia": "uuid-generado-en-la-app" (opcional)
     }
     Returns: {"pago_id": 1, "saldo_nuevo": 2400, ...}
     """
@@ -437,40 +452,27 @@ def api_registrar_pago():
         if not ruta or ruta.cobrador_id != usuario_id:
             return jsonify({'error': 'No tienes permiso para cobrar este préstamo'}), 403
         
-        monto = float(data['monto'])
-        observaciones = data.get('observaciones', '')
-        
-        # Calcular cuotas pagadas
-        numero_cuotas_pagadas = int(monto / prestamo.valor_cuota)
-        
-        # Registrar el pago
-        nuevo_pago = Pago(
-            prestamo_id=prestamo.id,
-            cobrador_id=usuario_id,
-            monto=monto,
-            numero_cuotas_pagadas=numero_cuotas_pagadas,
-            saldo_anterior=prestamo.saldo_actual,
-            saldo_nuevo=prestamo.saldo_actual - monto,
-            fecha_pago=datetime.now(),
-            observaciones=observaciones,
-            tipo_pago='NORMAL'
-        )
-        
-        # Actualizar préstamo
-        prestamo.saldo_actual -= monto
-        prestamo.cuotas_pagadas += numero_cuotas_pagadas
-        prestamo.fecha_ultimo_pago = datetime.now()
-        
-        # Si cuotas atrasadas > 0, restarlas
-        if prestamo.cuotas_atrasadas > 0:
-            prestamo.cuotas_atrasadas = max(0, prestamo.cuotas_atrasadas - numero_cuotas_pagadas)
-        
-        # Si saldo llega a 0, marcar como cancelado
-        if prestamo.saldo_actual <= 0:
-            prestamo.estado = 'CANCELADO'
-            prestamo.saldo_actual = 0
+        # Reenvío de un pago ya registrado (misma clave de idempotencia)
+        clave = data.get('clave_idempotencia')
+        if clave and error_clave(clave):
+            return jsonify({'error': error_clave(clave)}), 400
+        try:
+            pago_existente = pago_por_clave(clave, usuario_id)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 409
+        if pago_existente:
+            return _pago_duplicado(pago_existente)
         
-        db.session.add(nuevo_pago)
+        try:
+            monto = float(data['monto'])
+        except (TypeError, ValueError):
+            return jsonify({'error': 'prestamo_id y monto son requeridos'}), 400
+        if error_monto(monto):
+            return jsonify({'error': error_monto(monto)}), 400
+        nuevo_pago = aplicar_pago(prestamo, usuario_id, monto,
+                                  observaciones=data.get('observaciones', ''),
+                                  clave_idempotencia=clave)
+        numero_cuotas_pagadas = nuevo_pago.numero_cuotas_pagadas
         db.session.commit()
         
         return jsonify({
@@ -484,9 +486,77 @@ def api_registrar_pago():
             'fecha_pago': nuevo_pago.fecha_pago.isoformat()
         }), 201
         
+    except IntegrityError:
+        # Reenvío simultáneo con la misma clave: el otro ya registró el pago (índice único)
+        db.session.rollback()
+        try:
+            pago_existente = pago_por_clave(clave, usuario_id)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 409
+        if pago_existente:
+            return _pago_duplicado(pago_existente)
+        return jsonify({'error': 'Pago en conflicto con un envío simultáneo, reintente'}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+def _pago_duplicado(pago):
+    """Respuesta para el reenvío de un pago ya registrado"""
+    return jsonify({
+        'success': True,
+        'duplicado': True,
+        'pago_id': pago.id,
+        'saldo_nuevo': float(max(0, pago.saldo_nuevo)),
+        'fecha_pago': pago.fecha_pago.isoformat()
+    }), 200
+
+# ==================== PAGOS EN LOTE (MODO OFFLINE) ====================
+MAX_PAGOS_POR_LOTE = 500
+
+
+@api.route('/cobrador/pagos-lote', methods=['POST'])
+@jwt_required()
+def api_registrar_pagos_lote():
+    """
+    Registrar en una sola transacción los pagos acumulados sin conexión
+    Headers: Authorization: Bearer TOKEN
+    Body: {
+        "pagos": [
+            {"clave": "uuid-1", "prestamo_id": 1, "monto": 120.00,
+             "observaciones": "", "fecha_pago": "2025-12-16T09:30:00"},
+            ...
+        ]
+    }
+    Returns: {"aplicados": 1, "duplicados": 0, "errores": 0,
+              "resultados": [{"clave": "uuid-1", "estado": "APLICADO", "pago_id": 10, ...}]}
+    """
+    usuario_id = int(get_jwt_identity())
+    data = request.get_json(silent=True)
+    
+    if not data or not isinstance(data.get('pagos'), list) or not data['pagos']:
+        return jsonify({'error': 'Se requiere una lista de pagos'}), 400
+    
+    if len(data['pagos']) > MAX_PAGOS_POR_LOTE:
+        return jsonify({'error': f'Máximo {MAX_PAGOS_POR_LOTE} pagos por lote'}), 400
+    
+    try:
+        resultados = aplicar_lote(usuario_id, data['pagos'])
+        db.session.commit()
+    except IntegrityError:
+        # Otro envío concurrente registró alguna de las mismas claves: al reintentar saldrán como DUPLICADO
+        db.session.rollback()
+        return jsonify({'error': 'Lote en conflicto con un envío simultáneo, reintente'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'aplicados': sum(1 for r in resultados if r['estado'] == 'APLICADO'),
+        'duplicados': sum(1 for r in resultados if r['estado'] == 'DUPLICADO'),
+        'errores': sum(1 for r in resultados if r['estado'] == 'ERROR'),
+        'resultados': resultados
+    }), 200
 
 # ==================== ESTADÍSTICAS ====================
 @api.route('/cobrador/estadisticas', methods=['GET'])
@@ -500,9 +570,9 @@ def api_estadisticas_cobrador():
     usuario_id = int(get_jwt_identity())
     
     # Préstamos activos del cobrador (usando cobrador_id directamente)
-    prestamos_activos = Prestamo.query.filter_by(
-        cobrador_id=usuario_id,
-        estado='ACTIVO'
+    prestamos_activos = Prestamo.query.filter(
+        Prestamo.cobrador_id == usuario_id,
+        Prestamo.estado.in_(ESTADOS_VIGENTES)
     ).all()
     
     # Total cartera
@@ -512,10 +582,12 @@ def api_estadisticas_cobrador():
     capital_prestado = sum(float(p.monto_prestado) for p in prestamos_activos) if prestamos_activos else 0
     
     # Cobrado hoy
-    hoy = datetime.now().date()
+    zona = zona_de_cobrador(usuario_id)
+    inicio_dia, fin_dia = rango_del_dia(hoy_en(zona), zona)
     pagos_hoy = Pago.query.join(Prestamo).filter(
         Prestamo.cobrador_id == usuario_id,
-        func.date(Pago.fecha_pago) == hoy
+        Pago.fecha_pago >= inicio_dia,
+        Pago.fecha_pago < fin_dia
     ).all()
     
     cobrado_hoy = sum(float(p.monto) for p in pagos_hoy) if pagos_hoy else 0
@@ -567,6 +639,7 @@ def api_registrar_cobro():
         
         # Actualizar préstamo
         saldo_anterior = prestamo.saldo_actual
+        estado_anterior = prestamo.estado
         prestamo.saldo_actual -= monto_pago
         
         # Actualizar estado si se pagó completo
@@ -576,6 +649,7 @@ def api_registrar_cobro():
             prestamo.fecha_ultimo_pago = datetime.now()
         else:
             prestamo.fecha_ultimo_pago = datetime.now()
+        marcar_cuotas_pagadas(prestamo, saldo_anterior)
             
         # Calcular cuotas pagadas (aproximado, solo como referencia estadística)
         # cuotas_canceladas = int(monto_pago / prestamo.valor_cuota)
@@ -607,6 +681,7 @@ def api_registrar_cobro():
             prestamo_id=prestamo.id
         )
         db.session.add(nueva_transaccion)
+        contar_cobro(prestamo, usuario_id, monto_pago, saldo_anterior, estado_anterior)
         
         db.session.commit()
         
@@ -619,3 +694,144 @@ def api_registrar_cobro():
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+
+
+# ==================== SINCRONIZACIÓN INCREMENTAL ====================
+# Margen de seguridad para no perder filas de transacciones que confirmaron
+# después de tomar el cursor. La app hace upsert por id, así que repetir filas es inocuo.
+MARGEN_CURSOR_SYNC = timedelta(seconds=60)
+
+
+def _cliente_sync(cliente):
+    return {
+        'id': cliente.id,
+        'nombre': cliente.nombre,
+        'documento': cliente.documento,
+        'telefono': cliente.telefono,
+        'whatsapp': cliente.whatsapp_completo,
+        'direccion_negocio': cliente.direccion_negocio,
+        'gps_latitud': cliente.gps_latitud,
+        'gps_longitud': cliente.gps_longitud,
+        'es_vip': cliente.es_vip,
+        'fecha_actualizacion': cliente.fecha_actualizacion.isoformat() if cliente.fecha_actualizacion else None
+    }
+
+
+def _prestamo_sync(prestamo):
+    return {
+        'id': prestamo.id,
+        'cliente_id': prestamo.cliente_id,
+        'ruta_id': prestamo.ruta_id,
+        'monto_prestado': float(prestamo.monto_prestado),
+        'monto_a_pagar': float(prestamo.monto_a_pagar),
+        'saldo_actual': float(prestamo.saldo_actual),
+        'valor_cuota': float(prestamo.valor_cuota),
+        'moneda': prestamo.moneda,
+        'frecuencia': prestamo.frecuencia,
+        'numero_cuotas': prestamo.numero_cuotas,
+        'cuotas_pagadas': prestamo.cuotas_pagadas,
+        'cuotas_atrasadas': prestamo.cuotas_atrasadas,
+        'dias_atraso': prestamo.dias_atraso or 0,  # Del recálculo nocturno (recalcular_mora.py)
+        'fecha_inicio': prestamo.fecha_inicio.isoformat() if prestamo.fecha_inicio else None,
+        'fecha_ultimo_pago': prestamo.fecha_ultimo_pago.isoformat() if prestamo.fecha_ultimo_pago else None,
+        'estado': prestamo.estado,
+        'fecha_actualizacion': prestamo.fecha_actualizacion.isoformat() if prestamo.fecha_actualizacion else None
+    }
+
+
+def _pago_sync(pago):
+    return {
+        'id': pago.id,
+        'prestamo_id': pago.prestamo_id,
+        'monto': float(pago.monto),
+        'numero_cuotas_pagadas': pago.numero_cuotas_pagadas,
+        'saldo_anterior': float(pago.saldo_anterior),
+        'saldo_nuevo': float(pago.saldo_nuevo),
+        'fecha_pago': pago.fecha_pago.isoformat() if pago.fecha_pago else None,
+        'tipo_pago': pago.tipo_pago,
+        'observaciones': pago.observaciones,
+        'fecha_actualizacion': pago.fecha_actualizacion.isoformat() if pago.fecha_actualizacion else None
+    }
+
+
+@api.route('/sync', methods=['GET'])
+@jwt_required()
+def api_sync():
+    """
+    Sincronización incremental para la app móvil
+    Headers: Authorization: Bearer TOKEN
+    Query params: ?since=CURSOR (opcional, el cursor devuelto por la llamada anterior)
+    Sin cursor devuelve la foto completa (préstamos activos, sus clientes y pagos).
+    Con cursor devuelve solo lo creado o modificado desde entonces, más los eliminados (o reasignados a otro cobrador).
+    Returns: {"cursor": "...", "completo": false, "clientes": [...], "prestamos": [...],
+              "pagos": [...], "eliminados": [{"tabla": "pagos", "id": 3}]}
+    """
+    usuario_id = int(get_jwt_identity())
+    since = request.args.get('since')
+    
+    desde = None
+    if since:
+        try:
+            desde = datetime.fromisoformat(since)
+        except ValueError:
+            return jsonify({'error': 'Cursor inválido'}), 400
+    
+    # El cursor nuevo se toma ANTES de consultar para no perder cambios concurrentes
+    nuevo_cursor = datetime.utcnow() - MARGEN_CURSOR_SYNC
+    
+    prestamos_cobrador = db.session.query(Prestamo.id).filter(Prestamo.cobrador_id == usuario_id)
+    clientes_cobrador = db.session.query(Prestamo.cliente_id).filter(Prestamo.cobrador_id == usuario_id)
+    
+    if desde is None:
+        # Foto completa: solo cartera activa (igual que los endpoints clásicos)
+        prestamos = Prestamo.query.filter(
+            Prestamo.cobrador_id == usuario_id,
+            Prestamo.estado.in_(ESTADOS_VIGENTES)
+        ).all()
+        ids_activos = [p.id for p in prestamos]
+        clientes = Cliente.query.filter(Cliente.id.in_({p.cliente_id for p in prestamos})).all()
+        pagos = Pago.query.filter(Pago.prestamo_id.in_(ids_activos)).all() if ids_activos else []
+        eliminados = []
+    else:
+        # Delta: cualquier préstamo del cobrador que cambió (incluye los que salieron de ACTIVO)
+        prestamos = Prestamo.query.filter(
+            Prestamo.cobrador_id == usuario_id,
+            Prestamo.fecha_actualizacion > desde
+        ).all()
+        ids_prestamos = {p.id for p in prestamos}
+        # Los que llegaron de otro cobrador desde el cursor (dejaron un tombstone a su nombre):
+        # la app no tiene su cliente ni su historial de pagos, van completos
+        reasignados = {registro_id for registro_id, in db.session.query(RegistroEliminado.registro_id).filter(
+            RegistroEliminado.tabla == 'prestamos',
+            RegistroEliminado.fecha_eliminacion > desde,
+            RegistroEliminado.cobrador_id != usuario_id,
+            RegistroEliminado.registro_id.in_(ids_prestamos)
+        )} if ids_prestamos else set()
+        clientes_reasignados = {p.cliente_id for p in prestamos if p.id in reasignados}
+        clientes = Cliente.query.filter(
+            Cliente.id.in_(clientes_cobrador),
+            or_(Cliente.fecha_actualizacion > desde, Cliente.id.in_(clientes_reasignados))
+        ).all()
+        pagos = Pago.query.filter(
+            Pago.prestamo_id.in_(prestamos_cobrador),
+            or_(Pago.fecha_actualizacion > desde, Pago.prestamo_id.in_(reasignados))
+        ).all()
+        # Solo lo que tenía este cobrador (o sin cobrador: tombstones anteriores a la columna).
+        # Un préstamo que se le quitó y volvió a asignar viaja en `prestamos`, no como eliminado
+        eliminados = [e for e in RegistroEliminado.query.filter(
+            RegistroEliminado.fecha_eliminacion > desde,
+            or_(RegistroEliminado.cobrador_id == usuario_id, RegistroEliminado.cobrador_id.is_(None))
+        ).order_by(RegistroEliminado.id) if not (e.tabla == 'prestamos' and e.registro_id in ids_prestamos)]
+    
+    return jsonify({
+        'cursor': nuevo_cursor.isoformat(),
+        'completo': desde is None,
+        'clientes': [_cliente_sync(c) for c in clientes],
+        'prestamos': [_prestamo_sync(p) for p in prestamos],
+        'pagos': [_pago_sync(p) for p in pagos],
+        'eliminados': [{
+            'tabla': e.tabla,
+            'id': e.registro_id,
+            'fecha': e.fecha_eliminacion.isoformat()
+        } for e in eliminados]
+    }), 200
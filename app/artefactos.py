@@ -0,0 +1,254 @@
+"""
+Caché de artefactos generados (recibos y comprobantes) de DIAMANTE PRO
+Un recibo de pago no cambia después de registrado: se genera una vez y las
+veces siguientes que el cobrador lo comparte se sirve desde la caché.
+
+La clave es un hash de todo lo que determina la imagen (tipo, id, versión
+de plantilla, datos mostrados, formato y ancho), así nunca se sirve un
+artefacto viejo: si algo cambia, cambia la clave.
+
+Backends con límite de tamaño y expulsión LRU:
+- CacheMemoria: en el proceso (RECIBOS_CACHE=memoria, tests)
+- CacheDisco: directorio local (RECIBOS_CACHE=disco)
+- CacheS3: bucket AWS_BUCKET_NAME bajo el prefijo cache/recibos/ (RECIBOS_CACHE=s3)
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+from flask import current_app, send_file
+from .almacenamiento import cliente_s3, hay_boto3
+
+logger = logging.getLogger(__name__)
+
+UN_ANO = 365 * 24 * 3600
+
+
+def clave_artefacto(*partes):
+    """Clave direccionada por contenido a partir de las partes que determinan el artefacto"""
+    return hashlib.sha256('|'.join(str(p) for p in partes).encode('utf-8')).hexdigest()
+
+
+class CacheMemoria:
+    """Caché en memoria del proceso (tests, o cuando no hay disco ni S3)"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._datos = OrderedDict()
+        self._tamano = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        with self._lock:
+            if clave not in self._datos:
+                return None
+            self._datos.move_to_end(clave)
+            return self._datos[clave]
+
+    def guardar(self, clave, contenido, mimetype=None):
+        with self._lock:
+            if clave in self._datos:
+                self._tamano -= len(self._datos.pop(clave))
+            self._datos[clave] = contenido
+            self._tamano += len(contenido)
+            while self._tamano > self.max_bytes and len(self._datos) > 1:
+                _, expulsado = self._datos.popitem(last=False)
+                self._tamano -= len(expulsado)
+
+
+class CacheDisco:
+    """Caché en un directorio local; la fecha de modificación marca el último uso (LRU)"""
+
+    def __init__(self, directorio, max_bytes):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self._tamano = None
+        self._lock = threading.Lock()
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave[:2], clave)
+
+    def _archivos(self):
+        for carpeta, _, nombres in os.walk(self.directorio):
+            for nombre in nombres:
+                ruta = os.path.join(carpeta, nombre)
+                try:
+                    estado = os.stat(ruta)
+                except FileNotFoundError:
+                    continue  # Expulsado por otro proceso
+                yield ruta, estado.st_size, estado.st_mtime
+
+    def obtener(self, clave):
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'rb') as archivo:
+                contenido = archivo.read()
+            os.utime(ruta)  # Marca de último uso
+            return contenido
+        except FileNotFoundError:
+            return None
+
+    def guardar(self, clave, contenido, mimetype=None):
+        ruta = self._ruta(clave)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporal, 'wb') as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)  # Escritura atómica: otro worker nunca lee un archivo a medias
+
+        with self._lock:
+            if self._tamano is None:
+                self._tamano = sum(tamano for _, tamano, _ in self._archivos())
+            else:
+                self._tamano += len(contenido)
+            if self._tamano > self.max_bytes:
+                self._expulsar()
+
+    def _expulsar(self):
+        """Borra los menos usados hasta quedar en el 90% del límite"""
+        archivos = sorted(self._archivos(), key=lambda a: a[2])
+        total = sum(tamano for _, tamano, _ in archivos)
+        objetivo = self.max_bytes * 0.9
+        for ruta, tamano, _ in archivos:
+            if total <= objetivo:
+                break
+            try:
+                os.remove(ruta)
+                total -= tamano
+            except FileNotFoundError:
+                pass
+        self._tamano = total
+
+
+class CacheS3:
+    """
+    Caché en S3. S3 no registra lecturas, así que al leer un objeto con más de un día
+    se copia sobre sí mismo para renovar LastModified: LRU con resolución de un día.
+    """
+
+    def __init__(self, bucket, max_bytes, prefijo='cache/recibos/', cliente=None):
+        self.bucket = bucket
+        self.max_bytes = max_bytes
+        self.prefijo = prefijo
+        self.cliente = cliente or cliente_s3()
+        self._escrito = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        try:
+            objeto = self.cliente.get_object(Bucket=self.bucket, Key=self.prefijo + clave)
+        except self.cliente.exceptions.NoSuchKey:
+            return None
+        contenido = objeto['Body'].read()
+        if objeto['LastModified'] < datetime.now(timezone.utc) - timedelta(days=1):
+            self.cliente.copy_object(
+                Bucket=self.bucket, Key=self.prefijo + clave,
+                CopySource={'Bucket': self.bucket, 'Key': self.prefijo + clave},
+                ContentType=objeto.get('ContentType', 'application/octet-stream'),
+                MetadataDirective='REPLACE'
+            )
+        return contenido
+
+    def guardar(self, clave, contenido, mimetype=None):
+        self.cliente.put_object(Bucket=self.bucket, Key=self.prefijo + clave, Body=contenido,
+                                ContentType=mimetype or 'application/octet-stream')
+        # Listar el bucket es costoso: se revisa el tamaño cada ~5% del límite escrito
+        with self._lock:
+            self._escrito += len(contenido)
+            if self._escrito < self.max_bytes * 0.05:
+                return
+            self._escrito = 0
+        self._expulsar()
+
+    def _expulsar(self):
+        objetos = []
+        for pagina in self.cliente.get_paginator('list_objects_v2').paginate(Bucket=self.bucket,
+                                                                             Prefix=self.prefijo):
+            objetos.extend(pagina.get('Contents', []))
+        total = sum(o['Size'] for o in objetos)
+        objetivo = self.max_bytes * 0.9
+        borrar = []
+        for objeto in sorted(objetos, key=lambda o: o['LastModified']):
+            if total <= objetivo:
+                break
+            borrar.append({'Key': objeto['Key']})
+            total -= objeto['Size']
+        for i in range(0, len(borrar), 1000):  # Máximo 1000 claves por delete_objects
+            self.cliente.delete_objects(Bucket=self.bucket, Delete={'Objects': borrar[i:i + 1000]})
+
+
+def crear_cache(config):
+    """Backend según la configuración (None si la caché está desactivada)"""
+    tipo = (config.get('RECIBOS_CACHE') or '').lower()
+    max_bytes = int(config.get('RECIBOS_CACHE_MAX_MB', 200)) * 1024 * 1024
+    if tipo == 'memoria':
+        return CacheMemoria(max_bytes)
+    if tipo == 'disco':
+        directorio = config.get('RECIBOS_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'diamante_recibos')
+        return CacheDisco(directorio, max_bytes)
+    if tipo == 's3':
+        bucket = os.environ.get('AWS_BUCKET_NAME')
+        if hay_boto3() and bucket:
+            return CacheS3(bucket, max_bytes)
+        logger.warning("⚠️ RECIBOS_CACHE=s3 sin boto3 o AWS_BUCKET_NAME - Caché de recibos desactivada")
+    return None
+
+
+def cache_artefactos():
+    """Caché de la aplicación actual (una instancia por proceso)"""
+    if 'cache_artefactos' not in current_app.extensions:
+        current_app.extensions['cache_artefactos'] = crear_cache(current_app.config)
+    return current_app.extensions['cache_artefactos']
+
+
+def obtener_o_generar(clave, generar, mimetype):
+    """
+    Contenido del artefacto desde la caché, o generado con generar() y guardado.
+    Una falla de la caché nunca impide responder: se genera igual.
+    """
+    cache = cache_artefactos()
+    if cache is None:
+        return generar()
+    try:
+        contenido = cache.obtener(clave)
+        if contenido is not None:
+            return contenido
+    except Exception as e:
+        logger.warning(f"⚠️ Error leyendo la caché de recibos: {e}")
+
+    contenido = generar()
+    try:
+        cache.guardar(clave, contenido, mimetype)
+    except Exception as e:
+        logger.warning(f"⚠️ Error guardando en la caché de recibos: {e}")
+    return contenido
+
+
+def servir_artefacto(contenido, mimetype, nombre_descarga, inmutable=False):
+    """
+    Respuesta con ETag fuerte (hash del contenido) y 304 si el cliente ya lo tiene.
+    inmutable=True para URLs cuyo contenido no cambia nunca (con la versión en la URL);
+    si no, el navegador revalida en cada uso (no-cache) y recibe 304 mientras no cambie.
+    """
+    respuesta = send_file(
+        BytesIO(contenido),
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=nombre_descarga,
+        etag=hashlib.sha256(contenido).hexdigest()[:32],
+        conditional=True,
+        max_age=UN_ANO if inmutable else None
+    )
+    # Son datos de clientes: solo la caché del navegador, nunca proxies compartidos
+    respuesta.cache_control.public = False
+    respuesta.cache_control.private = True
+    if inmutable:
+        respuesta.cache_control.immutable = True
+    else:
+        respuesta.cache_control.no_cache = True
+    return respuesta
@@ -0,0 +1,95 @@
+"""
+Festivos nacionales de los países donde opera DIAMANTE PRO
+
+Se calculan (no hay dependencia externa): fechas fijas, festivos que dependen
+de la Pascua y, en Colombia, los que la ley Emiliani traslada al lunes.
+En Perú y Argentina solo se incluyen los festivos fijos y los de Semana Santa
+(los trasladables por decreto de cada año no se conocen de antemano).
+Lo usa el plan de cuotas (cuotas.py) para no poner vencimientos en festivo.
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+
+# Festivos de fecha fija (mes, día)
+FIJOS = {
+    'colombia': ((1, 1), (5, 1), (7, 20), (8, 7), (12, 8), (12, 25)),
+    'brasil': ((1, 1), (4, 21), (5, 1), (9, 7), (10, 12), (11, 2), (11, 15), (11, 20), (12, 25)),
+    'peru': ((1, 1), (5, 1), (6, 29), (7, 28), (7, 29), (8, 30), (10, 8), (11, 1), (12, 8), (12, 9), (12, 25)),
+    'argentina': ((1, 1), (3, 24), (4, 2), (5, 1), (5, 25), (6, 20), (7, 9), (12, 8), (12, 25)),
+    'usa': ((1, 1), (6, 19), (7, 4), (11, 11), (12, 25)),
+}
+
+# Colombia: festivos que se trasladan al lunes siguiente (ley 51 de 1983)
+TRASLADABLES_COLOMBIA = ((1, 6), (3, 19), (6, 29), (8, 15), (10, 12), (11, 1), (11, 11))
+
+# Días relativos al domingo de Pascua
+DE_PASCUA = {
+    # Jueves y Viernes Santo, Ascensión, Corpus Christi y Sagrado Corazón (ya en lunes)
+    'colombia': (-3, -2, 43, 64, 71),
+    # Lunes y martes de Carnaval, Viernes Santo, Corpus Christi
+    'brasil': (-48, -47, -2, 60),
+    'peru': (-3, -2),
+    'argentina': (-48, -47, -2),
+    'usa': (),
+}
+
+NOMBRES_PAIS = {'perú': 'peru', 'brazil': 'brasil'}
+
+
+def domingo_de_pascua(ano):
+    """Domingo de Pascua (algoritmo gregoriano anónimo)"""
+    a, b, c = ano % 19, ano // 100, ano % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    mes = (h + l - 7 * m + 90) // 25
+    dia = (h + l - 7 * m + 33 * mes + 19) % 32
+    return date(ano, mes, dia)
+
+
+def _enesimo_dia(ano, mes, dia_semana, n):
+    """n-ésimo día de la semana del mes (n=-1: el último)"""
+    if n > 0:
+        primero = date(ano, mes, 1)
+        return primero + timedelta(days=(dia_semana - primero.weekday()) % 7 + 7 * (n - 1))
+    ultimo = date(ano + mes // 12, mes % 12 + 1, 1) - timedelta(days=1)
+    return ultimo - timedelta(days=(ultimo.weekday() - dia_semana) % 7)
+
+
+def _normalizar(pais):
+    nombre = (pais or 'Colombia').strip().lower()
+    return NOMBRES_PAIS.get(nombre, nombre)
+
+
+@lru_cache(maxsize=64)
+def festivos(pais, ano):
+    """Conjunto de festivos (date) del país en el año; vacío si el país no se conoce"""
+    pais = _normalizar(pais)
+    if pais not in FIJOS:
+        return frozenset()
+
+    dias = {date(ano, mes, dia) for mes, dia in FIJOS[pais]}
+    pascua = domingo_de_pascua(ano)
+    dias.update(pascua + timedelta(days=n) for n in DE_PASCUA[pais])
+
+    if pais == 'colombia':
+        for mes, dia in TRASLADABLES_COLOMBIA:
+            fecha = date(ano, mes, dia)
+            dias.add(fecha + timedelta(days=(7 - fecha.weekday()) % 7))
+    elif pais == 'usa':
+        dias.update({
+            _enesimo_dia(ano, 1, 0, 3),   # Martin Luther King
+            _enesimo_dia(ano, 2, 0, 3),   # Presidents' Day
+            _enesimo_dia(ano, 5, 0, -1),  # Memorial Day
+            _enesimo_dia(ano, 9, 0, 1),   # Labor Day
+            _enesimo_dia(ano, 10, 0, 2),  # Columbus Day
+            _enesimo_dia(ano, 11, 3, 4),  # Thanksgiving
+        })
+    return frozenset(dias)
+
+
+def es_festivo(fecha, pais):
+    return fecha in festivos(pais, fecha.year)
@@ -0,0 +1,62 @@
+"""
+Motor de cobranza diaria de DIAMANTE PRO
+Calcula en una sola consulta qué préstamos siguen pendientes de cobro en una fecha
+"""
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
+from .models import Prestamo, Pago, ESTADOS_VIGENTES, db
+from .fechas import rango_del_dia
+from .cuotas import tiene_plan, tiene_cuota_vencida
+
+
+def consulta_pendientes(fecha, cobrador_id=None, ruta_id=None, frecuencias=None, zona=None):
+    """Query (sin ejecutar) de prestamos_pendientes(); útil para EXPLAIN"""
+    inicio, fin = rango_del_dia(fecha, zona)
+
+    pago_del_dia = db.session.query(Pago.id).filter(
+        Pago.prestamo_id == Prestamo.id,
+        Pago.fecha_pago >= inicio,
+        Pago.fecha_pago < fin
+    ).exists()
+
+    # Con plan de cuotas: debe alguna cuota vencida hasta la fecha.
+    # Sin plan (préstamos anteriores a la tabla cuotas): todos, o los de las frecuencias indicadas
+    sin_plan = ~tiene_plan()
+    if frecuencias:
+        sin_plan = sin_plan & Prestamo.frecuencia.in_(frecuencias)
+
+    query = Prestamo.query.options(joinedload(Prestamo.cliente)).filter(
+        Prestamo.estado.in_(ESTADOS_VIGENTES),
+        ~pago_del_dia,
+        or_(tiene_cuota_vencida(fecha), sin_plan)
+    )
+
+    if cobrador_id:
+        query = query.filter(Prestamo.cobrador_id == cobrador_id)
+    if ruta_id:
+        query = query.filter(Prestamo.ruta_id == ruta_id)
+
+    return query.order_by(Prestamo.cuotas_atrasadas.desc(), Prestamo.id)
+
+
+def prestamos_pendientes(fecha, cobrador_id=None, ruta_id=None, frecuencias=None, zona=None):
+    """
+    Préstamos activos que NO registran ningún pago en la fecha indicada y deben
+    alguna cuota vencida hasta esa fecha (según su plan de cuotas).
+
+    Usa un anti-join (NOT EXISTS) contra pagos y precarga el cliente con un JOIN,
+    así el costo es una sola consulta sin importar cuántos préstamos tenga la ruta.
+
+    Args:
+        fecha: Día a evaluar (date)
+        cobrador_id: Limitar a los préstamos de un cobrador (opcional)
+        ruta_id: Limitar a los préstamos de una ruta (opcional)
+        frecuencias: Frecuencias a incluir entre los préstamos SIN plan de cuotas,
+            ej. ['DIARIO', 'BISEMANAL'] (opcional; los que tienen plan se filtran por sus vencimientos)
+        zona: Zona horaria de la ruta para los límites del día (opcional, ver fechas.py)
+
+    Returns:
+        list[Prestamo]: Ordenados por cuotas atrasadas (los más atrasados primero)
+    """
+    return consulta_pendientes(fecha, cobrador_id=cobrador_id, ruta_id=ruta_id, frecuencias=frecuencias,
+                               zona=zona).all()
@@ -0,0 +1,98 @@
+"""
+Pool de conexiones a la base de datos de DIAMANTE PRO
+
+Heroku Postgres limita las conexiones por plan (Essential-0: 20). Cada worker de
+gunicorn tiene su propio pool, así que el máximo de conexiones es:
+    workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) + scripts y worker de correos
+y debe quedar por debajo del límite del plan. /estado/pool muestra el uso real
+del pool de cada proceso (conexiones en uso, overflow, espera para obtener una).
+
+Variables (solo PostgreSQL; SQLite usa los valores de Flask-SQLAlchemy):
+    DB_POOL_SIZE (5), DB_MAX_OVERFLOW (2), DB_POOL_TIMEOUT (10 s),
+    DB_POOL_RECYCLE (1800 s), DB_POOL_PRE_PING (1),
+    DB_STATEMENT_TIMEOUT_MS (0 = sin límite)
+
+El límite por sentencia es solo para las peticiones web: lo fija gunicorn.conf.py
+(WEB_STATEMENT_TIMEOUT_MS). Las migraciones (CREATE INDEX CONCURRENTLY sobre tablas
+grandes) y las tareas por lotes (recalcular_mora.py, recalcular_scoring.py...) corren
+sin límite; por eso DB_STATEMENT_TIMEOUT_MS no debe ser una config var global de Heroku.
+"""
+import os
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMedido(QueuePool):
+    """QueuePool que registra cuánto se espera para obtener una conexión"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock_medidas = threading.Lock()
+        self.medidas = {'obtenidas': 0, 'espera_total': 0.0, 'espera_maxima': 0.0, 'agotado': 0}
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._lock_medidas:
+                self.medidas['agotado'] += 1
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            with self._lock_medidas:
+                self.medidas['obtenidas'] += 1
+                self.medidas['espera_total'] += espera
+                self.medidas['espera_maxima'] = max(self.medidas['espera_maxima'], espera)
+
+
+def _entero(entorno, nombre, defecto):
+    return int(entorno.get(nombre, defecto))
+
+
+def opciones_motor(uri, entorno=None):
+    """SQLALCHEMY_ENGINE_OPTIONS según la base y las variables de entorno"""
+    entorno = os.environ if entorno is None else entorno
+    if not uri.startswith('postgresql'):
+        return {}
+
+    opciones = {
+        'poolclass': PoolMedido,
+        'pool_size': _entero(entorno, 'DB_POOL_SIZE', 5),
+        'max_overflow': _entero(entorno, 'DB_MAX_OVERFLOW', 2),
+        'pool_timeout': _entero(entorno, 'DB_POOL_TIMEOUT', 10),
+        'pool_recycle': _entero(entorno, 'DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': entorno.get('DB_POOL_PRE_PING', '1').lower() not in ('0', 'false', 'no'),
+    }
+    # Límite por sentencia en el servidor: una consulta desbocada no retiene la conexión
+    timeout_ms = _entero(entorno, 'DB_STATEMENT_TIMEOUT_MS', 0)
+    if timeout_ms:
+        opciones['connect_args'] = {'options': f'-c statement_timeout={timeout_ms}'}
+    return opciones
+
+
+def metricas_pool(engine):
+    """Estado del pool del proceso actual"""
+    pool = engine.pool
+    metricas = {'pid': os.getpid(), 'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        metricas.update({
+            'tamano': pool.size(),
+            'en_uso': pool.checkedout(),
+            'libres': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+        })
+    medidas = getattr(pool, 'medidas', None)
+    if medidas:
+        obtenidas = medidas['obtenidas']
+        metricas.update({
+            'obtenidas': obtenidas,
+            'espera_promedio_ms': round(medidas['espera_total'] / obtenidas * 1000, 3) if obtenidas else 0,
+            'espera_maxima_ms': round(medidas['espera_maxima'] * 1000, 3),
+            'agotado': medidas['agotado'],
+        })
+    return metricas
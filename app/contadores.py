@@ -0,0 +1,114 @@
+"""
+Contadores desnormalizados de rutas y usuarios de DIAMANTE PRO
+Evitan contar y sumar préstamos y pagos por cada fila en /rutas y /usuarios.
+
+Se actualizan con UPDATE atómicos (col = col + delta) dentro de la misma
+transacción que crea el préstamo o registra el pago, así dos cobros
+concurrentes nunca se pisan. reconciliar_contadores() los reconstruye
+desde cero a partir de préstamos y pagos.
+"""
+from collections import defaultdict
+from sqlalchemy import func, update
+from .models import Usuario, Ruta, Prestamo, Pago, ESTADOS_VIGENTES, db
+
+CONTADORES_ENTEROS = ('prestamos_activos', 'num_cobros')
+
+
+class DeltaContadores:
+    """Acumula cambios para emitir un solo UPDATE por ruta y por usuario"""
+
+    def __init__(self):
+        self.rutas = defaultdict(lambda: defaultdict(float))
+        self.usuarios = defaultdict(lambda: defaultdict(float))
+
+    def prestamo_nuevo(self, prestamo):
+        ruta = self.rutas[prestamo.ruta_id]
+        ruta['prestamos_activos'] += 1
+        ruta['cartera'] += prestamo.saldo_actual
+
+    def cobro(self, prestamo, cobrador_id, monto, saldo_anterior, estado_anterior):
+        """
+        Registra un pago ya aplicado al préstamo.
+        saldo_anterior y estado_anterior son los valores del préstamo antes del pago.
+        """
+        ruta = self.rutas[prestamo.ruta_id]
+        ruta['num_cobros'] += 1
+        ruta['total_cobrado'] += monto
+        if estado_anterior in ESTADOS_VIGENTES:
+            saldo_actual = prestamo.saldo_actual if prestamo.estado in ESTADOS_VIGENTES else 0
+            ruta['cartera'] += saldo_actual - saldo_anterior
+            if prestamo.estado not in ESTADOS_VIGENTES:
+                ruta['prestamos_activos'] -= 1
+
+        usuario = self.usuarios[cobrador_id]
+        usuario['num_cobros'] += 1
+        usuario['total_cobrado'] += monto
+
+    def aplicar(self):
+        """Emite los UPDATE en la sesión actual (sin hacer commit)"""
+        for modelo, deltas in ((Ruta, self.rutas), (Usuario, self.usuarios)):
+            for registro_id, campos in deltas.items():
+                if registro_id is None:
+                    continue
+                valores = {}
+                for campo, delta in campos.items():
+                    if campo in CONTADORES_ENTEROS:
+                        delta = int(delta)
+                    valores[campo] = func.coalesce(getattr(modelo, campo), 0) + delta
+                db.session.execute(
+                    update(modelo).where(modelo.id == registro_id).values(**valores)
+                    .execution_options(synchronize_session=False)
+                )
+        self.rutas.clear()
+        self.usuarios.clear()
+
+
+def contar_prestamo_nuevo(prestamo):
+    """Suma un préstamo recién creado a los contadores de su ruta"""
+    delta = DeltaContadores()
+    delta.prestamo_nuevo(prestamo)
+    delta.aplicar()
+
+
+def contar_cobro(prestamo, cobrador_id, monto, saldo_anterior, estado_anterior):
+    """Suma un pago recién registrado a los contadores de la ruta y del cobrador"""
+    delta = DeltaContadores()
+    delta.cobro(prestamo, cobrador_id, monto, saldo_anterior, estado_anterior)
+    delta.aplicar()
+
+
+def reconciliar_contadores():
+    """
+    Reconstruye todos los contadores desde préstamos y pagos (sin hacer commit).
+
+    Returns:
+        int: Número de rutas y usuarios cuyos contadores no coincidían
+    """
+    por_ruta = defaultdict(lambda: {'prestamos_activos': 0, 'cartera': 0.0, 'num_cobros': 0, 'total_cobrado': 0.0})
+    for ruta_id, activos, cartera in db.session.query(
+        Prestamo.ruta_id,
+        func.count(Prestamo.id),
+        func.sum(Prestamo.saldo_actual)
+    ).filter(Prestamo.estado.in_(ESTADOS_VIGENTES)).group_by(Prestamo.ruta_id).all():
+        por_ruta[ruta_id].update(prestamos_activos=activos, cartera=float(cartera or 0))
+
+    for ruta_id, num_cobros, total in db.session.query(
+        Prestamo.ruta_id, func.count(Pago.id), func.sum(Pago.monto)
+    ).join(Prestamo, Pago.prestamo_id == Prestamo.id).group_by(Prestamo.ruta_id).all():
+        por_ruta[ruta_id].update(num_cobros=num_cobros, total_cobrado=float(total or 0))
+
+    por_usuario = defaultdict(lambda: {'num_cobros': 0, 'total_cobrado': 0.0})
+    for cobrador_id, num_cobros, total in db.session.query(
+        Pago.cobrador_id, func.count(Pago.id), func.sum(Pago.monto)
+    ).group_by(Pago.cobrador_id).all():
+        por_usuario[cobrador_id].update(num_cobros=num_cobros, total_cobrado=float(total or 0))
+
+    corregidos = 0
+    for modelo, esperados in ((Ruta, por_ruta), (Usuario, por_usuario)):
+        for registro in modelo.query.all():
+            valores = esperados[registro.id]
+            if any(abs((getattr(registro, campo) or 0) - valor) > 0.005 for campo, valor in valores.items()):
+                corregidos += 1
+                for campo, valor in valores.items():
+                    setattr(registro, campo, valor)
+    return corregidos
@@ -0,0 +1,367 @@
+"""
+Informes de cuadre de ruta (PDF) de DIAMANTE PRO
+
+datos_cuadre() hace las consultas en el proceso web y devuelve datos planos;
+pdf_cuadre() arma el PDF con ReportLab sin tocar la base de datos, así puede
+correr en un pool de procesos fuera del worker de gunicorn.
+
+ColaPDF encola cuadres (uno o todos los cobradores de un día), los genera en
+paralelo y deja el PDF (o el ZIP del lote) en el almacén de artefactos; el
+navegador consulta el estado y descarga cuando está listo. El estado también
+se guarda en el almacén, así cualquier worker puede responder la consulta.
+
+Con PDF_COLA=worker los PDF no se generan en el proceso web: el trabajo queda
+en la tabla trabajos_pdf y lo genera el proceso 'pdf' del Procfile
+(procesar_pdfs.py), así un lote grande no compite por CPU con los cobros.
+El almacén debe ser compartido entre dynos (RECIBOS_CACHE=s3).
+"""
+import json
+import logging
+import multiprocessing
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime
+from io import BytesIO
+from flask import current_app
+from sqlalchemy.orm import joinedload
+from .models import Prestamo, Pago, Transaccion
+from .artefactos import cache_artefactos, CacheMemoria
+from .cobranza import prestamos_pendientes
+from .fechas import rango_del_dia
+
+logger = logging.getLogger(__name__)
+
+ESTADO_PENDIENTE = 'PENDIENTE'
+ESTADO_LISTO = 'LISTO'
+ESTADO_ERROR = 'ERROR'
+
+
+def datos_cuadre(usuario, fecha, zona=None):
+    """Datos del cuadre de un cobrador en un día (solo tipos simples: se envían a otro proceso)"""
+    fecha_inicio, fecha_fin = rango_del_dia(fecha, zona)
+
+    # ABONOS (pagos recibidos ese día por el cobrador)
+    abonos = [float(monto) for (monto,) in Pago.query.with_entities(Pago.monto).filter(
+        Pago.fecha_pago >= fecha_inicio,
+        Pago.fecha_pago < fecha_fin,
+        Pago.cobrador_id == usuario.id
+    ).all()]
+
+    # DESEMBOLSOS (préstamos creados ese día por el cobrador)
+    creditos = [{
+        'cliente': prestamo.cliente.nombre,
+        'celular': prestamo.cliente.telefono,
+        'valor': float(prestamo.monto_prestado)
+    } for prestamo in Prestamo.query.options(joinedload(Prestamo.cliente)).filter(
+        Prestamo.fecha_inicio >= fecha_inicio,
+        Prestamo.fecha_inicio < fecha_fin,
+        Prestamo.cobrador_id == usuario.id
+    ).all()]
+
+    # GASTOS del día del cobrador
+    gastos = [{
+        'concepto': gasto.concepto,
+        'descripcion': gasto.descripcion,
+        'monto': float(gasto.monto)
+    } for gasto in Transaccion.query.filter(
+        Transaccion.fecha >= fecha_inicio,
+        Transaccion.fecha < fecha_fin,
+        Transaccion.naturaleza == 'EGRESO',
+        Transaccion.usuario_origen_id == usuario.id
+    ).all()]
+
+    # CLIENTES SIN PAGO (préstamos activos del cobrador con cuota vencida que no pagaron ese día;
+    # los que no tienen plan de cuotas, solo DIARIO/BISEMANAL)
+    clientes_sin_pago = [{
+        'numero': prestamo.id,
+        'cliente': prestamo.cliente.nombre,
+        'celular': prestamo.cliente.telefono,
+        'valor': float(prestamo.valor_cuota)
+    } for prestamo in prestamos_pendientes(fecha, cobrador_id=usuario.id,
+                                           frecuencias=['DIARIO', 'BISEMANAL'], zona=zona)]
+
+    total_abonos = sum(abonos)
+    total_desembolsos = sum(c['valor'] for c in creditos)
+    return {
+        'cobrador_id': usuario.id,
+        'cobrador': usuario.nombre,
+        'fecha': fecha.isoformat(),
+        'total_abonos': total_abonos,
+        'total_desembolsos': total_desembolsos,
+        'total_caja': total_abonos - total_desembolsos,
+        'gastos': gastos,
+        'creditos': creditos,
+        'clientes_sin_pago': clientes_sin_pago,
+    }
+
+
+def nombre_archivo_cuadre(datos):
+    fecha = datos['fecha'].replace('-', '')
+    return f"cuadre_ruta_{fecha}.pdf"
+
+
+def pdf_cuadre(datos):
+    """Genera el PDF del cuadre a partir de datos_cuadre() (no usa la base de datos)"""
+    # ReportLab tarda en importarse: solo lo carga el proceso que genera PDF
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    fecha = datetime.strptime(datos['fecha'], '%Y-%m-%d')
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+    styles = getSampleStyleSheet()
+
+    # Título
+    elements.append(Paragraph(f"<b>{datos['cobrador'].upper()} - INFORME</b>", styles['Title']))
+    elements.append(Spacer(1, 0.2*inch))
+
+    # Fecha
+    elements.append(Paragraph(f"Fecha {fecha.strftime('%d/%m/%Y')}", styles['Normal']))
+    elements.append(Spacer(1, 0.3*inch))
+
+    # CUADRE RUTA
+    elements.append(Paragraph("<b>CUADRE RUTA</b>", styles['Heading2']))
+    cuadre_data = [
+        ['ABONOS', 'DESEMBOLSOS', 'TOTAL CAJA'],
+        [f"${datos['total_abonos']:,.2f}", f"${datos['total_desembolsos']:,.2f}", f"${datos['total_caja']:,.2f}"]
+    ]
+    cuadre_table = Table(cuadre_data, colWidths=[2*inch, 2*inch, 2*inch])
+    cuadre_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(cuadre_table)
+    elements.append(Spacer(1, 0.3*inch))
+
+    # GASTOS Y MOVIMIENTOS
+    elements.append(Paragraph("<b>GASTOS Y MOVIMIENTOS</b>", styles['Heading2']))
+    if datos['gastos']:
+        gastos_data = [['CONCEPTO', 'DESCRIPCIÓN', 'VALOR ($)']]
+        for gasto in datos['gastos']:
+            descripcion = gasto['descripcion'] or ''
+            gastos_data.append([
+                gasto['concepto'] or 'Sin concepto',
+                descripcion[:40] + '...' if len(descripcion) > 40 else descripcion,
+                f"${gasto['monto']:,.2f}"
+            ])
+        gastos_table = Table(gastos_data, colWidths=[1.5*inch, 2.5*inch, 1.5*inch])
+        gastos_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        elements.append(gastos_table)
+    else:
+        elements.append(Paragraph("No hay gastos registrados", styles['Normal']))
+    elements.append(Spacer(1, 0.3*inch))
+
+    # CRÉDITOS (PRÉSTAMOS OTORGADOS ESE DÍA)
+    if datos['creditos']:
+        elements.append(Paragraph("<b>CRÉDITOS</b>", styles['Heading2']))
+        creditos_data = [['CLIENTE', 'CELULAR', 'VALOR CRÉDITO ($)']]
+        for credito in datos['creditos']:
+            creditos_data.append([credito['cliente'], credito['celular'], f"${credito['valor']:,.2f}"])
+        creditos_table = Table(creditos_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
+        creditos_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        elements.append(creditos_table)
+        elements.append(Spacer(1, 0.3*inch))
+
+    # CLIENTES SIN PAGO
+    if datos['clientes_sin_pago']:
+        elements.append(Paragraph("<b>CLIENTES SIN PAGO</b>", styles['Heading2']))
+        sin_pago_data = [['N°', 'CLIENTE', 'CELULAR', 'VALOR']]
+        for idx, cliente in enumerate(datos['clientes_sin_pago'][:10], 1):  # Máximo 10
+            sin_pago_data.append([str(idx), cliente['cliente'], cliente['celular'], f"${cliente['valor']:,.2f}"])
+        sin_pago_table = Table(sin_pago_data, colWidths=[0.5*inch, 2.5*inch, 1.5*inch, 1.5*inch])
+        sin_pago_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        elements.append(sin_pago_table)
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+class ColaPDF:
+    """
+    Cola de generación de cuadres en PDF.
+
+    procesos > 0: pool de procesos (ReportLab es CPU puro y no libera el GIL).
+    procesos = 0: hilos del mismo proceso (desarrollo y tests).
+    externa = True: solo registra el trabajo en trabajos_pdf; lo genera procesar_pendiente()
+    en el proceso 'pdf'.
+    """
+
+    def __init__(self, almacen, procesos=2, externa=False):
+        self.almacen = almacen
+        self.procesos = procesos
+        self.externa = externa
+        self._executor = None
+        self._pendientes = {}  # trabajo_id -> Event, solo los encolados en este proceso
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                if self.procesos > 0:
+                    # spawn: no hereda hilos ni conexiones abiertas del worker web
+                    self._executor = ProcessPoolExecutor(max_workers=self.procesos,
+                                                         mp_context=multiprocessing.get_context('spawn'))
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=2)
+            return self._executor
+
+    def _guardar_estado(self, trabajo_id, **estado):
+        self.almacen.guardar(f"trabajo-{trabajo_id}.json", json.dumps(estado).encode('utf-8'), 'application/json')
+
+    def estado(self, trabajo_id):
+        """Estado del trabajo (dict) o None si no existe"""
+        contenido = self.almacen.obtener(f"trabajo-{trabajo_id}.json")
+        return json.loads(contenido) if contenido else None
+
+    def contenido(self, trabajo_id):
+        """PDF o ZIP generado (None si aún no está listo)"""
+        return self.almacen.obtener(f"trabajo-{trabajo_id}")
+
+    def _nuevo(self, tipo, nombre, fecha, **extra):
+        trabajo_id = uuid.uuid4().hex
+        estado = dict(id=trabajo_id, tipo=tipo, nombre=nombre, fecha=fecha, estado=ESTADO_PENDIENTE,
+                      creado=datetime.utcnow().isoformat(), **extra)
+        self._guardar_estado(trabajo_id, **estado)
+        if not self.externa:
+            self._pendientes[trabajo_id] = threading.Event()
+        return trabajo_id, estado
+
+    def _terminar(self, trabajo_id, estado, generar):
+        try:
+            contenido = generar()
+            self.almacen.guardar(f"trabajo-{trabajo_id}", contenido, None)
+            estado.update(estado=ESTADO_LISTO, tamano=len(contenido))
+        except Exception as e:
+            logger.error(f"❌ Error generando {estado['nombre']}: {e}")
+            estado.update(estado=ESTADO_ERROR, error=str(e))
+        estado['terminado'] = datetime.utcnow().isoformat()
+        self._guardar_estado(trabajo_id, **estado)
+        evento = self._pendientes.pop(trabajo_id, None)
+        if evento is not None:
+            evento.set()
+        return estado
+
+    def _registrar(self, trabajo_id, tipo, lista_datos):
+        from .models import db, TrabajoPDF
+        db.session.add(TrabajoPDF(id=trabajo_id, tipo=tipo, datos=json.dumps(lista_datos)))
+        db.session.commit()
+
+    def encolar_cuadre(self, datos):
+        """Encola el PDF de un cobrador; devuelve el id del trabajo"""
+        nombre = nombre_archivo_cuadre(datos)
+        trabajo_id, estado = self._nuevo('cuadre', nombre, datos['fecha'])
+        if self.externa:
+            self._registrar(trabajo_id, 'cuadre', [datos])
+            return trabajo_id
+        futuro = self._pool().submit(pdf_cuadre, datos)
+        futuro.add_done_callback(lambda f: self._terminar(trabajo_id, estado, f.result))
+        return trabajo_id
+
+    def encolar_lote(self, lista_datos, fecha):
+        """Encola los cuadres de varios cobradores en paralelo; el resultado es un ZIP"""
+        nombre = f"cuadres_{fecha.replace('-', '')}.zip"
+        trabajo_id, estado = self._nuevo('lote', nombre, fecha, total=len(lista_datos))
+        if self.externa:
+            self._registrar(trabajo_id, 'lote', lista_datos)
+            return trabajo_id
+        armar_zip = self._generador_lote(lista_datos)
+        threading.Thread(target=self._terminar, args=(trabajo_id, estado, armar_zip), daemon=True).start()
+        return trabajo_id
+
+    def _generador_lote(self, lista_datos):
+        """Envía los PDF al pool y devuelve la función que arma el ZIP cuando terminan"""
+        futuros = [(datos, self._pool().submit(pdf_cuadre, datos)) for datos in lista_datos]
+
+        def armar_zip():
+            wait([futuro for _, futuro in futuros])
+            buffer = BytesIO()
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archivo:
+                for datos, futuro in futuros:
+                    nombre_pdf = f"{datos['cobrador'].replace(' ', '_')}_{datos['cobrador_id']}.pdf"
+                    archivo.writestr(nombre_pdf, futuro.result())
+            return buffer.getvalue()
+        return armar_zip
+
+    def procesar_pendiente(self):
+        """
+        Genera el trabajo más antiguo de trabajos_pdf (lo llama el proceso 'pdf').
+        Devuelve su estado, o None si no hay pendientes.
+        """
+        from .models import db, TrabajoPDF
+        # skip_locked: varios procesos 'pdf' no toman el mismo trabajo (PostgreSQL).
+        # El bloqueo dura hasta el commit: si el proceso muere, el trabajo sigue PENDIENTE
+        trabajo = TrabajoPDF.query.filter(TrabajoPDF.estado == ESTADO_PENDIENTE)\
+            .order_by(TrabajoPDF.fecha_creacion).limit(1).with_for_update(skip_locked=True).first()
+        if trabajo is None:
+            db.session.rollback()
+            return None
+
+        lista_datos = json.loads(trabajo.datos)
+        estado = self.estado(trabajo.id) or dict(id=trabajo.id, tipo=trabajo.tipo, estado=ESTADO_PENDIENTE,
+                                                  nombre=nombre_archivo_cuadre(lista_datos[0]))
+        if trabajo.tipo == 'lote':
+            generar = self._generador_lote(lista_datos)
+        else:
+            generar = lambda: self._pool().submit(pdf_cuadre, lista_datos[0]).result()
+        estado = self._terminar(trabajo.id, estado, generar)
+
+        trabajo.estado = estado['estado']
+        trabajo.fecha_fin = datetime.utcnow()
+        db.session.commit()
+        return estado
+
+    def esperar(self, trabajo_id, timeout=None):
+        """Espera un trabajo encolado en este proceso (scripts y tests) y devuelve su estado"""
+        evento = self._pendientes.get(trabajo_id)
+        if evento is not None:
+            evento.wait(timeout)
+        return self.estado(trabajo_id)
+
+
+def cola_pdf():
+    """Cola de la aplicación actual (una por proceso), sobre el almacén de artefactos"""
+    if 'cola_pdf' not in current_app.extensions:
+        almacen = cache_artefactos()
+        if almacen is None:
+            logger.warning("⚠️ Caché de artefactos desactivada - Los PDF en cola solo viven en este proceso")
+            almacen = CacheMemoria(64 * 1024 * 1024)
+        externa = current_app.config.get('PDF_COLA') == 'worker'
+        if externa and isinstance(almacen, CacheMemoria):
+            logger.warning("⚠️ PDF_COLA=worker con almacén en memoria - El proceso web no verá los PDF generados")
+        current_app.extensions['cola_pdf'] = ColaPDF(almacen, current_app.config.get('PDF_PROCESOS', 2), externa)
+    return current_app.extensions['cola_pdf']
@@ -0,0 +1,192 @@
+"""
+Plan de cuotas de DIAMANTE PRO
+
+Al crear un préstamo se generan sus cuotas con la fecha de vencimiento exacta
+según la frecuencia y los festivos del país de la ruta (calendario.py):
+- DIARIO: de lunes a sábado; DIARIO_LUNES_VIERNES: de lunes a viernes.
+  Los festivos se saltan (la cuota pasa al siguiente día de cobro).
+- BISEMANAL: dos cobros por semana (a los 3 y 7 días), SEMANAL, QUINCENAL y
+  MENSUAL: la fecha que cae en domingo o festivo se corre al siguiente día hábil.
+
+"Quién debe pagar hoy", las vencidas y la proyección se consultan sobre la
+tabla cuotas con rangos de fechas (índices), sin heurísticas por día de la semana.
+Los préstamos sin plan (anteriores a la tabla) se completan con generar_plan_cuotas.py.
+"""
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import func, insert, select, update
+from .models import Cuota, Prestamo, Ruta, ESTADOS_VIGENTES, db
+from .calendario import es_festivo
+from .fechas import a_fecha_local, dias_entre, zona_de_pais
+
+# Días entre cuotas de las frecuencias de paso fijo
+DIAS_ENTRE_CUOTAS = {'SEMANAL': 7, 'QUINCENAL': 15}
+
+
+def es_dia_de_cobro(fecha, pais, sabado=True):
+    """Ni domingo ni festivo (ni sábado si sabado=False)"""
+    if fecha.weekday() == 6 or (not sabado and fecha.weekday() == 5):
+        return False
+    return not es_festivo(fecha, pais)
+
+
+def _siguiente_dia_de_cobro(fecha, pais):
+    while not es_dia_de_cobro(fecha, pais):
+        fecha += timedelta(days=1)
+    return fecha
+
+
+def _sumar_meses(fecha, meses):
+    mes = fecha.month - 1 + meses
+    ano, mes = fecha.year + mes // 12, mes % 12 + 1
+    ultimo = (date(ano + mes // 12, mes % 12 + 1, 1) - timedelta(days=1)).day
+    return date(ano, mes, min(fecha.day, ultimo))
+
+
+def fechas_de_vencimiento(frecuencia, fecha_inicio, numero_cuotas, pais=None):
+    """Fechas de vencimiento de las cuotas 1..numero_cuotas (la primera, después de fecha_inicio)"""
+    if isinstance(fecha_inicio, datetime):
+        fecha_inicio = fecha_inicio.date()
+
+    if frecuencia in DIAS_ENTRE_CUOTAS or frecuencia in ('BISEMANAL', 'MENSUAL'):
+        fechas = []
+        for n in range(1, numero_cuotas + 1):
+            if frecuencia == 'MENSUAL':
+                fecha = _sumar_meses(fecha_inicio, n)
+            elif frecuencia == 'BISEMANAL':
+                fecha = fecha_inicio + timedelta(days=(n // 2) * 7 + (n % 2) * 3)
+            else:
+                fecha = fecha_inicio + timedelta(days=n * DIAS_ENTRE_CUOTAS[frecuencia])
+            fechas.append(_siguiente_dia_de_cobro(fecha, pais))
+        return fechas
+
+    # DIARIO (y frecuencias desconocidas) o DIARIO_LUNES_VIERNES: un cobro por día de cobro
+    sabado = frecuencia != 'DIARIO_LUNES_VIERNES'
+    fechas = []
+    fecha = fecha_inicio
+    while len(fechas) < numero_cuotas:
+        fecha += timedelta(days=1)
+        if es_dia_de_cobro(fecha, pais, sabado=sabado):
+            fechas.append(fecha)
+    return fechas
+
+
+def cuotas_cubiertas(prestamo, saldo):
+    """Cuotas completas que cubre lo abonado hasta quedar en ese saldo"""
+    if not prestamo.valor_cuota:
+        return 0
+    return int((prestamo.monto_a_pagar - saldo) / prestamo.valor_cuota + 1e-6)
+
+
+def filas_del_plan(prestamo, pais=None):
+    """Filas de la tabla cuotas del préstamo (la última cuota absorbe el redondeo)"""
+    inicio = prestamo.fecha_inicio or datetime.now()
+    # A medianoche: fecha de formulario (registros anteriores); si no, el día en el país de la ruta
+    if inicio.time() != time.min:
+        inicio = a_fecha_local(inicio, zona_de_pais(pais))
+    fechas = fechas_de_vencimiento(prestamo.frecuencia, inicio, prestamo.numero_cuotas, pais)
+    valor = round(prestamo.valor_cuota, 2)
+    pagadas = cuotas_cubiertas(prestamo, prestamo.saldo_actual)
+    return [{
+        'prestamo_id': prestamo.id,
+        'numero': numero,
+        'fecha_vencimiento': fecha,
+        'monto': valor if numero < len(fechas) else round(prestamo.monto_a_pagar - valor * (len(fechas) - 1), 2),
+        'pagada': numero <= pagadas,
+    } for numero, fecha in enumerate(fechas, start=1)]
+
+
+def crear_plan_cuotas(prestamo, pais=None):
+    """
+    Genera las cuotas del préstamo con un solo INSERT y fija fecha_fin_estimada
+    en el último vencimiento (sin commit). pais: el de la ruta si no se indica.
+    """
+    if prestamo.id is None:
+        db.session.flush()
+    if pais is None:
+        pais = db.session.query(Ruta.pais).filter(Ruta.id == prestamo.ruta_id).scalar()
+    filas = filas_del_plan(prestamo, pais)
+    if filas:
+        db.session.execute(insert(Cuota), filas)
+        prestamo.fecha_fin_estimada = datetime.combine(filas[-1]['fecha_vencimiento'], time())
+    return filas
+
+
+def generar_planes_faltantes(lote=1000):
+    """
+    Crea el plan de cuotas de los préstamos vigentes que no lo tienen (anteriores a la
+    tabla cuotas), de a `lote` préstamos con un INSERT por lote. Las cuotas ya cubiertas
+    por el saldo quedan pagadas. Hace commit por lote; devuelve los préstamos completados.
+    """
+    completados = 0
+    ultimo_id = 0
+    while True:
+        prestamos = db.session.query(Prestamo, Ruta.pais).join(Ruta, Prestamo.ruta_id == Ruta.id).filter(
+            Prestamo.id > ultimo_id,
+            Prestamo.estado.in_(ESTADOS_VIGENTES),
+            ~tiene_plan()
+        ).order_by(Prestamo.id).limit(lote).all()
+        if not prestamos:
+            return completados
+        filas = [fila for prestamo, pais in prestamos for fila in filas_del_plan(prestamo, pais)]
+        if filas:
+            db.session.execute(insert(Cuota), filas)
+        db.session.commit()
+        completados += len(prestamos)
+        ultimo_id = prestamos[-1][0].id
+
+
+def marcar_cuotas_pagadas(prestamo, saldo_anterior):
+    """Marca como pagadas las cuotas que cubrió el abono (un UPDATE, solo si completó alguna)"""
+    cubiertas = cuotas_cubiertas(prestamo, prestamo.saldo_actual)
+    if cubiertas > cuotas_cubiertas(prestamo, saldo_anterior):
+        db.session.execute(update(Cuota).where(
+            Cuota.prestamo_id == prestamo.id, Cuota.numero <= cubiertas, Cuota.pagada == False
+        ).values(pagada=True))
+
+
+# ==================== CONDICIONES PARA CONSULTAS ====================
+
+def tiene_plan():
+    """EXISTS correlacionado con Prestamo: el préstamo tiene plan de cuotas"""
+    return db.session.query(Cuota.id).filter(Cuota.prestamo_id == Prestamo.id).exists()
+
+
+def tiene_cuota_vencida(fecha):
+    """EXISTS correlacionado con Prestamo: alguna cuota sin pagar vence en la fecha o antes"""
+    return db.session.query(Cuota.id).filter(
+        Cuota.prestamo_id == Prestamo.id,
+        Cuota.pagada == False,
+        Cuota.fecha_vencimiento <= fecha
+    ).exists()
+
+
+def dias_de_atraso(fecha):
+    """
+    Expresión correlacionada con Prestamo: días desde la cuota sin pagar más antigua
+    vencida antes de la fecha (0 si está al día). Usa ix_cuotas_prestamo_pagada_vencimiento.
+    """
+    mas_antigua = select(func.min(Cuota.fecha_vencimiento)).where(
+        Cuota.prestamo_id == Prestamo.id,
+        Cuota.pagada == False,
+        Cuota.fecha_vencimiento < fecha
+    ).scalar_subquery()
+    return func.coalesce(dias_entre(mas_antigua, fecha), 0)
+
+
+def consulta_vencidas(fecha, *filtros):
+    """
+    Cuotas sin pagar vencidas antes de la fecha, agrupadas por préstamo activo:
+    (prestamo_id, cuotas vencidas, monto vencido, vencimiento más antiguo).
+    filtros: condiciones adicionales sobre Prestamo (cobrador, ruta).
+    """
+    return db.session.query(
+        Cuota.prestamo_id,
+        func.count(Cuota.id),
+        func.sum(Cuota.monto),
+        func.min(Cuota.fecha_vencimiento)
+    ).join(Prestamo, Cuota.prestamo_id == Prestamo.id).filter(
+        Cuota.fecha_vencimiento < fecha,
+        Cuota.pagada == False,
+        Prestamo.estado.in_(ESTADOS_VIGENTES),
+        *filtros
+    ).group_by(Cuota.prestamo_id)
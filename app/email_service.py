@@ -1,8 +1,21 @@
 """
 Servicio de Email con SendGrid para DIAMANTE PRO
+
+Los correos de la aplicación no se envían dentro del request: queue_email() los
+guarda en la bandeja de salida (tabla correos_pendientes) en la misma transacción
+que la operación que los origina, y el worker enviar_correos.py los envía.
+El worker agrupa los correos con el mismo contenido en un solo llamado a SendGrid
+(una personalization por destinatario), reintenta con espera exponencial y limita
+los llamados por segundo.
+
+EMAIL_TRANSPORTE=falso guarda los envíos en memoria en vez de llamar a SendGrid
+(desarrollo y tests, sin red).
 """
 import os
 import logging
+import threading
+import time
+from datetime import datetime, timedelta
 
 try:
     from sendgrid import SendGridAPIClient
@@ -13,14 +26,90 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+MAX_DESTINATARIOS = 1000  # Límite de personalizations por llamado de SendGrid
+MAX_INTENTOS = 5
+ESPERA_BASE = 60  # Segundos antes del primer reintento; se duplica en cada falla
+ESPERA_MAXIMA = 3600
+
+
+class TransporteSendGrid:
+    """API de SendGrid con un solo cliente para todos los envíos"""
+
+    def __init__(self, api_key):
+        self.cliente = SendGridAPIClient(api_key)
+
+    def enviar(self, remitente, destinatarios, asunto, html, texto=None):
+        message = Mail(
+            from_email=Email(remitente, "DIAMANTE PRO"),
+            to_emails=[To(d) for d in destinatarios],
+            subject=asunto,
+            html_content=Content("text/html", html),
+            is_multiple=True  # Cada destinatario en su personalization: no ven a los demás
+        )
+        if texto:
+            message.plain_text_content = Content("text/plain", texto)
+        response = self.cliente.send(message)
+        if response.status_code not in (200, 201, 202):
+            raise RuntimeError(f"SendGrid respondió {response.status_code}")
+        return response.status_code
+
+
+class TransporteFalso:
+    """Guarda los envíos en memoria. fallas: cuántos envíos fallan antes de funcionar"""
+
+    def __init__(self, fallas=0):
+        self.enviados = []
+        self.fallas = fallas
+
+    def enviar(self, remitente, destinatarios, asunto, html, texto=None):
+        if self.fallas > 0:
+            self.fallas -= 1
+            raise ConnectionError("Falla simulada")
+        self.enviados.append({'remitente': remitente, 'destinatarios': list(destinatarios),
+                              'asunto': asunto, 'html': html, 'texto': texto})
+        logger.info(f"Email (transporte falso) a {len(destinatarios)} destinatarios: {asunto}")
+        return 202
+
+
+class LimiteEnvios:
+    """Máximo de llamados por segundo al proveedor"""
+
+    def __init__(self, por_segundo):
+        self.intervalo = 1.0 / por_segundo if por_segundo else 0
+        self._siguiente = 0.0
+        self._lock = threading.Lock()
+
+    def esperar(self):
+        with self._lock:
+            ahora = time.monotonic()
+            if self._siguiente > ahora:
+                time.sleep(self._siguiente - ahora)
+                ahora = self._siguiente
+            self._siguiente = ahora + self.intervalo
+
+
+def espera_reintento(intentos):
+    """Segundos hasta el siguiente intento después de `intentos` fallas"""
+    return min(ESPERA_BASE * 2 ** (intentos - 1), ESPERA_MAXIMA)
+
 
 class EmailService:
     """Servicio para enviar emails transaccionales"""
     
-    def __init__(self):
+    def __init__(self, transporte=None):
         self.api_key = os.getenv('SENDGRID_API_KEY')
         self.from_email = os.getenv('SENDGRID_FROM_EMAIL', 'noreply@diamantepro.me')
+        self.limite = LimiteEnvios(float(os.getenv('EMAIL_ENVIOS_POR_SEGUNDO', 5)))
+        
+        if transporte is None and os.getenv('EMAIL_TRANSPORTE', '').lower() == 'falso':
+            transporte = TransporteFalso()
+        if transporte is not None:
+            self.transporte = transporte
+            self.enabled = True
+            return
+        
         self.enabled = bool(self.api_key) and SENDGRID_AVAILABLE
+        self.transporte = TransporteSendGrid(self.api_key) if self.enabled else None
         
         if not SENDGRID_AVAILABLE:
             logger.warning("⚠️ SendGrid no instalado. Emails deshabilitados.")
@@ -30,7 +119,7 @@ class EmailService:
     
     def send_email(self, to_email, subject, html_content, plain_content=None):
         """
-        Enviar un email
+        Enviar un email en el momento (scripts de prueba; la aplicación usa queue_email)
         
         Args:
             to_email: Email del destinatario
@@ -46,28 +135,83 @@ class EmailService:
             return False
         
         try:
-            message = Mail(
-                from_email=Email(self.from_email, "DIAMANTE PRO"),
-                to_emails=To(to_email),
-                subject=subject,
-                html_content=Content("text/html", html_content)
-            )
-            
-            if plain_content:
-                message.plain_text_content = Content("text/plain", plain_content)
-            
-            sg = SendGridAPIClient(self.api_key)
-            response = sg.send(message)
-            
-            logger.info(f"Email enviado a {to_email}. Status: {response.status_code}")
-            return response.status_code in [200, 201, 202]
+            status = self.transporte.enviar(self.from_email, [to_email], subject, html_content, plain_content)
+            logger.info(f"Email enviado a {to_email}. Status: {status}")
+            return True
             
         except Exception as e:
             logger.error(f"Error enviando email a {to_email}: {str(e)}")
             return False
     
-    def send_payment_confirmation(self, cliente_email, cliente_nombre, monto, fecha):
-        """Enviar confirmación de pago"""
+    def queue_email(self, to_email, subject, html_content, plain_content=None):
+        """
+        Guardar un email en la bandeja de salida. No hace commit: se guarda con la
+        transacción de la operación que lo origina (si esta falla, no se envía).
+        """
+        from .models import db, CorreoPendiente
+        correo = CorreoPendiente(destinatario=to_email, asunto=subject, html=html_content,
+                                 texto=plain_content, estado='PENDIENTE', intentos=0,
+                                 proximo_intento=datetime.utcnow())
+        db.session.add(correo)
+        return correo
+    
+    def drain_outbox(self, max_correos=200):
+        """
+        Enviar los correos pendientes cuyo turno llegó (lo llama el worker).
+        Devuelve {'enviados': n, 'reintentos': n, 'errores': n}.
+        """
+        from .models import db, CorreoPendiente
+        resultado = {'enviados': 0, 'reintentos': 0, 'errores': 0}
+        if not self.enabled:
+            return resultado
+        
+        ahora = datetime.utcnow()
+        # skip_locked: varios workers pueden drenar la bandeja sin enviar dos veces (PostgreSQL)
+        correos = CorreoPendiente.query.filter(
+            CorreoPendiente.estado == 'PENDIENTE',
+            CorreoPendiente.proximo_intento <= ahora
+        ).order_by(CorreoPendiente.id).limit(max_correos).with_for_update(skip_locked=True).all()
+        
+        # Mismo contenido = un solo llamado con varios destinatarios
+        grupos = {}
+        for correo in correos:
+            grupos.setdefault((correo.asunto, correo.html, correo.texto), []).append(correo)
+        
+        for (asunto, html, texto), grupo in grupos.items():
+            for i in range(0, len(grupo), MAX_DESTINATARIOS):
+                lote = grupo[i:i + MAX_DESTINATARIOS]
+                self.limite.esperar()
+                try:
+                    self.transporte.enviar(self.from_email, [c.destinatario for c in lote], asunto, html, texto)
+                except Exception as e:
+                    logger.warning(f"⚠️ Error enviando '{asunto}' a {len(lote)} destinatarios: {e}")
+                    for correo in lote:
+                        correo.intentos += 1
+                        correo.ultimo_error = str(e)[:500]
+                        if correo.intentos >= MAX_INTENTOS:
+                            correo.estado = 'ERROR'
+                            resultado['errores'] += 1
+                        else:
+                            correo.proximo_intento = ahora + timedelta(seconds=espera_reintento(correo.intentos))
+                            resultado['reintentos'] += 1
+                    continue
+                for correo in lote:
+                    correo.estado = 'ENVIADO'
+                    correo.fecha_envio = datetime.utcnow()
+                    correo.ultimo_error = None
+                resultado['enviados'] += len(lote)
+        
+        db.session.commit()
+        return resultado
+    
+    def _entregar(self, to_email, subject, html_content, plain_content, encolar):
+        if encolar:
+            self.queue_email(to_email, subject, html_content, plain_content)
+            return True
+        return self.send_email(to_email, subject, html_content, plain_content)
+    
+    def send_payment_confirmation(self, cliente_email, cliente_nombre, monto, fecha, encolar=True):
+        """Confirmación de pago (a la bandeja de salida; encolar=False la envía ya)"""
         subject = "Confirmación de Pago - DIAMANTE PRO"
         html_content = f"""
         <html>
@@ -102,10 +246,10 @@ class EmailService:
         DIAMANTE PRO
         """
         
-        return self.send_email(cliente_email, subject, html_content, plain_content)
+        return self._entregar(cliente_email, subject, html_content, plain_content, encolar)
     
-    def send_payment_reminder(self, cliente_email, cliente_nombre, monto_pendiente, fecha_vencimiento):
-        """Enviar recordatorio de pago"""
+    def send_payment_reminder(self, cliente_email, cliente_nombre, monto_pendiente, fecha_vencimiento, encolar=True):
+        """Recordatorio de pago (a la bandeja de salida; encolar=False lo envía ya)"""
         subject = "Recordatorio de Pago - DIAMANTE PRO"
         html_content = f"""
         <html>
@@ -140,10 +284,10 @@ class EmailService:
         DIAMANTE PRO
         """
         
-        return self.send_email(cliente_email, subject, html_content, plain_content)
+        return self._entregar(cliente_email, subject, html_content, plain_content, encolar)
     
-    def send_new_loan_notification(self, cliente_email, cliente_nombre, monto, cuotas, cuota_valor):
-        """Enviar notificación de nuevo préstamo"""
+    def send_new_loan_notification(self, cliente_email, cliente_nombre, monto, cuotas, cuota_valor, encolar=True):
+        """Notificación de nuevo préstamo (a la bandeja de salida; encolar=False la envía ya)"""
         subject = "Nuevo Préstamo Aprobado - DIAMANTE PRO"
         html_content = f"""
         <html>
@@ -178,7 +322,7 @@ class EmailService:
         DIAMANTE PRO
         """
         
-        return self.send_email(cliente_email, subject, html_content, plain_content)
+        return self._entregar(cliente_email, subject, html_content, plain_content, encolar)
 
 
 # Instancia global del servicio
@@ -0,0 +1,47 @@
+"""
+Estado del servicio: chequeo de salud y métricas de operación
+Se registra en todos los modos (también con APP_MODO=api).
+- /estado/pool: conexiones del pool (app/conexiones.py)
+- /estado/metrics: latencia, consultas y tiempo en la base por endpoint (app/perfilador.py)
+
+Las métricas las ve el dueño con sesión iniciada, o cualquiera que envíe el
+encabezado X-Metricas-Token igual a la variable METRICAS_TOKEN (monitoreo externo).
+"""
+import hmac
+import os
+from flask import Blueprint, request, session, jsonify, current_app
+from .models import db
+from .conexiones import metricas_pool
+
+estado_bp = Blueprint('estado', __name__)
+
+
+def puede_ver_metricas():
+    token = os.environ.get('METRICAS_TOKEN')
+    if token and hmac.compare_digest(request.headers.get('X-Metricas-Token', ''), token):
+        return True
+    return session.get('rol') == 'dueno'
+
+
+@estado_bp.route('/estado')
+def estado():
+    return {"estado": "OK", "version": "1.0"}
+
+
+@estado_bp.route('/estado/pool')
+def estado_pool():
+    """Conexiones del pool de este proceso (cada worker de gunicorn tiene el suyo)"""
+    if not puede_ver_metricas():
+        return jsonify({'error': 'No autorizado'}), 403
+    return jsonify(metricas_pool(db.engine))
+
+
+@estado_bp.route('/estado/metrics')
+def estado_metrics():
+    """Histograma por endpoint de los últimos minutos en este proceso"""
+    if not puede_ver_metricas():
+        return jsonify({'error': 'No autorizado'}), 403
+    perfilador = current_app.extensions.get('perfilador')
+    if perfilador is None:
+        return jsonify({'error': 'Perfilador desactivado (PERFILADOR=0)'}), 404
+    return jsonify({'pid': os.getpid(), 'ventana_minutos': perfilador.ventana, 'endpoints': perfilador.metricas()})
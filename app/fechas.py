@@ -0,0 +1,111 @@
+"""
+Manejo de días y zonas horarias de DIAMANTE PRO
+
+Los timestamps se guardan sin zona, en la hora local del servidor (datetime.now()).
+"El día D" de una ruta depende de su país: el día de un cobrador en Brasil
+empieza dos horas antes que el de uno en Colombia. Estas funciones traducen un
+día en la zona de la ruta a un intervalo [inicio, fin) en hora del servidor,
+para filtrar con comparaciones directas sobre la columna (usan los índices)
+en lugar de func.date() fila por fila.
+"""
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import Date, Integer, cast, func, literal
+from .models import Ruta, db
+
+# País de la ruta (Ruta.pais) -> zona horaria IANA
+ZONAS_POR_PAIS = {
+    'colombia': 'America/Bogota',
+    'brasil': 'America/Sao_Paulo',
+    'brazil': 'America/Sao_Paulo',
+    'peru': 'America/Lima',
+    'perú': 'America/Lima',
+    'argentina': 'America/Argentina/Buenos_Aires',
+    'usa': 'America/New_York',
+}
+
+
+def zona_de_pais(pais):
+    """Zona horaria del país, o None (hora del servidor) si no se conoce"""
+    nombre = ZONAS_POR_PAIS.get((pais or '').strip().lower())
+    if not nombre:
+        return None
+    try:
+        return ZoneInfo(nombre)
+    except ZoneInfoNotFoundError:
+        return None
+
+
+def zona_de_cobrador(cobrador_id):
+    """Zona horaria de la ruta activa asignada al cobrador"""
+    ruta = Ruta.query.filter_by(cobrador_id=cobrador_id, activo=True).order_by(Ruta.id).first()
+    return zona_de_pais(ruta.pais) if ruta else None
+
+
+def zonas_de_rutas():
+    """Agrupa los ids de ruta por zona horaria: {zona o None: [ruta_id, ...]}"""
+    grupos = {}
+    for ruta_id, pais in Ruta.query.with_entities(Ruta.id, Ruta.pais).all():
+        grupos.setdefault(zona_de_pais(pais), []).append(ruta_id)
+    return grupos
+
+
+def hoy_en(zona=None):
+    """Fecha de hoy en la zona indicada (o en el servidor)"""
+    return datetime.now(zona).date() if zona else datetime.now().date()
+
+
+def a_hora_servidor(momento):
+    """Convierte un datetime con zona a la hora local del servidor sin zona (como se guarda)"""
+    return momento.astimezone().replace(tzinfo=None)
+
+
+def a_fecha_local(momento, zona=None):
+    """Fecha en la zona indicada de un timestamp guardado (hora del servidor sin zona)"""
+    if not zona:
+        return momento.date()
+    return momento.astimezone(zona).date()
+
+
+def momento_del_dia(fecha, zona=None):
+    """
+    Timestamp a guardar (hora del servidor) para un registro que solo trae la fecha
+    (formularios): ahora si `fecha` es hoy en la zona, si no el mediodía de ese día en la zona.
+    Cae dentro de rango_del_dia(fecha, zona); la medianoche sin zona quedaría en el día
+    anterior de las rutas al oeste del servidor.
+    """
+    if isinstance(fecha, datetime):
+        fecha = fecha.date()
+    if fecha == hoy_en(zona):
+        return datetime.now()
+    mediodia = datetime.combine(fecha, time(12))
+    return a_hora_servidor(mediodia.replace(tzinfo=zona)) if zona else mediodia
+
+
+def rango_del_dia(fecha, zona=None):
+    """
+    Intervalo [inicio, fin) en hora del servidor que cubre el día `fecha` de la zona.
+    Sin zona, el día es el del servidor.
+    """
+    return rango_de_fechas(fecha, fecha, zona)
+
+
+def rango_de_fechas(desde, hasta, zona=None):
+    """Intervalo [inicio, fin) en hora del servidor desde el inicio de `desde` hasta el final de `hasta`"""
+    inicio = datetime.combine(desde, time.min)
+    fin = datetime.combine(hasta + timedelta(days=1), time.min)
+    if zona:
+        inicio = a_hora_servidor(inicio.replace(tzinfo=zona))
+        fin = a_hora_servidor(fin.replace(tzinfo=zona))
+    return inicio, fin
+
+
+def dias_entre(desde, hasta):
+    """
+    Expresión SQL con los días de `desde` a `hasta` (columnas o fechas de tipo Date).
+    PostgreSQL resta fechas directamente; SQLite necesita julianday().
+    """
+    desde, hasta = (valor if hasattr(valor, 'type') else literal(valor, Date) for valor in (desde, hasta))
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return cast(func.julianday(hasta) - func.julianday(desde), Integer)
+    return hasta - desde
@@ -0,0 +1,60 @@
+"""
+Procesamiento de fotos subidas de DIAMANTE PRO
+Las fotos llegan a la resolución completa de la cámara del celular (varios MB).
+Antes de guardarlas se corrige la orientación, se quitan los metadatos EXIF
+(ubicación GPS, modelo del celular), se reducen a FOTO_MAX_LADO y se guardan
+en WebP junto con una miniatura de MINIATURA_LADO para las listas.
+
+La miniatura de foto.webp es foto_min.webp: su URL se deriva de la original.
+"""
+import importlib.util
+from io import BytesIO
+
+FOTO_MAX_LADO = 1600
+MINIATURA_LADO = 256
+CALIDAD_FOTO = 80
+CALIDAD_MINIATURA = 70
+SUFIJO_MINIATURA = '_min.webp'
+
+
+def disponible():
+    """Pillow instalado (sin importarlo: se carga en el primer procesamiento)"""
+    return importlib.util.find_spec('PIL') is not None
+
+
+def clave_foto(nombre):
+    """Nombre de archivo WebP para una foto subida"""
+    raiz = nombre.rsplit('.', 1)[0] if '.' in nombre else nombre
+    return f"{raiz}.webp"
+
+
+def clave_miniatura(clave):
+    """Miniatura de una foto procesada (None si la foto no pasó por este proceso)"""
+    if not clave or not clave.endswith('.webp') or clave.endswith(SUFIJO_MINIATURA):
+        return None
+    return clave[:-len('.webp')] + SUFIJO_MINIATURA
+
+
+def _webp(img, calidad):
+    salida = BytesIO()
+    img.save(salida, 'WEBP', quality=calidad, method=4)
+    return salida.getvalue()
+
+
+def procesar_foto(archivo, max_lado=FOTO_MAX_LADO, lado_miniatura=MINIATURA_LADO):
+    """
+    Foto reducida y su miniatura, ambas WebP y sin EXIF: (foto, miniatura) en bytes.
+    Lanza una excepción de PIL si el archivo no es una imagen.
+    """
+    from PIL import Image, ImageOps
+    with Image.open(archivo) as original:
+        # draft() decodifica los JPEG a una escala reducida: mucho menos memoria y CPU
+        original.draft('RGB', (max_lado, max_lado))
+        img = ImageOps.exif_transpose(original)
+        # Solo se copian los píxeles: ni EXIF ni perfiles pasan al archivo guardado
+        img = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB')
+    img.thumbnail((max_lado, max_lado), Image.LANCZOS)
+    foto = _webp(img, CALIDAD_FOTO)
+
+    img.thumbnail((lado_miniatura, lado_miniatura), Image.LANCZOS)
+    return foto, _webp(img, CALIDAD_MINIATURA)
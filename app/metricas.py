@@ -0,0 +1,225 @@
+"""
+Servicio de métricas del dashboard de DIAMANTE PRO
+Calcula todos los KPIs con un puñado de consultas agrupadas (GROUP BY)
+en lugar de cargar cada préstamo y cada pago en Python.
+Lo que vence hoy y mañana sale del plan de cuotas (ver cuotas.py).
+"""
+from datetime import timedelta
+from sqlalchemy import func, case
+from sqlalchemy.orm import joinedload
+from .models import Cliente, Prestamo, Pago, Cuota, ESTADOS_VIGENTES, db
+from .fechas import rango_del_dia, hoy_en
+from .snapshots import flujos_por_dia
+from .cuotas import tiene_plan
+
+
+def cobra_en_dia(frecuencia, dia_semana, incluir_bisemanal=True):
+    """
+    Indica si una frecuencia de pago genera cobro en un día de la semana.
+    Solo para préstamos sin plan de cuotas (anteriores a la tabla cuotas).
+    dia_semana: 0=Lunes ... 6=Domingo
+    """
+    if frecuencia == 'DIARIO':
+        return dia_semana != 6  # Todos menos domingo
+    if frecuencia == 'DIARIO_LUNES_VIERNES':
+        return dia_semana < 5  # Solo Lunes(0) a Viernes(4)
+    if frecuencia == 'BISEMANAL':
+        # Simplificación: se asume que BISEMANAL cobra siempre
+        return incluir_bisemanal
+    return False
+
+
+def _filtros_alcance(cobrador_id=None, ruta_id=None):
+    """Filtros sobre Prestamo según el alcance: cobrador, ruta o todo (dueño)"""
+    filtros = []
+    if cobrador_id:
+        filtros.append(Prestamo.cobrador_id == cobrador_id)
+    if ruta_id:
+        filtros.append(Prestamo.ruta_id == ruta_id)
+    return filtros
+
+
+def metricas_dashboard(cobrador_id=None, ruta_id=None, hoy=None, zona=None):
+    """
+    KPIs del dashboard para el alcance indicado.
+
+    Args:
+        cobrador_id: Solo los préstamos de este cobrador (vista del cobrador)
+        ruta_id: Solo los préstamos de esta ruta (dueño con ruta seleccionada)
+        hoy: Fecha de referencia (por defecto hoy en la zona)
+        zona: Zona horaria de la ruta o del cobrador para los límites del día (ver fechas.py)
+
+    Returns:
+        dict: Variables listas para el template dashboard.html
+    """
+    hoy = hoy or hoy_en(zona)
+    filtros = _filtros_alcance(cobrador_id, ruta_id)
+    por_alcance = bool(filtros)
+
+    # 1. Cartera activa agrupada por moneda y frecuencia (una consulta);
+    #    la suma de cuotas es solo de los préstamos sin plan de cuotas
+    cartera = db.session.query(
+        Prestamo.moneda,
+        Prestamo.frecuencia,
+        func.count(Prestamo.id),
+        func.sum(Prestamo.saldo_actual),
+        func.sum(Prestamo.monto_prestado),
+        func.sum(case((~tiene_plan(), Prestamo.valor_cuota), else_=0)),
+        func.sum(case((Prestamo.cuotas_atrasadas == 0, 1), else_=0)),
+        func.sum(case((Prestamo.cuotas_atrasadas > 0, 1), else_=0)),
+        func.sum(case((Prestamo.cuotas_atrasadas > 3, 1), else_=0))
+    ).filter(Prestamo.estado.in_(ESTADOS_VIGENTES), *filtros).group_by(Prestamo.moneda, Prestamo.frecuencia).all()
+
+    desglose_monedas = {}
+
+    def get_moneda_stats(moneda):
+        m = moneda or 'COP'
+        if m not in desglose_monedas:
+            desglose_monedas[m] = {
+                'moneda': m,
+                'total_cartera': 0,
+                'capital_prestado': 0,
+                'por_cobrar_hoy': 0,
+                'proyeccion_manana': 0,
+                'cobrado_hoy': 0
+            }
+        return desglose_monedas[m]
+
+    manana = hoy + timedelta(days=1)
+    total_prestamos_activos = 0
+    total_cartera = 0
+    capital_prestado = 0
+    por_cobrar_hoy = 0
+    proyeccion_manana = 0
+    prestamos_al_dia = prestamos_atrasados = prestamos_mora = 0
+
+    for moneda, frecuencia, cantidad, saldo, prestado, cuotas, al_dia, atrasados, mora in cartera:
+        stats = get_moneda_stats(moneda)
+        stats['total_cartera'] += float(saldo or 0)
+        stats['capital_prestado'] += float(prestado or 0)
+        total_prestamos_activos += cantidad
+        total_cartera += float(saldo or 0)
+        capital_prestado += float(prestado or 0)
+        prestamos_al_dia += int(al_dia or 0)
+        prestamos_atrasados += int(atrasados or 0)
+        prestamos_mora += int(mora or 0)
+
+        # Préstamos sin plan de cuotas: heurística por día de la semana
+        if cobra_en_dia(frecuencia, hoy.weekday()):
+            stats['por_cobrar_hoy'] += float(cuotas or 0)
+            por_cobrar_hoy += float(cuotas or 0)  # Suma global por compatibilidad (aunque mezcle monedas)
+        if cobra_en_dia(frecuencia, manana.weekday(), incluir_bisemanal=False):
+            stats['proyeccion_manana'] += float(cuotas or 0)
+            proyeccion_manana += float(cuotas or 0)
+
+    # 1.1 Cuotas que vencen hoy y mañana por moneda (rango sobre ix_cuotas_vencimiento_pagada)
+    vencimientos = db.session.query(
+        Prestamo.moneda, Cuota.fecha_vencimiento, func.sum(Cuota.monto)
+    ).join(Prestamo, Cuota.prestamo_id == Prestamo.id).filter(
+        Cuota.fecha_vencimiento >= hoy, Cuota.fecha_vencimiento <= manana,
+        Prestamo.estado.in_(ESTADOS_VIGENTES), *filtros
+    ).group_by(Prestamo.moneda, Cuota.fecha_vencimiento).all()
+
+    for moneda, fecha, total in vencimientos:
+        stats = get_moneda_stats(moneda)
+        if fecha == hoy:
+            stats['por_cobrar_hoy'] += float(total or 0)
+            por_cobrar_hoy += float(total or 0)
+        else:
+            stats['proyeccion_manana'] += float(total or 0)
+            proyeccion_manana += float(total or 0)
+
+    # 2. Pagos de hoy agrupados por moneda del préstamo
+    inicio_hoy, fin_hoy = rango_del_dia(hoy, zona)
+    pagos_hoy = db.session.query(
+        Prestamo.moneda, func.count(Pago.id), func.sum(Pago.monto)
+    ).join(Prestamo, Pago.prestamo_id == Prestamo.id).filter(
+        Pago.fecha_pago >= inicio_hoy, Pago.fecha_pago < fin_hoy, *filtros
+    ).group_by(Prestamo.moneda).all()
+
+    total_cobrado_hoy = 0
+    num_pagos_hoy = 0
+    for moneda, cantidad, total in pagos_hoy:
+        get_moneda_stats(moneda)['cobrado_hoy'] += float(total or 0)
+        total_cobrado_hoy += float(total or 0)
+        num_pagos_hoy += cantidad
+
+    lista_monedas = list(desglose_monedas.values())
+    # Ordenar: COP primero si existe, luego otros
+    lista_monedas.sort(key=lambda x: 0 if x['moneda'] == 'COP' else 1)
+
+    # 3. Cobros de los últimos 7 días (días cerrados desde snapshot_diario, hoy en vivo)
+    fecha_inicio = hoy - timedelta(days=6)
+    por_dia = flujos_por_dia(fecha_inicio, hoy, cobrador_id=cobrador_id, ruta_id=ruta_id, hoy=hoy)
+
+    cobros_ultimos_7_dias = []
+    labels_7_dias = []
+    for i in range(7):
+        fecha = fecha_inicio + timedelta(days=i)
+        cobros_ultimos_7_dias.append(por_dia[fecha]['cobrado'] if fecha in por_dia else 0)
+        labels_7_dias.append(fecha.strftime('%d/%m'))
+
+    # 4. Distribución de préstamos por estado
+    estados = dict(db.session.query(Prestamo.estado, func.count(Prestamo.id)).filter(
+        *filtros
+    ).group_by(Prestamo.estado).all())
+
+    # 5. Clientes (totales y VIP) y distribución de riesgo
+    if por_alcance:
+        clientes_alcance = db.session.query(Prestamo.cliente_id).filter(*filtros).distinct()
+        total_clientes, clientes_vip = db.session.query(
+            func.count(Cliente.id), func.sum(case((Cliente.es_vip == True, 1), else_=0))
+        ).filter(Cliente.id.in_(clientes_alcance)).one()
+        riesgo_stats = db.session.query(Cliente.nivel_riesgo, func.count(Cliente.id))\
+            .join(Prestamo).filter(Prestamo.estado.in_(ESTADOS_VIGENTES), *filtros)\
+            .group_by(Cliente.nivel_riesgo).all()
+    else:
+        total_clientes, clientes_vip = db.session.query(
+            func.count(Cliente.id), func.sum(case((Cliente.es_vip == True, 1), else_=0))
+        ).one()
+        # Distribución Global (Contamos clientes, no préstamos, para riesgo general)
+        riesgo_stats = db.session.query(Cliente.nivel_riesgo, func.count(Cliente.id)).group_by(Cliente.nivel_riesgo).all()
+
+    riesgo_labels = [r[0] if r[0] else 'NUEVO' for r in riesgo_stats]
+    riesgo_data = [r[1] for r in riesgo_stats]
+
+    # 6. Listas recientes con relaciones precargadas (sin cargas perezosas en el template)
+    ultimos_pagos = Pago.query.join(Prestamo, Pago.prestamo_id == Prestamo.id).options(
+        joinedload(Pago.prestamo).joinedload(Prestamo.cliente)
+    ).filter(*filtros).order_by(Pago.fecha_pago.desc()).limit(10).all()
+
+    prestamos_recientes = Prestamo.query.options(joinedload(Prestamo.cliente)).filter(
+        *filtros
+    ).order_by(Prestamo.fecha_inicio.desc()).limit(5).all()
+
+    # Estadísticas derivadas
+    ganancia_esperada = total_cartera - capital_prestado if capital_prestado > 0 else 0
+    porcentaje_ganancia = ((ganancia_esperada / capital_prestado) * 100) if capital_prestado > 0 else 0
+    tasa_cobro_diaria = (total_cobrado_hoy / por_cobrar_hoy * 100) if por_cobrar_hoy > 0 else 0
+
+    return {
+        'total_clientes': total_clientes or 0,
+        'clientes_vip': int(clientes_vip or 0),
+        'total_prestamos_activos': total_prestamos_activos,
+        'total_cartera': total_cartera,
+        'capital_prestado': capital_prestado,
+        'por_cobrar_hoy': por_cobrar_hoy,
+        'proyeccion_manana': proyeccion_manana,
+        'prestamos_al_dia': prestamos_al_dia,
+        'prestamos_atrasados': prestamos_atrasados,
+        'prestamos_mora': prestamos_mora,
+        'total_cobrado_hoy': total_cobrado_hoy,
+        'num_pagos_hoy': num_pagos_hoy,
+        'ganancia_esperada': ganancia_esperada,
+        'porcentaje_ganancia': porcentaje_ganancia,
+        'tasa_cobro_diaria': tasa_cobro_diaria,
+        'ultimos_pagos': ultimos_pagos,
+        'prestamos_recientes': prestamos_recientes,
+        'cobros_ultimos_7_dias': cobros_ultimos_7_dias,
+        'labels_7_dias': labels_7_dias,
+        'prestamos_pagados': estados.get('PAGADO', 0),
+        'prestamos_cancelados': estados.get('CANCELADO', 0),
+        'riesgo_labels': riesgo_labels,
+        'riesgo_data': riesgo_data,
+        'lista_monedas': lista_monedas
+    }
@@ -1,5 +1,7 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
 
 db = SQLAlchemy()
 
@@ -13,6 +15,10 @@ class Usuario(db.Model):
     rol = db.Column(db.String(20), nullable=False) # 'dueno', 'secretaria', 'supervisor', 'cobrador'
     activo = db.Column(db.Boolean, default=True)
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Contadores desnormalizados (los mantiene app/contadores.py, reconciliar con reconciliar_contadores.py)
+    num_cobros = db.Column(db.Integer, default=0)
+    total_cobrado = db.Column(db.Float, default=0)
 
 # 1.1 SOCIEDADES (Asociaciones con socios)
 class Sociedad(db.Model):
@@ -72,6 +78,12 @@ class Ruta(db.Model):
     moneda = db.Column(db.String(3), default='COP')  # COP, BRL, PEN, ARS, USD
     simbolo_moneda = db.Column(db.String(5), default='$')  # $, R$, S/, $, USD
     
+    # Contadores desnormalizados (los mantiene app/contadores.py, reconciliar con reconciliar_contadores.py)
+    prestamos_activos = db.Column(db.Integer, default=0)
+    cartera = db.Column(db.Float, default=0)  # Saldo de los préstamos activos
+    num_cobros = db.Column(db.Integer, default=0)
+    total_cobrado = db.Column(db.Float, default=0)
+    
     # Relaciones
     cobrador = db.relationship('Usuario', backref='rutas_asignadas')
     sociedad = db.relationship('Sociedad', backref='rutas')
@@ -79,6 +91,9 @@ class Ruta(db.Model):
 # 2. LOS CLIENTES (Comerciantes)
 class Cliente(db.Model):
     __tablename__ = 'clientes'
+    __table_args__ = (
+        db.Index('ix_clientes_actualizacion', 'fecha_actualizacion'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     nombre = db.Column(db.String(100), nullable=False)
     documento = db.Column(db.String(20), unique=True, nullable=False) # CPF (Documento Personal)
@@ -142,6 +157,9 @@ class Cliente(db.Model):
     motivo_bloqueo = db.Column(db.String(200))  # Razón del bloqueo
     fecha_ultimo_calculo_score = db.Column(db.DateTime)  # Última actualización del score
     
+    # Sincronización incremental con la app móvil
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
     # Relación con el cliente que lo refirió
     referido_por = db.relationship('Cliente', remote_side=[id], backref='clientes_referidos')
     
@@ -175,12 +193,30 @@ class Cliente(db.Model):
         return True
 
 # 3. LOS PRÉSTAMOS
+# Préstamos con saldo por cobrar: MORA es un ACTIVO atrasado (lo marca recalcular_mora.py)
+ESTADOS_VIGENTES = ('ACTIVO', 'MORA')
+
+
 class Prestamo(db.Model):
     __tablename__ = 'prestamos'
+    __table_args__ = (
+        # Cartera del cobrador / de la ruta (dashboard, ruta de cobro, sync)
+        db.Index('ix_prestamos_cobrador_estado', 'cobrador_id', 'estado'),
+        db.Index('ix_prestamos_ruta_estado', 'ruta_id', 'estado'),
+        # "¿El cliente ya tiene un préstamo activo?" y riesgo por cliente
+        db.Index('ix_prestamos_cliente_estado', 'cliente_id', 'estado'),
+        # Préstamos creados en un período (reportes, snapshots)
+        db.Index('ix_prestamos_fecha_inicio', 'fecha_inicio'),
+        # Delta de sincronización por cobrador
+        db.Index('ix_prestamos_cobrador_actualizacion', 'cobrador_id', 'fecha_actualizacion'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     cliente_id = db.Column(db.Integer, db.ForeignKey('clientes.id'), nullable=False)
     ruta_id = db.Column(db.Integer, db.ForeignKey('rutas.id'), nullable=False)  # Ahora se asocia a la ruta
-    cobrador_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=True)  # Mantener por compatibilidad temporal
+    # Mantener por compatibilidad temporal. active_history: al reasignar se carga el cobrador
+    # anterior aunque el objeto esté expirado (registrar_eliminados le deja el tombstone)
+    cobrador_id = db.column_property(db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=True),
+                                     active_history=True)
     
     # Montos
     monto_prestado = db.Column(db.Float, nullable=False)
@@ -197,6 +233,7 @@ class Prestamo(db.Model):
     numero_cuotas = db.Column(db.Integer, nullable=False)
     cuotas_pagadas = db.Column(db.Integer, default=0)
     cuotas_atrasadas = db.Column(db.Integer, default=0)
+    dias_atraso = db.Column(db.Integer, default=0)  # Días desde la cuota vencida sin pagar más antigua
     
     # Estado
     estado = db.Column(db.String(20), default='ACTIVO')  # ACTIVO, CANCELADO, MORA
@@ -206,14 +243,47 @@ class Prestamo(db.Model):
     fecha_fin_estimada = db.Column(db.DateTime)
     fecha_ultimo_pago = db.Column(db.DateTime)
     
+    # Sincronización incremental con la app móvil
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
     # Relaciones
     cliente = db.relationship('Cliente', backref='prestamos')
     ruta = db.relationship('Ruta', backref='prestamos')
     cobrador = db.relationship('Usuario', backref='prestamos_asignados')  # Mantener por compatibilidad
 
+# 3.1 PLAN DE CUOTAS (fechas de vencimiento exactas, ver app/cuotas.py)
+class Cuota(db.Model):
+    __tablename__ = 'cuotas'
+    __table_args__ = (
+        db.Index('uq_cuotas_prestamo_numero', 'prestamo_id', 'numero', unique=True),
+        # Vencen hoy / mañana (dashboard) y vencidas sin pagar (mora)
+        db.Index('ix_cuotas_vencimiento_pagada', 'fecha_vencimiento', 'pagada'),
+        # "¿El préstamo tiene cuotas vencidas sin pagar?" (ruta de cobro)
+        db.Index('ix_cuotas_prestamo_pagada_vencimiento', 'prestamo_id', 'pagada', 'fecha_vencimiento'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    prestamo_id = db.Column(db.Integer, db.ForeignKey('prestamos.id'), nullable=False)
+    numero = db.Column(db.Integer, nullable=False)  # 1..numero_cuotas
+    fecha_vencimiento = db.Column(db.Date, nullable=False)
+    monto = db.Column(db.Float, nullable=False)
+    pagada = db.Column(db.Boolean, default=False, nullable=False)
+
+    prestamo = db.relationship('Prestamo', backref=db.backref('cuotas', order_by='Cuota.numero',
+                                                                cascade='all, delete-orphan'))
+
 # 4. LOS PAGOS
 class Pago(db.Model):
     __tablename__ = 'pagos'
+    __table_args__ = (
+        # Pagos de un préstamo en un rango (anti-join de la ruta de cobro, historial)
+        db.Index('ix_pagos_prestamo_fecha', 'prestamo_id', 'fecha_pago'),
+        # Cobros de un usuario en un rango (reportes, cuadre)
+        db.Index('ix_pagos_cobrador_fecha', 'cobrador_id', 'fecha_pago'),
+        # Pagos del día / período de toda la empresa (dashboard, caja, reportes)
+        db.Index('ix_pagos_fecha', 'fecha_pago'),
+        db.Index('ix_pagos_actualizacion', 'fecha_actualizacion'),
+        db.Index('uq_pagos_clave_idempotencia', 'clave_idempotencia', unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     prestamo_id = db.Column(db.Integer, db.ForeignKey('prestamos.id'), nullable=False)
     cobrador_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
@@ -226,6 +296,10 @@ class Pago(db.Model):
     fecha_pago = db.Column(db.DateTime, default=datetime.utcnow)
     observaciones = db.Column(db.String(500))
     tipo_pago = db.Column(db.String(20), default='NORMAL')  # NORMAL, ABONO, COMPLETO
+    clave_idempotencia = db.Column(db.String(64))  # Generada por el cliente para deduplicar reenvíos (índice único)
+    
+    # Sincronización incremental con la app móvil
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relaciones
     prestamo = db.relationship('Prestamo', backref='pagos')
@@ -234,6 +308,11 @@ class Pago(db.Model):
 # 5. LA CAJA
 class Transaccion(db.Model):
     __tablename__ = 'transacciones'
+    __table_args__ = (
+        # Gastos de un usuario en un rango (caja, reportes del cobrador)
+        db.Index('ix_transacciones_origen_fecha', 'usuario_origen_id', 'fecha'),
+        db.Index('ix_transacciones_fecha', 'fecha'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     naturaleza = db.Column(db.String(20), nullable=False) 
     concepto = db.Column(db.String(50), nullable=False)
@@ -353,4 +432,108 @@ class AlertaScoring(db.Model):
     
     # Relaciones
     cliente = db.relationship('Cliente', backref='alertas_scoring')
-    atendida_por = db.relationship('Usuario', backref='alertas_atendidas')
\ No newline at end of file
+    atendida_por = db.relationship('Usuario', backref='alertas_atendidas')
+
+
+# 10. REGISTROS ELIMINADOS (Tombstones para la sincronización móvil)
+class RegistroEliminado(db.Model):
+    __tablename__ = 'registros_eliminados'
+    id = db.Column(db.Integer, primary_key=True)
+    tabla = db.Column(db.String(50), nullable=False)  # clientes, prestamos, pagos
+    registro_id = db.Column(db.Integer, nullable=False)
+    cobrador_id = db.Column(db.Integer, index=True)  # Dispositivo que tenía el registro (None: todos)
+    fecha_eliminacion = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+
+# 11. SNAPSHOT DIARIO (Totales precalculados por día para dashboard y reportes)
+class SnapshotDiario(db.Model):
+    __tablename__ = 'snapshot_diario'
+    __table_args__ = (
+        db.UniqueConstraint('fecha', 'ruta_id', 'cobrador_id', 'moneda', name='uq_snapshot_diario'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    fecha = db.Column(db.Date, nullable=False, index=True)
+    ruta_id = db.Column(db.Integer, db.ForeignKey('rutas.id'))
+    cobrador_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'))
+    moneda = db.Column(db.String(3), default='COP')
+
+    # Flujos del día (se pueden recalcular en cualquier momento desde pagos y préstamos)
+    cobrado = db.Column(db.Float, default=0)
+    num_pagos = db.Column(db.Integer, default=0)
+    prestado = db.Column(db.Float, default=0)
+    num_prestamos_nuevos = db.Column(db.Integer, default=0)
+
+    # Foto de la cartera al cierre del día (solo la captura el cierre nocturno)
+    cartera = db.Column(db.Float)
+    capital_circulacion = db.Column(db.Float)
+    prestamos_activos = db.Column(db.Integer)
+    prestamos_atrasados = db.Column(db.Integer)
+    prestamos_mora = db.Column(db.Integer)
+
+    fecha_generacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# 12. BANDEJA DE SALIDA DE CORREOS (los envía el worker enviar_correos.py)
+class CorreoPendiente(db.Model):
+    __tablename__ = 'correos_pendientes'
+    __table_args__ = (
+        db.Index('ix_correos_pendientes_estado_proximo', 'estado', 'proximo_intento'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    destinatario = db.Column(db.String(200), nullable=False)
+    asunto = db.Column(db.String(200), nullable=False)
+    html = db.Column(db.Text, nullable=False)
+    texto = db.Column(db.Text)
+    estado = db.Column(db.String(20), default='PENDIENTE')  # PENDIENTE, ENVIADO, ERROR
+    intentos = db.Column(db.Integer, default=0)
+    proximo_intento = db.Column(db.DateTime, default=datetime.utcnow)
+    ultimo_error = db.Column(db.String(500))
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+    fecha_envio = db.Column(db.DateTime)
+
+
+
+class TrabajoPDF(db.Model):
+    """Cuadres en PDF pendientes para el proceso 'pdf' (PDF_COLA=worker, ver app/cuadres.py)"""
+    __tablename__ = 'trabajos_pdf'
+    __table_args__ = (
+        db.Index('ix_trabajos_pdf_estado', 'estado'),
+    )
+    id = db.Column(db.String(32), primary_key=True)  # id del trabajo en ColaPDF
+    tipo = db.Column(db.String(20), nullable=False)  # cuadre, lote
+    datos = db.Column(db.Text, nullable=False)  # JSON con la lista de datos_cuadre()
+    estado = db.Column(db.String(20), default='PENDIENTE')  # PENDIENTE, LISTO, ERROR
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+    fecha_fin = db.Column(db.DateTime)
+
+# Tablas cuyas eliminaciones debe conocer la app móvil
+TABLAS_SINCRONIZADAS = ('clientes', 'prestamos', 'pagos')
+
+
+def _cobradores_con(session, tabla, obj):
+    """Cobradores cuya app tiene el registro: el del préstamo (o los de los préstamos del cliente)"""
+    if tabla == 'prestamos':
+        return {obj.cobrador_id}
+    with session.no_autoflush:
+        if tabla == 'pagos':
+            return {session.query(Prestamo.cobrador_id).filter(Prestamo.id == obj.prestamo_id).scalar()}
+        return {c for c, in session.query(Prestamo.cobrador_id).filter(Prestamo.cliente_id == obj.id).distinct()}
+
+
+@event.listens_for(Session, 'before_flush')
+def registrar_eliminados(session, flush_context, instances):
+    """
+    Deja un tombstone por cada Cliente, Prestamo o Pago eliminado, para cada cobrador
+    que lo tenía, y uno para el cobrador anterior de un préstamo reasignado
+    (su app debe quitarlo aunque el préstamo siga existiendo).
+    """
+    for obj in list(session.deleted):
+        tabla = getattr(obj, '__tablename__', None)
+        if tabla in TABLAS_SINCRONIZADAS and obj.id is not None:
+            for cobrador_id in _cobradores_con(session, tabla, obj) or {None}:
+                session.add(RegistroEliminado(tabla=tabla, registro_id=obj.id, cobrador_id=cobrador_id))
+    for obj in list(session.dirty):
+        if isinstance(obj, Prestamo) and obj.id is not None:
+            for anterior in inspect(obj).attrs.cobrador_id.history.deleted:
+                if anterior is not None and anterior != obj.cobrador_id:
+                    session.add(RegistroEliminado(tabla='prestamos', registro_id=obj.id, cobrador_id=anterior))
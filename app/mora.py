@@ -0,0 +1,89 @@
+"""
+Recálculo nocturno de la mora de DIAMANTE PRO
+
+Compara, para cada préstamo vigente, las cuotas que ya vencieron con las que
+cubren sus pagos (plan de cuotas, ver cuotas.py) y actualiza cuotas_atrasadas,
+dias_atraso y el estado (MORA con más de CUOTAS_PARA_MORA cuotas atrasadas,
+el mismo corte que el dashboard; ACTIVO si se puso al día).
+
+Todo es SQL por conjuntos: un UPDATE con subconsultas sobre los índices de
+cuotas por cada tramo de MORA_LOTE ids, con commit por tramo para no bloquear la
+tabla de préstamos. Solo se escriben las filas que cambian, con
+fecha_actualizacion explícita para que la app móvil las reciba en el sync.
+"""
+from datetime import datetime
+from sqlalchemy import case, func, or_, select, update
+from .models import Cuota, Prestamo, ESTADOS_VIGENTES, db
+from .cuotas import dias_de_atraso, generar_planes_faltantes, tiene_plan
+from .fechas import hoy_en, zonas_de_rutas
+
+CUOTAS_PARA_MORA = 3
+MORA_LOTE = 5000
+
+
+def salir_de_mora(prestamo):
+    """Tras un pago que redujo cuotas_atrasadas: vuelve a ACTIVO y/o a 0 días sin esperar al recálculo"""
+    if prestamo.cuotas_atrasadas == 0:
+        prestamo.dias_atraso = 0
+    if prestamo.estado == 'MORA' and prestamo.cuotas_atrasadas <= CUOTAS_PARA_MORA:
+        prestamo.estado = 'ACTIVO'
+
+
+def _actualizar_tramo(fecha, desde_id, hasta_id, ruta_ids=None):
+    """UPDATE de los préstamos vigentes con id en [desde_id, hasta_id); devuelve las filas cambiadas"""
+    atrasadas = select(func.count(Cuota.id)).where(
+        Cuota.prestamo_id == Prestamo.id, Cuota.pagada == False, Cuota.fecha_vencimiento < fecha
+    ).scalar_subquery()
+    dias = dias_de_atraso(fecha)
+    estado = case((atrasadas > CUOTAS_PARA_MORA, 'MORA'), else_='ACTIVO')
+
+    filtros = [Prestamo.id >= desde_id, Prestamo.id < hasta_id, Prestamo.estado.in_(ESTADOS_VIGENTES), tiene_plan()]
+    if ruta_ids is not None:
+        filtros.append(Prestamo.ruta_id.in_(ruta_ids))
+
+    resultado = db.session.execute(update(Prestamo).where(
+        *filtros,
+        or_(func.coalesce(Prestamo.cuotas_atrasadas, -1) != atrasadas,
+            func.coalesce(Prestamo.dias_atraso, -1) != dias,
+            Prestamo.estado != estado)
+    ).values(
+        cuotas_atrasadas=atrasadas,
+        dias_atraso=dias,
+        estado=estado,
+        fecha_actualizacion=datetime.utcnow()
+    ).execution_options(synchronize_session=False))
+    return resultado.rowcount
+
+
+def recalcular_mora(fecha=None, lote=MORA_LOTE):
+    """
+    Recalcula la mora de todos los préstamos vigentes (hace commit por tramo).
+
+    Args:
+        fecha: Día de referencia; por defecto hoy en la zona horaria de cada ruta
+        lote: Préstamos (por rango de id) por cada UPDATE
+
+    Returns:
+        dict: {'actualizados': filas que cambiaron, 'en_mora': préstamos en MORA al terminar}
+    """
+    # Los préstamos anteriores a la tabla cuotas necesitan su plan para compararse
+    generar_planes_faltantes()
+
+    if fecha:
+        grupos = [(fecha, None)]
+    else:
+        grupos = [(hoy_en(zona), ruta_ids) for zona, ruta_ids in zonas_de_rutas().items()]
+
+    minimo, maximo = db.session.query(func.min(Prestamo.id), func.max(Prestamo.id)).filter(
+        Prestamo.estado.in_(ESTADOS_VIGENTES)
+    ).one()
+
+    actualizados = 0
+    if minimo is not None:
+        for desde_id in range(minimo, maximo + 1, lote):
+            for fecha_grupo, ruta_ids in grupos:
+                actualizados += _actualizar_tramo(fecha_grupo, desde_id, desde_id + lote, ruta_ids)
+            db.session.commit()
+
+    en_mora = db.session.query(func.count(Prestamo.id)).filter(Prestamo.estado == 'MORA').scalar()
+    return {'actualizados': actualizados, 'en_mora': en_mora}
@@ -0,0 +1,250 @@
+"""
+Registro de pagos de la app móvil
+Lógica compartida entre el pago individual y la carga en lote (modo offline)
+"""
+import math
+from datetime import datetime
+from .models import Prestamo, Pago, Ruta, ESTADOS_VIGENTES, db
+from .contadores import DeltaContadores
+from .cuotas import marcar_cuotas_pagadas
+from .fechas import a_hora_servidor
+from .mora import salir_de_mora
+
+LARGO_CLAVE = 64  # Pago.clave_idempotencia es String(64)
+
+
+def error_monto(monto):
+    """Mensaje de error si el monto no sirve (NaN o infinito también se rechazan); None si es válido"""
+    if not math.isfinite(monto) or monto <= 0:
+        return 'El monto debe ser mayor a cero'
+    return None
+
+
+def error_clave(clave):
+    """Mensaje de error si la clave de idempotencia no cabe en la columna; None si es válida"""
+    if not isinstance(clave, str):
+        return 'clave debe ser texto'
+    if len(clave) > LARGO_CLAVE:
+        return f'clave admite máximo {LARGO_CLAVE} caracteres'
+    return None
+
+
+CLAVE_AJENA = 'clave ya usada por otro cobrador'
+
+
+def pago_por_clave(clave, cobrador_id):
+    """
+    Pago ya registrado con la clave (reenvío), o None.
+    Si la clave la usó otro cobrador lanza ValueError(CLAVE_AJENA): nunca se devuelve un pago ajeno.
+    """
+    if not clave:
+        return None
+    pago = Pago.query.filter_by(clave_idempotencia=clave).first()
+    if pago and pago.cobrador_id != cobrador_id:
+        raise ValueError(CLAVE_AJENA)
+    return pago
+
+
+def aplicar_pago(prestamo, cobrador_id, monto, observaciones='', fecha_pago=None, clave_idempotencia=None,
+                 contadores=None):
+    """
+    Registra un pago sobre un préstamo y actualiza su saldo (sin hacer commit).
+
+    Args:
+        prestamo: Préstamo al que se abona (idealmente bloqueado con FOR UPDATE)
+        cobrador_id: Usuario que recibe el dinero
+        monto: Valor recibido
+        observaciones: Notas del cobrador
+        fecha_pago: Momento real del cobro (la app offline lo envía, con o sin zona); por defecto ahora
+        clave_idempotencia: Clave generada por el cliente para deduplicar reenvíos
+        contadores: DeltaContadores donde acumular el pago (en lote); si no se pasa,
+            los contadores de ruta y cobrador se actualizan de inmediato
+
+    Returns:
+        Pago: El pago agregado a la sesión
+
+    Raises:
+        ValueError: Si el monto no es un número finito mayor a cero
+    """
+    error = error_monto(monto)
+    if error:
+        raise ValueError(error)
+    fecha_pago = fecha_pago or datetime.now()
+    if fecha_pago.tzinfo:
+        # Los timestamps se guardan sin zona, en hora del servidor (ver fechas.py)
+        fecha_pago = a_hora_servidor(fecha_pago)
+    saldo_anterior = prestamo.saldo_actual
+    estado_anterior = prestamo.estado
+
+    # Calcular cuotas pagadas
+    numero_cuotas_pagadas = int(monto / prestamo.valor_cuota)
+
+    nuevo_pago = Pago(
+        prestamo_id=prestamo.id,
+        cobrador_id=cobrador_id,
+        monto=monto,
+        numero_cuotas_pagadas=numero_cuotas_pagadas,
+        saldo_anterior=prestamo.saldo_actual,
+        saldo_nuevo=prestamo.saldo_actual - monto,
+        fecha_pago=fecha_pago,
+        observaciones=observaciones,
+        tipo_pago='NORMAL',
+        clave_idempotencia=clave_idempotencia
+    )
+
+    # Actualizar préstamo
+    prestamo.saldo_actual -= monto
+    prestamo.cuotas_pagadas += numero_cuotas_pagadas
+    prestamo.fecha_ultimo_pago = fecha_pago
+
+    # Si cuotas atrasadas > 0, restarlas
+    if prestamo.cuotas_atrasadas > 0:
+        prestamo.cuotas_atrasadas = max(0, prestamo.cuotas_atrasadas - numero_cuotas_pagadas)
+        salir_de_mora(prestamo)
+
+    # Si saldo llega a 0, marcar como cancelado
+    if prestamo.saldo_actual <= 0:
+        prestamo.estado = 'CANCELADO'
+        prestamo.saldo_actual = 0
+    marcar_cuotas_pagadas(prestamo, saldo_anterior)
+
+    db.session.add(nuevo_pago)
+
+    delta = contadores if contadores is not None else DeltaContadores()
+    delta.cobro(prestamo, cobrador_id, monto, saldo_anterior, estado_anterior)
+    if contadores is None:
+        delta.aplicar()
+    return nuevo_pago
+
+
+def _resultado_error(clave, mensaje):
+    return {'clave': clave, 'estado': 'ERROR', 'error': mensaje}
+
+
+def aplicar_lote(cobrador_id, items):
+    """
+    Aplica un lote de pagos offline en una sola transacción.
+
+    Los reenvíos se deduplican por clave de idempotencia: si la clave ya existe
+    (en la base o antes dentro del mismo lote) el item se reporta como DUPLICADO
+    con el pago original. Los préstamos afectados se bloquean con SELECT ... FOR UPDATE
+    en orden de id para evitar interbloqueos con otros lotes concurrentes.
+
+    El llamador hace commit (o rollback) de la sesión.
+
+    Args:
+        cobrador_id: Usuario autenticado que envía el lote
+        items: Lista de dicts {"clave", "prestamo_id", "monto", "observaciones", "fecha_pago"}
+
+    Returns:
+        list[dict]: Un resultado por item, en el mismo orden
+    """
+    claves = [item['clave'] for item in items
+              if isinstance(item, dict) and item.get('clave') and not error_clave(item['clave'])]
+
+    # Pagos ya registrados con estas claves (reenvíos); las de otro cobrador son error del item
+    existentes = {}
+    ajenas = set()
+    if claves:
+        for pago in Pago.query.filter(Pago.clave_idempotencia.in_(claves)).all():
+            if pago.cobrador_id == cobrador_id:
+                existentes[pago.clave_idempotencia] = pago
+            else:
+                ajenas.add(pago.clave_idempotencia)
+
+    # Bloquear los préstamos afectados (una sola consulta, orden estable)
+    prestamo_ids = set()
+    for item in items:
+        try:
+            prestamo_ids.add(int(item.get('prestamo_id')))
+        except (AttributeError, TypeError, ValueError):
+            pass
+    prestamos = {}
+    if prestamo_ids:
+        bloqueados = Prestamo.query.filter(Prestamo.id.in_(prestamo_ids)).order_by(Prestamo.id).with_for_update().all()
+        prestamos = {p.id: p for p in bloqueados}
+    rutas = {}
+    if prestamos:
+        rutas = {r.id: r for r in Ruta.query.filter(Ruta.id.in_({p.ruta_id for p in prestamos.values()})).all()}
+
+    contadores = DeltaContadores()
+    resultados = []
+    for item in items:
+        if not isinstance(item, dict):
+            resultados.append(_resultado_error(None, 'Item inválido'))
+            continue
+
+        clave = item.get('clave')
+        if not clave:
+            resultados.append(_resultado_error(None, 'clave es requerida'))
+            continue
+        error = error_clave(clave)
+        if error:
+            # Una clave inválida falla solo en su item, no en el INSERT de todo el lote
+            resultados.append(_resultado_error(clave if isinstance(clave, str) else None, error))
+            continue
+
+        if clave in ajenas:
+            resultados.append(_resultado_error(clave, CLAVE_AJENA))
+            continue
+
+        if clave in existentes:
+            pago = existentes[clave]
+            resultados.append({'clave': clave, 'estado': 'DUPLICADO', 'pago': pago,
+                               'saldo_nuevo': float(max(0, pago.saldo_nuevo))})
+            continue
+
+        try:
+            prestamo_id = int(item.get('prestamo_id'))
+            monto = float(item.get('monto'))
+        except (TypeError, ValueError):
+            resultados.append(_resultado_error(clave, 'prestamo_id y monto son requeridos'))
+            continue
+
+        error = error_monto(monto)
+        if error:
+            resultados.append(_resultado_error(clave, error))
+            continue
+
+        prestamo = prestamos.get(prestamo_id)
+        if not prestamo:
+            resultados.append(_resultado_error(clave, 'Préstamo no encontrado'))
+            continue
+
+        ruta = rutas.get(prestamo.ruta_id)
+        if not ruta or ruta.cobrador_id != cobrador_id:
+            resultados.append(_resultado_error(clave, 'No tienes permiso para cobrar este préstamo'))
+            continue
+
+        if prestamo.estado not in ESTADOS_VIGENTES:
+            resultados.append(_resultado_error(clave, f'El préstamo está {prestamo.estado}'))
+            continue
+
+        fecha_pago = None
+        if item.get('fecha_pago'):
+            try:
+                fecha_pago = datetime.fromisoformat(item['fecha_pago'])
+            except (TypeError, ValueError):
+                resultados.append(_resultado_error(clave, 'fecha_pago inválida'))
+                continue
+
+        pago = aplicar_pago(prestamo, cobrador_id, monto,
+                            observaciones=item.get('observaciones', ''),
+                            fecha_pago=fecha_pago,
+                            clave_idempotencia=clave,
+                            contadores=contadores)
+        existentes[clave] = pago
+        resultados.append({'clave': clave, 'estado': 'APLICADO', 'pago': pago,
+                           'saldo_nuevo': float(prestamo.saldo_actual),
+                           'prestamo_liquidado': prestamo.estado == 'CANCELADO'})
+
+    # Un UPDATE por ruta y por cobrador para todo el lote
+    contadores.aplicar()
+
+    # Obtener IDs de los pagos nuevos sin confirmar todavía la transacción
+    db.session.flush()
+    for resultado in resultados:
+        if 'pago' in resultado:
+            resultado['pago_id'] = resultado.pop('pago').id
+
+    return resultados
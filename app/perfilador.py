@@ -0,0 +1,178 @@
+"""
+Perfilador liviano de peticiones de DIAMANTE PRO
+
+Por cada petición cuenta las consultas SQL y el tiempo en la base (eventos de
+SQLAlchemy), los devuelve en el encabezado Server-Timing (visible en la
+pestaña Red del navegador) y los acumula en un histograma por endpoint de los
+últimos VENTANA_MINUTOS, que se consulta en /estado/metrics.
+
+Los datos son del proceso: cada worker de gunicorn tiene los suyos.
+Variables: PERFILADOR (1; 0 desactiva)
+
+También arma el traces_sampler de Sentry: la tasa de muestreo por ruta sale de
+SENTRY_TRACES_RUTAS ("/api/v1/cobrador/registrar-pago=1,/estado=0") y el resto
+usa SENTRY_TRACES_SAMPLE_RATE (0.1).
+"""
+import bisect
+import threading
+import time
+from collections import deque
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Límites superiores de los intervalos del histograma, en ms (el último intervalo es "más de 10 s")
+LIMITES_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+VENTANA_MINUTOS = 15
+
+
+class Histograma:
+    """Latencias de un endpoint en tramos de un minuto; solo se conservan los de la ventana"""
+
+    def __init__(self, ventana_minutos=VENTANA_MINUTOS):
+        self.ventana = ventana_minutos
+        self._tramos = deque()  # [minuto, conteos, peticiones, total_ms, max_ms, consultas, db_ms]
+
+    def registrar(self, duracion_ms, consultas, db_ms, ahora=None):
+        minuto = int((time.time() if ahora is None else ahora) // 60)
+        if not self._tramos or self._tramos[-1][0] != minuto:
+            self._tramos.append([minuto, [0] * (len(LIMITES_MS) + 1), 0, 0.0, 0.0, 0, 0.0])
+        while self._tramos[0][0] <= minuto - self.ventana:
+            self._tramos.popleft()
+        tramo = self._tramos[-1]
+        tramo[1][bisect.bisect_left(LIMITES_MS, duracion_ms)] += 1
+        tramo[2] += 1
+        tramo[3] += duracion_ms
+        tramo[4] = max(tramo[4], duracion_ms)
+        tramo[5] += consultas
+        tramo[6] += db_ms
+
+    def resumen(self, ahora=None):
+        """Totales de la ventana (None si no hubo peticiones)"""
+        minuto = int((time.time() if ahora is None else ahora) // 60)
+        tramos = [t for t in self._tramos if t[0] > minuto - self.ventana]
+        peticiones = sum(t[2] for t in tramos)
+        if not peticiones:
+            return None
+        conteos = [sum(t[1][i] for t in tramos) for i in range(len(LIMITES_MS) + 1)]
+        maximo = max(t[4] for t in tramos)
+        return {
+            'peticiones': peticiones,
+            'promedio_ms': round(sum(t[3] for t in tramos) / peticiones, 1),
+            'p50_ms': _percentil(conteos, peticiones, 0.50, maximo),
+            'p95_ms': _percentil(conteos, peticiones, 0.95, maximo),
+            'p99_ms': _percentil(conteos, peticiones, 0.99, maximo),
+            'max_ms': round(maximo, 1),
+            'consultas_promedio': round(sum(t[5] for t in tramos) / peticiones, 1),
+            'db_promedio_ms': round(sum(t[6] for t in tramos) / peticiones, 1),
+            'histograma': {_etiqueta(i): n for i, n in enumerate(conteos) if n},
+        }
+
+
+def _percentil(conteos, total, fraccion, maximo):
+    """Límite superior del intervalo donde cae el percentil (acotado por el máximo observado)"""
+    objetivo = fraccion * total
+    acumulado = 0
+    for i, n in enumerate(conteos):
+        acumulado += n
+        if acumulado >= objetivo:
+            return round(min(LIMITES_MS[i], maximo) if i < len(LIMITES_MS) else maximo, 1)
+    return round(maximo, 1)
+
+
+def _etiqueta(i):
+    return f"<={LIMITES_MS[i]}ms" if i < len(LIMITES_MS) else f">{LIMITES_MS[-1]}ms"
+
+
+class Perfilador:
+    """Histogramas por endpoint de las peticiones de este proceso"""
+
+    def __init__(self, ventana_minutos=VENTANA_MINUTOS):
+        self.ventana = ventana_minutos
+        self._histogramas = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, endpoint, duracion_ms, consultas, db_ms):
+        with self._lock:
+            if endpoint not in self._histogramas:
+                self._histogramas[endpoint] = Histograma(self.ventana)
+            self._histogramas[endpoint].registrar(duracion_ms, consultas, db_ms)
+
+    def metricas(self):
+        """Resumen de cada endpoint, de mayor a menor tiempo total en la ventana"""
+        with self._lock:
+            resumenes = [dict(endpoint=endpoint, **resumen) for endpoint, resumen in
+                         ((e, h.resumen()) for e, h in self._histogramas.items()) if resumen]
+        return sorted(resumenes, key=lambda r: -r['promedio_ms'] * r['peticiones'])
+
+
+# ==================== EVENTOS DE SQLALCHEMY ====================
+# Se escuchan en la clase Engine: cubren el engine que Flask-SQLAlchemy cree en cada app.
+# Fuera de una petición (hilos de subidas, scripts) no se mide nada.
+
+def _antes_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'perfil' in g:
+        conn.info['perfil_inicio'] = time.perf_counter()
+
+
+def _despues_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info.pop('perfil_inicio', None)
+    if inicio is not None and has_request_context() and 'perfil' in g:
+        g.perfil['consultas'] += 1
+        g.perfil['db'] += time.perf_counter() - inicio
+
+
+def _escuchar_consultas():
+    if not event.contains(Engine, 'before_cursor_execute', _antes_de_consulta):
+        event.listen(Engine, 'before_cursor_execute', _antes_de_consulta)
+        event.listen(Engine, 'after_cursor_execute', _despues_de_consulta)
+
+
+def instalar(app):
+    """Activa el perfilador en la app; queda en app.extensions['perfilador']"""
+    perfilador = Perfilador()
+    app.extensions['perfilador'] = perfilador
+    _escuchar_consultas()
+
+    @app.before_request
+    def iniciar_perfil():
+        g.perfil = {'inicio': time.perf_counter(), 'consultas': 0, 'db': 0.0}
+
+    @app.after_request
+    def cerrar_perfil(response):
+        perfil = g.pop('perfil', None)
+        if perfil is None or request.endpoint == 'static':
+            return response
+        total_ms = (time.perf_counter() - perfil['inicio']) * 1000
+        db_ms = perfil['db'] * 1000
+        response.headers.add('Server-Timing', f'db;dur={db_ms:.1f};desc="{perfil["consultas"]} consultas"')
+        response.headers.add('Server-Timing', f'app;dur={total_ms:.1f}')
+        perfilador.registrar(request.endpoint or 'sin_endpoint', total_ms, perfil['consultas'], db_ms)
+        return response
+
+    return perfilador
+
+
+# ==================== MUESTREO DE SENTRY ====================
+
+def leer_tasas_por_ruta(texto):
+    """Tasas de SENTRY_TRACES_RUTAS: "/api/v1=0.5,/estado=0" -> [('/api/v1', 0.5), ('/estado', 0.0)], prefijos más largos primero"""
+    tasas = []
+    for parte in (texto or '').split(','):
+        if '=' in parte:
+            ruta, tasa = parte.rsplit('=', 1)
+            tasas.append((ruta.strip(), float(tasa)))
+    return sorted(tasas, key=lambda t: -len(t[0]))
+
+
+def muestreo_por_ruta(tasas, defecto):
+    """traces_sampler de Sentry: la tasa del prefijo de ruta más largo que coincide, o la tasa por defecto"""
+    def traces_sampler(contexto):
+        if contexto.get('parent_sampled') is not None:
+            return contexto['parent_sampled']  # Respetar la decisión de la traza de origen
+        ruta = (contexto.get('wsgi_environ') or {}).get('PATH_INFO', '')
+        for prefijo, tasa in tasas:
+            if ruta.startswith(prefijo):
+                return tasa
+        return defecto
+    return traces_sampler
@@ -0,0 +1,250 @@
+"""
+Motor de imágenes de recibos y comprobantes de DIAMANTE PRO
+Las fuentes se cargan una sola vez por proceso y la capa estática de cada
+plantilla (fondo, encabezado, tarjetas, etiquetas y pie) se dibuja una sola
+vez por plantilla y esquema de color; en cada petición solo se copia esa
+capa y se escribe el texto variable del pago o del préstamo.
+
+Salida en PNG (por defecto), JPEG o WEBP y a un ancho configurable: para
+compartir por WhatsApp un WEBP de 720 px pesa una fracción del PNG original.
+"""
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+
+# Pillow se importa dentro de cada función: solo lo carga el proceso que genera imágenes
+
+# Subir al cambiar el diseño: invalida los recibos ya generados en la caché (ver artefactos.py)
+VERSION_PLANTILLAS = 1
+
+ANCHO, ALTO = 1080, 1350  # Formato Instagram Portrait
+MARGEN_X = 60
+
+# Fuentes por rol: (archivo, tamaño)
+FUENTES = {
+    'titulo': ('arialbd.ttf', 70),       # Título principal
+    'subtitulo': ('arial.ttf', 35),      # Subtítulos
+    'seccion': ('arialbd.ttf', 35),      # Encabezados de sección
+    'etiqueta': ('arial.ttf', 30),       # Etiquetas pequeñas
+    'valor': ('arialbd.ttf', 38),        # Valores
+    'dinero': ('arialbd.ttf', 60),       # Cifras grandes
+    'dinero_principal': ('arialbd.ttf', 80),  # Cifra central enorme
+    'pie': ('arial.ttf', 28),            # Pie de página
+}
+
+# Colores Corporativos "Diamante Pro"
+C_PRIMARIO = '#0f172a'   # Azul oscuro casi negro (Slate 900)
+C_ACENTO = '#0284c7'     # Azul brillante (Sky 600)
+C_EXITO = '#059669'      # Verde esmeralda (Emerald 600)
+C_EXITO_FONDO = '#d1fae5'
+C_TEXTO = '#334155'      # Gris texto (Slate 700)
+C_SUAVE = '#64748b'      # Gris suave (Slate 500)
+C_BLANCO = '#ffffff'
+
+# Esquemas de color del encabezado y los títulos de sección
+ESQUEMAS = {
+    'azul': {'encabezado': C_PRIMARIO, 'subtitulo': '#e2e8f0', 'etiqueta': C_ACENTO, 'seccion': C_ACENTO},
+    'verde': {'encabezado': C_EXITO, 'subtitulo': '#ecfdf5', 'etiqueta': '#047857', 'seccion': C_EXITO},
+}
+
+# Formatos de salida: (mimetype, extensión, opciones de Image.save)
+FORMATOS = {
+    'PNG': ('image/png', 'png', {}),
+    'JPEG': ('image/jpeg', 'jpg', {'quality': 85, 'optimize': True}),
+    'WEBP': ('image/webp', 'webp', {'quality': 80, 'method': 4}),
+}
+
+
+@lru_cache(maxsize=None)
+def fuente(rol):
+    """Fuente del rol indicado, cargada una sola vez por proceso"""
+    from PIL import ImageFont
+    archivo, tamano = FUENTES[rol]
+    try:
+        return ImageFont.truetype(archivo, tamano)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def _tarjeta(draw, y, alto):
+    # Sombra suave
+    draw.rectangle([MARGEN_X + 5, y + 5, ANCHO - MARGEN_X + 5, y + alto + 5], fill='#e2e8f0')
+    # Tarjeta blanca
+    draw.rectangle([MARGEN_X, y, ANCHO - MARGEN_X, y + alto], fill=C_BLANCO, outline='#cbd5e1', width=1)
+
+
+def _encabezado(draw, subtitulo, colores):
+    draw.rectangle([0, 0, ANCHO, 280], fill=colores['encabezado'])
+    draw.text((ANCHO // 2, 100), "💎 DIAMANTE PRO", fill=C_BLANCO, font=fuente('titulo'), anchor='mm')
+    draw.text((ANCHO // 2, 180), subtitulo, fill=colores['subtitulo'], font=fuente('subtitulo'), anchor='mm')
+    # Etiqueta estilo "Ticket" (el texto con número y fecha es dinámico)
+    tag_x = (ANCHO - 600) // 2
+    draw.rectangle([tag_x, 220, tag_x + 600, 280], fill=colores['etiqueta'])
+
+
+def _fondo_comprobante(draw, colores):
+    _encabezado(draw, "COMPROBANTE OFICIAL DE CRÉDITO", colores)
+
+    # Tarjeta 1: cliente y total
+    y = 330
+    _tarjeta(draw, y, 350)
+    draw.text((MARGEN_X + 40, y + 50), "👤 DATOS DEL CLIENTE", fill=colores['seccion'], font=fuente('seccion'))
+    draw.line([MARGEN_X + 40, y + 200, ANCHO - MARGEN_X - 40, y + 200], fill='#e2e8f0', width=2)
+    draw.text((MARGEN_X + 40, y + 230), "MONTO TOTAL A PAGAR", fill=C_SUAVE, font=fuente('etiqueta'))
+    draw.text((ANCHO - MARGEN_X - 40, y + 230), "💰", fill=C_EXITO, font=fuente('valor'), anchor='ra')
+
+    # Tarjeta 2: detalles financieros (etiquetas en dos columnas)
+    y = 720
+    _tarjeta(draw, y, 420)
+    draw.text((MARGEN_X + 40, y + 50), "📊 DETALLES DEL PRÉSTAMO", fill=colores['seccion'], font=fuente('seccion'))
+    fila = y + 120
+    for i, (izquierda, derecha) in enumerate([("Monto Prestado:", "Cuota:"), ("Tasa Interés:", "Nº Cuotas:"),
+                                              ("Estado:", "Vence:")]):
+        draw.text((MARGEN_X + 40, fila + i * 100), izquierda, fill=C_SUAVE, font=fuente('etiqueta'))
+        draw.text((ANCHO // 2 + 20, fila + i * 100), derecha, fill=C_SUAVE, font=fuente('etiqueta'))
+
+    # Pie de página
+    draw.line([MARGEN_X, 1190, ANCHO - MARGEN_X, 1190], fill='#cbd5e1', width=2)
+    draw.rectangle([0, ALTO - 100, ANCHO, ALTO], fill='#f1f5f9')
+    draw.text((ANCHO // 2, ALTO - 50), "¡Gracias por su confianza!", fill=colores['seccion'], font=fuente('seccion'),
+              anchor='mm')
+
+
+def _fondo_recibo(draw, colores):
+    _encabezado(draw, "RECIBO DE PAGO OFICIAL", colores)
+
+    # Tarjeta 1: datos del cliente
+    _tarjeta(draw, 330, 250)
+    draw.text((MARGEN_X + 40, 380), "👤 DATOS DEL CLIENTE", fill=colores['seccion'], font=fuente('seccion'))
+
+    # Tarjeta 2: monto pagado (destacado)
+    _tarjeta(draw, 620, 250)
+    draw.rectangle([MARGEN_X, 620, ANCHO - MARGEN_X, 870], fill=C_EXITO_FONDO, outline='#10b981', width=2)
+    draw.text((ANCHO // 2, 680), "MONTO RECIBIDO", fill='#047857', font=fuente('seccion'), anchor='mm')
+
+    # Tarjeta 3: estado de cuenta
+    _tarjeta(draw, 910, 280)
+    draw.text((MARGEN_X + 40, 960), "📉 ESTADO DE CUENTA", fill=C_PRIMARIO, font=fuente('seccion'))
+    draw.text((MARGEN_X + 40, 1020), "Saldo Anterior:", fill=C_SUAVE, font=fuente('etiqueta'))
+    draw.text((ANCHO // 2 + 20, 1020), "Nuevo Saldo:", fill=C_SUAVE, font=fuente('etiqueta'))
+
+    # Mensaje final
+    draw.rectangle([0, ALTO - 80, ANCHO, ALTO], fill='#f1f5f9')
+    draw.text((ANCHO // 2, ALTO - 40), "¡Gracias por su pago a tiempo!", fill=colores['seccion'], font=fuente('seccion'),
+              anchor='mm')
+
+
+PLANTILLAS = {
+    'comprobante': _fondo_comprobante,
+    'recibo': _fondo_recibo,
+}
+
+
+@lru_cache(maxsize=None)
+def fondo(plantilla, esquema):
+    """Capa estática de la plantilla, dibujada una sola vez por proceso (no modificar: usar .copy())"""
+    from PIL import Image, ImageDraw
+    img = Image.new('RGB', (ANCHO, ALTO), color='#f8fafc')
+    PLANTILLAS[plantilla](ImageDraw.Draw(img), ESQUEMAS[esquema])
+    return img
+
+
+def imagen_comprobante(prestamo, fecha_emision=None, esquema='azul'):
+    """Comprobante de crédito (PIL.Image) con los datos del préstamo"""
+    from PIL import ImageDraw
+    cliente = prestamo.cliente
+    img = fondo('comprobante', esquema).copy()
+    draw = ImageDraw.Draw(img)
+
+    draw.text((ANCHO // 2, 250), f"CRÉDITO #{prestamo.id}  •  {prestamo.fecha_inicio.strftime('%d/%m/%Y')}",
+              fill=C_BLANCO, font=fuente('seccion'), anchor='mm')
+
+    # Tarjeta 1
+    draw.text((MARGEN_X + 40, 440), cliente.nombre.upper(), fill=C_PRIMARIO, font=fuente('dinero'))
+    draw.text((MARGEN_X + 40, 500), f"Documento: {cliente.documento}", fill=C_SUAVE, font=fuente('subtitulo'))
+    draw.text((ANCHO - MARGEN_X - 40, 610), f"{prestamo.moneda} ${prestamo.monto_a_pagar:,.0f}",
+              fill=C_PRIMARIO, font=fuente('dinero'), anchor='ra')
+
+    # Tarjeta 2: valores debajo de cada etiqueta
+    col1_x, col2_x, fila = MARGEN_X + 40, ANCHO // 2 + 20, 880
+    draw.text((col1_x, fila), f"${prestamo.monto_prestado:,.0f}", fill=C_TEXTO, font=fuente('valor'))
+    draw.text((col1_x, fila + 100), f"{prestamo.tasa_interes:.0f}%", fill=C_TEXTO, font=fuente('valor'))
+    estado_color = C_EXITO if prestamo.estado == 'ACTIVO' else C_SUAVE
+    draw.text((col1_x, fila + 200), f"✅ {prestamo.estado}", fill=estado_color, font=fuente('valor'))
+    draw.text((col2_x, fila), f"${prestamo.valor_cuota:,.0f} ({prestamo.frecuencia})", fill=C_TEXTO,
+              font=fuente('valor'))
+    draw.text((col2_x, fila + 100), f"{prestamo.numero_cuotas}", fill=C_TEXTO, font=fuente('valor'))
+    draw.text((col2_x, fila + 200), f"{prestamo.fecha_fin_estimada.strftime('%d/%m/%Y')}", fill=C_TEXTO,
+              font=fuente('valor'))
+
+    # Pie de página
+    fecha_emision = fecha_emision or datetime.now()
+    draw.text((ANCHO // 2, 1220), f"Atendido por: {prestamo.cobrador.nombre}", fill=C_SUAVE, font=fuente('pie'),
+              anchor='mm')
+    draw.text((ANCHO // 2, 1260), f"Fecha de emisión: {fecha_emision.strftime('%d/%m/%Y %H:%M')}", fill=C_SUAVE,
+              font=fuente('pie'), anchor='mm')
+    return img
+
+
+def imagen_recibo(pago, recibido_por, esquema='verde'):
+    """Recibo de pago (PIL.Image) con los datos del pago"""
+    from PIL import ImageDraw
+    prestamo = pago.prestamo
+    cliente = prestamo.cliente
+    img = fondo('recibo', esquema).copy()
+    draw = ImageDraw.Draw(img)
+
+    draw.text((ANCHO // 2, 250), f"RECIBO #{pago.id}  •  {pago.fecha_pago.strftime('%d/%m/%Y %H:%M')}",
+              fill=C_BLANCO, font=fuente('seccion'), anchor='mm')
+
+    # Tarjeta 1
+    draw.text((MARGEN_X + 40, 440), cliente.nombre.upper(), fill=C_PRIMARIO, font=fuente('dinero'))
+    draw.text((MARGEN_X + 40, 500), f"Documento: {cliente.documento}  |  Crédito #{prestamo.id}", fill=C_SUAVE,
+              font=fuente('subtitulo'))
+
+    # Tarjeta 2
+    draw.text((ANCHO // 2, 760), f"{prestamo.moneda} ${pago.monto:,.0f}", fill='#065f46',
+              font=fuente('dinero_principal'), anchor='mm')
+
+    # Tarjeta 3
+    draw.text((MARGEN_X + 40, 1060), f"${pago.saldo_anterior:,.0f}", fill=C_TEXTO, font=fuente('valor'))
+    draw.text((ANCHO // 2 + 20, 1060), f"${pago.saldo_nuevo:,.0f}", fill=C_ACENTO, font=fuente('dinero'))
+
+    # Observaciones y pie
+    y = 1240
+    if pago.observaciones:
+        draw.text((MARGEN_X, y), "📝 Observaciones:", fill=C_SUAVE, font=fuente('etiqueta'))
+        obs_text = pago.observaciones[:80] + "..." if len(pago.observaciones) > 80 else pago.observaciones
+        draw.text((MARGEN_X + 230, y), obs_text, fill=C_TEXTO, font=fuente('etiqueta'))
+        y += 50
+    draw.line([MARGEN_X, y, ANCHO - MARGEN_X, y], fill='#cbd5e1', width=2)
+    draw.text((ANCHO // 2, y + 30), f"Recibido por: {recibido_por}", fill=C_SUAVE, font=fuente('pie'), anchor='mm')
+    return img
+
+
+def normalizar_formato(formato):
+    """'webp', 'jpg', ... -> clave de FORMATOS (PNG si no se reconoce)"""
+    formato = (formato or 'PNG').upper()
+    if formato == 'JPG':
+        formato = 'JPEG'
+    return formato if formato in FORMATOS else 'PNG'
+
+
+def codificar(img, formato='PNG', ancho=None):
+    """
+    Codifica la imagen en el formato y ancho indicados.
+
+    Returns:
+        tuple: (BytesIO, mimetype, extensión)
+    """
+    formato = normalizar_formato(formato)
+    mimetype, extension, opciones = FORMATOS[formato]
+
+    if ancho and ancho < img.width:
+        from PIL import Image
+        img = img.resize((ancho, round(img.height * ancho / img.width)), Image.LANCZOS)
+
+    buffer = BytesIO()
+    img.save(buffer, format=formato, **opciones)
+    buffer.seek(0)
+    return buffer, mimetype, extension
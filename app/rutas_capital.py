@@ -3,7 +3,7 @@ from app.models import db, AporteCapital, Sociedad
 from datetime import datetime
 
 # Definimos un "Blueprint" para organizar las rutas de finanzas
-capital_bp = Blueprint('capital', __name__)
+capital_bp = Blueprint('capital_api', __name__)
 
 @capital_bp.route('/api/capital/nuevo', methods=['POST'])
 def registrar_aporte():
@@ -0,0 +1,271 @@
+"""
+Scoring crediticio de DIAMANTE PRO
+
+Calcula score_crediticio (0-1000), nivel_riesgo y limite_credito_sugerido de
+los clientes a partir de su historia de pago y de los datos del comercio:
+- Puntualidad: lo pagado (pagos) frente a lo vencido sin pagar (cuotas) y los
+  días de la cuota vencida más antigua
+- Préstamos cancelados, antigüedad del negocio, comprobante de residencia,
+  tiempo en la vivienda y capacidad de pago (ingresos diarios vs gastos del mes)
+
+Los datos se cargan por tramos de LOTE ids con una consulta agrupada por tabla
+y el puntaje se calcula en NumPy para todo el tramo. Solo se escriben los
+clientes cuyo score, nivel o límite cambió, con su fila en historial_scoring
+(factores_calculo: puntos por factor) y, si el cambio lo amerita, una alerta.
+Las inserciones y los UPDATE van en lote, con commit por tramo.
+"""
+import json
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import bindparam, case, func, insert, select, update
+
+from .models import AlertaScoring, Cliente, Cuota, HistorialScoring, Pago, Prestamo, ESTADOS_VIGENTES, db
+from .fechas import hoy_en
+
+LOTE = 5000
+
+# Puntos máximos por factor (suman 1000)
+PUNTOS = {
+    'tasa_pago': 300,               # Pagado / (pagado + vencido sin pagar)
+    'atraso_actual': 150,           # Se pierde en CORTE_ATRASO días de atraso
+    'prestamos_cancelados': 100,    # Por préstamo terminado de pagar, hasta 5
+    'antiguedad_negocio': 150,      # Completo a los 5 años
+    'comprobante_residencia': 100,  # 60 por tenerlo, 40 más si está a su nombre
+    'tiempo_residencia': 50,        # Completo a los 3 años
+    'capacidad_pago': 150,          # Completo con un margen del 50% de los ingresos
+}
+CORTE_ATRASO = 30
+DIAS_DE_VENTA_AL_MES = 26
+
+# Score mínimo de cada nivel (de mayor a menor); por debajo, CRITICO.
+# Los clientes sin préstamos quedan NUEVO con el puntaje de sus datos.
+NIVELES = (('EXCELENTE', 800), ('BUENO', 650), ('REGULAR', 500), ('ALTO', 350))
+
+# Límite sugerido: margen mensual (o el mayor préstamo que tuvo) por este factor
+MULTIPLICADOR_LIMITE = {'EXCELENTE': 1.5, 'BUENO': 1.0, 'REGULAR': 0.6, 'ALTO': 0.3, 'CRITICO': 0.0, 'NUEVO': 0.5}
+
+# Variación de score que genera alerta de subir/bajar crédito
+CAMBIO_ALERTA = 100
+
+
+def _cargar_tramo(desde_id, hasta_id, fecha, cliente_ids=None):
+    """Datos del tramo como arrays alineados por cliente (ordenados por id); None si no hay clientes"""
+    filtros = [Cliente.id >= desde_id, Cliente.id < hasta_id]
+    if cliente_ids is not None:
+        filtros.append(Cliente.id.in_(cliente_ids))
+
+    clientes = db.session.execute(select(
+        Cliente.id, Cliente.score_crediticio, Cliente.nivel_riesgo, Cliente.limite_credito_sugerido,
+        Cliente.credito_bloqueado, Cliente.antiguedad_negocio_meses, Cliente.tiene_comprobante_residencia,
+        Cliente.comprobante_a_nombre_propio, Cliente.tiempo_residencia_meses,
+        Cliente.ingresos_diarios_estimados, Cliente.gastos_mensuales_promedio
+    ).where(*filtros).order_by(Cliente.id)).all()
+    if not clientes:
+        return None
+
+    columnas = np.array(clientes, dtype=object)
+    ids = columnas[:, 0].astype(np.int64)
+    datos = {
+        'id': ids,
+        'score': columnas[:, 1],
+        'nivel': columnas[:, 2],
+        'limite': columnas[:, 3].astype(float),
+        'bloqueado': columnas[:, 4] == True,
+        'antiguedad_negocio': columnas[:, 5].astype(float),
+        'tiene_comprobante': columnas[:, 6] == True,
+        'comprobante_propio': columnas[:, 7] == True,
+        'tiempo_residencia': columnas[:, 8].astype(float),
+        'ingresos_diarios': columnas[:, 9].astype(float),
+        'gastos_mensuales': columnas[:, 10].astype(float),
+    }
+
+    del_tramo = [Prestamo.cliente_id >= desde_id, Prestamo.cliente_id < hasta_id]
+    if cliente_ids is not None:
+        del_tramo.append(Prestamo.cliente_id.in_(cliente_ids))
+
+    prestamos = db.session.execute(select(
+        Prestamo.cliente_id,
+        func.count(Prestamo.id),
+        func.sum(case((Prestamo.estado == 'CANCELADO', 1), else_=0)),
+        func.max(Prestamo.monto_prestado)
+    ).where(*del_tramo).group_by(Prestamo.cliente_id)).all()
+    _alinear(datos, prestamos, ('prestamos', 'cancelados', 'mayor_prestamo'), (0, 0, np.nan))
+
+    pagado = db.session.execute(select(
+        Prestamo.cliente_id, func.sum(Pago.monto)
+    ).join(Pago, Pago.prestamo_id == Prestamo.id).where(*del_tramo).group_by(Prestamo.cliente_id)).all()
+    _alinear(datos, pagado, ('pagado',), (0,))
+
+    vencido = db.session.execute(select(
+        Prestamo.cliente_id, func.sum(Cuota.monto), func.min(Cuota.fecha_vencimiento)
+    ).join(Cuota, Cuota.prestamo_id == Prestamo.id).where(
+        *del_tramo,
+        Prestamo.estado.in_(ESTADOS_VIGENTES),
+        Cuota.pagada == False,
+        Cuota.fecha_vencimiento < fecha
+    ).group_by(Prestamo.cliente_id)).all()
+    _alinear(datos, vencido, ('vencido', 'vencida_mas_antigua'), (0, None))
+    mas_antigua = datos.pop('vencida_mas_antigua').astype('datetime64[D]')
+    dias = (np.datetime64(fecha, 'D') - mas_antigua).astype(np.int64)
+    datos['dias_atraso'] = np.where(np.isnat(mas_antigua), 0, dias).astype(float)
+    return datos
+
+
+def _alinear(datos, filas, nombres, vacios):
+    """Agrega a datos las columnas de una consulta agrupada (cliente_id, ...) en el orden de datos['id']"""
+    posiciones = np.searchsorted(datos['id'], [fila[0] for fila in filas])
+    for i, (nombre, vacio) in enumerate(zip(nombres, vacios)):
+        columna = np.full(len(datos['id']), vacio, dtype=object if vacio is None else float)
+        columna[posiciones] = [fila[i + 1] for fila in filas]
+        datos[nombre] = columna
+
+
+def puntuar(datos):
+    """
+    Puntos por factor (matriz clientes x PUNTOS), score, nivel y límite del tramo.
+    Los clientes sin préstamos toman la mitad de los puntos de puntualidad.
+    """
+    sin_historia = datos['prestamos'] == 0
+    esperado = datos['pagado'] + datos['vencido']
+    tasa_pago = np.divide(datos['pagado'], esperado, out=np.full(len(esperado), 0.5), where=esperado > 0)
+    al_dia = np.clip(1 - datos['dias_atraso'] / CORTE_ATRASO, 0, 1)
+    al_dia[sin_historia] = 0.5
+
+    ingresos_mes = datos['ingresos_diarios'] * DIAS_DE_VENTA_AL_MES
+    margen = ingresos_mes - datos['gastos_mensuales']
+    proporcion_margen = np.divide(margen, ingresos_mes, out=np.zeros(len(margen)), where=ingresos_mes > 0)
+
+    fracciones = np.column_stack([
+        tasa_pago,
+        al_dia,
+        np.minimum(datos['cancelados'], 5) / 5,
+        np.clip(np.nan_to_num(datos['antiguedad_negocio']) / 60, 0, 1),
+        0.6 * datos['tiene_comprobante'] + 0.4 * (datos['tiene_comprobante'] & datos['comprobante_propio']),
+        np.clip(np.nan_to_num(datos['tiempo_residencia']) / 36, 0, 1),
+        np.clip(np.nan_to_num(proporcion_margen) / 0.5, 0, 1),
+    ])
+    factores = np.rint(fracciones * np.array(list(PUNTOS.values()))).astype(np.int64)
+    score = np.clip(factores.sum(axis=1), 0, 1000)
+
+    nivel = np.select([score >= minimo for _, minimo in NIVELES], [n for n, _ in NIVELES], 'CRITICO').astype(object)
+    nivel[sin_historia] = 'NUEVO'
+
+    base = np.where(margen > 0, margen, datos['mayor_prestamo'])
+    limite = np.round(base * np.array([MULTIPLICADOR_LIMITE[n] for n in nivel]))
+    return factores, score, nivel, limite
+
+
+def _alertas(datos, indices, score, nivel):
+    """Tipo, prioridad, mensaje y acción de las alertas de los clientes que cambiaron"""
+    anterior = np.array([s if s is not None else 500 for s in datos['score'][indices]], dtype=np.int64)
+    nivel_anterior = datos['nivel'][indices]
+    nuevo, nivel_nuevo = score[indices], nivel[indices]
+    con_historia = (nivel_anterior != 'NUEVO') & (nivel_nuevo != 'NUEVO')
+
+    tipo = np.select([
+        (nivel_nuevo == 'CRITICO') & (nivel_anterior != 'CRITICO') & ~datos['bloqueado'][indices],
+        con_historia & (nuevo <= anterior - CAMBIO_ALERTA) & (nivel_nuevo != 'CRITICO'),
+        (nivel_nuevo == 'EXCELENTE') & (nivel_anterior != 'EXCELENTE'),
+        con_historia & (nuevo >= anterior + CAMBIO_ALERTA) & np.isin(nivel_nuevo, ('BUENO', 'EXCELENTE')),
+    ], ['BLOQUEAR', 'BAJAR_CREDITO', 'CLIENTE_ESTRELLA', 'SUBIR_CREDITO'], '')
+
+    textos = {
+        'BLOQUEAR': ('ALTA', 'Score crítico: {a} → {n}', 'Bloquear nuevos créditos y revisar la cartera del cliente'),
+        'BAJAR_CREDITO': ('MEDIA', 'El score bajó de {a} a {n} ({nivel})', 'Reducir el monto del próximo préstamo'),
+        'CLIENTE_ESTRELLA': ('BAJA', 'Cliente excelente: score {n}', 'Ofrecer renovación o condiciones VIP'),
+        'SUBIR_CREDITO': ('BAJA', 'El score subió de {a} a {n} ({nivel})', 'Ofrecer un préstamo mayor'),
+    }
+    for i in np.flatnonzero(tipo != ''):
+        prioridad, mensaje, accion = textos[tipo[i]]
+        yield (tipo[i], prioridad, mensaje.format(a=anterior[i], n=nuevo[i], nivel=nivel_nuevo[i]), accion,
+               indices[i])
+
+
+def _calcular_tramo(desde_id, hasta_id, fecha, calculado_por, ahora, cliente_ids=None):
+    """Calcula y guarda el tramo [desde_id, hasta_id); devuelve (calculados, actualizados, alertas)"""
+    datos = _cargar_tramo(desde_id, hasta_id, fecha, cliente_ids)
+    if datos is None:
+        return 0, 0, 0
+    factores, score, nivel, limite = puntuar(datos)
+
+    limite_igual = (limite == datos['limite']) | (np.isnan(limite) & np.isnan(datos['limite']))
+    cambiaron = np.flatnonzero((score != datos['score']) | (nivel != datos['nivel']) | ~limite_igual)
+
+    ids = datos['id']
+    limites = [None if np.isnan(l) else float(l) for l in limite[cambiaron]]
+    if len(cambiaron):
+        tabla = Cliente.__table__
+        db.session.execute(update(tabla).where(tabla.c.id == bindparam('b_id')).values(
+            score_crediticio=bindparam('b_score'),
+            nivel_riesgo=bindparam('b_nivel'),
+            limite_credito_sugerido=bindparam('b_limite'),
+            # El score no viaja en el sync de la app: no marcar al cliente como modificado
+            fecha_actualizacion=tabla.c.fecha_actualizacion
+        ), [{'b_id': int(ids[i]), 'b_score': int(score[i]), 'b_nivel': nivel[i], 'b_limite': nuevo_limite}
+            for i, nuevo_limite in zip(cambiaron, limites)])
+
+        nombres = list(PUNTOS)
+        db.session.execute(insert(HistorialScoring), [{
+            'cliente_id': int(ids[i]),
+            'score_anterior': datos['score'][i],
+            'score_nuevo': int(score[i]),
+            'nivel_riesgo_anterior': datos['nivel'][i],
+            'nivel_riesgo_nuevo': nivel[i],
+            'limite_anterior': None if np.isnan(datos['limite'][i]) else float(datos['limite'][i]),
+            'limite_nuevo': nuevo_limite,
+            'factores_calculo': json.dumps(dict(zip(nombres, puntos))),
+            'fecha_calculo': ahora,
+            'calculado_por': calculado_por,
+        } for i, nuevo_limite, puntos in zip(cambiaron, limites, factores[cambiaron].tolist())])
+
+    # Una alerta pendiente del mismo tipo por cliente basta
+    pendientes = set(db.session.execute(select(AlertaScoring.cliente_id, AlertaScoring.tipo_alerta).where(
+        AlertaScoring.cliente_id >= desde_id, AlertaScoring.cliente_id < hasta_id,
+        AlertaScoring.estado == 'PENDIENTE'
+    )).all()) if len(cambiaron) else set()
+    alertas = [{
+        'cliente_id': int(ids[i]), 'tipo_alerta': tipo, 'prioridad': prioridad, 'mensaje': mensaje,
+        'accion_sugerida': accion, 'estado': 'PENDIENTE', 'fecha_creacion': ahora,
+    } for tipo, prioridad, mensaje, accion, i in _alertas(datos, cambiaron, score, nivel)
+        if (int(ids[i]), tipo) not in pendientes]
+    if alertas:
+        db.session.execute(insert(AlertaScoring), alertas)
+
+    filtros = [Cliente.id >= desde_id, Cliente.id < hasta_id]
+    if cliente_ids is not None:
+        filtros.append(Cliente.id.in_(cliente_ids))
+    db.session.execute(update(Cliente).where(*filtros).values(
+        fecha_ultimo_calculo_score=ahora,
+        fecha_actualizacion=Cliente.fecha_actualizacion
+    ).execution_options(synchronize_session=False))
+    return len(ids), len(cambiaron), len(alertas)
+
+
+def calcular_scoring(cliente_ids=None, fecha=None, calculado_por='RECALCULO_MASIVO', lote=LOTE):
+    """
+    Recalcula el scoring de los clientes (hace commit por tramo).
+
+    Args:
+        cliente_ids: Solo estos clientes (por defecto, todos)
+        fecha: Día de referencia para las cuotas vencidas (por defecto, hoy)
+        calculado_por: SISTEMA, MANUAL o RECALCULO_MASIVO (queda en historial_scoring)
+        lote: Clientes (por rango de id) por tramo
+
+    Returns:
+        dict: {'calculados', 'actualizados': clientes que cambiaron, 'alertas': alertas creadas}
+    """
+    fecha = fecha or hoy_en()
+    ahora = datetime.now()
+    consulta = db.session.query(func.min(Cliente.id), func.max(Cliente.id))
+    if cliente_ids is not None:
+        consulta = consulta.filter(Cliente.id.in_(cliente_ids))
+    minimo, maximo = consulta.one()
+
+    totales = [0, 0, 0]
+    if minimo is not None:
+        for desde_id in range(minimo, maximo + 1, lote):
+            resultado = _calcular_tramo(desde_id, desde_id + lote, fecha, calculado_por, ahora, cliente_ids)
+            totales = [total + n for total, n in zip(totales, resultado)]
+            db.session.commit()
+    return dict(zip(('calculados', 'actualizados', 'alertas'), totales))
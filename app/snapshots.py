@@ -0,0 +1,233 @@
+"""
+Snapshots diarios de cartera de DIAMANTE PRO
+Los días ya cerrados se leen de la tabla snapshot_diario (una fila por
+fecha, ruta, cobrador y moneda); solo los días sin cerrar (normalmente hoy)
+se calculan en vivo desde pagos y préstamos.
+
+Los días son los del país de cada ruta (ver fechas.py).
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import func, case, or_
+from .models import SnapshotDiario, Prestamo, Pago, Ruta, ESTADOS_VIGENTES, db
+from .fechas import rango_del_dia, rango_de_fechas, zona_de_pais, zonas_de_rutas, a_fecha_local
+
+# Punto de una serie diaria, compatible con las filas que usan los templates (pago.fecha, pago.total)
+PuntoSerie = namedtuple('PuntoSerie', ['fecha', 'total'])
+
+FLUJOS = ('cobrado', 'num_pagos', 'prestado', 'num_prestamos_nuevos')
+
+
+def _dias(desde, hasta):
+    return [desde + timedelta(days=i) for i in range((hasta - desde).days + 1)]
+
+
+def _filtros_prestamo(cobrador_id=None, ruta_id=None):
+    filtros = []
+    if cobrador_id:
+        filtros.append(Prestamo.cobrador_id == cobrador_id)
+    if ruta_id:
+        filtros.append(Prestamo.ruta_id == ruta_id)
+    return filtros
+
+
+def _grupos_por_zona(ruta_id=None):
+    """
+    Filtro sobre Prestamo.ruta_id por cada zona horaria: [(zona, filtro o None)].
+    Los préstamos sin ruta o con país desconocido usan la hora del servidor.
+    """
+    grupos = zonas_de_rutas()
+    if ruta_id:
+        zona = next((z for z, ids in grupos.items() if ruta_id in ids), None)
+        return [(zona, None)]
+    if len(grupos) <= 1:
+        return [(next(iter(grupos), None), None)]
+
+    resultado = []
+    for zona, ids in grupos.items():
+        filtro = Prestamo.ruta_id.in_(ids)
+        if zona is None:
+            filtro = or_(filtro, Prestamo.ruta_id.is_(None))
+        resultado.append((zona, filtro))
+    if None not in grupos:
+        resultado.append((None, Prestamo.ruta_id.is_(None)))
+    return resultado
+
+
+def _indice_dia(columna, limites):
+    """
+    Número de día (0, 1, ...) de cada timestamp según los inicios de día ya calculados.
+    Solo compara contra constantes: no aplica funciones de fecha fila por fila.
+    """
+    return case(*[(columna >= inicio, i) for i, inicio in reversed(list(enumerate(limites)))], else_=-1)
+
+
+def _flujos_en_vivo(desde, hasta, filtros, ruta_id=None):
+    """
+    Cobrado y prestado por (fecha, ruta, cobrador, moneda) entre dos días inclusive,
+    calculado directamente desde pagos y préstamos.
+
+    Cada grupo de rutas con la misma zona horaria se consulta con su propio
+    intervalo [inicio, fin), así el filtro por fecha usa los índices.
+    """
+    dias = _dias(desde, hasta)
+    flujos = {}
+
+    def fila(clave):
+        if clave not in flujos:
+            flujos[clave] = dict.fromkeys(FLUJOS, 0)
+        return flujos[clave]
+
+    for zona, filtro_zona in _grupos_por_zona(ruta_id):
+        inicio, fin = rango_de_fechas(desde, hasta, zona)
+        limites = [rango_del_dia(dia, zona)[0] for dia in dias]
+        filtros_grupo = filtros + ([filtro_zona] if filtro_zona is not None else [])
+
+        dia_pago = _indice_dia(Pago.fecha_pago, limites)
+        for indice, ruta, cobrador_id, moneda, total, cantidad in db.session.query(
+            dia_pago, Prestamo.ruta_id, Prestamo.cobrador_id, Prestamo.moneda,
+            func.sum(Pago.monto), func.count(Pago.id)
+        ).join(Prestamo, Pago.prestamo_id == Prestamo.id).filter(
+            Pago.fecha_pago >= inicio, Pago.fecha_pago < fin, *filtros_grupo
+        ).group_by(dia_pago, Prestamo.ruta_id, Prestamo.cobrador_id, Prestamo.moneda).all():
+            valores = fila((dias[indice], ruta, cobrador_id, moneda or 'COP'))
+            valores['cobrado'] += float(total or 0)
+            valores['num_pagos'] += cantidad
+
+        dia_prestamo = _indice_dia(Prestamo.fecha_inicio, limites)
+        for indice, ruta, cobrador_id, moneda, total, cantidad in db.session.query(
+            dia_prestamo, Prestamo.ruta_id, Prestamo.cobrador_id, Prestamo.moneda,
+            func.sum(Prestamo.monto_prestado), func.count(Prestamo.id)
+        ).filter(
+            Prestamo.fecha_inicio >= inicio, Prestamo.fecha_inicio < fin, *filtros_grupo
+        ).group_by(dia_prestamo, Prestamo.ruta_id, Prestamo.cobrador_id, Prestamo.moneda).all():
+            valores = fila((dias[indice], ruta, cobrador_id, moneda or 'COP'))
+            valores['prestado'] += float(total or 0)
+            valores['num_prestamos_nuevos'] += cantidad
+
+    return flujos
+
+
+def flujos_por_dia(desde, hasta, cobrador_id=None, ruta_id=None, hoy=None):
+    """
+    Totales diarios (cobrado, pagos, prestado, préstamos nuevos) entre dos días inclusive.
+
+    Los días cerrados salen de snapshot_diario con una consulta agrupada por fecha;
+    el resto se calcula en vivo. El costo depende del número de días, no de pagos.
+
+    Returns:
+        dict: {date: {'cobrado', 'num_pagos', 'prestado', 'num_prestamos_nuevos'}}
+              (solo días con actividad)
+    """
+    hoy = hoy or datetime.now().date()
+    resultado = {}
+    cerrados = set()
+
+    ultimo_cerrado = min(hasta, hoy - timedelta(days=1))
+    if desde <= ultimo_cerrado:
+        cerrados = {f for (f,) in db.session.query(SnapshotDiario.fecha).filter(
+            SnapshotDiario.fecha >= desde, SnapshotDiario.fecha <= ultimo_cerrado
+        ).distinct()}
+
+    if cerrados:
+        filtros = []
+        if cobrador_id:
+            filtros.append(SnapshotDiario.cobrador_id == cobrador_id)
+        if ruta_id:
+            filtros.append(SnapshotDiario.ruta_id == ruta_id)
+        for fecha, cobrado, num_pagos, prestado, nuevos in db.session.query(
+            SnapshotDiario.fecha,
+            func.sum(SnapshotDiario.cobrado), func.sum(SnapshotDiario.num_pagos),
+            func.sum(SnapshotDiario.prestado), func.sum(SnapshotDiario.num_prestamos_nuevos)
+        ).filter(
+            SnapshotDiario.fecha >= desde, SnapshotDiario.fecha <= ultimo_cerrado, *filtros
+        ).group_by(SnapshotDiario.fecha).all():
+            if cobrado or num_pagos or prestado or nuevos:
+                resultado[fecha] = {'cobrado': float(cobrado or 0), 'num_pagos': int(num_pagos or 0),
+                                    'prestado': float(prestado or 0), 'num_prestamos_nuevos': int(nuevos or 0)}
+
+    # Días sin snapshot (hoy o días que el cierre nocturno aún no procesó)
+    faltantes = [dia for dia in _dias(desde, hasta) if dia not in cerrados]
+    if faltantes:
+        pendientes = set(faltantes)
+        for (fecha, _, _, _), valores in _flujos_en_vivo(
+                faltantes[0], faltantes[-1], _filtros_prestamo(cobrador_id, ruta_id), ruta_id).items():
+            if fecha in pendientes:
+                acumulado = resultado.setdefault(fecha, dict.fromkeys(FLUJOS, 0))
+                for campo in FLUJOS:
+                    acumulado[campo] += valores[campo]
+
+    return resultado
+
+
+def serie_cobrado(flujos):
+    """Cobrado por día con pagos, ordenado por fecha (para gráficos)"""
+    return [PuntoSerie(fecha.isoformat(), flujos[fecha]['cobrado'])
+            for fecha in sorted(flujos) if flujos[fecha]['num_pagos']]
+
+
+def generar_snapshot(fecha, incluir_cartera=False):
+    """
+    Recalcula el snapshot de un día (sin hacer commit).
+
+    Los flujos se recalculan siempre. La foto de cartera (saldo, capital, préstamos
+    activos/atrasados/mora) solo refleja el estado actual de los préstamos, por eso
+    únicamente la captura el cierre nocturno (incluir_cartera=True); al recalcular
+    días anteriores se conserva la foto guardada.
+
+    Returns:
+        int: Número de filas del snapshot para esa fecha
+    """
+    flujos = {clave[1:]: valores for clave, valores in _flujos_en_vivo(fecha, fecha, []).items()}
+    existentes = {(s.ruta_id, s.cobrador_id, s.moneda): s
+                  for s in SnapshotDiario.query.filter_by(fecha=fecha).all()}
+
+    cartera = {}
+    if incluir_cartera:
+        for ruta_id, cobrador_id, moneda, saldo, capital, activos, atrasados, mora in db.session.query(
+            Prestamo.ruta_id, Prestamo.cobrador_id, Prestamo.moneda,
+            func.sum(Prestamo.saldo_actual), func.sum(Prestamo.monto_prestado), func.count(Prestamo.id),
+            func.sum(case((Prestamo.cuotas_atrasadas > 0, 1), else_=0)),
+            func.sum(case((Prestamo.cuotas_atrasadas > 3, 1), else_=0))
+        ).filter(Prestamo.estado.in_(ESTADOS_VIGENTES)).group_by(
+            Prestamo.ruta_id, Prestamo.cobrador_id, Prestamo.moneda
+        ).all():
+            cartera[(ruta_id, cobrador_id, moneda or 'COP')] = {
+                'cartera': float(saldo or 0), 'capital_circulacion': float(capital or 0),
+                'prestamos_activos': activos, 'prestamos_atrasados': int(atrasados or 0),
+                'prestamos_mora': int(mora or 0)
+            }
+
+    for clave in set(existentes) | set(flujos) | set(cartera):
+        snapshot = existentes.get(clave)
+        if snapshot is None:
+            ruta_id, cobrador_id, moneda = clave
+            snapshot = SnapshotDiario(fecha=fecha, ruta_id=ruta_id, cobrador_id=cobrador_id, moneda=moneda)
+            db.session.add(snapshot)
+        for campo, valor in flujos.get(clave, dict.fromkeys(FLUJOS, 0)).items():
+            setattr(snapshot, campo, valor)
+        if incluir_cartera:
+            for campo, valor in cartera.get(clave, {'cartera': 0, 'capital_circulacion': 0, 'prestamos_activos': 0,
+                                                     'prestamos_atrasados': 0, 'prestamos_mora': 0}).items():
+                setattr(snapshot, campo, valor)
+        snapshot.fecha_generacion = datetime.utcnow()
+
+    return len(set(existentes) | set(flujos) | set(cartera))
+
+
+def dias_con_pagos_tardios(desde_actualizacion, antes_de):
+    """
+    Días anteriores a `antes_de` con pagos creados o modificados después de
+    `desde_actualizacion` (ej. pagos offline sincronizados con fecha atrasada).
+    """
+    # Pocas filas (solo lo sincronizado desde la última corrida): el día local se calcula en Python
+    dias = set()
+    for fecha_pago, pais in db.session.query(Pago.fecha_pago, Ruta.pais).join(
+        Prestamo, Pago.prestamo_id == Prestamo.id
+    ).outerjoin(Ruta, Prestamo.ruta_id == Ruta.id).filter(
+        Pago.fecha_actualizacion >= desde_actualizacion
+    ).all():
+        dia = a_fecha_local(fecha_pago, zona_de_pais(pais))
+        if dia < antes_de:
+            dias.add(dia)
+    return sorted(dias)
@@ -0,0 +1,20 @@
+"""
+Vistas web de DIAMANTE PRO, un blueprint por módulo
+
+Las URLs no cambian; los endpoints llevan el nombre del blueprint
+(url_for('cobro.cobro_lista')). Con APP_MODO=api create_app() no importa
+este paquete: el proceso de la app móvil solo carga la API.
+"""
+from importlib import import_module
+from .comun import url_archivo, miniatura
+
+BLUEPRINTS = ('dashboard', 'clientes', 'prestamos', 'cobro', 'caja', 'reportes',
+              'capital', 'activos', 'rutas', 'usuarios')
+
+
+def registrar_vistas(app):
+    """Registra los blueprints de la interfaz web y los filtros de sus plantillas"""
+    for nombre in BLUEPRINTS:
+        app.register_blueprint(import_module(f'.{nombre}', __name__).bp)
+    app.add_template_filter(url_archivo)
+    app.add_template_filter(miniatura)
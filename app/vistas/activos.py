@@ -0,0 +1,114 @@
+"""
+Activos fijos (blueprint activos)
+"""
+from flask import Blueprint, render_template, request, redirect, url_for, session
+from ..models import Usuario, Sociedad, Ruta, Activo, db
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+bp = Blueprint('activos', __name__)
+
+
+# ==================== ACTIVOS FIJOS ====================
+@bp.route('/activos')
+def activos_lista():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    activos = Activo.query.options(
+        joinedload(Activo.usuario_responsable), joinedload(Activo.sociedad), joinedload(Activo.ruta)
+    ).order_by(Activo.fecha_compra.desc()).all()
+
+    # Calcular total por categoría
+    total_valor = db.session.query(func.sum(Activo.valor_compra)).scalar() or 0
+
+    return render_template('activos_lista.html',
+                         activos=activos,
+                         total_valor=total_valor,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/activos/nuevo')
+def activos_nuevo():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    sociedades = Sociedad.query.order_by(Sociedad.nombre).all()
+    rutas = Ruta.query.order_by(Ruta.nombre).all()
+    usuarios = Usuario.query.order_by(Usuario.nombre).all()
+
+    return render_template('activos_nuevo.html',
+                         sociedades=sociedades,
+                         rutas=rutas,
+                         usuarios=usuarios,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/activos/guardar', methods=['POST'])
+def activos_guardar():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    try:
+        nombre = request.form['nombre']
+        categoria = request.form['categoria']
+        valor_compra = float(request.form['valor_compra'])
+        fecha_compra_str = request.form['fecha_compra']
+        sociedad_id = request.form.get('sociedad_id')
+        ruta_id = request.form.get('ruta_id')
+        usuario_responsable_id = request.form.get('usuario_responsable_id')
+        marca = request.form.get('marca', '')
+        modelo = request.form.get('modelo', '')
+        placa_serial = request.form.get('placa_serial', '')
+        estado = request.form['estado']
+        notas = request.form.get('observaciones', '')
+
+        # Convertir fecha
+        fecha_compra = datetime.strptime(fecha_compra_str, '%Y-%m-%d')
+
+        # Crear nuevo activo
+        nuevo_activo = Activo(
+            nombre=nombre,
+            categoria=categoria,
+            valor_compra=valor_compra,
+            fecha_compra=fecha_compra,
+            sociedad_id=sociedad_id if sociedad_id else None,
+            ruta_id=ruta_id if ruta_id else None,
+            usuario_responsable_id=usuario_responsable_id if usuario_responsable_id else None,
+            marca=marca,
+            modelo=modelo,
+            placa_serial=placa_serial,
+            estado=estado,
+            notas=notas,
+            registrado_por_id=session.get('usuario_id')
+        )
+
+        db.session.add(nuevo_activo)
+        db.session.commit()
+
+        return redirect(url_for('activos.activos_lista'))
+
+    except Exception as e:
+        db.session.rollback()
+        sociedades = Sociedad.query.order_by(Sociedad.nombre).all()
+        rutas = Ruta.query.order_by(Ruta.nombre).all()
+        usuarios = Usuario.query.order_by(Usuario.nombre).all()
+        return render_template('activos_nuevo.html',
+                             sociedades=sociedades,
+                             rutas=rutas,
+                             usuarios=usuarios,
+                             error=f'Error al guardar activo: {str(e)}',
+                             nombre=session.get('nombre'),
+                             rol=session.get('rol'))
@@ -0,0 +1,394 @@
+"""
+Caja: resumen, gastos, cuadre diario y traslados entre rutas (blueprint caja)
+"""
+from flask import Blueprint, render_template, request, redirect, url_for, session, current_app
+from werkzeug.utils import secure_filename
+from ..models import Usuario, Prestamo, Pago, Transaccion, db
+from ..fechas import rango_del_dia, hoy_en, zona_de_cobrador, momento_del_dia
+from datetime import datetime
+from sqlalchemy.orm import joinedload, contains_eager
+from ..almacenamiento import servicio_subidas
+from .. import imagenes
+import uuid
+
+bp = Blueprint('caja', __name__)
+
+
+# ==================== MÓDULO DE CAJA/FINANZAS ====================
+@bp.route('/caja')
+def caja_inicio():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    usuario_id = session.get('usuario_id')
+    rol = session.get('rol')
+
+    # Obtener fecha actual (para el cobrador, el día en el país de su ruta)
+    zona = zona_de_cobrador(usuario_id) if rol == 'cobrador' else None
+    hoy = hoy_en(zona)
+    inicio_dia, fin_dia = rango_del_dia(hoy, zona)
+
+    # Calcular ingresos del día (pagos recibidos)
+    if rol == 'cobrador':
+        pagos_hoy = Pago.query.join(Prestamo).filter(
+            Pago.fecha_pago >= inicio_dia, Pago.fecha_pago < fin_dia,
+            Prestamo.cobrador_id == usuario_id
+        ).all()
+        # Traslados recibidos (ingresos)
+        traslados_recibidos_hoy = Transaccion.query.filter(
+            Transaccion.fecha >= inicio_dia, Transaccion.fecha < fin_dia,
+            Transaccion.usuario_destino_id == usuario_id,
+            Transaccion.naturaleza == 'TRASLADO'
+        ).all()
+    else:
+        pagos_hoy = Pago.query.filter(Pago.fecha_pago >= inicio_dia, Pago.fecha_pago < fin_dia).all()
+        traslados_recibidos_hoy = []
+
+    total_cobrado_hoy = sum(p.monto for p in pagos_hoy)
+    total_traslados_recibidos = sum(t.monto for t in traslados_recibidos_hoy)
+
+    # Calcular gastos del día (incluyendo traslados enviados)
+    if rol == 'cobrador':
+        gastos_hoy = Transaccion.query.filter(
+            Transaccion.fecha >= inicio_dia, Transaccion.fecha < fin_dia,
+            Transaccion.usuario_origen_id == usuario_id
+        ).all()
+    else:
+        gastos_hoy = Transaccion.query.filter(Transaccion.fecha >= inicio_dia, Transaccion.fecha < fin_dia).all()
+
+    total_gastos_hoy = sum(g.monto for g in gastos_hoy)
+
+    # Balance del día (cobros + traslados recibidos - gastos - traslados enviados)
+    balance_dia = total_cobrado_hoy + total_traslados_recibidos - total_gastos_hoy
+
+    # Estadísticas del mes
+    inicio_mes = datetime(hoy.year, hoy.month, 1)
+
+    if rol == 'cobrador':
+        pagos_mes = Pago.query.join(Prestamo).filter(
+            Pago.fecha_pago >= inicio_mes,
+            Prestamo.cobrador_id == usuario_id
+        ).all()
+        # Traslados recibidos del mes
+        traslados_recibidos_mes = Transaccion.query.filter(
+            Transaccion.fecha >= inicio_mes,
+            Transaccion.usuario_destino_id == usuario_id,
+            Transaccion.naturaleza == 'TRASLADO'
+        ).all()
+        gastos_mes = Transaccion.query.filter(
+            Transaccion.fecha >= inicio_mes,
+            Transaccion.usuario_origen_id == usuario_id
+        ).all()
+    else:
+        pagos_mes = Pago.query.filter(Pago.fecha_pago >= inicio_mes).all()
+        traslados_recibidos_mes = []
+        gastos_mes = Transaccion.query.filter(Transaccion.fecha >= inicio_mes).all()
+
+    total_cobrado_mes = sum(p.monto for p in pagos_mes)
+    total_traslados_mes = sum(t.monto for t in traslados_recibidos_mes)
+    total_gastos_mes = sum(g.monto for g in gastos_mes)
+    balance_mes = total_cobrado_mes + total_traslados_mes - total_gastos_mes
+
+    return render_template('caja_inicio.html',
+                         total_cobrado_hoy=total_cobrado_hoy,
+                         total_gastos_hoy=total_gastos_hoy,
+                         balance_dia=balance_dia,
+                         num_pagos_hoy=len(pagos_hoy),
+                         num_gastos_hoy=len(gastos_hoy),
+                         total_cobrado_mes=total_cobrado_mes,
+                         total_gastos_mes=total_gastos_mes,
+                         balance_mes=balance_mes,
+                         fecha_hoy=hoy.strftime('%d/%m/%Y'),
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/caja/gastos')
+def caja_gastos():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    usuario_id = session.get('usuario_id')
+    rol = session.get('rol')
+
+    # Filtros de fecha
+    fecha_inicio_str = request.args.get('fecha_inicio')
+    fecha_fin_str = request.args.get('fecha_fin')
+
+    query = Transaccion.query.options(joinedload(Transaccion.usuario_origen))
+    zona = None
+
+    # Filtrar gastos según el rol
+    if rol == 'cobrador':
+        query = query.filter_by(usuario_origen_id=usuario_id)
+        zona = zona_de_cobrador(usuario_id)
+
+    # Filtrar por fechas si existen
+    if fecha_inicio_str:
+        try:
+            fecha_inicio = datetime.strptime(fecha_inicio_str, '%Y-%m-%d').date()
+            inicio, _ = rango_del_dia(fecha_inicio, zona)
+            query = query.filter(Transaccion.fecha >= inicio)
+        except ValueError:
+            pass
+
+    if fecha_fin_str:
+        try:
+            fecha_fin = datetime.strptime(fecha_fin_str, '%Y-%m-%d').date()
+            # Incluir hasta el final del día
+            _, fin = rango_del_dia(fecha_fin, zona)
+            query = query.filter(Transaccion.fecha < fin)
+        except ValueError:
+            pass
+
+    gastos = query.order_by(Transaccion.fecha.desc()).all()
+
+    return render_template('caja_gastos.html',
+                         gastos=gastos,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/caja/gastos/nuevo')
+def caja_gastos_nuevo():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    return render_template('caja_gastos_nuevo.html',
+                         fecha_hoy=datetime.now().strftime('%Y-%m-%d'),
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/caja/gastos/guardar', methods=['POST'])
+def caja_gastos_guardar():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    try:
+        # Foto del recibo: se responde con su URL y se sube en segundo plano
+        subidas = servicio_subidas()
+        foto_evidencia = None
+        archivo = request.files.get('recibo')
+        if archivo and archivo.filename != '':
+            clave = secure_filename(f"gasto_{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}_{archivo.filename}")
+            es_foto = imagenes.disponible() and (archivo.content_type or '').startswith('image/')
+            if es_foto:
+                clave = imagenes.clave_foto(clave)  # Se guarda en WebP reducido, con miniatura
+            foto_evidencia = subidas.url(clave)
+
+        nueva_transaccion = Transaccion(
+            naturaleza='EGRESO',
+            concepto=request.form.get('concepto'),
+            descripcion=request.form.get('descripcion'),
+            monto=float(request.form.get('monto')),
+            fecha=momento_del_dia(datetime.strptime(request.form.get('fecha'), '%Y-%m-%d'),
+                                  zona_de_cobrador(session.get('usuario_id'))),
+            usuario_origen_id=session.get('usuario_id'),
+            foto_evidencia=foto_evidencia
+        )
+
+        db.session.add(nueva_transaccion)
+        db.session.commit()
+
+        if foto_evidencia:
+            subidas.encolar(clave, archivo.stream, archivo.content_type or 'application/octet-stream',
+                            current_app._get_current_object(), foto=es_foto)
+
+        return redirect(url_for('caja.caja_gastos', mensaje='Gasto registrado exitosamente'))
+
+    except Exception as e:
+        db.session.rollback()
+        return render_template('caja_gastos_nuevo.html',
+                             fecha_hoy=datetime.now().strftime('%Y-%m-%d'),
+                             error=f'Error al guardar: {str(e)}',
+                             nombre=session.get('nombre'),
+                             rol=session.get('rol'))
+
+
+@bp.route('/caja/cuadre')
+def caja_cuadre():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    usuario_id = session.get('usuario_id')
+    rol = session.get('rol')
+
+    # Obtener fecha del filtro o usar hoy (para el cobrador, el día en el país de su ruta)
+    zona = zona_de_cobrador(usuario_id) if rol == 'cobrador' else None
+    fecha_str = request.args.get('fecha', hoy_en(zona).strftime('%Y-%m-%d'))
+    fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
+    inicio_dia, fin_dia = rango_del_dia(fecha, zona)
+
+    # Obtener pagos del día (el préstamo y el cliente llegan en el mismo JOIN)
+    pagos_del_dia = Pago.query.join(Pago.prestamo).join(Prestamo.cliente).options(
+        contains_eager(Pago.prestamo).contains_eager(Prestamo.cliente)
+    )
+    if rol == 'cobrador':
+        pagos = pagos_del_dia.filter(
+            Pago.fecha_pago >= inicio_dia, Pago.fecha_pago < fin_dia,
+            Prestamo.cobrador_id == usuario_id
+        ).all()
+    else:
+        pagos = pagos_del_dia.filter(
+            Pago.fecha_pago >= inicio_dia, Pago.fecha_pago < fin_dia
+        ).all()
+
+    # Obtener gastos del día
+    if rol == 'cobrador':
+        gastos = Transaccion.query.filter(
+            Transaccion.fecha >= inicio_dia, Transaccion.fecha < fin_dia,
+            Transaccion.usuario_origen_id == usuario_id
+        ).all()
+    else:
+        gastos = Transaccion.query.filter(Transaccion.fecha >= inicio_dia, Transaccion.fecha < fin_dia).all()
+
+    # Calcular totales
+    total_ingresos = sum(p.monto for p in pagos)
+    total_gastos = sum(g.monto for g in gastos)
+    efectivo_esperado = total_ingresos - total_gastos
+
+    return render_template('caja_cuadre.html',
+                         pagos=pagos,
+                         gastos=gastos,
+                         total_ingresos=total_ingresos,
+                         total_gastos=total_gastos,
+                         efectivo_esperado=efectivo_esperado,
+                         fecha=fecha.strftime('%Y-%m-%d'),
+                         fecha_display=fecha.strftime('%d/%m/%Y'),
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+# ==================== TRASLADOS ENTRE RUTAS ====================
+@bp.route('/traslados')
+def traslados_lista():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    # Solo dueño, gerente, supervisor y secretaria pueden ver traslados
+    if session.get('rol') not in ['dueno', 'gerente', 'supervisor', 'secretaria']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    # Obtener traslados (transacciones de tipo TRASLADO)
+    traslados = Transaccion.query.options(
+        joinedload(Transaccion.usuario_origen), joinedload(Transaccion.usuario_destino)
+    ).filter(
+        Transaccion.concepto.like('TRASLADO%')
+    ).order_by(Transaccion.fecha.desc()).limit(50).all()
+
+    return render_template('traslados_lista.html',
+                         traslados=traslados,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/traslados/nuevo')
+def traslados_nuevo():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    # Solo dueño, gerente y supervisor pueden hacer traslados
+    if session.get('rol') not in ['dueno', 'gerente', 'supervisor']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    # Obtener lista de cobradores
+    cobradores = Usuario.query.filter(Usuario.rol.in_(['cobrador', 'supervisor'])).all()
+
+    return render_template('traslados_nuevo.html',
+                         cobradores=cobradores,
+                         fecha_hoy=datetime.now().strftime('%Y-%m-%d'),
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/traslados/guardar', methods=['POST'])
+def traslados_guardar():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente', 'supervisor']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    try:
+        tipo_traslado = request.form.get('tipo_traslado')
+        monto = float(request.form.get('monto'))
+        descripcion = request.form.get('descripcion', '')
+        dia = datetime.strptime(request.form.get('fecha'), '%Y-%m-%d')
+
+        usuario_id = session.get('usuario_id')
+
+        # Crear transacción según el tipo
+        if tipo_traslado == 'general_a_ruta':
+            cobrador_id = int(request.form.get('cobrador_id'))
+            cobrador_ruta = cobrador_id
+            # Salida de caja general (naturaleza EGRESO para caja general)
+            transaccion = Transaccion(
+                naturaleza='TRASLADO',
+                concepto='TRASLADO A RUTA',
+                descripcion=f'Traslado a ruta de cobrador. {descripcion}',
+                monto=monto,
+                usuario_origen_id=usuario_id,  # Quien hace el traslado (admin/supervisor)
+                usuario_destino_id=cobrador_id  # Cobrador que recibe
+            )
+        elif tipo_traslado == 'ruta_a_general':
+            cobrador_id = int(request.form.get('cobrador_id'))
+            cobrador_ruta = cobrador_id
+            # Entrada a caja general (naturaleza INGRESO para caja general)
+            transaccion = Transaccion(
+                naturaleza='TRASLADO',
+                concepto='TRASLADO DE RUTA',
+                descripcion=f'Devolución de ruta de cobrador. {descripcion}',
+                monto=monto,
+                usuario_origen_id=cobrador_id,  # Cobrador que entrega
+                usuario_destino_id=usuario_id  # Quien recibe (admin/supervisor)
+            )
+        else:  # ruta_a_ruta
+            cobrador_origen_id = int(request.form.get('cobrador_origen_id'))
+            cobrador_destino_id = int(request.form.get('cobrador_destino_id'))
+            cobrador_ruta = cobrador_origen_id
+
+            # Validar que no sean el mismo cobrador
+            if cobrador_origen_id == cobrador_destino_id:
+                raise ValueError('El cobrador origen y destino no pueden ser el mismo')
+
+            # Traslado entre rutas
+            transaccion = Transaccion(
+                naturaleza='TRASLADO',
+                concepto='TRASLADO ENTRE RUTAS',
+                descripcion=f'Traslado entre cobradores. {descripcion}',
+                monto=monto,
+                usuario_origen_id=cobrador_origen_id,  # Cobrador que entrega
+                usuario_destino_id=cobrador_destino_id  # Cobrador que recibe
+            )
+
+        # Los traslados los ven los cobradores en el día de su ruta (entre rutas, la que entrega):
+        # un timestamp dentro de ese día en la zona de la ruta
+        transaccion.fecha = momento_del_dia(dia, zona_de_cobrador(cobrador_ruta))
+        db.session.add(transaccion)
+        db.session.commit()
+
+        return redirect(url_for('caja.traslados_exito', traslado_id=transaccion.id))
+
+    except Exception as e:
+        db.session.rollback()
+        cobradores = Usuario.query.filter(Usuario.rol.in_(['cobrador', 'supervisor'])).all()
+        return render_template('traslados_nuevo.html',
+                             cobradores=cobradores,
+                             fecha_hoy=datetime.now().strftime('%Y-%m-%d'),
+                             error=f'Error al registrar traslado: {str(e)}',
+                             nombre=session.get('nombre'),
+                             rol=session.get('rol'))
+
+
+@bp.route('/traslados/exito/<int:traslado_id>')
+def traslados_exito(traslado_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    traslado = Transaccion.query.get_or_404(traslado_id)
+
+    return render_template('traslados_exito.html',
+                         traslado=traslado,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
@@ -0,0 +1,270 @@
+"""
+Sociedades y aportes de capital (blueprint capital)
+"""
+from flask import Blueprint, render_template, request, redirect, url_for, session
+from ..models import Transaccion, Sociedad, Ruta, AporteCapital, db
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+bp = Blueprint('capital', __name__)
+
+
+# ==================== SOCIEDADES ====================
+@bp.route('/sociedades')
+def sociedades_lista():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    sociedades = Sociedad.query.order_by(Sociedad.fecha_creacion.desc()).all()
+
+    # Calcular estadísticas por sociedad (rutas activas de todas en una sola consulta)
+    rutas_por_sociedad = dict(db.session.query(Ruta.sociedad_id, func.count(Ruta.id)).filter(
+        Ruta.sociedad_id.isnot(None), Ruta.activo == True
+    ).group_by(Ruta.sociedad_id).all())
+    stats_sociedades = [{
+        'sociedad': sociedad,
+        'num_rutas': rutas_por_sociedad.get(sociedad.id, 0)
+    } for sociedad in sociedades]
+
+    return render_template('sociedades_lista.html',
+                         stats_sociedades=stats_sociedades,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/sociedades/nueva')
+def sociedades_nueva():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    return render_template('sociedades_nueva.html',
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/sociedades/guardar', methods=['POST'])
+def sociedades_guardar():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    try:
+        # Validar que la suma de porcentajes no supere 100%
+        p1 = float(request.form.get('porcentaje_socio', 50))
+        p2 = float(request.form.get('porcentaje_socio_2', 0))
+        p3 = float(request.form.get('porcentaje_socio_3', 0))
+
+        if (p1 + p2 + p3) > 100:
+            return render_template('sociedades_nueva.html',
+                                 error='La suma de los porcentajes no puede superar el 100%',
+                                 nombre=session.get('nombre'),
+                                 rol=session.get('rol'))
+
+        nueva_sociedad = Sociedad(
+            nombre=request.form.get('nombre'),
+            nombre_socio=request.form.get('nombre_socio'),
+            telefono_socio=request.form.get('telefono_socio'),
+            porcentaje_socio=p1,
+            # Socio 2 (opcional)
+            nombre_socio_2=request.form.get('nombre_socio_2') or None,
+            telefono_socio_2=request.form.get('telefono_socio_2') or None,
+            porcentaje_socio_2=p2,
+            # Socio 3 (opcional)
+            nombre_socio_3=request.form.get('nombre_socio_3') or None,
+            telefono_socio_3=request.form.get('telefono_socio_3') or None,
+            porcentaje_socio_3=p3,
+            notas=request.form.get('notas'),
+            activo=True
+        )
+
+        db.session.add(nueva_sociedad)
+        db.session.commit()
+
+        return redirect(url_for('capital.sociedades_lista'))
+
+    except Exception as e:
+        db.session.rollback()
+        return render_template('sociedades_nueva.html',
+                             error=f'Error al crear sociedad: {str(e)}',
+                             nombre=session.get('nombre'),
+                             rol=session.get('rol'))
+
+
+@bp.route('/sociedades/editar/<int:sociedad_id>')
+def sociedades_editar(sociedad_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    sociedad = Sociedad.query.get_or_404(sociedad_id)
+
+    return render_template('sociedades_editar.html',
+                         sociedad=sociedad,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/sociedades/actualizar/<int:sociedad_id>', methods=['POST'])
+def sociedades_actualizar(sociedad_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    try:
+        sociedad = Sociedad.query.get_or_404(sociedad_id)
+
+        # Validar porcentajes
+        p1 = float(request.form.get('porcentaje_socio', 50))
+        p2 = float(request.form.get('porcentaje_socio_2', 0))
+        p3 = float(request.form.get('porcentaje_socio_3', 0))
+
+        if (p1 + p2 + p3) > 100:
+            return render_template('sociedades_editar.html',
+                                 sociedad=sociedad,
+                                 error='La suma de los porcentajes no puede superar el 100%',
+                                 nombre=session.get('nombre'),
+                                 rol=session.get('rol'))
+
+        sociedad.nombre = request.form.get('nombre')
+        sociedad.nombre_socio = request.form.get('nombre_socio')
+        sociedad.telefono_socio = request.form.get('telefono_socio')
+        sociedad.porcentaje_socio = p1
+
+        # Socio 2
+        sociedad.nombre_socio_2 = request.form.get('nombre_socio_2') or None
+        sociedad.telefono_socio_2 = request.form.get('telefono_socio_2') or None
+        sociedad.porcentaje_socio_2 = p2
+
+        # Socio 3
+        sociedad.nombre_socio_3 = request.form.get('nombre_socio_3') or None
+        sociedad.telefono_socio_3 = request.form.get('telefono_socio_3') or None
+        sociedad.porcentaje_socio_3 = p3
+
+        sociedad.notas = request.form.get('notas')
+
+        activo = request.form.get('activo')
+        sociedad.activo = (activo == 'on')
+
+        db.session.commit()
+
+        return redirect(url_for('capital.sociedades_lista'))
+
+    except Exception as e:
+        db.session.rollback()
+        return render_template('sociedades_editar.html',
+                             sociedad=sociedad,
+                             error=f'Error al actualizar sociedad: {str(e)}',
+                             nombre=session.get('nombre'),
+                             rol=session.get('rol'))
+
+
+# ==================== APORTES DE CAPITAL ====================
+@bp.route('/capital/aportes')
+def capital_lista():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    aportes = AporteCapital.query.options(joinedload(AporteCapital.sociedad)).order_by(AporteCapital.fecha_aporte.desc()).all()
+
+    # Calcular totales por moneda
+    total_pesos = db.session.query(func.sum(AporteCapital.monto)).filter(AporteCapital.moneda == 'PESOS').scalar() or 0
+    total_reales = db.session.query(func.sum(AporteCapital.monto)).filter(AporteCapital.moneda == 'REALES').scalar() or 0
+
+    return render_template('capital_lista.html',
+                         aportes=aportes,
+                         total_pesos=total_pesos,
+                         total_reales=total_reales,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/capital/nuevo')
+def capital_nuevo():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    sociedades = Sociedad.query.order_by(Sociedad.nombre).all()
+
+    return render_template('capital_nuevo.html',
+                         sociedades=sociedades,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/capital/guardar', methods=['POST'])
+def capital_guardar():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    try:
+        sociedad_id = request.form['sociedad_id']
+        nombre_aportante = request.form['nombre_aportante']
+        monto = float(request.form['monto'])
+        moneda = request.form['moneda']
+        fecha_aporte_str = request.form['fecha_aporte']
+        descripcion = request.form.get('observaciones', '')
+
+        # Convertir fecha
+        fecha_aporte = datetime.strptime(fecha_aporte_str, '%Y-%m-%d')
+
+        # Crear nuevo aporte
+        nuevo_aporte = AporteCapital(
+            sociedad_id=sociedad_id,
+            nombre_aportante=nombre_aportante,
+            monto=monto,
+            moneda=moneda,
+            fecha_aporte=fecha_aporte,
+            descripcion=descripcion,
+            registrado_por_id=session.get('usuario_id')
+        )
+
+        db.session.add(nuevo_aporte)
+
+        # AUTOMATICAMENTE INGRESAR A LA CAJA DEL DUEÑO (CAJA MAYOR)
+        # Para que luego pueda hacer traslados a las rutas
+        ingreso_caja = Transaccion(
+            naturaleza='INGRESO',
+            concepto='APORTE_CAPITAL',
+            descripcion=f'Aporte Capital: {nombre_aportante} ({sociedad_id}) - {moneda}',
+            monto=monto,
+            fecha=fecha_aporte, # Usar la misma fecha del aporte
+            usuario_origen_id=session.get('usuario_id'), # Entra a la caja del usuario actual (Dueño)
+            usuario_destino_id=session.get('usuario_id'), # Se marca destino a si mismo para ingresos propios
+            prestamo_id=None
+        )
+        db.session.add(ingreso_caja)
+
+        db.session.commit()
+
+        return redirect(url_for('capital.capital_lista'))
+
+    except Exception as e:
+        db.session.rollback()
+        sociedades = Sociedad.query.order_by(Sociedad.nombre).all()
+        return render_template('capital_nuevo.html',
+                             sociedades=sociedades,
+                             error=f'Error al guardar aporte: {str(e)}',
+                             nombre=session.get('nombre'),
+                             rol=session.get('rol'))
@@ -0,0 +1,233 @@
+"""
+Clientes: lista, alta y edición (blueprint clientes)
+"""
+from flask import Blueprint, render_template, request, redirect, url_for, session
+from ..models import Cliente, Prestamo, db
+from datetime import datetime
+
+bp = Blueprint('clientes', __name__)
+
+
+# ==================== CLIENTES ====================
+@bp.route('/clientes')
+def clientes_lista():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    rol = session.get('rol')
+    usuario_id = session.get('usuario_id')
+
+    # Si es cobrador, solo ver sus clientes (que tienen préstamos asignados a él)
+    if rol == 'cobrador':
+        # Obtener IDs de clientes que tienen préstamos del cobrador
+        clientes_ids = db.session.query(Prestamo.cliente_id).filter_by(cobrador_id=usuario_id).distinct().all()
+        clientes_ids = [c[0] for c in clientes_ids]
+        clientes = Cliente.query.filter(Cliente.id.in_(clientes_ids)).order_by(Cliente.fecha_registro.desc()).all()
+    else:
+        # Dueño, gerente y secretaria ven todos los clientes (o filtrados por ruta)
+        ruta_seleccionada_id = session.get('ruta_seleccionada_id')
+
+        if ruta_seleccionada_id:
+            # Obtener clientes de la ruta seleccionada
+            clientes_ids = db.session.query(Prestamo.cliente_id).filter_by(ruta_id=ruta_seleccionada_id).distinct().all()
+            clientes_ids = [c[0] for c in clientes_ids]
+            clientes = Cliente.query.filter(Cliente.id.in_(clientes_ids)).order_by(Cliente.fecha_registro.desc()).all()
+        else:
+            # Ver todos los clientes
+            clientes = Cliente.query.order_by(Cliente.fecha_registro.desc()).all()
+
+    return render_template('clientes_lista.html', 
+                         clientes=clientes,
+                         nombre=session.get('nombre'), 
+                         rol=session.get('rol'),
+                         mensaje=request.args.get('mensaje'))
+
+
+@bp.route('/clientes/nuevo')
+def clientes_nuevo():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+    return render_template('clientes_nuevo.html', 
+                         nombre=session.get('nombre'), 
+                         rol=session.get('rol'))
+
+
+@bp.route('/clientes/guardar', methods=['POST'])
+def clientes_guardar():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    try:
+        # Verificar si el documento ya existe
+        documento = request.form.get('documento')
+        if Cliente.query.filter_by(documento=documento).first():
+            return render_template('clientes_nuevo.html', 
+                                 error='Ya existe un cliente con ese documento',
+                                 nombre=session.get('nombre'), 
+                                 rol=session.get('rol'))
+
+        # Validar fecha nacimiento
+        fecha_nac = request.form.get('fecha_nacimiento')
+        fecha_nacimiento = datetime.strptime(fecha_nac, '%Y-%m-%d').date() if fecha_nac else None
+
+        # Conversiones seguras
+        def to_float(val):
+            try:
+                return float(val) if val else None
+            except ValueError:
+                return None
+
+        def to_int(val):
+            try:
+                return int(val) if val else None
+            except ValueError:
+                return None
+
+        nuevo_cliente = Cliente(
+            nombre=request.form.get('nombre'),
+            documento=documento,
+            fecha_nacimiento=fecha_nacimiento,
+            telefono=request.form.get('telefono'),
+            whatsapp_codigo_pais=request.form.get('whatsapp_codigo_pais', '57'),
+            whatsapp_numero=request.form.get('whatsapp_numero'),
+
+            # Nuevos campos Scoring
+            estado_civil=request.form.get('estado_civil'),
+            personas_a_cargo=to_int(request.form.get('personas_a_cargo')) or 0,
+
+            # Datos Negocio
+            documento_fiscal_negocio=request.form.get('documento_fiscal_negocio'),
+            tipo_negocio=request.form.get('tipo_negocio'),
+            direccion_negocio=request.form.get('direccion_negocio'),
+            cep_negocio=request.form.get('cep_negocio'),
+            antiguedad_negocio_meses=to_int(request.form.get('antiguedad_negocio_meses')),
+            ingresos_diarios_estimados=to_float(request.form.get('ingresos_diarios_estimados')),
+            gastos_mensuales_promedio=to_float(request.form.get('gastos_mensuales_promedio')),
+            local_propio=bool(request.form.get('local_propio')),
+
+            gps_latitud=to_float(request.form.get('gps_latitud')),
+            gps_longitud=to_float(request.form.get('gps_longitud')),
+
+            # Datos Residencia
+            direccion_casa=request.form.get('direccion_casa'),
+            cep_casa=request.form.get('cep_casa'),
+            tiempo_residencia_meses=to_int(request.form.get('tiempo_residencia_meses')),
+            tiene_comprobante_residencia=bool(request.form.get('tiene_comprobante_residencia')),
+            comprobante_a_nombre_propio=bool(request.form.get('comprobante_a_nombre_propio')),
+
+            es_vip=bool(request.form.get('es_vip'))
+        )
+
+        # Si tiene CNPJ, lo marcamos como formalizado
+        if nuevo_cliente.documento_fiscal_negocio:
+            nuevo_cliente.negocio_formalizado = True
+
+        db.session.add(nuevo_cliente)
+        db.session.commit()
+
+        return redirect(url_for('clientes.clientes_lista', mensaje='Cliente registrado exitosamente'))
+
+    except Exception as e:
+        db.session.rollback()
+        return render_template('clientes_nuevo.html', 
+                             error=f'Error al guardar: {str(e)}',
+                             nombre=session.get('nombre'), 
+                             rol=session.get('rol'))
+
+
+@bp.route('/clientes/editar/<int:cliente_id>')
+def clientes_editar(cliente_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    cliente = Cliente.query.get_or_404(cliente_id)
+
+    return render_template('clientes_editar.html',
+                         cliente=cliente,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/clientes/actualizar/<int:cliente_id>', methods=['POST'])
+def clientes_actualizar(cliente_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    try:
+        cliente = Cliente.query.get_or_404(cliente_id)
+
+        # Verificar si el documento cambió y ya existe en otro cliente
+        nuevo_documento = request.form.get('documento')
+        if nuevo_documento != cliente.documento:
+            if Cliente.query.filter_by(documento=nuevo_documento).first():
+                return render_template('clientes_editar.html',
+                                     cliente=cliente,
+                                     error='Ya existe otro cliente con ese documento',
+                                     nombre=session.get('nombre'),
+                                     rol=session.get('rol'))
+
+        # Helpers para conversión
+        def to_float(val):
+            try:
+                return float(val) if val else None
+            except ValueError:
+                return None
+
+        def to_int(val):
+            try:
+                return int(val) if val else None
+            except ValueError:
+                return None
+
+        # Procesar fecha nacimiento
+        fecha_nac = request.form.get('fecha_nacimiento')
+        cliente.fecha_nacimiento = datetime.strptime(fecha_nac, '%Y-%m-%d').date() if fecha_nac else None
+
+        # Actualizar datos básicos
+        cliente.nombre = request.form.get('nombre')
+        cliente.documento = nuevo_documento
+        cliente.telefono = request.form.get('telefono')
+        cliente.whatsapp_codigo_pais = request.form.get('whatsapp_codigo_pais', '57')
+        cliente.whatsapp_numero = request.form.get('whatsapp_numero')
+
+        # Nuevos datos Scoring (Personal)
+        cliente.estado_civil = request.form.get('estado_civil')
+        cliente.personas_a_cargo = to_int(request.form.get('personas_a_cargo')) or 0
+
+        # Datos Negocio / Fiscal
+        cliente.documento_fiscal_negocio = request.form.get('documento_fiscal_negocio')
+        cliente.tipo_negocio = request.form.get('tipo_negocio')
+        cliente.direccion_negocio = request.form.get('direccion_negocio')
+        cliente.cep_negocio = request.form.get('cep_negocio')
+        cliente.antiguedad_negocio_meses = to_int(request.form.get('antiguedad_negocio_meses'))
+        cliente.ingresos_diarios_estimados = to_float(request.form.get('ingresos_diarios_estimados'))
+        cliente.gastos_mensuales_promedio = to_float(request.form.get('gastos_mensuales_promedio'))
+        cliente.local_propio = bool(request.form.get('local_propio'))
+
+        cliente.gps_latitud = to_float(request.form.get('gps_latitud'))
+        cliente.gps_longitud = to_float(request.form.get('gps_longitud'))
+
+        # Datos Residencia
+        cliente.direccion_casa = request.form.get('direccion_casa')
+        cliente.cep_casa = request.form.get('cep_casa')
+        cliente.tiempo_residencia_meses = to_int(request.form.get('tiempo_residencia_meses'))
+        cliente.tiene_comprobante_residencia = bool(request.form.get('tiene_comprobante_residencia'))
+        cliente.comprobante_a_nombre_propio = bool(request.form.get('comprobante_a_nombre_propio'))
+
+        cliente.es_vip = bool(request.form.get('es_vip'))
+
+        # Actualización automática de estado formalizado
+        if cliente.documento_fiscal_negocio and not cliente.negocio_formalizado:
+            cliente.negocio_formalizado = True
+
+        db.session.commit()
+
+        return redirect(url_for('clientes.clientes_lista', mensaje='Cliente actualizado exitosamente'))
+
+    except Exception as e:
+        db.session.rollback()
+        return render_template('clientes_editar.html',
+                             cliente=cliente,
+                             error=f'Error al actualizar: {str(e)}',
+                             nombre=session.get('nombre'),
+                             rol=session.get('rol'))
@@ -0,0 +1,255 @@
+"""
+Cobro: ruta del día, registro de pagos y recibo en imagen (blueprint cobro)
+"""
+from flask import Blueprint, render_template, request, redirect, url_for, session
+from ..models import Prestamo, Pago, db
+from ..cobranza import prestamos_pendientes
+from ..fechas import rango_del_dia, hoy_en, zona_de_pais, zona_de_cobrador
+from ..contadores import contar_cobro
+from ..cuotas import marcar_cuotas_pagadas
+from ..mora import salir_de_mora
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from ..recibos import imagen_recibo, codificar, FORMATOS, VERSION_PLANTILLAS
+from ..artefactos import clave_artefacto, obtener_o_generar, servir_artefacto
+from .comun import formato_recibo
+import uuid
+
+bp = Blueprint('cobro', __name__)
+
+
+# ==================== COBRO ====================
+@bp.route('/cobro/lista')
+def cobro_lista():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    usuario_id = session.get('usuario_id')
+    rol = session.get('rol')
+
+    # Préstamos activos que NO han pagado hoy (si es cobrador, solo los suyos,
+    # con "hoy" según el país de su ruta)
+    if rol == 'cobrador':
+        zona = zona_de_cobrador(usuario_id)
+        prestamos = prestamos_pendientes(hoy_en(zona), cobrador_id=usuario_id, zona=zona)
+    else:
+        prestamos = prestamos_pendientes(hoy_en())
+
+    # Estadísticas
+    total_a_cobrar = sum(p.valor_cuota for p in prestamos)
+    creditos_al_dia = sum(1 for p in prestamos if p.cuotas_atrasadas == 0)
+    creditos_atrasados = sum(1 for p in prestamos if 0 < p.cuotas_atrasadas <= 3)
+    creditos_mora = sum(1 for p in prestamos if p.cuotas_atrasadas > 3)
+
+    return render_template('cobro_lista.html',
+                         prestamos=prestamos,
+                         total_a_cobrar=total_a_cobrar,
+                         creditos_al_dia=creditos_al_dia,
+                         creditos_atrasados=creditos_atrasados,
+                         creditos_mora=creditos_mora,
+                         fecha_hoy=datetime.now().strftime('%A, %d de %B %Y'),
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/cobro/registrar/<int:prestamo_id>')
+def cobro_registrar(prestamo_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    prestamo = Prestamo.query.get_or_404(prestamo_id)
+
+    return render_template('cobro_registrar.html',
+                         prestamo=prestamo,
+                         clave_idempotencia=uuid.uuid4().hex,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+def _pago_por_clave(clave_idempotencia):
+    """Pago ya registrado por este usuario con la clave del formulario (reenvío), o None"""
+    if not clave_idempotencia:
+        return None
+    return Pago.query.filter_by(clave_idempotencia=clave_idempotencia,
+                                cobrador_id=session.get('usuario_id')).first()
+
+
+def _formulario_con_error(prestamo_id, error):
+    return render_template('cobro_registrar.html',
+                           prestamo=Prestamo.query.get(prestamo_id),
+                           error=f'Error al registrar pago: {error}',
+                           clave_idempotencia=request.form.get('clave_idempotencia'),
+                           nombre=session.get('nombre'),
+                           rol=session.get('rol'))
+
+
+@bp.route('/cobro/guardar', methods=['POST'])
+def cobro_guardar():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    try:
+        prestamo_id = int(request.form.get('prestamo_id'))
+        prestamo = Prestamo.query.get_or_404(prestamo_id)
+
+        # Refrescar el objeto desde la base de datos para obtener el saldo más actual
+        db.session.refresh(prestamo)
+
+        monto = float(request.form.get('monto'))
+        tipo_pago = request.form.get('tipo_pago')
+        forzar_pago = request.form.get('forzar_pago', '0')
+        # Usar el saldo actual del préstamo, no el del formulario
+        saldo_anterior = prestamo.saldo_actual
+
+        # Reenvío del mismo formulario (doble clic, botón atrás): mostrar el pago ya registrado
+        clave_idempotencia = request.form.get('clave_idempotencia') or None
+        pago_existente = _pago_por_clave(clave_idempotencia)
+        if pago_existente:
+            return redirect(url_for('cobro.cobro_exito', pago_id=pago_existente.id))
+
+        # Verificar si ya existe un pago con el mismo monto hoy (solo si no está forzando)
+        if forzar_pago != '1':
+            zona = zona_de_pais(prestamo.ruta.pais) if prestamo.ruta else None
+            hoy_inicio, hoy_fin = rango_del_dia(hoy_en(zona), zona)
+
+            pago_duplicado = Pago.query.filter(
+                Pago.prestamo_id == prestamo_id,
+                Pago.monto == monto,
+                Pago.fecha_pago >= hoy_inicio,
+                Pago.fecha_pago < hoy_fin
+            ).first()
+
+            if pago_duplicado:
+                return render_template('cobro_registrar.html',
+                                     prestamo=prestamo,
+                                     error=f'⚠️ Ya se registró un pago de {prestamo.moneda} {monto:,.0f} para este cliente hoy a las {pago_duplicado.fecha_pago.strftime("%H:%M")}. ¿Está seguro de registrar otro pago con el mismo valor?',
+                                     clave_idempotencia=clave_idempotencia,
+                                     nombre=session.get('nombre'),
+                                     rol=session.get('rol'))
+
+        estado_anterior = prestamo.estado
+
+        # Calcular nuevo saldo
+        nuevo_saldo = max(0, saldo_anterior - monto)
+
+        # Determinar cuántas cuotas se pagaron
+        if tipo_pago == 'COMPLETO':
+            cuotas_pagadas = prestamo.numero_cuotas - prestamo.cuotas_pagadas
+        elif tipo_pago == 'MULTIPLE':
+            cuotas_pagadas = int(request.form.get('numero_cuotas_pagadas', 1))
+        else:
+            # Calcular automáticamente basado en el monto
+            cuotas_pagadas = int(monto / prestamo.valor_cuota)
+            if cuotas_pagadas == 0 and monto > 0:
+                cuotas_pagadas = 1  # Al menos 1 si pagó algo
+
+        # Crear registro de pago
+        nuevo_pago = Pago(
+            prestamo_id=prestamo_id,
+            cobrador_id=session.get('usuario_id'),
+            monto=monto,
+            numero_cuotas_pagadas=cuotas_pagadas,
+            saldo_anterior=saldo_anterior,
+            saldo_nuevo=nuevo_saldo,
+            observaciones=request.form.get('observaciones'),
+            tipo_pago=tipo_pago,
+            fecha_pago=datetime.now(),
+            clave_idempotencia=clave_idempotencia
+        )
+
+        # Actualizar préstamo
+        prestamo.saldo_actual = nuevo_saldo
+        prestamo.cuotas_pagadas += cuotas_pagadas
+        prestamo.fecha_ultimo_pago = datetime.now()
+
+        # Recalcular cuotas atrasadas (lógica simple)
+        if prestamo.cuotas_atrasadas > 0:
+            prestamo.cuotas_atrasadas = max(0, prestamo.cuotas_atrasadas - cuotas_pagadas)
+            salir_de_mora(prestamo)
+
+        # Si se pagó todo, cambiar estado
+        if nuevo_saldo <= 0:
+            prestamo.estado = 'CANCELADO'
+        marcar_cuotas_pagadas(prestamo, saldo_anterior)
+
+        db.session.add(nuevo_pago)
+        contar_cobro(prestamo, session.get('usuario_id'), monto, saldo_anterior, estado_anterior)
+        db.session.commit()
+
+        return redirect(url_for('cobro.cobro_exito', pago_id=nuevo_pago.id))
+
+    except IntegrityError as e:
+        db.session.rollback()
+        # Dos envíos simultáneos con la misma clave: el otro ya registró el pago (índice único)
+        pago_existente = _pago_por_clave(request.form.get('clave_idempotencia'))
+        if pago_existente:
+            return redirect(url_for('cobro.cobro_exito', pago_id=pago_existente.id))
+        return _formulario_con_error(prestamo_id, e)
+
+    except Exception as e:
+        db.session.rollback()
+        return _formulario_con_error(prestamo_id, e)
+
+
+@bp.route('/cobro/exito/<int:pago_id>')
+def cobro_exito(pago_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    pago = Pago.query.get_or_404(pago_id)
+    prestamo = pago.prestamo
+    cliente = prestamo.cliente
+
+    # Generar mensaje de WhatsApp simplificado
+    fecha_formato = pago.fecha_pago.strftime('%d/%m/%Y %H:%M')
+    mensaje = f"""RECIBO DE PAGO - DIAMANTE PRO
+
+Credito: #{prestamo.id}
+Cliente: {cliente.nombre}
+Fecha: {fecha_formato}
+
+Monto Recibido: {prestamo.moneda} {pago.monto:,.0f}
+Saldo Anterior: {prestamo.moneda} {pago.saldo_anterior:,.0f}
+Saldo Nuevo: {prestamo.moneda} {pago.saldo_nuevo:,.0f}
+
+Cuotas Pagadas: {prestamo.cuotas_pagadas}/{prestamo.numero_cuotas}
+
+Gracias por su pago!"""
+
+    # Usar el número de WhatsApp completo (con código de país)
+    mensaje_encoded = mensaje.replace(' ', '%20').replace('\n', '%0A')
+    whatsapp_url = f"https://wa.me/{cliente.whatsapp_completo}?text={mensaje_encoded}"
+
+    return render_template('cobro_exito.html',
+                         pago=pago,
+                         prestamo=prestamo,
+                         cliente=cliente,
+                         whatsapp_url=whatsapp_url,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/cobro/recibo-imagen/<int:pago_id>')
+def cobro_recibo_imagen(pago_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    pago = Pago.query.get_or_404(pago_id)
+    prestamo = pago.prestamo
+    cliente = prestamo.cliente
+
+    formato, ancho = formato_recibo()
+    mimetype, extension, _ = FORMATOS[formato]
+
+    # Un pago registrado no cambia, pero el recibo también muestra el nombre y documento del
+    # cliente, que sí pueden corregirse: el navegador revalida y recibe 304 mientras no cambien
+    recibido_por = pago.cobrador.nombre if pago.cobrador else session.get('nombre')
+    clave = clave_artefacto('recibo', VERSION_PLANTILLAS, formato, ancho, pago.id, pago.fecha_actualizacion,
+                            recibido_por, cliente.nombre, cliente.documento, cliente.fecha_actualizacion)
+    contenido = obtener_o_generar(
+        clave, lambda: codificar(imagen_recibo(pago, recibido_por), formato, ancho)[0].getvalue(), mimetype)
+
+    return servir_artefacto(
+        contenido, mimetype,
+        f'Recibo_Pago_{pago.id}_{cliente.nombre.replace(" ", "_")}.{extension}'
+    )
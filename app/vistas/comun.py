@@ -0,0 +1,25 @@
+"""
+Utilidades compartidas por las vistas web
+"""
+from flask import current_app, request, url_for
+from ..recibos import normalizar_formato
+from .. import imagenes
+
+
+def formato_recibo():
+    """Formato y ancho de las imágenes de recibos (?formato=webp&ancho=720 o la configuración)"""
+    formato = normalizar_formato(request.args.get('formato') or current_app.config['RECIBO_FORMATO'])
+    ancho = request.args.get('ancho', type=int) or current_app.config['RECIBO_ANCHO']
+    return formato, min(max(ancho, 320), 1080)
+
+
+def url_archivo(ruta):
+    """URL de un archivo subido: absoluta si está en S3, si no dentro de static/"""
+    if not ruta or ruta.startswith(('http://', 'https://')):
+        return ruta
+    return url_for('static', filename=ruta)
+
+
+def miniatura(ruta):
+    """URL de la miniatura de una foto subida (None en fotos anteriores a las miniaturas)"""
+    return url_archivo(imagenes.clave_miniatura(ruta))
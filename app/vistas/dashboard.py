@@ -0,0 +1,127 @@
+"""
+Inicio de sesión, dashboard y selección de ruta (blueprint dashboard)
+"""
+from flask import Blueprint, render_template, request, redirect, url_for, session
+from ..models import Usuario, Ruta
+from ..fechas import zona_de_pais, zona_de_cobrador
+from ..metricas import metricas_dashboard
+from sqlalchemy.orm import joinedload
+
+bp = Blueprint('dashboard', __name__)
+
+
+# ==================== AUTENTICACIÓN ====================
+@bp.route('/')
+def home():
+    if 'usuario_id' in session:
+        return redirect(url_for('dashboard.dashboard'))
+    return render_template('login.html')
+
+
+@bp.route('/login', methods=['POST'])
+def login():
+    usuario = request.form.get('usuario')
+    password = request.form.get('password')
+
+    user = Usuario.query.filter_by(usuario=usuario).first()
+
+    if user and user.password == password and user.activo:
+        session['usuario_id'] = user.id
+        session['nombre'] = user.nombre
+        session['rol'] = user.rol
+        return redirect(url_for('dashboard.dashboard'))
+    else:
+        return render_template('login.html', error='Usuario o contraseña incorrectos')
+
+
+@bp.route('/dashboard')
+def dashboard():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    usuario_id = session.get('usuario_id')
+    rol = session.get('rol')
+
+    # Obtener ruta seleccionada (para dueño y gerente)
+    ruta_seleccionada_id = session.get('ruta_seleccionada_id')
+    ruta_seleccionada = None
+    todas_las_rutas = []
+
+    if rol in ['dueno', 'gerente']:
+        # Cobrador y sociedad precargados para el selector de rutas
+        todas_las_rutas = Ruta.query.options(joinedload(Ruta.cobrador), joinedload(Ruta.sociedad))\
+            .filter_by(activo=True).order_by(Ruta.nombre).all()
+        if ruta_seleccionada_id:
+            ruta_seleccionada = Ruta.query.get(ruta_seleccionada_id)
+
+    # KPIs calculados con consultas agregadas (ver app/metricas.py)
+    if rol == 'cobrador':
+        # Cobrador: solo sus préstamos
+        metricas = metricas_dashboard(cobrador_id=usuario_id, zona=zona_de_cobrador(usuario_id))
+        # El desglose por moneda solo se muestra a dueño/gerente/secretaria
+        metricas['lista_monedas'] = []
+    else:
+        # Dueño, gerente, secretaria ven todas las estadísticas (o filtradas por ruta)
+        zona = zona_de_pais(ruta_seleccionada.pais) if ruta_seleccionada else None
+        metricas = metricas_dashboard(ruta_id=ruta_seleccionada_id, zona=zona)
+
+    # NUEVO: Calcular Capital Disponible (solo para dueño y gerente)
+    capital_total_aportado = 0
+    capital_invertido_activos = 0
+    capital_disponible = 0
+
+    # COMENTADO TEMPORALMENTE POR ERRORES EN PRODUCCIÓN
+    # if rol in ['dueno', 'gerente']:
+    #     # Total de aportes de capital
+    #     try:
+    #         capital_total_aportado = db.session.query(func.sum(AporteCapital.monto)).scalar() or 0
+    #         capital_total_aportado = float(capital_total_aportado)
+
+    #         # Total invertido en activos
+    #         capital_invertido_activos = db.session.query(func.sum(Activo.valor_compra)).scalar() or 0
+    #         capital_invertido_activos = float(capital_invertido_activos)
+
+    #         # Capital disponible = Aportes - Activos
+    #         capital_disponible = capital_total_aportado - capital_invertido_activos
+    #     except Exception as e:
+    #         print(f"Error calculando capital: {e}")
+    #         capital_disponible = 0
+
+    return render_template('dashboard.html', 
+                        nombre=session.get('nombre'), 
+                        rol=session.get('rol'),
+                        todas_las_rutas=todas_las_rutas,
+                        ruta_seleccionada=ruta_seleccionada,
+                        capital_total_aportado=capital_total_aportado,
+                        capital_invertido_activos=capital_invertido_activos,
+                        capital_disponible=capital_disponible,
+                        **metricas)
+
+
+@bp.route('/seleccionar-ruta/<int:ruta_id>')
+def seleccionar_ruta(ruta_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    # Guardar la ruta seleccionada en la sesión
+    session['ruta_seleccionada_id'] = ruta_id
+    return redirect(url_for('dashboard.dashboard'))
+
+
+@bp.route('/ver-todas-rutas')
+def ver_todas_rutas():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    # Limpiar la ruta seleccionada para ver todas
+    session.pop('ruta_seleccionada_id', None)
+    return redirect(url_for('dashboard.dashboard'))
+
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    return redirect(url_for('dashboard.home'))
@@ -0,0 +1,301 @@
+"""
+Préstamos: lista, alta, detalle y comprobante en imagen (blueprint prestamos)
+"""
+from flask import Blueprint, render_template, request, redirect, url_for, session
+from ..models import Usuario, Cliente, Prestamo, Pago, Ruta, ESTADOS_VIGENTES, db
+from ..contadores import contar_prestamo_nuevo
+from ..cuotas import crear_plan_cuotas
+from ..fechas import momento_del_dia, zona_de_pais
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from ..recibos import imagen_comprobante, codificar, FORMATOS, VERSION_PLANTILLAS
+from ..artefactos import clave_artefacto, obtener_o_generar, servir_artefacto
+from .comun import formato_recibo
+
+bp = Blueprint('prestamos', __name__)
+
+
+# ==================== PRÉSTAMOS ====================
+def consulta_lista():
+    """Préstamos con el cliente y el cobrador que muestra la lista (sin una consulta por fila)"""
+    return Prestamo.query.options(joinedload(Prestamo.cliente), joinedload(Prestamo.cobrador))
+
+
+@bp.route('/prestamos')
+def prestamos_lista():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    usuario_id = session.get('usuario_id')
+    rol = session.get('rol')
+
+    # Si es cobrador, solo ver sus préstamos asignados
+    if rol == 'cobrador':
+        prestamos = consulta_lista().filter_by(cobrador_id=usuario_id).order_by(Prestamo.fecha_inicio.desc()).all()
+
+        # Estadísticas solo de sus préstamos
+        total_prestado = db.session.query(func.sum(Prestamo.monto_prestado)).filter(
+            Prestamo.estado.in_(ESTADOS_VIGENTES),
+            Prestamo.cobrador_id == usuario_id
+        ).scalar() or 0
+
+        total_cartera = db.session.query(func.sum(Prestamo.saldo_actual)).filter(
+            Prestamo.estado.in_(ESTADOS_VIGENTES),
+            Prestamo.cobrador_id == usuario_id
+        ).scalar() or 0
+
+        prestamos_activos = Prestamo.query.filter(Prestamo.estado.in_(ESTADOS_VIGENTES), Prestamo.cobrador_id == usuario_id).count()
+
+        ganancia_esperada = db.session.query(
+            func.sum(Prestamo.monto_a_pagar - Prestamo.monto_prestado)
+        ).filter(Prestamo.estado.in_(ESTADOS_VIGENTES), Prestamo.cobrador_id == usuario_id).scalar() or 0
+    else:
+        # Dueño, gerente y secretaria ven todos los préstamos (o filtrados por ruta)
+        ruta_seleccionada_id = session.get('ruta_seleccionada_id')
+
+        if ruta_seleccionada_id:
+            # Filtrar por ruta seleccionada
+            prestamos = consulta_lista().filter_by(ruta_id=ruta_seleccionada_id).order_by(Prestamo.fecha_inicio.desc()).all()
+
+            total_prestado = db.session.query(func.sum(Prestamo.monto_prestado)).filter(
+                Prestamo.estado.in_(ESTADOS_VIGENTES),
+                Prestamo.ruta_id == ruta_seleccionada_id
+            ).scalar() or 0
+
+            total_cartera = db.session.query(func.sum(Prestamo.saldo_actual)).filter(
+                Prestamo.estado.in_(ESTADOS_VIGENTES),
+                Prestamo.ruta_id == ruta_seleccionada_id
+            ).scalar() or 0
+
+            prestamos_activos = Prestamo.query.filter(Prestamo.estado.in_(ESTADOS_VIGENTES), Prestamo.ruta_id == ruta_seleccionada_id).count()
+
+            ganancia_esperada = db.session.query(
+                func.sum(Prestamo.monto_a_pagar - Prestamo.monto_prestado)
+            ).filter(Prestamo.estado.in_(ESTADOS_VIGENTES), Prestamo.ruta_id == ruta_seleccionada_id).scalar() or 0
+        else:
+            # Ver todos los préstamos
+            prestamos = consulta_lista().order_by(Prestamo.fecha_inicio.desc()).all()
+
+            # Estadísticas generales
+            total_prestado = db.session.query(func.sum(Prestamo.monto_prestado)).filter(
+                Prestamo.estado.in_(ESTADOS_VIGENTES)
+            ).scalar() or 0
+
+            total_cartera = db.session.query(func.sum(Prestamo.saldo_actual)).filter(
+                Prestamo.estado.in_(ESTADOS_VIGENTES)
+            ).scalar() or 0
+
+            prestamos_activos = Prestamo.query.filter(Prestamo.estado.in_(ESTADOS_VIGENTES)).count()
+
+            ganancia_esperada = db.session.query(
+            func.sum(Prestamo.monto_a_pagar - Prestamo.monto_prestado)
+        ).filter(Prestamo.estado.in_(ESTADOS_VIGENTES)).scalar() or 0
+
+    return render_template('prestamos_lista.html',
+                         prestamos=prestamos,
+                         total_prestado=total_prestado,
+                         total_cartera=total_cartera,
+                         prestamos_activos=prestamos_activos,
+                         ganancia_esperada=ganancia_esperada,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'),
+                         mensaje=request.args.get('mensaje'))
+
+
+@bp.route('/prestamos/nuevo')
+def prestamos_nuevo():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    # Filtrar clientes: mostrar solo los de la ruta actual + nuevos (sin préstamos)
+    ruta_id = session.get('ruta_seleccionada_id')
+    usuario_id = session.get('usuario_id')
+    rol = session.get('rol')
+
+    # Si es cobrador y no hay ruta seleccionada, usar su ruta asignada
+    if not ruta_id and rol == 'cobrador':
+         ruta = Ruta.query.filter_by(cobrador_id=usuario_id).first()
+         if ruta:
+             ruta_id = ruta.id
+
+    if ruta_id:
+         # 1. Clientes con prestamos en ESTA ruta
+         clientes_ruta_ids = [r[0] for r in db.session.query(Prestamo.cliente_id).filter_by(ruta_id=ruta_id).distinct().all()]
+         # 2. Clientes SIN prestamos (Nuevos)
+         clientes_nuevos_ids = [r[0] for r in db.session.query(Cliente.id).outerjoin(Prestamo).filter(Prestamo.id == None).all()]
+
+         ids_validos = list(set(clientes_ruta_ids + clientes_nuevos_ids))
+         clientes = Cliente.query.filter(Cliente.id.in_(ids_validos)).order_by(Cliente.nombre).all()
+    else:
+         # Si no hay ruta definida, mostrar todos
+         clientes = Cliente.query.order_by(Cliente.nombre).all()
+
+    # Cobradores pueden ser: supervisor, cobrador, o admin (por compatibilidad)
+    cobradores = Usuario.query.filter(Usuario.rol.in_(['admin', 'dueno', 'supervisor', 'cobrador'])).all()
+
+    # Obtener cliente_id de los parámetros de URL si existe
+    cliente_id_seleccionado = request.args.get('cliente_id', type=int)
+
+    return render_template('prestamos_nuevo.html',
+                         clientes=clientes,
+                         cobradores=cobradores,
+                         fecha_hoy=datetime.now().strftime('%Y-%m-%d'),
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'),
+                         usuario_id=session.get('usuario_id'),
+                         cliente_id_seleccionado=cliente_id_seleccionado)
+
+
+@bp.route('/prestamos/guardar', methods=['POST'])
+def prestamos_guardar():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    try:
+        cliente_id = int(request.form.get('cliente_id'))
+
+        # VALIDACIÓN: Verificar si el cliente ya tiene un préstamo activo
+        prestamo_activo = Prestamo.query.filter(
+            Prestamo.cliente_id == cliente_id,
+            Prestamo.estado.in_(ESTADOS_VIGENTES)
+        ).first()
+
+        if prestamo_activo:
+            clientes = Cliente.query.all()
+            cobradores = Usuario.query.filter_by(rol='cobrador', activo=True).all()
+            return render_template('prestamos_nuevo.html',
+                                 error=f'❌ Este cliente ya tiene un préstamo activo (#ID: {prestamo_activo.id}). No puede tener dos préstamos simultáneos.',
+                                 clientes=clientes,
+                                 cobradores=cobradores,
+                                 nombre=session.get('nombre'),
+                                 rol=session.get('rol'))
+
+        monto_prestado = float(request.form.get('monto_prestado'))
+        tasa_interes = float(request.form.get('tasa_interes'))
+        numero_cuotas = int(request.form.get('numero_cuotas'))
+        monto_a_pagar = float(request.form.get('monto_a_pagar'))
+        valor_cuota = float(request.form.get('valor_cuota'))
+
+        # La fecha fin estimada sale del plan de cuotas (último vencimiento)
+        fecha_inicio = datetime.strptime(request.form.get('fecha_inicio'), '%Y-%m-%d').date()
+        frecuencia = request.form.get('frecuencia')
+
+        # Obtener Ruta ID (Contexto de ruta)
+        ruta_id = session.get('ruta_seleccionada_id')
+        if not ruta_id:
+             cobrador_id_form = int(request.form.get('cobrador_id'))
+             ruta = Ruta.query.filter_by(cobrador_id=cobrador_id_form).first()
+             if ruta:
+                 ruta_id = ruta.id
+             else:
+                 # Fallback: Usar la primera ruta disponible para evitar error de base de datos
+                 ruta = Ruta.query.first()
+                 ruta_id = ruta.id if ruta else 1
+
+        # Crear préstamo
+        nuevo_prestamo = Prestamo(
+            cliente_id=cliente_id,
+            ruta_id=ruta_id,
+            cobrador_id=int(request.form.get('cobrador_id')),
+            monto_prestado=monto_prestado,
+            tasa_interes=tasa_interes,
+            monto_a_pagar=monto_a_pagar,
+            saldo_actual=monto_a_pagar,
+            valor_cuota=valor_cuota,
+            moneda=request.form.get('moneda'),
+            frecuencia=frecuencia,
+            numero_cuotas=numero_cuotas,
+            cuotas_pagadas=0,
+            cuotas_atrasadas=0,
+            estado='ACTIVO',
+            # Un timestamp dentro del día de la ruta (la medianoche del servidor cae en el día anterior)
+            fecha_inicio=momento_del_dia(fecha_inicio, zona_de_pais(
+                db.session.query(Ruta.pais).filter(Ruta.id == ruta_id).scalar()))
+        )
+
+        db.session.add(nuevo_prestamo)
+        crear_plan_cuotas(nuevo_prestamo)
+        contar_prestamo_nuevo(nuevo_prestamo)
+        db.session.commit()
+
+        # Redirigir a página de éxito con comprobante
+        return redirect(url_for('prestamos.prestamo_exito', prestamo_id=nuevo_prestamo.id))
+
+    except Exception as e:
+        db.session.rollback()
+        clientes = Cliente.query.order_by(Cliente.nombre).all()
+        cobradores = Usuario.query.filter(Usuario.rol.in_(['admin', 'cobrador'])).all()
+        return render_template('prestamos_nuevo.html',
+                             clientes=clientes,
+                             cobradores=cobradores,
+                             fecha_hoy=datetime.now().strftime('%Y-%m-%d'),
+                             error=f'Error al crear préstamo: {str(e)}',
+                             nombre=session.get('nombre'),
+                             rol=session.get('rol'))
+
+
+@bp.route('/prestamos/ver/<int:prestamo_id>')
+def prestamo_detalle(prestamo_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    prestamo = Prestamo.query.get_or_404(prestamo_id)
+
+    # Obtener todos los pagos del préstamo ordenados por fecha
+    pagos = Pago.query.filter_by(prestamo_id=prestamo_id).order_by(Pago.fecha_pago.desc()).all()
+
+    return render_template('prestamo_detalle.html',
+                         prestamo=prestamo,
+                         pagos=pagos,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/prestamos/exito/<int:prestamo_id>')
+def prestamo_exito(prestamo_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    prestamo = Prestamo.query.get_or_404(prestamo_id)
+    cliente = prestamo.cliente
+    cobrador = prestamo.cobrador
+
+    # Generar URL de WhatsApp con imagen del comprobante
+    whatsapp_url = f"https://wa.me/{cliente.whatsapp_completo}"
+
+    return render_template('prestamo_exito.html',
+                         prestamo=prestamo,
+                         cliente=cliente,
+                         cobrador=cobrador,
+                         whatsapp_url=whatsapp_url,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/prestamos/comprobante-imagen/<int:prestamo_id>')
+def prestamo_comprobante_imagen(prestamo_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    prestamo = Prestamo.query.get_or_404(prestamo_id)
+    cliente = prestamo.cliente
+
+    formato, ancho = formato_recibo()
+    mimetype, extension, _ = FORMATOS[formato]
+
+    # La clave incluye todo lo que muestra el comprobante: si el préstamo cambia, se genera de nuevo.
+    # La fecha de emisión es la de la última modificación del préstamo (no la hora actual)
+    emision = prestamo.fecha_actualizacion or prestamo.fecha_inicio
+    clave = clave_artefacto('comprobante', VERSION_PLANTILLAS, formato, ancho, prestamo.id, prestamo.estado,
+                            prestamo.monto_prestado, prestamo.monto_a_pagar, prestamo.tasa_interes,
+                            prestamo.valor_cuota, prestamo.frecuencia, prestamo.numero_cuotas, prestamo.moneda,
+                            prestamo.fecha_inicio, prestamo.fecha_fin_estimada, cliente.nombre, cliente.documento,
+                            prestamo.cobrador.nombre if prestamo.cobrador else '', emision)
+    contenido = obtener_o_generar(
+        clave, lambda: codificar(imagen_comprobante(prestamo, emision), formato, ancho)[0].getvalue(), mimetype)
+
+    return servir_artefacto(
+        contenido, mimetype,
+        f'Comprobante_Credito_{prestamo.id}_{cliente.nombre.replace(" ", "_")}.{extension}'
+    )
@@ -0,0 +1,369 @@
+"""
+Reportes por periodo y cuadres de ruta en PDF (blueprint reportes)
+"""
+from flask import Blueprint, render_template, request, redirect, url_for, session, make_response, send_file, jsonify
+from ..models import Usuario, Cliente, Prestamo, Pago, Transaccion, ESTADOS_VIGENTES, db
+from ..fechas import rango_de_fechas, hoy_en, zona_de_cobrador
+from ..snapshots import flujos_por_dia, serie_cobrado
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
+from io import BytesIO
+from ..cuadres import datos_cuadre, pdf_cuadre, nombre_archivo_cuadre, cola_pdf
+
+bp = Blueprint('reportes', __name__)
+
+
+# ==================== REPORTES ====================
+@bp.route('/reportes')
+def reportes():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    usuario_id = session.get('usuario_id')
+    rol = session.get('rol')
+
+    # Días del periodo en el país de la ruta del cobrador (dueño y gerente: hora del servidor)
+    zona = zona_de_cobrador(usuario_id) if rol == 'cobrador' else None
+
+    # Obtener fecha de inicio y fin (por defecto últimos 30 días)
+    fecha_fin = hoy_en(zona)
+    fecha_inicio = fecha_fin - timedelta(days=30)
+
+    # Si hay filtros en la query
+    if request.args.get('fecha_inicio'):
+        fecha_inicio = datetime.strptime(request.args.get('fecha_inicio'), '%Y-%m-%d').date()
+    if request.args.get('fecha_fin'):
+        fecha_fin = datetime.strptime(request.args.get('fecha_fin'), '%Y-%m-%d').date()
+
+    # Intervalo [inicio_periodo, fin_periodo) sobre los timestamps (usa los índices de fecha)
+    inicio_periodo, fin_periodo = rango_de_fechas(fecha_inicio, fecha_fin, zona)
+
+    # ===== ESTADÍSTICAS GENERALES =====
+    total_clientes = Cliente.query.count()
+
+    if rol == 'cobrador':
+        # Cobradores ven solo sus préstamos
+        total_prestamos = Prestamo.query.filter_by(cobrador_id=usuario_id).count()
+        prestamos_activos = Prestamo.query.filter(Prestamo.estado.in_(ESTADOS_VIGENTES), Prestamo.cobrador_id == usuario_id).count()
+        prestamos_cancelados = Prestamo.query.filter_by(estado='CANCELADO', cobrador_id=usuario_id).count()
+    else:
+        # Otros roles ven todos los préstamos
+        total_prestamos = Prestamo.query.count()
+        prestamos_activos = Prestamo.query.filter(Prestamo.estado.in_(ESTADOS_VIGENTES)).count()
+        prestamos_cancelados = Prestamo.query.filter_by(estado='CANCELADO').count()
+
+    # ===== DATOS FINANCIEROS =====
+    # Flujos por día: días cerrados desde snapshot_diario, hoy en vivo
+    flujos = flujos_por_dia(fecha_inicio, fecha_fin,
+                            cobrador_id=usuario_id if rol == 'cobrador' else None)
+    total_prestado_periodo = sum(f['prestado'] for f in flujos.values())
+    total_cobrado_periodo = sum(f['cobrado'] for f in flujos.values())
+    num_pagos_periodo = sum(f['num_pagos'] for f in flujos.values())
+    pagos_por_dia = serie_cobrado(flujos)
+
+    if rol == 'cobrador':
+        # Cartera actual (solo sus préstamos)
+        cartera_actual = db.session.query(func.sum(Prestamo.saldo_actual)).filter(Prestamo.estado.in_(ESTADOS_VIGENTES), Prestamo.cobrador_id == usuario_id).scalar()
+        cartera_actual = float(cartera_actual) if cartera_actual else 0
+
+        # Capital en circulación (solo sus préstamos)
+        capital_circulacion = db.session.query(func.sum(Prestamo.monto_prestado)).filter(Prestamo.estado.in_(ESTADOS_VIGENTES), Prestamo.cobrador_id == usuario_id).scalar()
+        capital_circulacion = float(capital_circulacion) if capital_circulacion else 0
+    else:
+        # Cartera actual
+        cartera_actual = db.session.query(func.sum(Prestamo.saldo_actual)).filter(Prestamo.estado.in_(ESTADOS_VIGENTES)).scalar()
+        cartera_actual = float(cartera_actual) if cartera_actual else 0
+
+        # Capital en circulación
+        capital_circulacion = db.session.query(func.sum(Prestamo.monto_prestado)).filter(Prestamo.estado.in_(ESTADOS_VIGENTES)).scalar()
+        capital_circulacion = float(capital_circulacion) if capital_circulacion else 0
+
+    # ===== DATOS PARA GRÁFICOS =====
+    if rol == 'cobrador':
+        # Préstamos por estado (solo suyos)
+        estados_prestamos = db.session.query(
+            Prestamo.estado,
+            func.count(Prestamo.id).label('cantidad')
+        ).filter_by(cobrador_id=usuario_id).group_by(Prestamo.estado).all()
+
+        # Top 5 clientes que más deben (solo sus préstamos)
+        top_deudores = db.session.query(
+            Cliente.nombre,
+            Prestamo.saldo_actual
+        ).join(Prestamo).filter(
+            Prestamo.estado.in_(ESTADOS_VIGENTES),
+            Prestamo.cobrador_id == usuario_id
+        ).order_by(Prestamo.saldo_actual.desc()).limit(5).all()
+
+        # Préstamos por frecuencia de pago (solo suyos)
+        prestamos_por_frecuencia = db.session.query(
+            Prestamo.frecuencia,
+            func.count(Prestamo.id).label('cantidad')
+        ).filter(Prestamo.estado.in_(ESTADOS_VIGENTES), Prestamo.cobrador_id == usuario_id).group_by(Prestamo.frecuencia).all()
+
+        # Cobros por cobrador (solo él mismo)
+        cobros_por_cobrador = db.session.query(
+            Usuario.nombre,
+            func.count(Pago.id).label('num_pagos'),
+            func.sum(Pago.monto).label('total_cobrado')
+        ).join(Pago, Usuario.id == Pago.cobrador_id).filter(
+            Pago.fecha_pago >= inicio_periodo,
+            Pago.fecha_pago < fin_periodo,
+            Usuario.id == usuario_id
+        ).group_by(Usuario.nombre).all()
+    else:
+        # Préstamos por estado
+        estados_prestamos = db.session.query(
+            Prestamo.estado,
+            func.count(Prestamo.id).label('cantidad')
+        ).group_by(Prestamo.estado).all()
+
+        # Top 5 clientes que más deben
+        top_deudores = db.session.query(
+            Cliente.nombre,
+            Prestamo.saldo_actual
+        ).join(Prestamo).filter(
+            Prestamo.estado.in_(ESTADOS_VIGENTES)
+        ).order_by(Prestamo.saldo_actual.desc()).limit(5).all()
+
+        # Préstamos por frecuencia de pago
+        prestamos_por_frecuencia = db.session.query(
+            Prestamo.frecuencia,
+            func.count(Prestamo.id).label('cantidad')
+        ).filter(Prestamo.estado.in_(ESTADOS_VIGENTES)).group_by(Prestamo.frecuencia).all()
+
+        # Cobros por cobrador
+        cobros_por_cobrador = db.session.query(
+            Usuario.nombre,
+            func.count(Pago.id).label('num_pagos'),
+            func.sum(Pago.monto).label('total_cobrado')
+        ).join(Pago, Usuario.id == Pago.cobrador_id).filter(
+            Pago.fecha_pago >= inicio_periodo,
+            Pago.fecha_pago < fin_periodo
+        ).group_by(Usuario.nombre).all()
+
+    # ===== LISTAS DETALLADAS PARA COBRADORES =====
+    if rol == 'cobrador':
+        # 1. Lista de pagos recibidos (clientes que pagaron)
+        # contains_eager: el préstamo y el cliente llegan en el mismo JOIN (sin consultas por fila)
+        lista_pagos = Pago.query.join(Pago.prestamo).join(Prestamo.cliente).options(
+            contains_eager(Pago.prestamo).contains_eager(Prestamo.cliente)
+        ).filter(
+            Pago.fecha_pago >= inicio_periodo,
+            Pago.fecha_pago < fin_periodo,
+            Prestamo.cobrador_id == usuario_id
+        ).order_by(Pago.fecha_pago.desc()).all()
+
+        # 2. Lista de créditos creados
+        lista_creditos = Prestamo.query.join(Prestamo.cliente).options(contains_eager(Prestamo.cliente)).filter(
+            Prestamo.fecha_inicio >= inicio_periodo,
+            Prestamo.fecha_inicio < fin_periodo,
+            Prestamo.cobrador_id == usuario_id
+        ).order_by(Prestamo.fecha_inicio.desc()).all()
+
+        # 3. Lista de gastos/transacciones
+        lista_gastos = Transaccion.query.filter(
+            Transaccion.fecha >= inicio_periodo,
+            Transaccion.fecha < fin_periodo,
+            Transaccion.usuario_origen_id == usuario_id
+        ).order_by(Transaccion.fecha.desc()).all()
+
+        # 4. Resumen de movimientos (todos los registros de actividad)
+        lista_movimientos = []
+
+        # Agregar pagos a movimientos
+        for pago in lista_pagos:
+            lista_movimientos.append({
+                'tipo': 'PAGO',
+                'fecha': pago.fecha_pago,
+                'descripcion': f'Pago de {pago.prestamo.cliente.nombre} - Crédito #{pago.prestamo_id}',
+                'monto': pago.monto,
+                'icono': 'bi-cash-coin',
+                'color': 'success'
+            })
+
+        # Agregar créditos a movimientos
+        for credito in lista_creditos:
+            lista_movimientos.append({
+                'tipo': 'CRÉDITO',
+                'fecha': credito.fecha_inicio,
+                'descripcion': f'Crédito creado para {credito.cliente.nombre} - #{credito.id}',
+                'monto': credito.monto_prestado,
+                'icono': 'bi-plus-circle',
+                'color': 'primary'
+            })
+
+        # Agregar gastos a movimientos
+        for gasto in lista_gastos:
+            lista_movimientos.append({
+                'tipo': 'GASTO',
+                'fecha': gasto.fecha,
+                'descripcion': f'{gasto.concepto}: {gasto.descripcion}',
+                'monto': gasto.monto,
+                'icono': 'bi-arrow-down-circle',
+                'color': 'danger'
+            })
+
+        # Ordenar movimientos por fecha descendente
+        lista_movimientos.sort(key=lambda x: x['fecha'], reverse=True)
+    else:
+        lista_pagos = []
+        lista_creditos = []
+        lista_gastos = []
+        lista_movimientos = []
+
+    return render_template('reportes.html',
+                         fecha_inicio=fecha_inicio.strftime('%Y-%m-%d'),
+                         fecha_fin=fecha_fin.strftime('%Y-%m-%d'),
+                         total_clientes=total_clientes,
+                         total_prestamos=total_prestamos,
+                         prestamos_activos=prestamos_activos,
+                         prestamos_cancelados=prestamos_cancelados,
+                         total_prestado_periodo=total_prestado_periodo,
+                         total_cobrado_periodo=total_cobrado_periodo,
+                         num_pagos_periodo=num_pagos_periodo,
+                         cartera_actual=cartera_actual,
+                         capital_circulacion=capital_circulacion,
+                         pagos_por_dia=pagos_por_dia,
+                         estados_prestamos=estados_prestamos,
+                         top_deudores=top_deudores,
+                         prestamos_por_frecuencia=prestamos_por_frecuencia,
+                         cobros_por_cobrador=cobros_por_cobrador,
+                         lista_pagos=lista_pagos,
+                         lista_creditos=lista_creditos,
+                         lista_gastos=lista_gastos,
+                         lista_movimientos=lista_movimientos,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+# ==================== REPORTES PDF ====================
+@bp.route('/reporte/seleccionar-cobrador')
+def reporte_seleccionar_cobrador():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    # Solo secretaria, gerente, supervisor y dueño pueden acceder
+    if session.get('rol') not in ['secretaria', 'gerente', 'supervisor', 'dueno']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    # Obtener lista de cobradores
+    cobradores = Usuario.query.filter(Usuario.rol.in_(['cobrador', 'supervisor'])).all()
+
+    return render_template('reporte_seleccionar_cobrador.html',
+                         cobradores=cobradores,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/reporte/cuadre-pdf')
+def reporte_cuadre_pdf():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    # Solo secretaria, gerente, supervisor y dueño pueden descargar
+    if session.get('rol') not in ['secretaria', 'gerente', 'supervisor', 'dueno']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    # Determinar el cobrador a consultar
+    # Si se especifica cobrador_id en la URL, usar ese; sino usar el usuario actual
+    cobrador_id = request.args.get('cobrador_id', type=int)
+    if cobrador_id:
+        usuario = Usuario.query.get(cobrador_id)
+        if not usuario:
+            return "Cobrador no encontrado", 404
+    else:
+        usuario = Usuario.query.get(session.get('usuario_id'))
+
+    # Obtener fecha (hoy por defecto), con el día según el país de la ruta del cobrador
+    zona = zona_de_cobrador(usuario.id)
+    fecha = hoy_en(zona)
+    if request.args.get('fecha'):
+        fecha = datetime.strptime(request.args.get('fecha'), '%Y-%m-%d').date()
+
+    # Descarga directa (síncrona); para varios cobradores usar la cola en segundo plano
+    datos = datos_cuadre(usuario, fecha, zona)
+    response = make_response(pdf_cuadre(datos))
+    response.headers['Content-Type'] = 'application/pdf'
+    response.headers['Content-Disposition'] = f'attachment; filename={nombre_archivo_cuadre(datos)}'
+
+    return response
+
+
+def puede_descargar_cuadres():
+    return 'usuario_id' in session and session.get('rol') in ['secretaria', 'gerente', 'supervisor', 'dueno']
+
+
+def fecha_de_formulario(zona):
+    fecha = request.values.get('fecha')
+    return datetime.strptime(fecha, '%Y-%m-%d').date() if fecha else hoy_en(zona)
+
+
+def respuesta_trabajo(trabajo_id, codigo=200):
+    estado = cola_pdf().estado(trabajo_id)
+    if not estado:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    estado['url_estado'] = url_for('reportes.reporte_trabajo_estado', trabajo_id=trabajo_id)
+    if estado['estado'] == 'LISTO':
+        estado['url_descarga'] = url_for('reportes.reporte_trabajo_descargar', trabajo_id=trabajo_id)
+    return jsonify(estado), codigo
+
+
+@bp.route('/reporte/cuadre-pdf/trabajos', methods=['POST'])
+def reporte_cuadre_encolar():
+    """Encola el cuadre de un cobrador; responde 202 con la URL para consultar el estado"""
+    if not puede_descargar_cuadres():
+        return jsonify({'error': 'No autorizado'}), 403
+
+    usuario = Usuario.query.get(request.values.get('cobrador_id', type=int) or session.get('usuario_id'))
+    if not usuario:
+        return jsonify({'error': 'Cobrador no encontrado'}), 404
+    zona = zona_de_cobrador(usuario.id)
+
+    trabajo_id = cola_pdf().encolar_cuadre(datos_cuadre(usuario, fecha_de_formulario(zona), zona))
+    return respuesta_trabajo(trabajo_id, 202)
+
+
+@bp.route('/reporte/cuadre-pdf/lote', methods=['POST'])
+def reporte_cuadre_lote():
+    """Encola los cuadres de todos los cobradores de un día; el resultado es un ZIP"""
+    if not puede_descargar_cuadres():
+        return jsonify({'error': 'No autorizado'}), 403
+
+    fecha = fecha_de_formulario(None)
+    cobradores = Usuario.query.filter(Usuario.rol.in_(['cobrador', 'supervisor']), Usuario.activo == True)\
+        .order_by(Usuario.nombre).all()
+    # Las consultas se hacen aquí; en el pool solo se arma cada PDF
+    lista_datos = [datos_cuadre(cobrador, fecha, zona_de_cobrador(cobrador.id)) for cobrador in cobradores]
+
+    trabajo_id = cola_pdf().encolar_lote(lista_datos, fecha.isoformat())
+    return respuesta_trabajo(trabajo_id, 202)
+
+
+@bp.route('/reporte/trabajos/<trabajo_id>')
+def reporte_trabajo_estado(trabajo_id):
+    if not puede_descargar_cuadres():
+        return jsonify({'error': 'No autorizado'}), 403
+    return respuesta_trabajo(trabajo_id)
+
+
+@bp.route('/reporte/trabajos/<trabajo_id>/descargar')
+def reporte_trabajo_descargar(trabajo_id):
+    if not puede_descargar_cuadres():
+        return redirect(url_for('dashboard.home'))
+
+    cola = cola_pdf()
+    estado = cola.estado(trabajo_id)
+    if not estado:
+        return "Trabajo no encontrado", 404
+    contenido = cola.contenido(trabajo_id) if estado['estado'] == 'LISTO' else None
+    if contenido is None:
+        return respuesta_trabajo(trabajo_id, 202)
+
+    return send_file(
+        BytesIO(contenido),
+        mimetype='application/zip' if estado['tipo'] == 'lote' else 'application/pdf',
+        as_attachment=True,
+        download_name=estado['nombre']
+    )
@@ -0,0 +1,157 @@
+"""
+Rutas de cobro (blueprint rutas)
+"""
+from flask import Blueprint, render_template, request, redirect, url_for, session
+from ..models import Usuario, Sociedad, Ruta, db
+from sqlalchemy.orm import joinedload
+
+bp = Blueprint('rutas', __name__)
+
+
+# ==================== RUTAS ====================
+@bp.route('/rutas')
+def rutas_lista():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    rutas = Ruta.query.options(joinedload(Ruta.cobrador), joinedload(Ruta.sociedad)).order_by(Ruta.nombre).all()
+
+    # Estadísticas por ruta desde los contadores desnormalizados (sin consultas por fila)
+    stats_rutas = [{
+        'ruta': ruta,
+        'num_prestamos': ruta.prestamos_activos or 0,
+        'total_cartera': ruta.cartera or 0
+    } for ruta in rutas]
+
+    return render_template('rutas_lista.html',
+                         stats_rutas=stats_rutas,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/rutas/nueva')
+def rutas_nueva():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    cobradores = Usuario.query.filter_by(rol='cobrador', activo=True).all()
+    sociedades = Sociedad.query.filter_by(activo=True).all()
+
+    return render_template('rutas_nueva.html',
+                         cobradores=cobradores,
+                         sociedades=sociedades,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/rutas/guardar', methods=['POST'])
+def rutas_guardar():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    try:
+        cobrador_id = request.form.get('cobrador_id')
+        sociedad_id = request.form.get('sociedad_id')
+        pais_data = request.form.get('pais', 'Colombia|COP|$')
+
+        # Parsear país, moneda y símbolo
+        pais_parts = pais_data.split('|')
+        pais = pais_parts[0] if len(pais_parts) > 0 else 'Colombia'
+        moneda = pais_parts[1] if len(pais_parts) > 1 else 'COP'
+        simbolo = pais_parts[2] if len(pais_parts) > 2 else '$'
+
+        nueva_ruta = Ruta(
+            nombre=request.form.get('nombre'),
+            cobrador_id=int(cobrador_id) if cobrador_id else None,
+            sociedad_id=int(sociedad_id) if sociedad_id and sociedad_id != '' else None,
+            descripcion=request.form.get('descripcion'),
+            pais=pais,
+            moneda=moneda,
+            simbolo_moneda=simbolo,
+            activo=True
+        )
+
+        db.session.add(nueva_ruta)
+        db.session.commit()
+
+        return redirect(url_for('rutas.rutas_lista'))
+
+    except Exception as e:
+        db.session.rollback()
+        cobradores = Usuario.query.filter_by(rol='cobrador', activo=True).all()
+        sociedades = Sociedad.query.filter_by(activo=True).all()
+        return render_template('rutas_nueva.html',
+                             cobradores=cobradores,
+                             sociedades=sociedades,
+                             error=f'Error al crear ruta: {str(e)}',
+                             nombre=session.get('nombre'),
+                             rol=session.get('rol'))
+
+
+@bp.route('/rutas/editar/<int:ruta_id>')
+def rutas_editar(ruta_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    ruta = Ruta.query.get_or_404(ruta_id)
+    cobradores = Usuario.query.filter_by(rol='cobrador', activo=True).all()
+    sociedades = Sociedad.query.filter_by(activo=True).all()
+
+    return render_template('rutas_editar.html',
+                         ruta=ruta,
+                         cobradores=cobradores,
+                         sociedades=sociedades,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/rutas/actualizar/<int:ruta_id>', methods=['POST'])
+def rutas_actualizar(ruta_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    try:
+        ruta = Ruta.query.get_or_404(ruta_id)
+
+        ruta.nombre = request.form.get('nombre')
+        cobrador_id = request.form.get('cobrador_id')
+        ruta.cobrador_id = int(cobrador_id) if cobrador_id else None
+
+        sociedad_id = request.form.get('sociedad_id')
+        ruta.sociedad_id = int(sociedad_id) if sociedad_id and sociedad_id != '' else None
+
+        ruta.descripcion = request.form.get('descripcion')
+
+        activo = request.form.get('activo')
+        ruta.activo = (activo == 'on')
+
+        db.session.commit()
+
+        return redirect(url_for('rutas.rutas_lista'))
+
+    except Exception as e:
+        db.session.rollback()
+        cobradores = Usuario.query.filter_by(rol='cobrador', activo=True).all()
+        sociedades = Sociedad.query.filter_by(activo=True).all()
+        return render_template('rutas_editar.html',
+                             ruta=ruta,
+                             cobradores=cobradores,
+                             sociedades=sociedades,
+                             error=f'Error al actualizar ruta: {str(e)}',
+                             nombre=session.get('nombre'),
+                             rol=session.get('rol'))
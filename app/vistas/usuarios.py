@@ -0,0 +1,167 @@
+"""
+Gestión de usuarios (blueprint usuarios)
+"""
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from ..models import Usuario, db
+
+bp = Blueprint('usuarios', __name__)
+
+
+# ==================== GESTIÓN DE USUARIOS ====================
+@bp.route('/usuarios')
+def usuarios_lista():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    # Solo dueños y gerentes pueden ver usuarios
+    if session.get('rol') not in ['dueno', 'gerente']:
+        flash('No tienes permisos para acceder a esta sección')
+        return redirect(url_for('dashboard.dashboard'))
+
+    usuarios = Usuario.query.all()
+
+    # Cobros por usuario desde los contadores desnormalizados (sin consultas por fila)
+    stats_usuarios = [{
+        'usuario': usuario,
+        'num_cobros': usuario.num_cobros or 0,
+        'total_cobrado': float(usuario.total_cobrado or 0)
+    } for usuario in usuarios]
+
+    return render_template('usuarios_lista.html',
+                         stats_usuarios=stats_usuarios,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/usuarios/nuevo')
+def usuarios_nuevo():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    return render_template('usuarios_nuevo.html',
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/usuarios/guardar', methods=['POST'])
+def usuarios_guardar():
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    try:
+        nombre = request.form.get('nombre')
+        usuario = request.form.get('usuario')
+        password = request.form.get('password')
+        rol = request.form.get('rol')
+
+        # Validar que no exista el usuario
+        usuario_existente = Usuario.query.filter_by(usuario=usuario).first()
+        if usuario_existente:
+            return render_template('usuarios_nuevo.html',
+                                 error='El nombre de usuario ya existe',
+                                 nombre=session.get('nombre'),
+                                 rol=session.get('rol'))
+
+        nuevo_usuario = Usuario(
+            nombre=nombre,
+            usuario=usuario,
+            password=password,
+            rol=rol,
+            activo=True
+        )
+
+        db.session.add(nuevo_usuario)
+        db.session.commit()
+
+        return redirect(url_for('usuarios.usuarios_lista'))
+
+    except Exception as e:
+        db.session.rollback()
+        return render_template('usuarios_nuevo.html',
+                             error=f'Error al crear usuario: {str(e)}',
+                             nombre=session.get('nombre'),
+                             rol=session.get('rol'))
+
+
+@bp.route('/usuarios/editar/<int:usuario_id>')
+def usuarios_editar(usuario_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    usuario = Usuario.query.get_or_404(usuario_id)
+
+    return render_template('usuarios_editar.html',
+                         usuario=usuario,
+                         nombre=session.get('nombre'),
+                         rol=session.get('rol'))
+
+
+@bp.route('/usuarios/actualizar/<int:usuario_id>', methods=['POST'])
+def usuarios_actualizar(usuario_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    if session.get('rol') not in ['dueno', 'gerente']:
+        return redirect(url_for('dashboard.dashboard'))
+
+    try:
+        usuario = Usuario.query.get_or_404(usuario_id)
+
+        usuario.nombre = request.form.get('nombre')
+        usuario.rol = request.form.get('rol')
+
+        # Solo actualizar contraseña si se proporciona una nueva
+        nueva_password = request.form.get('password')
+        if nueva_password:
+            usuario.password = nueva_password
+
+        activo = request.form.get('activo')
+        usuario.activo = (activo == 'on')
+
+        db.session.commit()
+
+        return redirect(url_for('usuarios.usuarios_lista'))
+
+    except Exception as e:
+        db.session.rollback()
+        return render_template('usuarios_editar.html',
+                             usuario=usuario,
+                             error=f'Error al actualizar usuario: {str(e)}',
+                             nombre=session.get('nombre'),
+                             rol=session.get('rol'))
+
+
+@bp.route('/usuarios/eliminar/<int:usuario_id>')
+def usuarios_eliminar(usuario_id):
+    if 'usuario_id' not in session:
+        return redirect(url_for('dashboard.home'))
+
+    # Solo el dueño puede eliminar usuarios
+    if session.get('rol') != 'dueno':
+        return redirect(url_for('dashboard.dashboard'))
+
+    # No permitir eliminar el propio usuario
+    if usuario_id == session.get('usuario_id'):
+        return redirect(url_for('usuarios.usuarios_lista'))
+
+    try:
+        usuario = Usuario.query.get_or_404(usuario_id)
+
+        # En lugar de eliminar, desactivar
+        usuario.activo = False
+        db.session.commit()
+
+        return redirect(url_for('usuarios.usuarios_lista'))
+
+    except Exception as e:
+        db.session.rollback()
+        return redirect(url_for('usuarios.usuarios_lista'))
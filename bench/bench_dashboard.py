@@ -0,0 +1,76 @@
+"""
+Benchmark de regresión del dashboard sobre una cartera sintética de 50.000 préstamos
+
+Renderiza /dashboard completo para las tres vistas (dueño global, dueño con ruta
+seleccionada y cobrador) y falla si alguna supera el presupuesto de consultas:
+las métricas se calculan con consultas agregadas, así que el número de consultas
+no debe crecer con el tamaño de la cartera.
+
+Uso:
+    python bench/bench_dashboard.py [n_prestamos]
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.models import db, Usuario
+from bench.datos_sinteticos import generar_cartera
+from bench.contador_consultas import contar_consultas
+
+# Máximo de consultas SQL permitidas por render del dashboard
+PRESUPUESTO_CONSULTAS = 15
+
+
+def medir(nombre, cliente_http, engine, sesion):
+    with cliente_http.session_transaction() as s:
+        s.clear()
+        s.update(sesion)
+    db.session.expunge_all()
+    with contar_consultas(engine) as contador:
+        inicio = time.perf_counter()
+        respuesta = cliente_http.get('/dashboard')
+        duracion = time.perf_counter() - inicio
+    assert respuesta.status_code == 200, f"{nombre}: HTTP {respuesta.status_code}"
+    print(f"{nombre:<16} {duracion * 1000:>10.1f} ms {contador['consultas']:>6} consultas")
+    return contador['consultas']
+
+
+def main():
+    n_prestamos = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    ruta_db = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{ruta_db}'})
+
+    with app.app_context():
+        db.create_all()
+        ids = generar_cartera(n_prestamos, n_cobradores=50)
+        dueno = Usuario(nombre='Dueño', usuario='dueno_bench', password='x', rol='dueno')
+        db.session.add(dueno)
+        db.session.commit()
+
+        vistas = [
+            ('dueño global', {'usuario_id': dueno.id, 'nombre': 'Dueño', 'rol': 'dueno'}),
+            ('dueño por ruta', {'usuario_id': dueno.id, 'nombre': 'Dueño', 'rol': 'dueno',
+                                'ruta_seleccionada_id': ids['ruta_ids'][0]}),
+            ('cobrador', {'usuario_id': ids['cobrador_ids'][0], 'nombre': 'Cobrador', 'rol': 'cobrador'}),
+        ]
+
+        print(f"💎 Dashboard - {n_prestamos} préstamos")
+        cliente_http = app.test_client()
+        excedidas = []
+        for nombre, sesion in vistas:
+            consultas = medir(nombre, cliente_http, db.engine, sesion)
+            if consultas > PRESUPUESTO_CONSULTAS:
+                excedidas.append(nombre)
+
+        if excedidas:
+            print(f"❌ Presupuesto de {PRESUPUESTO_CONSULTAS} consultas excedido en: {', '.join(excedidas)}")
+            sys.exit(1)
+        print(f"✅ Todas las vistas dentro del presupuesto de {PRESUPUESTO_CONSULTAS} consultas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark del recálculo nocturno de mora (app/mora.py) sobre una cartera sintética
+
+Genera N préstamos con meses de historia de pagos y su plan de cuotas, y mide
+recalcular_mora() dos veces: la primera escribe la mora de toda la cartera y la
+segunda (mismo día) no debe cambiar ninguna fila.
+
+Uso:
+    python bench/bench_mora.py [n_prestamos] [lote]
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.models import db, Cuota
+from app.mora import recalcular_mora, MORA_LOTE
+from bench.datos_sinteticos import generar_cartera
+
+
+def main():
+    n_prestamos = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    lote = int(sys.argv[2]) if len(sys.argv) > 2 else MORA_LOTE
+    ruta_db = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': os.environ.get('BENCH_DATABASE_URL') or f'sqlite:///{ruta_db}'})
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        inicio = time.perf_counter()
+        generar_cartera(n_prestamos, n_cobradores=50, meses_historia=3)
+        print(f"💎 Mora - {n_prestamos} préstamos, {Cuota.query.count()} cuotas "
+              f"(generados en {time.perf_counter() - inicio:.1f} s)")
+
+        for vuelta in ('primera', 'repetida'):
+            inicio = time.perf_counter()
+            resultado = recalcular_mora(lote=lote)
+            print(f"{vuelta:<10} {time.perf_counter() - inicio:>8.2f} s {resultado['actualizados']:>8} actualizados "
+                  f"{resultado['en_mora']:>8} en mora")
+        assert resultado['actualizados'] == 0, "La segunda pasada no debería cambiar filas"
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark de la ruta de cobro diaria sobre una cartera sintética de 10.000 préstamos
+
+Compara el recorrido anterior (una consulta de pagos + carga perezosa del cliente
+por préstamo) contra prestamos_pendientes() (anti-join + cliente precargado).
+La cartera se genera sin plan de cuotas: así ambos usan el mismo criterio
+(frecuencias DIARIO y BISEMANAL) y los resultados deben coincidir.
+
+Uso:
+    python bench/bench_ruta_cobro.py [n_prestamos]
+"""
+import os
+import sys
+import time
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import func
+
+from app import create_app
+from app.models import db, Prestamo, Pago
+from app.cobranza import prestamos_pendientes
+from bench.datos_sinteticos import generar_cartera
+from bench.contador_consultas import contar_consultas
+
+
+def ruta_cobro_anterior(cobrador_id, hoy):
+    """Implementación previa: N+1 consultas por préstamo"""
+    resultado = []
+    for prestamo in Prestamo.query.filter(Prestamo.cobrador_id == cobrador_id, Prestamo.estado == 'ACTIVO').all():
+        pago_hoy = Pago.query.filter(Pago.prestamo_id == prestamo.id, func.date(Pago.fecha_pago) == hoy).first()
+        if not pago_hoy and prestamo.frecuencia in ['DIARIO', 'BISEMANAL']:
+            resultado.append((prestamo.id, prestamo.cliente.nombre))
+    return resultado
+
+
+def ruta_cobro_nueva(cobrador_id, hoy):
+    return [(p.id, p.cliente.nombre)
+            for p in prestamos_pendientes(hoy, cobrador_id=cobrador_id, frecuencias=['DIARIO', 'BISEMANAL'])]
+
+
+def medir(nombre, funcion, engine, *args):
+    db.session.expunge_all()
+    with contar_consultas(engine) as contador:
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        duracion = time.perf_counter() - inicio
+    print(f"{nombre:<12} {duracion * 1000:>10.1f} ms {contador['consultas']:>8} consultas {len(resultado):>7} filas")
+    return resultado
+
+
+def main():
+    n_prestamos = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    ruta_db = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{ruta_db}'})
+
+    with app.app_context():
+        db.create_all()
+        ids = generar_cartera(n_prestamos, n_cobradores=25, plan_cuotas=False)
+        cobrador_id = ids['cobrador_ids'][0]
+        hoy = datetime.now().date()
+
+        print(f"💎 Ruta de cobro - {n_prestamos} préstamos, cobrador {cobrador_id}")
+        anterior = medir('anterior', ruta_cobro_anterior, db.engine, cobrador_id, hoy)
+        nueva = medir('nueva', ruta_cobro_nueva, db.engine, cobrador_id, hoy)
+        assert sorted(anterior) == sorted(nueva), "Los resultados no coinciden"
+        print("✅ Resultados idénticos")
+
+
+if __name__ == '__main__':
+    main()
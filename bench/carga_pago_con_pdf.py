@@ -0,0 +1,163 @@
+"""
+Prueba de carga: latencia de registrar-pago mientras se exportan cuadres en PDF
+
+Levanta gunicorn con gunicorn.conf.py sobre una cartera sintética (SQLite en
+un directorio temporal) y mide el p95 de POST /api/v1/cobrador/registrar-pago
+en reposo y con lotes de cuadres en PDF encolándose sin parar, en dos
+escenarios:
+- local:  PDF_COLA=local, los PDF se generan en el pool de procesos del web
+- worker: PDF_COLA=worker, los genera procesar_pdfs.py (proceso 'pdf' del Procfile)
+
+En Heroku el proceso 'pdf' corre en otro dyno con su propia CPU. Aquí comparte
+la máquina, así que se le baja la prioridad (nice) para aproximar ese
+aislamiento; con una sola CPU el escenario local no tiene esa ayuda.
+
+Uso:
+    python bench/carga_pago_con_pdf.py [n_prestamos] [peticiones] [concurrencia]
+        Termina con código 1 si en el escenario worker el p95 con PDF supera
+        MAX_DEGRADACION veces el p95 en reposo.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, RAIZ)
+
+from app import create_app
+from app.models import db, Usuario, Prestamo
+from bench.datos_sinteticos import generar_cartera
+
+PUERTO = 5099
+MAX_DEGRADACION = 1.5
+
+
+def preparar_base(ruta_db, n_prestamos):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{ruta_db}'})
+    with app.app_context():
+        generar_cartera(n_prestamos)
+        db.session.add(Usuario(nombre='Dueño', usuario='dueno', password='x', rol='dueno'))
+        db.session.commit()
+        cobrador = Usuario.query.filter_by(usuario='cobrador0').one()
+        prestamos = [p.id for p in Prestamo.query.filter_by(cobrador_id=cobrador.id)]
+        db.engine.dispose()
+    return prestamos
+
+
+def iniciar(comando, entorno, prioridad=0):
+    return subprocess.Popen(comando, cwd=RAIZ, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                            preexec_fn=(lambda: os.nice(prioridad)) if prioridad else None)
+
+
+def esperar_servidor(url, timeout=30):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            urllib.request.urlopen(f"{url}/estado", timeout=1)
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn no respondió")
+
+
+def pedir(url, datos=None, token=None, abridor=None, formulario=False):
+    cabeceras = {'Authorization': f'Bearer {token}'} if token else {}
+    cuerpo = None
+    if datos is not None:
+        if formulario:
+            cuerpo = urllib.parse.urlencode(datos).encode()
+        else:
+            cuerpo = json.dumps(datos).encode()
+            cabeceras['Content-Type'] = 'application/json'
+    peticion = urllib.request.Request(url, data=cuerpo, headers=cabeceras)
+    with (abridor.open if abridor else urllib.request.urlopen)(peticion, timeout=60) as respuesta:
+        return json.loads(respuesta.read() or b'null') if 'json' in respuesta.headers.get('Content-Type', '') else None
+
+
+def medir_pagos(url, token, prestamos, peticiones, concurrencia):
+    """Latencias en ms de registrar-pago (cada petición a un préstamo distinto)"""
+    def pagar(i):
+        inicio = time.perf_counter()
+        pedir(f"{url}/api/v1/cobrador/registrar-pago", {'prestamo_id': prestamos[i % len(prestamos)], 'monto': 1},
+              token=token)
+        return (time.perf_counter() - inicio) * 1000
+
+    with ThreadPoolExecutor(concurrencia) as pool:
+        return sorted(pool.map(pagar, range(peticiones)))
+
+
+def p95(latencias):
+    return latencias[int(len(latencias) * 0.95) - 1]
+
+
+def exportar_pdfs(url, detener, contador):
+    """Encola lotes de cuadres uno tras otro hasta que se pida detener"""
+    abridor = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+    pedir(f"{url}/login", {'usuario': 'dueno', 'password': 'x'}, abridor=abridor, formulario=True)
+    while not detener.is_set():
+        trabajo = pedir(f"{url}/reporte/cuadre-pdf/lote", {}, abridor=abridor, formulario=True)
+        while not detener.is_set() and trabajo['estado'] == 'PENDIENTE':
+            time.sleep(0.2)
+            trabajo = pedir(f"{url}{trabajo['url_estado']}", abridor=abridor)
+        contador['lotes'] += 1
+
+
+def escenario(cola, ruta_db, directorio, prestamos, peticiones, concurrencia):
+    url = f"http://127.0.0.1:{PUERTO}"
+    entorno = dict(os.environ, DATABASE_URL=f'sqlite:///{ruta_db}', PORT=str(PUERTO), PDF_COLA=cola,
+                   PDF_PROCESOS='2', RECIBOS_CACHE='disco', RECIBOS_CACHE_DIR=os.path.join(directorio, 'cache'),
+                   EMAIL_TRANSPORTE='falso')
+    entorno.pop('SENTRY_DSN', None)
+    procesos = [iniciar([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'run:app'], entorno)]
+    if cola == 'worker':
+        procesos.append(iniciar([sys.executable, 'procesar_pdfs.py'], entorno, prioridad=10))
+    try:
+        esperar_servidor(url)
+        token = pedir(f"{url}/api/v1/login", {'usuario': 'cobrador0', 'password': 'x'})['access_token']
+        medir_pagos(url, token, prestamos, concurrencia * 2, concurrencia)  # calentar workers
+        reposo = medir_pagos(url, token, prestamos, peticiones, concurrencia)
+
+        detener, contador = threading.Event(), {'lotes': 0}
+        exportador = threading.Thread(target=exportar_pdfs, args=(url, detener, contador), daemon=True)
+        exportador.start()
+        time.sleep(1)
+        con_pdf = medir_pagos(url, token, prestamos, peticiones, concurrencia)
+        detener.set()
+        exportador.join(60)
+        return p95(reposo), p95(con_pdf), contador['lotes']
+    finally:
+        for proceso in procesos:
+            proceso.terminate()
+            proceso.wait(30)
+
+
+if __name__ == '__main__':
+    n_prestamos = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    peticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+    concurrencia = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_db = os.path.join(directorio, 'carga.db')
+        print(f"📦 Generando {n_prestamos} préstamos sintéticos...")
+        prestamos = preparar_base(ruta_db, n_prestamos)
+
+        print(f"\n{'cola PDF':<10} {'p95 reposo':>12} {'p95 con PDF':>12} {'x':>6} {'lotes':>6}")
+        resultados = {}
+        for cola in ('local', 'worker'):
+            reposo, con_pdf, lotes = escenario(cola, ruta_db, directorio, prestamos, peticiones, concurrencia)
+            resultados[cola] = con_pdf / reposo
+            print(f"{cola:<10} {reposo:>9.1f} ms {con_pdf:>9.1f} ms {con_pdf / reposo:>6.2f} {lotes:>6}")
+
+    if resultados['worker'] > MAX_DEGRADACION:
+        print(f"❌ Con PDF_COLA=worker el p95 sube {resultados['worker']:.2f}x (máximo {MAX_DEGRADACION}x)")
+        sys.exit(1)
+    print(f"✅ Con PDF_COLA=worker el p95 de registrar-pago se mantiene (≤ {MAX_DEGRADACION}x)")
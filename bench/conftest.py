@@ -0,0 +1,71 @@
+"""
+Fixtures de la suite de benchmarks (pytest-benchmark)
+
+La cartera se genera una vez por sesión. Por defecto en SQLite (archivo
+temporal); con BENCH_DATABASE_URL se usa otra base, p. ej. un PostgreSQL
+local: la suite BORRA y recrea sus tablas, así que debe ser una base vacía
+dedicada a los benchmarks.
+
+Variables: BENCH_DATABASE_URL, BENCH_PRESTAMOS (2000), BENCH_COBRADORES (10), BENCH_MESES (3)
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.models import db, Usuario, Prestamo
+from bench.datos_sinteticos import generar_cartera
+
+
+@pytest.fixture(scope='session')
+def cartera():
+    """App sobre la cartera sintética: ids, dueño y token JWT del primer cobrador"""
+    directorio = tempfile.mkdtemp()
+    uri = os.environ.get('BENCH_DATABASE_URL') or f"sqlite:///{os.path.join(directorio, 'bench.db')}"
+    app = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'RECIBOS_CACHE': 'memoria', 'PDF_PROCESOS': 0,
+                      'PERFILADOR': False, 'EMAIL_TRANSPORTE': 'falso'})
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        ids = generar_cartera(int(os.environ.get('BENCH_PRESTAMOS', 2000)),
+                              n_cobradores=int(os.environ.get('BENCH_COBRADORES', 10)),
+                              meses_historia=int(os.environ.get('BENCH_MESES', 3)))
+        dueno = Usuario(nombre='Dueño', usuario='dueno_bench', password='x', rol='dueno')
+        db.session.add(dueno)
+        db.session.commit()
+
+        cobrador_id = ids['cobrador_ids'][0]
+        yield {
+            'app': app,
+            'dueno_id': dueno.id,
+            'cobrador_id': cobrador_id,
+            'token': create_access_token(identity=str(cobrador_id)),
+            'prestamos_activos': [p.id for p in Prestamo.query.filter_by(cobrador_id=cobrador_id, estado='ACTIVO')],
+        }
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def como_dueno(cartera):
+    cliente = cartera['app'].test_client()
+    with cliente.session_transaction() as sesion:
+        sesion.update(usuario_id=cartera['dueno_id'], nombre='Dueño', rol='dueno')
+    return cliente
+
+
+@pytest.fixture
+def como_cobrador(cartera):
+    cliente = cartera['app'].test_client()
+    with cliente.session_transaction() as sesion:
+        sesion.update(usuario_id=cartera['cobrador_id'], nombre='Cobrador 0', rol='cobrador')
+    return cliente
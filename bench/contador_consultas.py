@@ -0,0 +1,20 @@
+"""
+Contador de consultas SQL para benchmarks y tests
+"""
+from contextlib import contextmanager
+from sqlalchemy import event
+
+
+@contextmanager
+def contar_consultas(engine):
+    """Cuenta las sentencias ejecutadas sobre el engine dentro del bloque"""
+    contador = {'consultas': 0}
+
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        contador['consultas'] += 1
+
+    event.listen(engine, 'before_cursor_execute', _antes)
+    try:
+        yield contador
+    finally:
+        event.remove(engine, 'before_cursor_execute', _antes)
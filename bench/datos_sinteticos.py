@@ -0,0 +1,154 @@
+"""
+Generador determinístico de cartera sintética para benchmarks de DIAMANTE PRO
+Inserta cobradores, rutas, clientes, préstamos y pagos con inserciones masivas
+(con las frecuencias reales y, si se pide, meses de historia de pagos), y el plan
+de cuotas de los préstamos vigentes
+"""
+import random
+from datetime import datetime, timedelta
+
+from app.models import db, Usuario, Ruta, Cliente, Prestamo, Pago
+from app.cuotas import generar_planes_faltantes
+
+
+# Frecuencias reales de los préstamos y su peso en la cartera
+FRECUENCIAS = (('DIARIO', 40), ('DIARIO_LUNES_VIERNES', 15), ('BISEMANAL', 15),
+               ('SEMANAL', 15), ('QUINCENAL', 10), ('MENSUAL', 5))
+
+# Días entre cuotas de las frecuencias que no son diarias (BISEMANAL alterna 3 y 4 días)
+PASOS = {'BISEMANAL': (3, 4), 'SEMANAL': (7,), 'QUINCENAL': (15,), 'MENSUAL': (30,)}
+
+
+def fechas_de_cobro(frecuencia, desde, hasta):
+    """Días en que toca cobrar un préstamo entre desde (exclusive) y hasta (exclusive)"""
+    fechas = []
+    if frecuencia in ('DIARIO', 'DIARIO_LUNES_VIERNES'):
+        ultimo_dia_habil = 5 if frecuencia == 'DIARIO' else 4  # sábado o viernes
+        dia = desde + timedelta(days=1)
+        while dia < hasta:
+            if dia.weekday() <= ultimo_dia_habil:
+                fechas.append(dia)
+            dia += timedelta(days=1)
+        return fechas
+    pasos = PASOS[frecuencia]
+    dia, i = desde + timedelta(days=pasos[0]), 1
+    while dia < hasta:
+        fechas.append(dia)
+        dia += timedelta(days=pasos[i % len(pasos)])
+        i += 1
+    return fechas
+
+
+def generar_cartera(n_prestamos, n_cobradores=10, proporcion_pagaron_hoy=0.4, semilla=42,
+                    meses_historia=0, proporcion_pago_puntual=0.9, hoy=None, plan_cuotas=True):
+    """
+    Crea una cartera sintética dentro del contexto de aplicación actual.
+
+    Args:
+        n_prestamos: Número de préstamos a crear (uno por cliente)
+        n_cobradores: Número de cobradores (cada uno con su ruta)
+        proporcion_pagaron_hoy: Fracción de préstamos activos con un pago registrado hoy
+        semilla: Semilla para que los datos sean reproducibles
+        meses_historia: 0 = un pago de ayer por préstamo; N = préstamos desembolsados en
+            los últimos N meses con un pago por cada cuota vencida (los que terminan
+            de pagar quedan CANCELADO)
+        proporcion_pago_puntual: Con historia, fracción de cuotas vencidas que se pagaron
+        hoy: Fecha y hora de referencia (por defecto ahora)
+        plan_cuotas: Generar el plan de cuotas de los préstamos vigentes (False: como
+            los préstamos anteriores a la tabla cuotas)
+
+    Returns:
+        dict: IDs de cobradores y rutas creados
+    """
+    rnd = random.Random(semilla)
+    ahora = hoy or datetime.now()
+
+    cobradores = [{'nombre': f'Cobrador {i}', 'usuario': f'cobrador{i}', 'password': 'x',
+                   'rol': 'cobrador', 'activo': True} for i in range(n_cobradores)]
+    db.session.execute(db.insert(Usuario), cobradores)
+    cobrador_ids = [u.id for u in Usuario.query.filter(Usuario.rol == 'cobrador').order_by(Usuario.id)]
+
+    rutas = [{'nombre': f'Ruta {i}', 'cobrador_id': cid, 'activo': True, 'pais': 'Colombia',
+              'moneda': 'COP', 'simbolo_moneda': '$'} for i, cid in enumerate(cobrador_ids)]
+    db.session.execute(db.insert(Ruta), rutas)
+    ruta_ids = [r.id for r in Ruta.query.order_by(Ruta.id)]
+
+    clientes = [{'nombre': f'Cliente {i}', 'documento': f'DOC{i:08d}', 'telefono': f'300{i:07d}',
+                 'direccion_negocio': f'Calle {i}', 'es_vip': rnd.random() < 0.05} for i in range(n_prestamos)]
+    # Datos del comercio para el scoring, con su propia semilla para no alterar el resto de la cartera
+    rnd_perfil = random.Random(semilla + 1)
+    for cliente in clientes:
+        ingresos = rnd_perfil.choice([None, 50000, 80000, 120000, 200000])
+        cliente.update({
+            'antiguedad_negocio_meses': rnd_perfil.randint(0, 120),
+            'tiene_comprobante_residencia': rnd_perfil.random() < 0.7,
+            'comprobante_a_nombre_propio': rnd_perfil.random() < 0.5,
+            'tiempo_residencia_meses': rnd_perfil.randint(0, 240),
+            'ingresos_diarios_estimados': ingresos,
+            'gastos_mensuales_promedio': ingresos and ingresos * rnd_perfil.uniform(10, 30),
+        })
+    db.session.execute(db.insert(Cliente), clientes)
+    cliente_ids = [c[0] for c in db.session.query(Cliente.id).order_by(Cliente.id)]
+
+    nombres_frecuencia = [f for f, _ in FRECUENCIAS]
+    pesos_frecuencia = [peso for _, peso in FRECUENCIAS]
+    inicio_dia = ahora.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    prestamos, cobros = [], []
+    for i, cliente_id in enumerate(cliente_ids):
+        idx = i % n_cobradores
+        monto = rnd.choice([100000, 200000, 300000, 500000])
+        frecuencia = rnd.choices(nombres_frecuencia, pesos_frecuencia)[0]
+        cuotas = rnd.choice([20, 24, 30]) if frecuencia.startswith('DIARIO') else rnd.choice([4, 6, 8, 12])
+        total = monto * 1.2
+        valor_cuota = total / cuotas
+
+        if meses_historia:
+            fecha_inicio = inicio_dia - timedelta(days=rnd.randint(1, meses_historia * 30), hours=-8)
+            vencidas = fechas_de_cobro(frecuencia, fecha_inicio, inicio_dia)[:cuotas]
+            pagos_cuotas = [d for d in vencidas if rnd.random() < proporcion_pago_puntual]
+            pagadas = len(pagos_cuotas)
+            atrasadas = len(vencidas) - pagadas
+        else:
+            pagadas = rnd.randint(0, cuotas - 1)
+            atrasadas = rnd.choice([0, 0, 0, 1, 2, 5])
+            fecha_inicio = ahora - timedelta(days=pagadas + 1)
+            pagos_cuotas = [ahora - timedelta(days=1)]
+
+        estado = 'CANCELADO' if pagadas >= cuotas else 'ACTIVO'
+        prestamos.append({
+            'cliente_id': cliente_id, 'ruta_id': ruta_ids[idx], 'cobrador_id': cobrador_ids[idx],
+            'monto_prestado': monto, 'tasa_interes': 0.2, 'monto_a_pagar': total,
+            'saldo_actual': max(total - pagadas * valor_cuota, 0), 'valor_cuota': valor_cuota,
+            'moneda': 'COP', 'frecuencia': frecuencia,
+            'numero_cuotas': cuotas, 'cuotas_pagadas': pagadas, 'cuotas_atrasadas': atrasadas,
+            'estado': estado, 'fecha_inicio': fecha_inicio,
+            'fecha_ultimo_pago': pagos_cuotas[-1] if pagos_cuotas else None,
+        })
+        # Hora del cobro entre las 8 y las 17
+        cobros.append([dia.replace(hour=8 + rnd.randint(0, 9), minute=rnd.randint(0, 59))
+                       for dia in pagos_cuotas])
+    db.session.execute(db.insert(Prestamo), prestamos)
+
+    pagos = []
+    filas = db.session.query(Prestamo.id, Prestamo.cobrador_id, Prestamo.valor_cuota, Prestamo.monto_a_pagar,
+                             Prestamo.saldo_actual, Prestamo.estado).order_by(Prestamo.id)
+    for (prestamo_id, cobrador_id, valor_cuota, total, saldo, estado), fechas in zip(filas, cobros):
+        # Un pago por cuota cobrada, con el saldo que dejó cada uno
+        saldo_anterior = saldo + len(fechas) * valor_cuota if meses_historia else saldo + valor_cuota
+        for fecha in fechas:
+            pagos.append({'prestamo_id': prestamo_id, 'cobrador_id': cobrador_id, 'monto': valor_cuota,
+                          'saldo_anterior': saldo_anterior, 'saldo_nuevo': saldo_anterior - valor_cuota,
+                          'fecha_pago': fecha})
+            saldo_anterior -= valor_cuota
+        # Pago de hoy para una fracción de los préstamos activos
+        if estado == 'ACTIVO' and rnd.random() < proporcion_pagaron_hoy:
+            pagos.append({'prestamo_id': prestamo_id, 'cobrador_id': cobrador_id, 'monto': valor_cuota,
+                          'saldo_anterior': saldo + valor_cuota, 'saldo_nuevo': saldo,
+                          'fecha_pago': ahora.replace(hour=9, minute=0)})
+    db.session.execute(db.insert(Pago), pagos)
+    db.session.commit()
+    if plan_cuotas:
+        generar_planes_faltantes(lote=5000)
+
+    return {'cobrador_ids': cobrador_ids, 'ruta_ids': ruta_ids}
@@ -0,0 +1,150 @@
+"""
+Planes de ejecución (EXPLAIN) de las consultas de los endpoints más usados
+
+Uso:
+    python bench/explicar_consultas.py
+        Planes contra la base configurada (DATABASE_URL o SQLite local).
+        Ejecutarlo antes y después de `flask db upgrade` para ver el efecto de los índices.
+
+    python bench/explicar_consultas.py --comparar [n_prestamos]
+        Crea una base SQLite temporal con cartera sintética y muestra cada plan
+        y su tiempo sin los índices de la migración 0003 y con ellos.
+"""
+import os
+import sys
+import time
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import func, text
+
+from app import create_app
+from app.models import db, Prestamo, Pago, Cuota, Transaccion, Usuario
+from app.cobranza import consulta_pendientes
+from app.fechas import rango_del_dia
+
+
+def consultas(cobrador_id):
+    """(nombre, query) con la misma forma que usan las vistas y la API"""
+    hoy = datetime.now().date()
+    inicio, fin = rango_del_dia(hoy)
+    hace_30 = datetime.now() - timedelta(days=30)
+    prestamo_id = db.session.query(func.min(Prestamo.id)).filter(Prestamo.cobrador_id == cobrador_id).scalar() or 0
+
+    return [
+        ('ruta de cobro (anti-join)',
+         consulta_pendientes(hoy, cobrador_id=cobrador_id, frecuencias=['DIARIO', 'BISEMANAL'])),
+        ('dashboard cobrador: cartera',
+         db.session.query(Prestamo.moneda, Prestamo.frecuencia, func.sum(Prestamo.saldo_actual))
+         .filter(Prestamo.estado == 'ACTIVO', Prestamo.cobrador_id == cobrador_id)
+         .group_by(Prestamo.moneda, Prestamo.frecuencia)),
+        ('dashboard cobrador: cuotas que vencen hoy y mañana',
+         db.session.query(Prestamo.moneda, Cuota.fecha_vencimiento, func.sum(Cuota.monto))
+         .join(Prestamo, Cuota.prestamo_id == Prestamo.id)
+         .filter(Cuota.fecha_vencimiento >= hoy, Cuota.fecha_vencimiento <= hoy + timedelta(days=1),
+                 Prestamo.estado == 'ACTIVO', Prestamo.cobrador_id == cobrador_id)
+         .group_by(Prestamo.moneda, Cuota.fecha_vencimiento)),
+        ('dashboard cobrador: pagos de hoy',
+         db.session.query(Prestamo.moneda, func.sum(Pago.monto))
+         .join(Prestamo, Pago.prestamo_id == Prestamo.id)
+         .filter(Pago.fecha_pago >= inicio, Pago.fecha_pago < fin, Prestamo.cobrador_id == cobrador_id)
+         .group_by(Prestamo.moneda)),
+        ('reportes: cobros por cobrador (30 días)',
+         db.session.query(Pago.cobrador_id, func.count(Pago.id), func.sum(Pago.monto))
+         .filter(Pago.cobrador_id == cobrador_id, Pago.fecha_pago >= hace_30)
+         .group_by(Pago.cobrador_id)),
+        ('historial de pagos del préstamo',
+         Pago.query.filter_by(prestamo_id=prestamo_id).order_by(Pago.fecha_pago.desc())),
+        ('sync delta: préstamos del cobrador',
+         Prestamo.query.filter(Prestamo.cobrador_id == cobrador_id,
+                               Prestamo.fecha_actualizacion > datetime.utcnow() - timedelta(hours=1))),
+        ('caja: gastos del cobrador hoy',
+         Transaccion.query.filter(Transaccion.fecha >= inicio, Transaccion.fecha < fin,
+                                  Transaccion.usuario_origen_id == cobrador_id)),
+    ]
+
+
+def _parametro(valor):
+    # El driver recibe los parámetros tal cual; SQLite no adapta datetime sin advertencias
+    return str(valor) if isinstance(valor, datetime) else valor
+
+
+def explicar(query):
+    """Devuelve las líneas del plan de ejecución y el tiempo de la consulta en ms"""
+    dialecto = db.engine.dialect
+    compilada = query.statement.compile(dialect=dialecto, compile_kwargs={'render_postcompile': True})
+    if compilada.positional:
+        parametros = tuple(_parametro(compilada.params[nombre]) for nombre in compilada.positiontup)
+    else:
+        parametros = {nombre: _parametro(valor) for nombre, valor in compilada.params.items()}
+
+    prefijo = 'EXPLAIN QUERY PLAN ' if dialecto.name == 'sqlite' else 'EXPLAIN '
+    with db.engine.connect() as conn:
+        filas = conn.exec_driver_sql(prefijo + str(compilada), parametros).fetchall()
+        inicio = time.perf_counter()
+        conn.exec_driver_sql(str(compilada), parametros).fetchall()
+        duracion = (time.perf_counter() - inicio) * 1000
+
+    # SQLite: (id, parent, notused, detalle); PostgreSQL: una columna de texto
+    return [str(fila[-1]) for fila in filas], duracion
+
+
+def imprimir_planes(titulo, cobrador_id):
+    print(f"\n===== {titulo} =====")
+    for nombre, query in consultas(cobrador_id):
+        plan, duracion = explicar(query)
+        print(f"\n▶ {nombre} ({duracion:.1f} ms)")
+        for linea in plan:
+            print(f"    {linea}")
+
+
+def indices_migracion():
+    """Índices declarados en los modelos con prefijo ix_ (los de la migración 0003)"""
+    return [indice for tabla in db.metadata.sorted_tables for indice in tabla.indexes
+            if indice.name.startswith('ix_') and indice.table.name in ('prestamos', 'pagos', 'transacciones', 'clientes')]
+
+
+def comparar(n_prestamos):
+    from bench.datos_sinteticos import generar_cartera
+
+    ruta_db = os.path.join(tempfile.mkdtemp(), 'explain.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{ruta_db}'})
+    with app.app_context():
+        db.create_all()
+        ids = generar_cartera(n_prestamos, n_cobradores=25)
+        cobrador_id = ids['cobrador_ids'][0]
+
+        indices = indices_migracion()
+        with db.engine.begin() as conn:
+            for indice in indices:
+                conn.execute(text(f"DROP INDEX IF EXISTS {indice.name}"))
+            conn.execute(text("ANALYZE"))
+        imprimir_planes(f"ANTES (sin índices) - {n_prestamos} préstamos", cobrador_id)
+
+        with db.engine.begin() as conn:
+            for indice in indices:
+                indice.create(conn)
+            conn.execute(text("ANALYZE"))
+        imprimir_planes(f"DESPUÉS (con {len(indices)} índices)", cobrador_id)
+
+
+def main():
+    if '--comparar' in sys.argv:
+        posicion = sys.argv.index('--comparar')
+        n_prestamos = int(sys.argv[posicion + 1]) if len(sys.argv) > posicion + 1 else 20000
+        comparar(n_prestamos)
+        return
+
+    app = create_app()
+    with app.app_context():
+        cobrador = Usuario.query.filter_by(rol='cobrador').first()
+        if not cobrador:
+            print("❌ No hay cobradores en la base de datos")
+            sys.exit(1)
+        imprimir_planes(f"{db.engine.dialect.name} - cobrador {cobrador.id}", cobrador.id)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Escenarios de rendimiento con pytest-benchmark sobre la cartera sintética (ver bench/conftest.py)
+
+Cada escenario falla si supera su máximo de consultas SQL (CONSULTAS_MAXIMAS:
+no depende de la máquina). El tiempo se compara con la línea base guardada
+en bench/baselines (depende de la máquina: guardar una propia antes de comparar).
+
+Uso:
+    # Correr los escenarios
+    python -m pytest bench
+    # Guardar la línea base (antes de un cambio)
+    python -m pytest bench --benchmark-storage=bench/baselines --benchmark-save=base
+    # Comparar con la última línea base; falla si la mediana empeora más de 25%
+    python -m pytest bench --benchmark-storage=bench/baselines --benchmark-compare \
+        --benchmark-compare-fail=median:25%
+"""
+import itertools
+
+from app.models import db
+from bench.contador_consultas import contar_consultas
+
+# Máximo de consultas SQL por petición de cada escenario
+CONSULTAS_MAXIMAS = {
+    'dashboard': 13,
+    'cobro_lista': 2,
+    'reportes': 14,
+    'ruta_cobro': 2,
+    'registrar_pago': 8,
+    'cuadre_pdf': 6,
+}
+
+
+def medir(benchmark, escenario, peticion, rondas=20):
+    """Cuenta las consultas de una petición y luego la mide con pytest-benchmark"""
+    db.session.expunge_all()
+    with contar_consultas(db.engine) as contador:
+        respuesta = peticion()
+    assert respuesta.status_code in (200, 201), f"{escenario}: HTTP {respuesta.status_code}"
+    benchmark.extra_info['consultas'] = contador['consultas']
+    assert contador['consultas'] <= CONSULTAS_MAXIMAS[escenario], \
+        f"{escenario}: {contador['consultas']} consultas (máximo {CONSULTAS_MAXIMAS[escenario]})"
+
+    respuesta = benchmark.pedantic(peticion, rounds=rondas, iterations=1, warmup_rounds=1)
+    assert respuesta.status_code in (200, 201)
+
+
+def test_dashboard(benchmark, como_dueno):
+    medir(benchmark, 'dashboard', lambda: como_dueno.get('/dashboard'))
+
+
+def test_cobro_lista(benchmark, como_cobrador):
+    medir(benchmark, 'cobro_lista', lambda: como_cobrador.get('/cobro/lista'))
+
+
+def test_reportes(benchmark, como_dueno):
+    medir(benchmark, 'reportes', lambda: como_dueno.get('/reportes'))
+
+
+def test_ruta_cobro(benchmark, cartera):
+    cliente = cartera['app'].test_client()
+    cabeceras = {'Authorization': f"Bearer {cartera['token']}"}
+    medir(benchmark, 'ruta_cobro', lambda: cliente.get('/api/v1/cobrador/ruta-cobro', headers=cabeceras))
+
+
+def test_registrar_pago(benchmark, cartera):
+    cliente = cartera['app'].test_client()
+    cabeceras = {'Authorization': f"Bearer {cartera['token']}"}
+    # Cada ronda abona a un préstamo distinto (monto pequeño: ninguno se cancela)
+    prestamos = itertools.cycle(cartera['prestamos_activos'])
+    medir(benchmark, 'registrar_pago', lambda: cliente.post(
+        '/api/v1/cobrador/registrar-pago', json={'prestamo_id': next(prestamos), 'monto': 1}, headers=cabeceras),
+        rondas=50)
+
+
+def test_cuadre_pdf(benchmark, como_dueno, cartera):
+    medir(benchmark, 'cuadre_pdf',
+          lambda: como_dueno.get(f"/reporte/cuadre-pdf?cobrador_id={cartera['cobrador_id']}"), rondas=10)
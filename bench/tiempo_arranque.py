@@ -0,0 +1,88 @@
+"""
+Tiempo de arranque de create_app() medido con python -X importtime
+
+Cada reinicio de dyno y cada script de la raíz pagan este arranque. Las
+dependencias pesadas (ReportLab, Pillow, boto3, Sentry, alembic) se importan
+la primera vez que se usan, no al crear la aplicación: si alguna vuelve a
+cargarse en el arranque, este benchmark falla.
+
+Uso:
+    python bench/tiempo_arranque.py [presupuesto_ms]
+        Muestra los módulos que más tardan y termina con código 1 si se
+        supera el presupuesto o se carga una dependencia pesada. También
+        compara con el modo API (APP_MODO=api: sin las vistas web).
+"""
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Presupuesto de importaciones de create_app() en ms (hoy ~0.75 s; el margen cubre máquinas lentas de CI)
+PRESUPUESTO_MS = 1500
+
+# Se cargan solo en los caminos de PDF, imágenes, S3, monitoreo y migraciones
+PESADOS = ('reportlab', 'PIL', 'boto3', 'botocore', 'sentry_sdk', 'alembic', 'flask_migrate', 'sendgrid')
+
+CODIGO = (
+    "from app import create_app; create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})\n"
+    "try:\n"
+    "    import resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    "except ImportError:\n"
+    "    print(0)\n"
+)
+
+
+def medir_arranque(modo='completo'):
+    """
+    Importaciones de create_app() en un proceso nuevo.
+
+    Returns:
+        dict: total_ms, modulos {nombre: (propio_ms, acumulado_ms)}, pesados (cargados) y rss_mb
+    """
+    entorno = dict(os.environ)
+    for variable in ('SENTRY_DSN', 'DATABASE_URL'):
+        entorno.pop(variable, None)
+    entorno['APP_MODO'] = modo
+    proceso = subprocess.run([sys.executable, '-X', 'importtime', '-c', CODIGO], cwd=RAIZ, env=entorno,
+                             capture_output=True, text=True, check=True)
+
+    modulos = {}
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        modulos[nombre.strip()] = (int(propio) / 1000, int(acumulado) / 1000)
+
+    pesados = sorted({n.split('.')[0] for n in modulos if n.split('.')[0] in PESADOS})
+    return {
+        'total_ms': sum(propio for propio, _ in modulos.values()),
+        'modulos': modulos,
+        'pesados': pesados,
+        'rss_mb': int(proceso.stdout.split()[-1]) / 1024,  # ru_maxrss está en KB en Linux
+    }
+
+
+if __name__ == '__main__':
+    presupuesto = float(sys.argv[1]) if len(sys.argv) > 1 else PRESUPUESTO_MS
+    resultado = medir_arranque()
+
+    print("🐢 Módulos de primer nivel que más tardan (acumulado):")
+    primer_nivel = {n: v for n, v in resultado['modulos'].items() if '.' not in n}
+    for nombre, (_, acumulado) in sorted(primer_nivel.items(), key=lambda m: -m[1][1])[:15]:
+        print(f"   {acumulado:8.1f} ms  {nombre}")
+    print(f"\n⏱️ Importaciones de create_app(): {resultado['total_ms']:.0f} ms (presupuesto {presupuesto:.0f} ms)"
+          f" | RSS {resultado['rss_mb']:.0f} MB")
+    api = medir_arranque('api')
+    print(f"📱 Modo API (APP_MODO=api): {api['total_ms']:.0f} ms | RSS {api['rss_mb']:.0f} MB")
+
+    fallas = []
+    if resultado['total_ms'] > presupuesto:
+        fallas.append(f"supera el presupuesto en {resultado['total_ms'] - presupuesto:.0f} ms")
+    if resultado['pesados']:
+        fallas.append(f"carga dependencias pesadas en el arranque: {', '.join(resultado['pesados'])}")
+    if fallas:
+        for falla in fallas:
+            print(f"❌ {falla}")
+        sys.exit(1)
+    print("✅ Arranque dentro del presupuesto")
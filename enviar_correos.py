@@ -0,0 +1,33 @@
+"""
+Worker de correos: envía la bandeja de salida (tabla correos_pendientes)
+- Sin argumentos: corre en bucle (proceso 'worker' del Procfile)
+- Con --una-vez: drena lo pendiente y termina (ej. Heroku Scheduler cada 10 minutos)
+
+La tabla la crea la migración 0004 (flask db upgrade).
+Variables: SENDGRID_API_KEY, EMAIL_ENVIOS_POR_SEGUNDO (5), EMAIL_TRANSPORTE=falso para no usar la red.
+"""
+import sys
+import time
+from app import create_app
+from app.email_service import email_service
+
+ESPERA_SIN_CORREOS = 5  # segundos
+
+app = create_app()
+
+with app.app_context():
+    if not email_service.enabled:
+        print("⚠️ Emails deshabilitados (SENDGRID_API_KEY o EMAIL_TRANSPORTE) - Los correos quedan en la bandeja")
+        sys.exit(0)
+
+    print("📧 Enviando correos pendientes...")
+    while True:
+        resultado = email_service.drain_outbox()
+        if any(resultado.values()):
+            print(f"✅ Enviados: {resultado['enviados']} | Reintentos: {resultado['reintentos']} | Errores: {resultado['errores']}")
+        if '--una-vez' in sys.argv:
+            if not any(resultado.values()):
+                break
+            continue
+        if not any(resultado.values()):
+            time.sleep(ESPERA_SIN_CORREOS)
@@ -0,0 +1,18 @@
+"""
+Genera el plan de cuotas (tabla cuotas) de los préstamos vigentes que no lo tienen
+- Los préstamos nuevos lo crean al guardarse; este script completa los anteriores
+- Las cuotas que ya cubre el saldo pagado quedan marcadas como pagadas
+
+La tabla la crea la migración 0006 (flask db upgrade). Ejecutar una vez después de desplegar:
+    python generar_plan_cuotas.py
+Es seguro repetirlo: solo toca los préstamos sin plan.
+"""
+from app import create_app
+from app.cuotas import generar_planes_faltantes
+
+app = create_app()
+
+with app.app_context():
+    print("🔄 Generando planes de cuotas faltantes...")
+    completados = generar_planes_faltantes()
+    print(f"✅ Planes generados para {completados} préstamos")
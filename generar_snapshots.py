@@ -0,0 +1,48 @@
+"""
+Cierre nocturno: genera el snapshot diario de cartera (tabla snapshot_diario)
+- Sin argumentos: cierra el día de ayer (flujos + foto de cartera) y recalcula los
+  días anteriores que recibieron pagos tardíos (ej. pagos offline sincronizados después)
+- Con una fecha AAAA-MM-DD: recalcula los flujos desde esa fecha hasta ayer (backfill)
+
+La tabla la crea la migración 0002 (flask db upgrade).
+Programar una vez al día después de medianoche (ej. Heroku Scheduler):
+    python generar_snapshots.py
+Los días son los del país de cada ruta: programarlo cuando ya terminó el día en
+todos los países (ej. 06:00 UTC cubre Colombia, Perú, Brasil, Argentina y USA-Este).
+"""
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from app import create_app
+from app.models import db, SnapshotDiario
+from app.snapshots import generar_snapshot, dias_con_pagos_tardios
+
+app = create_app()
+
+with app.app_context():
+    ayer = datetime.now().date() - timedelta(days=1)
+
+    if len(sys.argv) > 1:
+        desde = datetime.strptime(sys.argv[1], '%Y-%m-%d').date()
+        print(f"🔄 Backfill de snapshots desde {desde} hasta {ayer}...")
+        dia = desde
+        while dia <= ayer:
+            filas = generar_snapshot(dia)
+            db.session.commit()
+            print(f"✅ {dia}: {filas} filas")
+            dia += timedelta(days=1)
+    else:
+        ultima_generacion = db.session.query(func.max(SnapshotDiario.fecha_generacion)).scalar()
+
+        print(f"🔄 Cerrando el día {ayer}...")
+        filas = generar_snapshot(ayer, incluir_cartera=True)
+        db.session.commit()
+        print(f"✅ {ayer}: {filas} filas")
+
+        if ultima_generacion:
+            for dia in dias_con_pagos_tardios(ultima_generacion, ayer):
+                filas = generar_snapshot(dia)
+                db.session.commit()
+                print(f"♻️ {dia} recalculado por pagos tardíos: {filas} filas")
+
+    print("✅ Snapshots completados!")
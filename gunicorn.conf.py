@@ -0,0 +1,81 @@
+"""
+Configuración de gunicorn para DIAMANTE PRO (proceso 'web' del Procfile)
+
+Los workers se calculan según la memoria del dyno: Heroku exporta DYNO_RAM
+(MB) y WEB_CONCURRENCY; fuera de Heroku se lee el límite del cgroup.
+Cada worker usa gthread: las peticiones de la app móvil pasan casi todo el
+tiempo esperando a PostgreSQL o S3, así que varios hilos por worker atienden
+más cobros con la misma memoria.
+
+Conexiones a PostgreSQL: cada worker tiene su pool (app/conexiones.py). Con
+GUNICORN_THREADS <= DB_POOL_SIZE ningún hilo espera conexión, y el total
+    workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+debe caber en el plan de la base.
+
+Variables:
+    WEB_CONCURRENCY (según memoria), GUNICORN_THREADS (4), GUNICORN_TIMEOUT (30 s),
+    GUNICORN_MAX_REQUESTS (1000), GUNICORN_PRELOAD (1), PORT (5001),
+    WEB_STATEMENT_TIMEOUT_MS (30000; 0 = sin límite)
+"""
+import os
+
+# Memoria que usa un worker con sus hilos bajo carga (el arranque son ~60 MB)
+MB_POR_WORKER = 160
+
+
+def _memoria_mb():
+    if os.environ.get('DYNO_RAM'):
+        return int(os.environ['DYNO_RAM'])
+    try:
+        with open('/sys/fs/cgroup/memory.max') as archivo:
+            limite = archivo.read().strip()
+        if limite != 'max':
+            return int(limite) // (1024 * 1024)
+    except (OSError, ValueError):
+        pass
+    return 512  # dyno básico de Heroku
+
+
+def _workers(memoria_mb, cpus):
+    if os.environ.get('WEB_CONCURRENCY'):
+        return int(os.environ['WEB_CONCURRENCY'])
+    # Por memoria, sin pasar de 2 x CPU + 1 (los hilos ya cubren la espera de E/S)
+    return max(2, min(memoria_mb // MB_POR_WORKER, cpus * 2 + 1))
+
+
+# Límite por sentencia solo para el proceso web (app/conexiones.py): una consulta desbocada
+# no retiene la conexión. Se define antes de create_app(), que lee DB_STATEMENT_TIMEOUT_MS.
+os.environ['DB_STATEMENT_TIMEOUT_MS'] = os.environ.get('WEB_STATEMENT_TIMEOUT_MS', '30000')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+workers = _workers(_memoria_mb(), os.cpu_count() or 1)
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# El router de Heroku corta a los 30 s; al reiniciar el dyno quedan 30 s antes del SIGKILL
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 25
+keepalive = 5
+
+# Reciclar workers cada ~1000 peticiones (el jitter evita que todos reinicien a la vez)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+
+# preload: create_app() corre una vez en el maestro y los workers comparten esa memoria
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1').lower() not in ('0', 'false', 'no')
+
+# El latido de los workers en memoria y no en el disco del dyno
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    """Con preload, descarta las conexiones heredadas del maestro: cada worker abre las suyas"""
+    if not preload_app:
+        return
+    from app.models import db
+    app = worker.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
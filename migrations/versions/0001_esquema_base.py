@@ -0,0 +1,26 @@
+"""Esquema base (tablas creadas con db.create_all() y los scripts de migración antiguos)
+
+Las bases existentes ya tienen este esquema: marcarlas una sola vez con
+    flask db stamp 0001_esquema_base
+y desde ahí aplicar el resto con `flask db upgrade`.
+
+Revision ID: 0001_esquema_base
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_esquema_base'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    pass
+
+
+def downgrade():
+    pass
@@ -0,0 +1,119 @@
+"""Sincronización incremental, idempotencia de pagos, snapshots diarios y contadores
+
+Reemplaza a los scripts migrar_sync_movil.py y migrar_pagos_idempotencia.py.
+Es idempotente: las bases creadas con db.create_all() ya tienen todo esto.
+Después de aplicarla, ejecutar `python reconciliar_contadores.py` para
+llenar los contadores de rutas y usuarios.
+
+Revision ID: 0002_sync_snapshots_contadores
+Revises: 0001_esquema_base
+Create Date: 2026-10-18 09:05:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_sync_snapshots_contadores'
+down_revision = '0001_esquema_base'
+branch_labels = None
+depends_on = None
+
+# (tabla, expresión con la que se rellena fecha_actualizacion)
+FECHAS_ACTUALIZACION = [
+    ('clientes', 'fecha_registro'),
+    ('prestamos', 'COALESCE(fecha_ultimo_pago, fecha_inicio)'),
+    ('pagos', 'fecha_pago'),
+]
+
+CONTADORES = {
+    'rutas': [('prestamos_activos', sa.Integer()), ('cartera', sa.Float()),
+              ('num_cobros', sa.Integer()), ('total_cobrado', sa.Float())],
+    'usuarios': [('num_cobros', sa.Integer()), ('total_cobrado', sa.Float())],
+}
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def _columnas(tabla):
+    return {c['name'] for c in _inspector().get_columns(tabla)}
+
+
+def _indices(tabla):
+    return {i['name'] for i in _inspector().get_indexes(tabla)}
+
+
+def upgrade():
+    for tabla, origen in FECHAS_ACTUALIZACION:
+        if 'fecha_actualizacion' not in _columnas(tabla):
+            with op.batch_alter_table(tabla) as batch_op:
+                batch_op.add_column(sa.Column('fecha_actualizacion', sa.DateTime()))
+        op.execute(f"UPDATE {tabla} SET fecha_actualizacion = {origen} WHERE fecha_actualizacion IS NULL")
+
+    if 'clave_idempotencia' not in _columnas('pagos'):
+        with op.batch_alter_table('pagos') as batch_op:
+            batch_op.add_column(sa.Column('clave_idempotencia', sa.String(length=64)))
+        op.create_index('uq_pagos_clave_idempotencia', 'pagos', ['clave_idempotencia'], unique=True)
+
+    for tabla, columnas in CONTADORES.items():
+        existentes = _columnas(tabla)
+        faltantes = [(nombre, tipo) for nombre, tipo in columnas if nombre not in existentes]
+        if faltantes:
+            with op.batch_alter_table(tabla) as batch_op:
+                for nombre, tipo in faltantes:
+                    batch_op.add_column(sa.Column(nombre, tipo, server_default='0'))
+
+    tablas = set(_inspector().get_table_names())
+    if 'registros_eliminados' not in tablas:
+        op.create_table(
+            'registros_eliminados',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('tabla', sa.String(length=50), nullable=False),
+            sa.Column('registro_id', sa.Integer(), nullable=False),
+            sa.Column('fecha_eliminacion', sa.DateTime()),
+        )
+        op.create_index('ix_registros_eliminados_fecha_eliminacion', 'registros_eliminados', ['fecha_eliminacion'])
+
+    if 'snapshot_diario' not in tablas:
+        op.create_table(
+            'snapshot_diario',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('fecha', sa.Date(), nullable=False),
+            sa.Column('ruta_id', sa.Integer(), sa.ForeignKey('rutas.id')),
+            sa.Column('cobrador_id', sa.Integer(), sa.ForeignKey('usuarios.id')),
+            sa.Column('moneda', sa.String(length=3)),
+            sa.Column('cobrado', sa.Float()),
+            sa.Column('num_pagos', sa.Integer()),
+            sa.Column('prestado', sa.Float()),
+            sa.Column('num_prestamos_nuevos', sa.Integer()),
+            sa.Column('cartera', sa.Float()),
+            sa.Column('capital_circulacion', sa.Float()),
+            sa.Column('prestamos_activos', sa.Integer()),
+            sa.Column('prestamos_atrasados', sa.Integer()),
+            sa.Column('prestamos_mora', sa.Integer()),
+            sa.Column('fecha_generacion', sa.DateTime()),
+            sa.UniqueConstraint('fecha', 'ruta_id', 'cobrador_id', 'moneda', name='uq_snapshot_diario'),
+        )
+        op.create_index('ix_snapshot_diario_fecha', 'snapshot_diario', ['fecha'])
+
+
+def downgrade():
+    op.drop_table('snapshot_diario')
+    op.drop_table('registros_eliminados')
+
+    for tabla, columnas in CONTADORES.items():
+        with op.batch_alter_table(tabla) as batch_op:
+            for nombre, _ in columnas:
+                batch_op.drop_column(nombre)
+
+    if 'uq_pagos_clave_idempotencia' in _indices('pagos'):
+        op.drop_index('uq_pagos_clave_idempotencia', table_name='pagos')
+    with op.batch_alter_table('pagos') as batch_op:
+        batch_op.drop_column('clave_idempotencia')
+
+    for tabla, _ in FECHAS_ACTUALIZACION:
+        with op.batch_alter_table(tabla) as batch_op:
+            batch_op.drop_column('fecha_actualizacion')
@@ -0,0 +1,72 @@
+"""Índices compuestos para los filtros más usados (estado, cobrador, ruta, fechas)
+
+En PostgreSQL los índices se crean con CREATE INDEX CONCURRENTLY para no
+bloquear escrituras mientras se construyen sobre tablas grandes. Si una
+ejecución anterior se interrumpió, el índice quedó INVALID (pg_index.indisvalid):
+se borra y se vuelve a crear.
+
+Revision ID: 0003_indices_consultas
+Revises: 0002_sync_snapshots_contadores
+Create Date: 2026-10-18 09:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_indices_consultas'
+down_revision = '0002_sync_snapshots_contadores'
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas) - deben coincidir con __table_args__ en app/models.py
+INDICES = [
+    ('ix_prestamos_cobrador_estado', 'prestamos', ['cobrador_id', 'estado']),
+    ('ix_prestamos_ruta_estado', 'prestamos', ['ruta_id', 'estado']),
+    ('ix_prestamos_cliente_estado', 'prestamos', ['cliente_id', 'estado']),
+    ('ix_prestamos_fecha_inicio', 'prestamos', ['fecha_inicio']),
+    ('ix_prestamos_cobrador_actualizacion', 'prestamos', ['cobrador_id', 'fecha_actualizacion']),
+    ('ix_pagos_prestamo_fecha', 'pagos', ['prestamo_id', 'fecha_pago']),
+    ('ix_pagos_cobrador_fecha', 'pagos', ['cobrador_id', 'fecha_pago']),
+    ('ix_pagos_fecha', 'pagos', ['fecha_pago']),
+    ('ix_pagos_actualizacion', 'pagos', ['fecha_actualizacion']),
+    ('ix_transacciones_origen_fecha', 'transacciones', ['usuario_origen_id', 'fecha']),
+    ('ix_transacciones_fecha', 'transacciones', ['fecha']),
+    ('ix_clientes_actualizacion', 'clientes', ['fecha_actualizacion']),
+]
+
+
+def _existentes():
+    inspector = sa.inspect(op.get_bind())
+    return {i['name'] for tabla in {t for _, t, _ in INDICES} for i in inspector.get_indexes(tabla)}
+
+
+def _invalidos():
+    """Índices de la lista que quedaron INVALID por un CREATE INDEX CONCURRENTLY interrumpido"""
+    if op.get_bind().dialect.name != 'postgresql':
+        return set()
+    filas = op.get_bind().execute(sa.text(
+        'SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+        'WHERE NOT i.indisvalid AND c.relname = ANY(:nombres)'
+    ), {'nombres': [nombre for nombre, _, _ in INDICES]})
+    return {nombre for (nombre,) in filas}
+
+
+def upgrade():
+    existentes = _existentes()
+    invalidos = _invalidos()
+    concurrente = op.get_bind().dialect.name == 'postgresql'
+    with op.get_context().autocommit_block():
+        for nombre, tabla, columnas in INDICES:
+            if nombre in invalidos:
+                op.drop_index(nombre, table_name=tabla, postgresql_concurrently=True)
+            if nombre not in existentes or nombre in invalidos:
+                op.create_index(nombre, tabla, columnas, postgresql_concurrently=concurrente)
+
+
+def downgrade():
+    existentes = _existentes()
+    for nombre, tabla, _ in INDICES:
+        if nombre in existentes:
+            op.drop_index(nombre, table_name=tabla)
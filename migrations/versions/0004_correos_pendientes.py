@@ -0,0 +1,44 @@
+"""Bandeja de salida de correos (correos_pendientes)
+
+Es idempotente: las bases creadas con db.create_all() ya tienen la tabla.
+
+Revision ID: 0004_correos_pendientes
+Revises: 0003_indices_consultas
+Create Date: 2026-10-18 09:15:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_correos_pendientes'
+down_revision = '0003_indices_consultas'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'correos_pendientes' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'correos_pendientes',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('destinatario', sa.String(length=200), nullable=False),
+        sa.Column('asunto', sa.String(length=200), nullable=False),
+        sa.Column('html', sa.Text(), nullable=False),
+        sa.Column('texto', sa.Text()),
+        sa.Column('estado', sa.String(length=20)),
+        sa.Column('intentos', sa.Integer()),
+        sa.Column('proximo_intento', sa.DateTime()),
+        sa.Column('ultimo_error', sa.String(length=500)),
+        sa.Column('fecha_creacion', sa.DateTime()),
+        sa.Column('fecha_envio', sa.DateTime()),
+    )
+    op.create_index('ix_correos_pendientes_estado_proximo', 'correos_pendientes', ['estado', 'proximo_intento'])
+
+
+def downgrade():
+    if 'correos_pendientes' in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_index('ix_correos_pendientes_estado_proximo', table_name='correos_pendientes')
+        op.drop_table('correos_pendientes')
@@ -0,0 +1,39 @@
+"""Cola de cuadres en PDF para el proceso pdf (trabajos_pdf)
+
+Es idempotente: las bases creadas con db.create_all() ya tienen la tabla.
+
+Revision ID: 0005_trabajos_pdf
+Revises: 0004_correos_pendientes
+Create Date: 2026-10-18 11:40:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_trabajos_pdf'
+down_revision = '0004_correos_pendientes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'trabajos_pdf' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'trabajos_pdf',
+        sa.Column('id', sa.String(length=32), primary_key=True),
+        sa.Column('tipo', sa.String(length=20), nullable=False),
+        sa.Column('datos', sa.Text(), nullable=False),
+        sa.Column('estado', sa.String(length=20)),
+        sa.Column('fecha_creacion', sa.DateTime()),
+        sa.Column('fecha_fin', sa.DateTime()),
+    )
+    op.create_index('ix_trabajos_pdf_estado', 'trabajos_pdf', ['estado'])
+
+
+def downgrade():
+    if 'trabajos_pdf' in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_index('ix_trabajos_pdf_estado', table_name='trabajos_pdf')
+        op.drop_table('trabajos_pdf')
@@ -0,0 +1,45 @@
+"""Plan de cuotas: fechas de vencimiento exactas por préstamo (cuotas)
+
+Es idempotente: las bases creadas con db.create_all() ya tienen la tabla.
+Los préstamos existentes se completan con generar_plan_cuotas.py.
+
+Revision ID: 0006_cuotas
+Revises: 0005_trabajos_pdf
+Create Date: 2026-10-18 15:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_cuotas'
+down_revision = '0005_trabajos_pdf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'cuotas' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'cuotas',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('prestamo_id', sa.Integer(), sa.ForeignKey('prestamos.id'), nullable=False),
+        sa.Column('numero', sa.Integer(), nullable=False),
+        sa.Column('fecha_vencimiento', sa.Date(), nullable=False),
+        sa.Column('monto', sa.Float(), nullable=False),
+        sa.Column('pagada', sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.create_index('uq_cuotas_prestamo_numero', 'cuotas', ['prestamo_id', 'numero'], unique=True)
+    op.create_index('ix_cuotas_vencimiento_pagada', 'cuotas', ['fecha_vencimiento', 'pagada'])
+    op.create_index('ix_cuotas_prestamo_pagada_vencimiento', 'cuotas',
+                    ['prestamo_id', 'pagada', 'fecha_vencimiento'])
+
+
+def downgrade():
+    if 'cuotas' in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_index('ix_cuotas_prestamo_pagada_vencimiento', table_name='cuotas')
+        op.drop_index('ix_cuotas_vencimiento_pagada', table_name='cuotas')
+        op.drop_index('uq_cuotas_prestamo_numero', table_name='cuotas')
+        op.drop_table('cuotas')
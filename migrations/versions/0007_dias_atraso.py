@@ -0,0 +1,34 @@
+"""Días de atraso por préstamo (prestamos.dias_atraso, lo calcula recalcular_mora.py)
+
+Es idempotente: las bases creadas con db.create_all() ya tienen la columna.
+
+Revision ID: 0007_dias_atraso
+Revises: 0006_cuotas
+Create Date: 2026-10-18 17:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_dias_atraso'
+down_revision = '0006_cuotas'
+branch_labels = None
+depends_on = None
+
+
+def _columnas():
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns('prestamos')}
+
+
+def upgrade():
+    if 'dias_atraso' not in _columnas():
+        with op.batch_alter_table('prestamos') as batch_op:
+            batch_op.add_column(sa.Column('dias_atraso', sa.Integer(), server_default='0'))
+
+
+def downgrade():
+    if 'dias_atraso' in _columnas():
+        with op.batch_alter_table('prestamos') as batch_op:
+            batch_op.drop_column('dias_atraso')
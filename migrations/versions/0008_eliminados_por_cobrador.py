@@ -0,0 +1,43 @@
+"""Cobrador de cada tombstone (registros_eliminados.cobrador_id) para el sync por dispositivo
+
+Es idempotente: las bases creadas con db.create_all() ya tienen la columna.
+Los tombstones anteriores quedan sin cobrador y se siguen enviando a todos.
+
+Revision ID: 0008_eliminados_por_cobrador
+Revises: 0007_dias_atraso
+Create Date: 2026-10-18 19:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_eliminados_por_cobrador'
+down_revision = '0007_dias_atraso'
+branch_labels = None
+depends_on = None
+
+INDICE = 'ix_registros_eliminados_cobrador_id'
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def upgrade():
+    inspector = _inspector()
+    if 'cobrador_id' not in {c['name'] for c in inspector.get_columns('registros_eliminados')}:
+        with op.batch_alter_table('registros_eliminados') as batch_op:
+            batch_op.add_column(sa.Column('cobrador_id', sa.Integer()))
+    if INDICE not in {i['name'] for i in _inspector().get_indexes('registros_eliminados')}:
+        op.create_index(INDICE, 'registros_eliminados', ['cobrador_id'])
+
+
+def downgrade():
+    inspector = _inspector()
+    if INDICE in {i['name'] for i in inspector.get_indexes('registros_eliminados')}:
+        op.drop_index(INDICE, table_name='registros_eliminados')
+    if 'cobrador_id' in {c['name'] for c in _inspector().get_columns('registros_eliminados')}:
+        with op.batch_alter_table('registros_eliminados') as batch_op:
+            batch_op.drop_column('cobrador_id')
@@ -0,0 +1,30 @@
+"""
+Worker de PDF: genera los cuadres encolados en la tabla trabajos_pdf
+- Sin argumentos: corre en bucle (proceso 'pdf' del Procfile)
+- Con --una-vez: genera lo pendiente y termina
+
+Solo recibe trabajos si el proceso web corre con PDF_COLA=worker. El almacén de
+artefactos debe ser compartido con el web (RECIBOS_CACHE=s3 en Heroku).
+La tabla la crea la migración 0005 (flask db upgrade).
+Variables: PDF_PROCESOS (2) procesos de ReportLab por dyno.
+"""
+import sys
+import time
+from app import create_app
+from app.cuadres import cola_pdf
+
+ESPERA_SIN_TRABAJOS = 2  # segundos
+
+app = create_app()
+
+with app.app_context():
+    cola = cola_pdf()
+    print("📄 Generando cuadres en PDF pendientes...")
+    while True:
+        estado = cola.procesar_pendiente()
+        if estado:
+            print(f"✅ {estado['nombre']}: {estado['estado']}")
+            continue
+        if '--una-vez' in sys.argv:
+            break
+        time.sleep(ESPERA_SIN_TRABAJOS)
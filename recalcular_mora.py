@@ -0,0 +1,28 @@
+"""
+Recálculo nocturno de la mora: cuotas_atrasadas, dias_atraso y estado MORA/ACTIVO
+de los préstamos vigentes según su plan de cuotas (ver app/mora.py)
+- Sin argumentos: usa el día de hoy en el país de cada ruta
+- Con una fecha AAAA-MM-DD: recalcula como si fuera ese día
+
+La columna dias_atraso la crea la migración 0007 (flask db upgrade).
+Programar una vez al día después de medianoche (ej. Heroku Scheduler, después
+de generar_snapshots.py):
+    python recalcular_mora.py
+Variables: MORA_LOTE (5000) préstamos por cada UPDATE.
+"""
+import os
+import sys
+import time
+from datetime import datetime
+from app import create_app
+from app.mora import recalcular_mora, MORA_LOTE
+
+app = create_app()
+
+with app.app_context():
+    fecha = datetime.strptime(sys.argv[1], '%Y-%m-%d').date() if len(sys.argv) > 1 else None
+    print(f"🔄 Recalculando mora{f' al {fecha}' if fecha else ''}...")
+    inicio = time.perf_counter()
+    resultado = recalcular_mora(fecha, lote=int(os.environ.get('MORA_LOTE', MORA_LOTE)))
+    print(f"✅ {resultado['actualizados']} préstamos actualizados, {resultado['en_mora']} en mora "
+          f"({time.perf_counter() - inicio:.1f} s)")
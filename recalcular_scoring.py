@@ -0,0 +1,27 @@
+"""
+Recálculo masivo del scoring crediticio: score_crediticio, nivel_riesgo y
+limite_credito_sugerido de todos los clientes, con su historial (calculado_por
+RECALCULO_MASIVO) y las alertas para el dueño (ver app/scoring.py)
+- Sin argumentos: cuotas vencidas a hoy
+- Con una fecha AAAA-MM-DD: calcula como si fuera ese día
+
+Programar una vez al día después de recalcular_mora.py (ej. Heroku Scheduler):
+    python recalcular_scoring.py
+Variables: SCORING_LOTE (5000) clientes por tramo.
+"""
+import os
+import sys
+import time
+from datetime import datetime
+from app import create_app
+from app.scoring import calcular_scoring, LOTE
+
+app = create_app()
+
+with app.app_context():
+    fecha = datetime.strptime(sys.argv[1], '%Y-%m-%d').date() if len(sys.argv) > 1 else None
+    print(f"🔄 Recalculando scoring{f' al {fecha}' if fecha else ''}...")
+    inicio = time.perf_counter()
+    resultado = calcular_scoring(fecha=fecha, lote=int(os.environ.get('SCORING_LOTE', LOTE)))
+    print(f"✅ {resultado['calculados']} clientes, {resultado['actualizados']} con cambios, "
+          f"{resultado['alertas']} alertas nuevas ({time.perf_counter() - inicio:.1f} s)")
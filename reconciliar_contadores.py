@@ -0,0 +1,20 @@
+"""
+Script para reconstruir los contadores desnormalizados de rutas y usuarios
+(las columnas las crea la migración 0002: flask db upgrade)
+- Recalcula préstamos activos, cartera, número de cobros y total cobrado
+  desde préstamos y pagos
+
+Ejecutar después de desplegar y cada vez que se sospeche un descuadre:
+    python reconciliar_contadores.py
+"""
+from app import create_app
+from app.models import db
+from app.contadores import reconciliar_contadores
+
+app = create_app()
+
+with app.app_context():
+    print("🔄 Reconciliando contadores...")
+    corregidos = reconciliar_contadores()
+    db.session.commit()
+    print(f"✅ Reconciliación completada! {corregidos} registros corregidos")
@@ -48,7 +48,8 @@ def test_payment_confirmation():
         cliente_email="graciano90210@gmail.com",  # Cambiar por tu email
         cliente_nombre="Juan Pérez",
         monto=500.00,
-        fecha="2025-12-22"
+        fecha="2025-12-22",
+        encolar=False  # Enviar ya, sin pasar por la bandeja de salida
     )
     
     if success:
@@ -65,7 +66,8 @@ def test_payment_reminder():
         cliente_email="graciano90210@gmail.com",  # Cambiar por tu email
         cliente_nombre="María López",
         monto_pendiente=250.00,
-        fecha_vencimiento="2025-12-25"
+        fecha_vencimiento="2025-12-25",
+        encolar=False  # Enviar ya, sin pasar por la bandeja de salida
     )
     
     if success:
@@ -83,7 +85,8 @@ def test_loan_notification():
         cliente_nombre="Carlos Ramírez",
         monto=10000.00,
         cuotas=24,
-        cuota_valor=500.00
+        cuota_valor=500.00,
+        encolar=False  # Enviar ya, sin pasar por la bandeja de salida
     )
     
     if success:
@@ -0,0 +1,122 @@
+"""
+Tests del servicio de subida de fotos de evidencia
+"""
+import pytest
+import sys
+import os
+import threading
+from io import BytesIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.models import db, Usuario, Transaccion
+from app.almacenamiento import (ServicioSubidas, AlmacenMemoria, AlmacenLocal, AlmacenS3,
+                                servicio_subidas, SUBIDO, LOCAL, ERROR, MB)
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria y fotos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'ALMACENAMIENTO': 'memoria'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+class AlmacenQueFalla(AlmacenMemoria):
+    """Simula un S3 caído"""
+
+    def subir(self, clave, archivo, content_type):
+        raise ConnectionError('S3 no responde')
+
+    def url(self, clave):
+        return f"https://bucket.s3.us-east-1.amazonaws.com/{clave}"
+
+
+class ClienteS3Falso:
+    """Registra las llamadas a upload_fileobj como lo haría moto"""
+
+    def __init__(self):
+        self.subidos = {}
+
+    def upload_fileobj(self, archivo, bucket, clave, ExtraArgs=None, Config=None):
+        self.subidos[(bucket, clave)] = (archivo.read(), ExtraArgs, Config)
+
+
+def test_gasto_con_foto_responde_antes_de_subir(app):
+    usuario = Usuario(nombre='Dueño', usuario='dueno', password='x', rol='dueno')
+    db.session.add(usuario)
+    db.session.commit()
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['usuario_id'] = usuario.id
+        sesion['rol'] = 'dueno'
+
+    # La subida queda bloqueada hasta después de la respuesta
+    subidas = servicio_subidas()
+    liberar = threading.Event()
+    subir = subidas.almacen.subir
+    subidas.almacen.subir = lambda *args: liberar.wait(5) and subir(*args)
+
+    respuesta = cliente.post('/caja/gastos/guardar', data={
+        'concepto': 'Gasolina', 'descripcion': '', 'monto': '20000', 'fecha': '2026-10-14',
+        'recibo': (BytesIO(b'foto' * 1000), 'factura.jpg', 'image/jpeg')
+    }, content_type='multipart/form-data')
+    assert respuesta.status_code == 302
+
+    gasto = Transaccion.query.one()
+    clave = gasto.foto_evidencia.removeprefix('memoria://')
+    assert subidas.estado(clave) == 'PENDIENTE'
+
+    liberar.set()
+    subidas.esperar(timeout=5)
+    assert subidas.estado(clave) == SUBIDO
+    assert subidas.almacen.archivos[clave] == (b'foto' * 1000, 'image/jpeg')
+
+
+def test_s3_caido_queda_en_local_y_corrige_la_url(app, tmp_path):
+    usuario = Usuario(nombre='Dueño', usuario='dueno', password='x', rol='dueno')
+    db.session.add(usuario)
+    db.session.flush()
+    servicio = ServicioSubidas(AlmacenQueFalla(), respaldo=AlmacenLocal(str(tmp_path), 'uploads/recibos'),
+                               reintentos=2, espera=0)
+    url = servicio.url('gasto.jpg')
+    db.session.add(Transaccion(naturaleza='EGRESO', concepto='Gasolina', monto=1,
+                               usuario_origen_id=usuario.id, foto_evidencia=url))
+    db.session.commit()
+
+    servicio.encolar('gasto.jpg', BytesIO(b'foto'), 'image/jpeg', app)
+    servicio.esperar(timeout=5)
+
+    assert servicio.estado('gasto.jpg') == LOCAL
+    assert (tmp_path / 'gasto.jpg').read_bytes() == b'foto'
+    db.session.expire_all()
+    assert Transaccion.query.one().foto_evidencia == 'uploads/recibos/gasto.jpg'
+
+
+def test_sin_respaldo_queda_en_error():
+    servicio = ServicioSubidas(AlmacenQueFalla(), reintentos=1)
+    servicio.encolar('gasto.jpg', BytesIO(b'foto'), 'image/jpeg')
+    servicio.esperar(timeout=5)
+    assert servicio.estado('gasto.jpg') == ERROR
+
+
+def test_almacen_s3_multipart_y_url():
+    pytest.importorskip('boto3')
+    cliente = ClienteS3Falso()
+    s3 = AlmacenS3('evidencias', 'sa-east-1', cliente=cliente, umbral_multipart=5 * MB)
+    servicio = ServicioSubidas(s3)
+
+    url = servicio.encolar('gasto.jpg', BytesIO(b'x' * (2 * MB)), 'image/jpeg')
+    servicio.esperar(timeout=5)
+
+    assert url == 'https://evidencias.s3.sa-east-1.amazonaws.com/gasto.jpg'
+    contenido, extra, config = cliente.subidos[('evidencias', 'gasto.jpg')]
+    assert len(contenido) == 2 * MB  # El temporal pasó a disco y se leyó completo
+    assert extra['ContentType'] == 'image/jpeg'
+    assert config.multipart_threshold == 5 * MB
+    assert AlmacenS3('evidencias', cliente=cliente, endpoint='http://localhost:9000/').url('a.jpg') == \
+        'http://localhost:9000/evidencias/a.jpg'
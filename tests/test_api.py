@@ -4,11 +4,16 @@ Tests básicos para la API de DIAMANTE PRO
 import pytest
 import sys
 import os
+from datetime import date, datetime
 
 # Agregar el directorio raíz al path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from flask_jwt_extended import create_access_token
 from app import create_app
+from app.models import db, Usuario, Ruta, Cliente, Prestamo
+from app.cuotas import crear_plan_cuotas
+from app.pagos import aplicar_pago
 
 
 @pytest.fixture
@@ -51,3 +56,62 @@ def test_api_login_exists(client):
     # Debe retornar 200 (success), 401 (unauthorized) o 400 (bad request)
     # No debe ser 404 (not found)
     assert response.status_code != 404
+
+
+@pytest.fixture
+def app_bd():
+    """Aplicación con base de datos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def crear_prestamos(planes):
+    """Cobrador en Colombia con un préstamo SEMANAL de 120 en 4 cuotas desde el 5/10/2026 por cada plan (False: sin plan)"""
+    cobrador = Usuario(nombre='Cobrador', usuario='cob', password='x', rol='cobrador')
+    db.session.add(cobrador)
+    db.session.flush()
+    ruta = Ruta(nombre='Ruta Centro', cobrador_id=cobrador.id, pais='Colombia')
+    db.session.add(ruta)
+    db.session.flush()
+    prestamos = []
+    for i, plan in enumerate(planes):
+        cliente = Cliente(nombre=f'Cliente {i}', documento=f'{i}', telefono='300')
+        db.session.add(cliente)
+        db.session.flush()
+        prestamo = Prestamo(cliente_id=cliente.id, ruta_id=ruta.id, cobrador_id=cobrador.id,
+                            monto_prestado=100, monto_a_pagar=120, saldo_actual=120, valor_cuota=30,
+                            frecuencia='SEMANAL', numero_cuotas=4, cuotas_pagadas=0, cuotas_atrasadas=0,
+                            fecha_inicio=datetime(2026, 10, 5))
+        db.session.add(prestamo)
+        if plan:
+            crear_plan_cuotas(prestamo)
+        prestamos.append(prestamo)
+    db.session.commit()
+    return prestamos
+
+
+def test_api_prestamos_ordena_y_filtra_por_dias_de_atraso(app_bd, monkeypatch):
+    import app.api as api
+
+    al_dia, atrasado, muy_atrasado, sin_plan = crear_prestamos([True, True, True, False])
+    aplicar_pago(al_dia, al_dia.cobrador_id, 60)
+    aplicar_pago(atrasado, atrasado.cobrador_id, 30)
+    db.session.commit()
+    # El 21 de octubre vencieron las cuotas del 13 (festivo el 12) y del 19
+    monkeypatch.setattr(api, 'hoy_en', lambda zona=None: date(2026, 10, 21))
+    cliente = app_bd.test_client()
+    cabeceras = {'Authorization': f'Bearer {create_access_token(identity=str(al_dia.cobrador_id))}'}
+
+    # Sin plan no se sabe el atraso: null (no "al día") y al final
+    peores = cliente.get('/api/v1/cobrador/prestamos?orden=dias_atraso', headers=cabeceras).get_json()
+    assert [(p['id'], p['dias_atraso']) for p in peores] == [
+        (muy_atrasado.id, 8), (atrasado.id, 2), (al_dia.id, 0), (sin_plan.id, None)]
+
+    atrasados = cliente.get('/api/v1/cobrador/prestamos?dias_atraso_min=1&dias_atraso_max=5', headers=cabeceras)
+    assert [p['id'] for p in atrasados.get_json()] == [atrasado.id]
+    al_dia_solo = cliente.get('/api/v1/cobrador/prestamos?dias_atraso_max=0', headers=cabeceras)
+    assert [p['id'] for p in al_dia_solo.get_json()] == [al_dia.id]
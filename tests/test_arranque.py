@@ -0,0 +1,22 @@
+"""
+Presupuesto de arranque de create_app() (python -X importtime)
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench.tiempo_arranque import medir_arranque, PRESUPUESTO_MS
+
+
+def test_arranque_sin_dependencias_pesadas_y_en_presupuesto():
+    resultado = medir_arranque()
+    assert resultado['pesados'] == []
+    assert resultado['total_ms'] <= PRESUPUESTO_MS
+
+
+def test_modo_api_solo_registra_la_api():
+    from app import create_app
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'APP_MODO': 'api'})
+    blueprints = {regla.endpoint.split('.')[0] for regla in app.url_map.iter_rules()}
+    assert blueprints == {'api', 'capital_api', 'estado', 'static'}
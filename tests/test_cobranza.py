@@ -0,0 +1,86 @@
+"""
+Tests del motor de cobranza diaria (préstamos pendientes de pago)
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.models import db, Usuario, Ruta, Cliente, Prestamo, Pago
+from app.cobranza import prestamos_pendientes
+from bench.contador_consultas import contar_consultas
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def crear_prestamos(n, frecuencia='DIARIO'):
+    """Crea un cobrador con su ruta y n préstamos activos"""
+    cobrador = Usuario(nombre='Cobrador', usuario=f'cob_{frecuencia}_{n}', password='x', rol='cobrador')
+    db.session.add(cobrador)
+    db.session.flush()
+    ruta = Ruta(nombre='Ruta Centro', cobrador_id=cobrador.id)
+    db.session.add(ruta)
+    db.session.flush()
+    prestamos = []
+    for i in range(n):
+        cliente = Cliente(nombre=f'Cliente {i}', documento=f'{frecuencia}{n}{i}', telefono='300')
+        db.session.add(cliente)
+        db.session.flush()
+        prestamo = Prestamo(cliente_id=cliente.id, ruta_id=ruta.id, cobrador_id=cobrador.id,
+                            monto_prestado=100, monto_a_pagar=120, saldo_actual=120, valor_cuota=5,
+                            frecuencia=frecuencia, numero_cuotas=24, cuotas_atrasadas=i % 3)
+        db.session.add(prestamo)
+        prestamos.append(prestamo)
+    db.session.commit()
+    return cobrador, prestamos
+
+
+def test_excluye_prestamos_que_pagaron_ese_dia(app):
+    cobrador, prestamos = crear_prestamos(3)
+    hoy = datetime.now()
+    db.session.add(Pago(prestamo_id=prestamos[0].id, cobrador_id=cobrador.id, monto=5,
+                        saldo_anterior=120, saldo_nuevo=115, fecha_pago=hoy))
+    # Un pago de ayer no cuenta para hoy
+    db.session.add(Pago(prestamo_id=prestamos[1].id, cobrador_id=cobrador.id, monto=5,
+                        saldo_anterior=120, saldo_nuevo=115, fecha_pago=hoy - timedelta(days=1)))
+    db.session.commit()
+
+    pendientes = prestamos_pendientes(hoy.date(), cobrador_id=cobrador.id)
+
+    assert {p.id for p in pendientes} == {prestamos[1].id, prestamos[2].id}
+    # Los más atrasados primero
+    assert pendientes[0].cuotas_atrasadas >= pendientes[-1].cuotas_atrasadas
+
+
+def test_filtra_por_frecuencia(app):
+    crear_prestamos(2, frecuencia='DIARIO')
+    crear_prestamos(2, frecuencia='SEMANAL')
+
+    pendientes = prestamos_pendientes(datetime.now().date(), frecuencias=['DIARIO', 'BISEMANAL'])
+
+    assert len(pendientes) == 2
+    assert all(p.frecuencia == 'DIARIO' for p in pendientes)
+
+
+def test_una_sola_consulta_con_cliente_precargado(app):
+    cobrador, _ = crear_prestamos(20)
+    cobrador_id = cobrador.id
+    db.session.expunge_all()
+
+    with contar_consultas(db.engine) as contador:
+        nombres = [p.cliente.nombre for p in prestamos_pendientes(datetime.now().date(), cobrador_id=cobrador_id)]
+
+    assert len(nombres) == 20
+    assert contador['consultas'] == 1
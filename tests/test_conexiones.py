@@ -0,0 +1,71 @@
+"""
+Tests de la configuración del pool de conexiones y sus métricas
+"""
+import pytest
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, exc, text
+
+from app import create_app
+from app.models import db
+from app.conexiones import PoolMedido, opciones_motor, metricas_pool
+
+
+def test_opciones_desde_variables_de_entorno():
+    opciones = opciones_motor('postgresql://u:p@host/db', {
+        'DB_POOL_SIZE': '3', 'DB_MAX_OVERFLOW': '0', 'DB_POOL_PRE_PING': 'false', 'DB_STATEMENT_TIMEOUT_MS': '5000'
+    })
+    assert opciones['poolclass'] is PoolMedido
+    assert (opciones['pool_size'], opciones['max_overflow'], opciones['pool_pre_ping']) == (3, 0, False)
+    assert opciones['pool_recycle'] == 1800
+    assert opciones['connect_args'] == {'options': '-c statement_timeout=5000'}
+
+    # Sin la variable (migraciones, scripts por lotes) no hay límite por sentencia
+    assert 'connect_args' not in opciones_motor('postgresql://h/db', {'DB_STATEMENT_TIMEOUT_MS': '0'})
+    assert 'connect_args' not in opciones_motor('postgresql://h/db', {})
+    assert opciones_motor('sqlite:///diamante.db', {}) == {}
+
+
+def test_pool_medido_registra_uso_y_agotamiento(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=PoolMedido,
+                           pool_size=1, max_overflow=0, pool_timeout=0.2)
+    conexion = engine.connect()
+    metricas = metricas_pool(engine)
+    assert (metricas['tamano'], metricas['en_uso'], metricas['overflow']) == (1, 1, 0)
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    metricas = metricas_pool(engine)
+    assert metricas['agotado'] == 1
+    assert metricas['espera_maxima_ms'] >= 200
+
+    # Al liberarse la conexión, quien espera la obtiene
+    hilo = threading.Timer(0.05, conexion.close)
+    hilo.start()
+    with engine.connect() as otra:
+        otra.execute(text('SELECT 1'))
+    hilo.join()
+    assert metricas_pool(engine)['obtenidas'] == 3
+    engine.dispose()
+
+
+def test_endpoint_pool_solo_para_dueno_o_token(tmp_path, monkeypatch):
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}",
+                      'SQLALCHEMY_ENGINE_OPTIONS': {'poolclass': PoolMedido, 'pool_size': 2}})
+    cliente = app.test_client()
+    assert cliente.get('/estado/pool').status_code == 403
+
+    monkeypatch.setenv('METRICAS_TOKEN', 'secreto')
+    respuesta = cliente.get('/estado/pool', headers={'X-Metricas-Token': 'secreto'})
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['tamano'] == 2
+
+    with cliente.session_transaction() as sesion:
+        sesion['rol'] = 'dueno'
+    assert cliente.get('/estado/pool').get_json()['pool'] == 'PoolMedido'
+    with app.app_context():
+        db.engine.dispose()
@@ -0,0 +1,129 @@
+"""
+Tests del número de consultas de las listas: no debe crecer con las filas
+
+Cada lista se pide con una base de N filas y con otra de 2N; si una relación
+se carga perezosamente por fila (pago.prestamo.cliente, activo.ruta, ...), el
+número de consultas crece y el test falla con el endpoint culpable.
+"""
+import pytest
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.models import (db, Usuario, Sociedad, Ruta, Cliente, Prestamo, Pago, Transaccion, Activo,
+                        AporteCapital)
+from bench.contador_consultas import contar_consultas
+
+LISTAS = [
+    ('dueno', '/prestamos'),
+    ('dueno', '/clientes'),
+    ('dueno', '/rutas'),
+    ('dueno', '/usuarios'),
+    ('dueno', '/caja/gastos'),
+    ('dueno', '/caja/cuadre'),
+    ('dueno', '/traslados'),
+    ('dueno', '/sociedades'),
+    ('dueno', '/capital/aportes'),
+    ('dueno', '/activos'),
+    ('dueno', '/reportes'),
+    ('dueno', '/dashboard'),
+    ('cobrador', '/prestamos'),
+    ('cobrador', '/clientes'),
+    ('cobrador', '/cobro/lista'),
+    ('cobrador', '/caja/cuadre'),
+    ('cobrador', '/reportes'),
+    ('api', '/api/v1/cobrador/prestamos'),
+    ('api', '/api/v1/cobrador/clientes'),
+    ('api', '/api/v1/cobrador/ruta-cobro'),
+    ('api', '/api/v1/sync'),
+]
+
+
+def sembrar(n):
+    """n rutas, cada una con su cobrador, sociedad, cliente, préstamo, pago, gasto, traslado, activo y aporte"""
+    ahora = datetime.now()
+    dueno = Usuario(nombre='Dueño', usuario='dueno', password='x', rol='dueno')
+    principal = Usuario(nombre='Principal', usuario='principal', password='x', rol='cobrador')
+    db.session.add_all([dueno, principal])
+    db.session.flush()
+    ruta_principal = Ruta(nombre='Ruta Principal', cobrador_id=principal.id)
+    db.session.add(ruta_principal)
+
+    for i in range(n):
+        # Relaciones distintas en cada fila: la carga perezosa no se salva con el identity map
+        cobrador = Usuario(nombre=f'Cobrador {i}', usuario=f'cobrador{i}', password='x', rol='cobrador')
+        sociedad = Sociedad(nombre=f'Sociedad {i}', nombre_socio=f'Socio {i}')
+        db.session.add_all([cobrador, sociedad])
+        db.session.flush()
+        ruta = Ruta(nombre=f'Ruta {i}', cobrador_id=cobrador.id, sociedad_id=sociedad.id)
+        db.session.add(ruta)
+        db.session.flush()
+
+        # Un préstamo en la ruta de su cobrador y otro en la del cobrador principal
+        for ruta_prestamo, cobrador_id in ((ruta, cobrador.id), (ruta_principal, principal.id)):
+            cliente = Cliente(nombre=f'Cliente {i}-{cobrador_id}', documento=f'{i}-{cobrador_id}', telefono='300')
+            db.session.add(cliente)
+            db.session.flush()
+            prestamo = Prestamo(cliente_id=cliente.id, ruta_id=ruta_prestamo.id, cobrador_id=cobrador_id,
+                                monto_prestado=100, monto_a_pagar=120, saldo_actual=110, valor_cuota=10,
+                                frecuencia='DIARIO', numero_cuotas=12, fecha_inicio=ahora)
+            db.session.add(prestamo)
+            db.session.flush()
+            db.session.add(Pago(prestamo_id=prestamo.id, cobrador_id=cobrador_id, monto=10, saldo_anterior=120,
+                                saldo_nuevo=110, fecha_pago=ahora))
+
+        db.session.add_all([
+            Transaccion(naturaleza='EGRESO', concepto='GASOLINA', descripcion='Tanqueo', monto=5,
+                        usuario_origen_id=cobrador.id, fecha=ahora),
+            Transaccion(naturaleza='TRASLADO', concepto='TRASLADO', descripcion='Base', monto=50,
+                        usuario_origen_id=dueno.id, usuario_destino_id=cobrador.id, fecha=ahora),
+            Activo(nombre=f'Moto {i}', categoria='VEHICULO', valor_compra=1000, sociedad_id=sociedad.id,
+                   ruta_id=ruta.id, usuario_responsable_id=cobrador.id, registrado_por_id=dueno.id),
+            AporteCapital(sociedad_id=sociedad.id, nombre_aportante=f'Socio {i}', monto=500,
+                          registrado_por_id=dueno.id),
+        ])
+    db.session.commit()
+    return dueno.id, principal.id
+
+
+def consultas_por_lista(n):
+    """Número de consultas de cada lista con n filas"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'RECIBOS_CACHE': 'memoria'})
+    consultas = {}
+    with app.app_context():
+        db.create_all()
+        dueno_id, principal_id = sembrar(n)
+        token = create_access_token(identity=str(principal_id))
+
+        for rol, usuario_id in (('dueno', dueno_id), ('cobrador', principal_id), ('api', None)):
+            cliente = app.test_client()
+            if usuario_id:
+                with cliente.session_transaction() as sesion:
+                    sesion.update(usuario_id=usuario_id, rol=rol, nombre=rol)
+            for rol_lista, url in LISTAS:
+                if rol_lista != rol:
+                    continue
+                db.session.expunge_all()
+                with contar_consultas(db.engine) as contador:
+                    respuesta = cliente.get(url, headers={'Authorization': f'Bearer {token}'} if rol == 'api' else {})
+                assert respuesta.status_code == 200, url
+                consultas[(rol, url)] = contador['consultas']
+        db.session.remove()
+    return consultas
+
+
+@pytest.fixture(scope='module')
+def consultas():
+    return consultas_por_lista(3), consultas_por_lista(6)
+
+
+@pytest.mark.parametrize('rol,url', LISTAS)
+def test_consultas_no_crecen_con_las_filas(consultas, rol, url):
+    pocas, muchas = consultas
+    assert muchas[(rol, url)] == pocas[(rol, url)], \
+        f"{url} ({rol}): {pocas[(rol, url)]} consultas con 3 filas y {muchas[(rol, url)]} con 6"
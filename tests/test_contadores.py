@@ -0,0 +1,78 @@
+"""
+Tests de los contadores desnormalizados de rutas y usuarios
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.models import db, Usuario, Ruta, Cliente, Prestamo
+from app.contadores import reconciliar_contadores
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def ruta(app):
+    cobrador = Usuario(nombre='Cobrador', usuario='cob', password='x', rol='cobrador')
+    db.session.add(cobrador)
+    db.session.flush()
+    ruta = Ruta(nombre='Ruta Centro', cobrador_id=cobrador.id)
+    db.session.add_all([ruta, Cliente(nombre='Cliente 1', documento='1', telefono='300'),
+                        Cliente(nombre='Cliente 2', documento='2', telefono='300')])
+    db.session.commit()
+    return ruta
+
+
+def test_contadores_se_mantienen_en_prestamos_y_pagos(client, ruta):
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(ruta.cobrador_id))}'}
+    ids = []
+    for cliente_id in (1, 2):
+        respuesta = client.post('/api/v1/cobrador/prestamos', headers=headers, json={
+            'cliente_id': cliente_id, 'monto': 100, 'interes': 20, 'cuotas': 12,
+            'frecuencia': 'DIARIO', 'ruta_id': ruta.id})
+        ids.append(respuesta.get_json()['id'])
+
+    client.post('/api/v1/cobrador/registrar-pago', headers=headers, json={'prestamo_id': ids[0], 'monto': 10})
+    client.post('/api/v1/cobrador/pagos-lote', headers=headers, json={'pagos': [
+        {'clave': 'a', 'prestamo_id': ids[0], 'monto': 10},
+        {'clave': 'b', 'prestamo_id': ids[1], 'monto': 120},  # Liquida el préstamo
+    ]})
+
+    db.session.expire_all()
+    ruta = db.session.get(Ruta, ruta.id)
+    assert (ruta.prestamos_activos, ruta.cartera) == (1, 100)
+    assert (ruta.num_cobros, ruta.total_cobrado) == (3, 140)
+    cobrador = db.session.get(Usuario, ruta.cobrador_id)
+    assert (cobrador.num_cobros, cobrador.total_cobrado) == (3, 140)
+
+    # Los contadores incrementales coinciden con la reconstrucción desde cero
+    assert reconciliar_contadores() == 0
+
+
+def test_reconciliar_corrige_contadores_descuadrados(ruta):
+    db.session.add(Prestamo(cliente_id=1, ruta_id=ruta.id, cobrador_id=ruta.cobrador_id,
+                            monto_prestado=100, monto_a_pagar=120, saldo_actual=120, valor_cuota=10,
+                            numero_cuotas=12))
+    db.session.commit()
+
+    assert reconciliar_contadores() == 1
+    db.session.commit()
+    assert (db.session.get(Ruta, ruta.id).prestamos_activos, db.session.get(Ruta, ruta.id).cartera) == (1, 120)
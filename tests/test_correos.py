@@ -0,0 +1,81 @@
+"""
+Tests de la bandeja de salida de correos con el transporte falso
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.models import db, CorreoPendiente
+from app.email_service import EmailService, TransporteFalso, LimiteEnvios, MAX_INTENTOS
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def servicio(fallas=0):
+    servicio = EmailService(TransporteFalso(fallas))
+    servicio.limite = LimiteEnvios(0)
+    return servicio
+
+
+def test_confirmacion_se_encola_y_el_worker_la_envia(app):
+    correos = servicio()
+    assert correos.send_payment_confirmation('ana@correo.com', 'Ana', 10000, '2026-10-14')
+    db.session.commit()
+    assert correos.transporte.enviados == []  # Nada sale dentro del request
+
+    assert correos.drain_outbox() == {'enviados': 1, 'reintentos': 0, 'errores': 0}
+    enviado = correos.transporte.enviados[0]
+    assert enviado['destinatarios'] == ['ana@correo.com']
+    assert 'Ana' in enviado['html']
+    correo = CorreoPendiente.query.one()
+    assert correo.estado == 'ENVIADO' and correo.fecha_envio is not None
+
+
+def test_mismo_contenido_va_en_un_solo_llamado(app):
+    correos = servicio()
+    for i in range(3):
+        correos.queue_email(f'cliente{i}@correo.com', 'Aviso', '<p>Oficina cerrada el lunes</p>')
+    correos.queue_email('otro@correo.com', 'Otro aviso', '<p>Hola</p>')
+    db.session.commit()
+
+    assert correos.drain_outbox()['enviados'] == 4
+    assert sorted(len(e['destinatarios']) for e in correos.transporte.enviados) == [1, 3]
+
+
+def test_reintento_con_espera_y_error_final(app):
+    correos = servicio(fallas=MAX_INTENTOS)
+    correos.queue_email('ana@correo.com', 'Aviso', '<p>Hola</p>')
+    db.session.commit()
+
+    assert correos.drain_outbox()['reintentos'] == 1
+    correo = CorreoPendiente.query.one()
+    assert correo.intentos == 1 and correo.ultimo_error == 'Falla simulada'
+    assert correo.proximo_intento > datetime.utcnow() + timedelta(seconds=30)
+    assert correos.drain_outbox() == {'enviados': 0, 'reintentos': 0, 'errores': 0}  # Aún no es su turno
+
+    for _ in range(MAX_INTENTOS - 1):
+        correo.proximo_intento = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        correos.drain_outbox()
+    assert correo.estado == 'ERROR'
+    assert correos.transporte.enviados == []
+
+
+def test_correo_no_se_guarda_si_la_operacion_falla(app):
+    correos = servicio()
+    correos.queue_email('ana@correo.com', 'Aviso', '<p>Hola</p>')
+    db.session.rollback()
+    assert CorreoPendiente.query.count() == 0
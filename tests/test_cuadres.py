@@ -0,0 +1,131 @@
+"""
+Tests de los cuadres de ruta en PDF y su cola en segundo plano
+"""
+import pytest
+import sys
+import os
+import zipfile
+from io import BytesIO
+from datetime import datetime, date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.models import db, Usuario, Ruta, Cliente, Prestamo, Pago
+from app.artefactos import CacheMemoria
+from app.cuadres import datos_cuadre, ColaPDF, cola_pdf
+
+DIA = date(2026, 10, 14)
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria; los PDF se generan en hilos"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+                      'RECIBOS_CACHE': 'memoria', 'PDF_PROCESOS': 0})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def crear_cobrador(nombre):
+    cobrador = Usuario(nombre=nombre, usuario=nombre.lower(), password='x', rol='cobrador')
+    db.session.add(cobrador)
+    db.session.flush()
+    ruta = Ruta(nombre=f'Ruta {nombre}', cobrador_id=cobrador.id, pais='')
+    cliente = Cliente(nombre=f'Cliente {nombre}', documento=nombre, telefono='300')
+    db.session.add_all([ruta, cliente])
+    db.session.flush()
+    prestamo = Prestamo(cliente_id=cliente.id, ruta_id=ruta.id, cobrador_id=cobrador.id,
+                        monto_prestado=100, monto_a_pagar=120, saldo_actual=120, valor_cuota=10,
+                        frecuencia='DIARIO', numero_cuotas=12, fecha_inicio=datetime(2026, 10, 14, 8))
+    db.session.add(prestamo)
+    db.session.flush()
+    db.session.add(Pago(prestamo_id=prestamo.id, cobrador_id=cobrador.id, monto=10, saldo_anterior=120,
+                        saldo_nuevo=110, fecha_pago=datetime(2026, 10, 14, 15)))
+    db.session.commit()
+    return cobrador
+
+
+def iniciar_sesion(app):
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['usuario_id'] = 1
+        sesion['rol'] = 'dueno'
+    return cliente
+
+
+def test_datos_cuadre(app):
+    cobrador = crear_cobrador('Ana')
+    datos = datos_cuadre(cobrador, DIA)
+    assert datos['total_abonos'] == 10
+    assert datos['total_desembolsos'] == 100
+    assert datos['total_caja'] == -90
+    assert datos['creditos'] == [{'cliente': 'Cliente Ana', 'celular': '300', 'valor': 100.0}]
+    assert datos['clientes_sin_pago'] == []
+
+
+def test_cuadre_en_cola_y_descarga(app):
+    cobrador = crear_cobrador('Ana')
+    cliente = iniciar_sesion(app)
+
+    respuesta = cliente.post('/reporte/cuadre-pdf/trabajos', data={'cobrador_id': cobrador.id, 'fecha': '2026-10-14'})
+    assert respuesta.status_code == 202
+    trabajo = respuesta.get_json()
+
+    assert cola_pdf().esperar(trabajo['id'], timeout=30)['estado'] == 'LISTO'
+    estado = cliente.get(trabajo['url_estado']).get_json()
+    descarga = cliente.get(estado['url_descarga'])
+    assert descarga.mimetype == 'application/pdf'
+    assert descarga.data.startswith(b'%PDF')
+
+
+def test_lote_de_todos_los_cobradores_en_zip(app):
+    for nombre in ('Ana', 'Beto', 'Carla'):
+        crear_cobrador(nombre)
+    cliente = iniciar_sesion(app)
+
+    trabajo = cliente.post('/reporte/cuadre-pdf/lote', data={'fecha': '2026-10-14'}).get_json()
+    assert trabajo['total'] == 3
+    cola_pdf().esperar(trabajo['id'], timeout=30)
+
+    descarga = cliente.get(f"/reporte/trabajos/{trabajo['id']}/descargar")
+    assert descarga.mimetype == 'application/zip'
+    with zipfile.ZipFile(BytesIO(descarga.data)) as archivo:
+        nombres = archivo.namelist()
+        assert len(nombres) == 3
+        assert all(archivo.read(n).startswith(b'%PDF') for n in nombres)
+
+
+def test_pool_de_procesos(app):
+    cobrador = crear_cobrador('Ana')
+    cola = ColaPDF(CacheMemoria(10 * 1024 * 1024), procesos=1)
+    trabajo_id = cola.encolar_cuadre(datos_cuadre(cobrador, DIA))
+
+    assert cola.esperar(trabajo_id, timeout=60)['estado'] == 'LISTO'
+    assert cola.contenido(trabajo_id).startswith(b'%PDF')
+
+
+def test_cola_externa_la_genera_el_proceso_pdf(app):
+    from app.models import TrabajoPDF
+    for nombre in ('Ana', 'Beto'):
+        crear_cobrador(nombre)
+    app.config['PDF_COLA'] = 'worker'
+    cliente = iniciar_sesion(app)
+
+    # El proceso web solo registra el trabajo
+    trabajo = cliente.post('/reporte/cuadre-pdf/lote', data={'fecha': '2026-10-14'}).get_json()
+    assert trabajo['estado'] == 'PENDIENTE'
+    assert TrabajoPDF.query.get(trabajo['id']).estado == 'PENDIENTE'
+
+    # procesar_pdfs.py: otra cola sobre el mismo almacén
+    worker = ColaPDF(cola_pdf().almacen, procesos=0, externa=True)
+    assert worker.procesar_pendiente()['estado'] == 'LISTO'
+    assert worker.procesar_pendiente() is None
+
+    assert TrabajoPDF.query.get(trabajo['id']).estado == 'LISTO'
+    descarga = cliente.get(cliente.get(trabajo['url_estado']).get_json()['url_descarga'])
+    with zipfile.ZipFile(BytesIO(descarga.data)) as archivo:
+        assert len(archivo.namelist()) == 2
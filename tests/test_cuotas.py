@@ -0,0 +1,141 @@
+"""
+Tests del plan de cuotas: fechas de vencimiento, festivos y consultas sobre la tabla cuotas
+"""
+import pytest
+import sys
+import os
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.models import db, Usuario, Ruta, Cliente, Prestamo, Cuota
+from app.calendario import festivos, domingo_de_pascua
+from app.cuotas import fechas_de_vencimiento, crear_plan_cuotas, consulta_vencidas, generar_planes_faltantes
+from app.cobranza import prestamos_pendientes
+from app.metricas import metricas_dashboard
+from app.pagos import aplicar_pago
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def crear_prestamo(frecuencia, fecha_inicio, numero_cuotas=4):
+    """Préstamo de 120 en una ruta de Colombia, con su plan de cuotas"""
+    cobrador = Usuario(nombre='Cobrador', usuario=f'cob_{frecuencia}', password='x', rol='cobrador')
+    db.session.add(cobrador)
+    db.session.flush()
+    ruta = Ruta(nombre='Ruta Centro', cobrador_id=cobrador.id, pais='Colombia')
+    cliente = Cliente(nombre='Cliente', documento=f'doc_{frecuencia}', telefono='300')
+    db.session.add_all([ruta, cliente])
+    db.session.flush()
+    prestamo = Prestamo(cliente_id=cliente.id, ruta_id=ruta.id, cobrador_id=cobrador.id,
+                        monto_prestado=100, monto_a_pagar=120, saldo_actual=120,
+                        valor_cuota=120 / numero_cuotas, frecuencia=frecuencia, numero_cuotas=numero_cuotas,
+                        fecha_inicio=datetime.combine(fecha_inicio, datetime.min.time()))
+    db.session.add(prestamo)
+    crear_plan_cuotas(prestamo)
+    db.session.commit()
+    return prestamo
+
+
+def test_festivos_de_colombia_y_pascua():
+    assert domingo_de_pascua(2026) == date(2026, 4, 5)
+    colombia = festivos('Colombia', 2025)
+    # San Pedro (domingo 29 de junio) pasa al lunes; Jueves y Viernes Santo
+    assert {date(2025, 6, 30), date(2025, 4, 17), date(2025, 4, 18), date(2025, 11, 17)} <= colombia
+    assert date(2025, 6, 29) not in colombia
+    # Carnaval en Brasil
+    assert {date(2026, 2, 16), date(2026, 2, 17)} <= festivos('Brasil', 2026)
+    assert festivos('Marte', 2026) == frozenset()
+
+
+@pytest.mark.parametrize('frecuencia,inicio,esperadas', [
+    # Domingo 11 y lunes festivo 12 de octubre se saltan
+    ('DIARIO', date(2026, 10, 10), [date(2026, 10, 13), date(2026, 10, 14), date(2026, 10, 15)]),
+    ('DIARIO_LUNES_VIERNES', date(2026, 10, 15), [date(2026, 10, 16), date(2026, 10, 19), date(2026, 10, 20)]),
+    ('BISEMANAL', date(2026, 10, 14), [date(2026, 10, 17), date(2026, 10, 21), date(2026, 10, 24)]),
+    # El festivo pasa al siguiente día hábil
+    ('SEMANAL', date(2026, 10, 5), [date(2026, 10, 13), date(2026, 10, 19), date(2026, 10, 26)]),
+    ('MENSUAL', date(2026, 1, 31), [date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30)]),
+])
+def test_fechas_de_vencimiento(frecuencia, inicio, esperadas):
+    assert fechas_de_vencimiento(frecuencia, inicio, 3, 'Colombia') == esperadas
+
+
+def test_api_crea_el_plan_y_la_fecha_fin(app):
+    cobrador = Usuario(nombre='Cobrador', usuario='cob', password='x', rol='cobrador')
+    db.session.add(cobrador)
+    db.session.flush()
+    ruta = Ruta(nombre='Ruta', cobrador_id=cobrador.id, pais='Colombia')
+    cliente = Cliente(nombre='Cliente', documento='1', telefono='300')
+    db.session.add_all([ruta, cliente])
+    db.session.commit()
+
+    respuesta = app.test_client().post('/api/v1/cobrador/prestamos', json={
+        'cliente_id': cliente.id, 'monto': 100, 'interes': 20, 'cuotas': 7, 'frecuencia': 'DIARIO',
+        'ruta_id': ruta.id}, headers={'Authorization': f'Bearer {create_access_token(identity=str(cobrador.id))}'})
+    assert respuesta.status_code == 201
+
+    prestamo = db.session.get(Prestamo, respuesta.get_json()['id'])
+    assert [c.numero for c in prestamo.cuotas] == list(range(1, 8))
+    assert sum(c.monto for c in prestamo.cuotas) == pytest.approx(120)
+    assert all(c.fecha_vencimiento.weekday() != 6 for c in prestamo.cuotas)
+    assert prestamo.fecha_fin_estimada.date() == prestamo.cuotas[-1].fecha_vencimiento
+
+
+def test_pendientes_segun_vencimientos(app):
+    # SEMANAL desde el lunes 5: vence el martes 13 (festivo el 12), el 19, el 26 y el 2 de noviembre
+    prestamo = crear_prestamo('SEMANAL', date(2026, 10, 5))
+
+    assert prestamos_pendientes(date(2026, 10, 9)) == []
+    assert prestamos_pendientes(date(2026, 10, 13)) == [prestamo]
+    # Sigue pendiente mientras la cuota esté vencida sin pagar
+    assert prestamos_pendientes(date(2026, 10, 15)) == [prestamo]
+    assert consulta_vencidas(date(2026, 10, 15)).all() == [(prestamo.id, 1, 30, date(2026, 10, 13))]
+
+    aplicar_pago(prestamo, prestamo.cobrador_id, 30, fecha_pago=datetime(2026, 10, 15, 9))
+    db.session.commit()
+    assert [c.pagada for c in prestamo.cuotas] == [True, False, False, False]
+    assert prestamos_pendientes(date(2026, 10, 16)) == []
+    assert consulta_vencidas(date(2026, 10, 16)).all() == []
+
+
+def test_pago_parcial_no_marca_la_cuota(app):
+    prestamo = crear_prestamo('DIARIO', date(2026, 10, 13))
+    aplicar_pago(prestamo, prestamo.cobrador_id, 20)
+    aplicar_pago(prestamo, prestamo.cobrador_id, 50)
+    db.session.commit()
+    # 70 abonados con cuotas de 30: dos cuotas completas
+    assert Cuota.query.filter_by(prestamo_id=prestamo.id, pagada=True).count() == 2
+
+
+def test_dashboard_por_cobrar_hoy_y_manana_desde_el_plan(app):
+    # BISEMANAL desde el miércoles 14: vence el sábado 17 y el miércoles 21
+    crear_prestamo('BISEMANAL', date(2026, 10, 14))
+
+    viernes = metricas_dashboard(hoy=date(2026, 10, 16))
+    assert (viernes['por_cobrar_hoy'], viernes['proyeccion_manana']) == (0, 30)
+    sabado = metricas_dashboard(hoy=date(2026, 10, 17))
+    assert (sabado['por_cobrar_hoy'], sabado['proyeccion_manana']) == (30, 0)
+
+
+def test_planes_faltantes_de_prestamos_anteriores(app):
+    prestamo = crear_prestamo('DIARIO', date(2026, 10, 13))
+    Cuota.query.filter_by(prestamo_id=prestamo.id).delete()
+    prestamo.saldo_actual = 60  # Ya abonó dos cuotas de 30
+    db.session.commit()
+
+    assert generar_planes_faltantes(lote=1) == 1
+    assert [c.pagada for c in prestamo.cuotas] == [True, True, False, False]
+    assert generar_planes_faltantes() == 0
@@ -0,0 +1,165 @@
+"""
+Tests de los límites de día por zona horaria (país de la ruta)
+"""
+import pytest
+import sys
+import os
+import time
+from datetime import datetime, date, timedelta
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.models import db, Usuario, Ruta, Cliente, Prestamo, Pago, Transaccion
+from app.fechas import rango_del_dia, rango_de_fechas, zona_de_pais, zona_de_cobrador, a_hora_servidor
+from app.cobranza import prestamos_pendientes
+from app.snapshots import flujos_por_dia
+from app.cuadres import datos_cuadre
+
+BOGOTA = ZoneInfo('America/Bogota')
+SAO_PAULO = ZoneInfo('America/Sao_Paulo')
+DIA = date(2026, 10, 14)
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def crear_prestamo(pais, usuario):
+    cobrador = Usuario(nombre=usuario, usuario=usuario, password='x', rol='cobrador')
+    db.session.add(cobrador)
+    db.session.flush()
+    ruta = Ruta(nombre=f'Ruta {pais}', cobrador_id=cobrador.id, pais=pais)
+    cliente = Cliente(nombre=f'Cliente {pais}', documento=usuario, telefono='300')
+    db.session.add_all([ruta, cliente])
+    db.session.flush()
+    prestamo = Prestamo(cliente_id=cliente.id, ruta_id=ruta.id, cobrador_id=cobrador.id,
+                        monto_prestado=100, monto_a_pagar=120, saldo_actual=120, valor_cuota=10,
+                        frecuencia='DIARIO', numero_cuotas=12, fecha_inicio=datetime(2026, 9, 1, 12))
+    db.session.add(prestamo)
+    db.session.commit()
+    return prestamo
+
+
+def pagar(prestamo, momento_local):
+    """Registra un pago guardando el timestamp como lo hace la app (hora del servidor)"""
+    db.session.add(Pago(prestamo_id=prestamo.id, cobrador_id=prestamo.cobrador_id, monto=10,
+                        saldo_anterior=120, saldo_nuevo=110, fecha_pago=a_hora_servidor(momento_local)))
+    db.session.commit()
+
+
+def test_rango_del_dia_en_zona():
+    inicio, fin = rango_del_dia(DIA, BOGOTA)
+    assert inicio == a_hora_servidor(datetime(2026, 10, 14, tzinfo=BOGOTA))
+    assert fin - inicio == timedelta(days=1)
+    assert inicio.tzinfo is None
+
+    # Sin zona: el día del servidor
+    assert rango_del_dia(DIA) == (datetime(2026, 10, 14), datetime(2026, 10, 15))
+    assert rango_de_fechas(DIA, DIA + timedelta(days=2)) == (datetime(2026, 10, 14), datetime(2026, 10, 17))
+
+
+def test_zona_de_pais():
+    assert zona_de_pais('Colombia') == BOGOTA
+    assert zona_de_pais('Perú') == zona_de_pais('peru') == ZoneInfo('America/Lima')
+    assert zona_de_pais('Marte') is None
+    assert zona_de_pais(None) is None
+
+
+def test_pago_nocturno_cuenta_en_el_dia_de_la_ruta(app):
+    colombia = crear_prestamo('Colombia', 'cob_co')
+    brasil = crear_prestamo('Brasil', 'cob_br')
+    # 23:30 en Bogotá ya es el día siguiente en Brasil (y en UTC)
+    pagar(colombia, datetime(2026, 10, 14, 23, 30, tzinfo=BOGOTA))
+    pagar(brasil, datetime(2026, 10, 14, 23, 30, tzinfo=BOGOTA))
+
+    flujos = flujos_por_dia(DIA, DIA + timedelta(days=1), ruta_id=colombia.ruta_id, hoy=DIA + timedelta(days=2))
+    assert list(flujos) == [DIA]
+    flujos = flujos_por_dia(DIA, DIA + timedelta(days=1), ruta_id=brasil.ruta_id, hoy=DIA + timedelta(days=2))
+    assert list(flujos) == [DIA + timedelta(days=1)]
+
+    # Sin filtro de ruta, cada préstamo cae en el día de su país
+    flujos = flujos_por_dia(DIA, DIA + timedelta(days=1), hoy=DIA + timedelta(days=2))
+    assert flujos[DIA]['num_pagos'] == 1
+    assert flujos[DIA + timedelta(days=1)]['num_pagos'] == 1
+
+    zona = zona_de_cobrador(colombia.cobrador_id)
+    assert zona == BOGOTA
+    assert prestamos_pendientes(DIA, cobrador_id=colombia.cobrador_id, zona=zona) == []
+    assert prestamos_pendientes(DIA + timedelta(days=1), cobrador_id=colombia.cobrador_id, zona=zona) == [colombia]
+    assert prestamos_pendientes(DIA, cobrador_id=brasil.cobrador_id, zona=SAO_PAULO) == [brasil]
+
+
+@pytest.fixture
+def servidor_utc(monkeypatch):
+    """Servidor en UTC, como Heroku"""
+    monkeypatch.setenv('TZ', 'UTC')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_registros_con_solo_fecha_cuentan_en_el_dia_de_la_ruta(app, servidor_utc):
+    colombia = crear_prestamo('Colombia', 'cob_co')
+    cobrador = colombia.cobrador
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['usuario_id'] = cobrador.id
+        sesion['rol'] = 'cobrador'
+
+    # Gasto y préstamo del 14 de octubre desde los formularios (solo fecha)
+    cliente.post('/caja/gastos/guardar', data={'concepto': 'Gasolina', 'monto': '20000', 'fecha': DIA.isoformat()})
+    otro = Cliente(nombre='Cliente nuevo', documento='nuevo', telefono='300')
+    db.session.add(otro)
+    db.session.commit()
+    cliente.post('/prestamos/guardar', data={
+        'cliente_id': otro.id, 'cobrador_id': cobrador.id, 'monto_prestado': '100', 'tasa_interes': '20',
+        'numero_cuotas': '4', 'monto_a_pagar': '120', 'valor_cuota': '30', 'moneda': 'COP',
+        'frecuencia': 'SEMANAL', 'fecha_inicio': DIA.isoformat()})
+
+    gasto = Transaccion.query.one()
+    nuevo = Prestamo.query.filter_by(cliente_id=otro.id).one()
+    for momento in (gasto.fecha, nuevo.fecha_inicio):
+        assert rango_del_dia(DIA, BOGOTA)[0] <= momento < rango_del_dia(DIA, BOGOTA)[1]
+    # El plan de cuotas parte del 14 (SEMANAL: primera cuota el 21)
+    assert nuevo.cuotas[0].fecha_vencimiento == date(2026, 10, 21)
+
+    # Caja, cuadre y snapshots los cuentan el 14 en Bogotá, no el 13
+    datos = datos_cuadre(cobrador, DIA, BOGOTA)
+    assert [g['monto'] for g in datos['gastos']] == [20000]
+    assert [c['valor'] for c in datos['creditos']] == [100]
+    flujos = flujos_por_dia(DIA - timedelta(days=1), DIA, ruta_id=colombia.ruta_id, hoy=DIA + timedelta(days=2))
+    assert list(flujos) == [DIA] and flujos[DIA]['prestado'] == 100
+
+
+@pytest.fixture
+def servidor_tokio(monkeypatch):
+    """Servidor adelantado: su mediodía del 14 es la noche del 13 en Bogotá"""
+    monkeypatch.setenv('TZ', 'Asia/Tokyo')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_traslado_con_solo_fecha_cae_en_el_dia_de_la_ruta(app, servidor_tokio):
+    cobrador = crear_prestamo('Colombia', 'cob_co').cobrador
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['usuario_id'] = cobrador.id
+        sesion['rol'] = 'dueno'
+
+    cliente.post('/traslados/guardar', data={'tipo_traslado': 'general_a_ruta', 'cobrador_id': cobrador.id,
+                                             'monto': '50000', 'fecha': DIA.isoformat()})
+
+    traslado = Transaccion.query.one()
+    assert rango_del_dia(DIA, BOGOTA)[0] <= traslado.fecha < rango_del_dia(DIA, BOGOTA)[1]
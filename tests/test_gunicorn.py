@@ -0,0 +1,43 @@
+"""
+Tests de la configuración de gunicorn según el tamaño del dyno
+"""
+import os
+import runpy
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def cargar(monkeypatch, **variables):
+    for nombre in ('DYNO_RAM', 'WEB_CONCURRENCY', 'GUNICORN_THREADS', 'GUNICORN_PRELOAD', 'PORT',
+                   'WEB_STATEMENT_TIMEOUT_MS'):
+        monkeypatch.delenv(nombre, raising=False)
+    # La configuración escribe DB_STATEMENT_TIMEOUT_MS: se restaura al terminar el test
+    monkeypatch.setenv('DB_STATEMENT_TIMEOUT_MS', '')
+    for nombre, valor in variables.items():
+        monkeypatch.setenv(nombre, valor)
+    monkeypatch.setattr(os, 'cpu_count', lambda: 8)
+    return runpy.run_path(os.path.join(RAIZ, 'gunicorn.conf.py'))
+
+
+def test_workers_segun_memoria_del_dyno(monkeypatch):
+    basico = cargar(monkeypatch, DYNO_RAM='512', PORT='8000')
+    assert (basico['workers'], basico['worker_class'], basico['threads']) == (3, 'gthread', 4)
+    assert basico['bind'] == '0.0.0.0:8000'
+    assert basico['preload_app'] is True
+    assert basico['max_requests_jitter'] == 100
+
+    assert cargar(monkeypatch, DYNO_RAM='2560')['workers'] == 16
+    assert cargar(monkeypatch, DYNO_RAM='14336')['workers'] == 17  # tope 2 x CPU + 1
+    assert cargar(monkeypatch, DYNO_RAM='256')['workers'] == 2
+
+
+def test_variables_explicitas(monkeypatch):
+    config = cargar(monkeypatch, DYNO_RAM='512', WEB_CONCURRENCY='5', GUNICORN_THREADS='2', GUNICORN_PRELOAD='0')
+    assert (config['workers'], config['threads'], config['preload_app']) == (5, 2, False)
+
+
+def test_statement_timeout_solo_para_el_proceso_web(monkeypatch):
+    cargar(monkeypatch, DYNO_RAM='512')
+    assert os.environ['DB_STATEMENT_TIMEOUT_MS'] == '30000'
+    cargar(monkeypatch, DYNO_RAM='512', WEB_STATEMENT_TIMEOUT_MS='5000')
+    assert os.environ['DB_STATEMENT_TIMEOUT_MS'] == '5000'
@@ -0,0 +1,85 @@
+"""
+Tests del procesamiento de fotos subidas (reducción, EXIF y miniaturas)
+"""
+import pytest
+import sys
+import os
+from io import BytesIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+PIL = pytest.importorskip('PIL')
+from PIL import Image
+
+from app import create_app
+from app.models import db, Usuario, Transaccion
+from app.almacenamiento import servicio_subidas
+from app.imagenes import procesar_foto, clave_foto, clave_miniatura
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria y fotos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'ALMACENAMIENTO': 'memoria'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def foto_de_celular(ancho=4000, alto=3000):
+    """JPEG grande con EXIF de orientación (rotada 90°) y ubicación"""
+    img = Image.new('RGB', (ancho, alto), (200, 120, 40))
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientación: rotar 90° al mostrar
+    exif[0x010F] = 'Marca del celular'
+    salida = BytesIO()
+    img.save(salida, 'JPEG', exif=exif.tobytes(), quality=90)
+    salida.seek(0)
+    return salida
+
+
+def test_procesar_foto_reduce_rota_y_quita_exif():
+    foto, miniatura = procesar_foto(foto_de_celular())
+
+    reducida = Image.open(BytesIO(foto))
+    assert reducida.format == 'WEBP'
+    assert reducida.size == (1200, 1600)  # Vertical: se aplicó la orientación
+    assert not reducida.getexif()
+
+    pequena = Image.open(BytesIO(miniatura))
+    assert max(pequena.size) == 256
+    assert len(miniatura) < len(foto)
+
+
+def test_claves():
+    assert clave_foto('gasto_1_factura.JPG') == 'gasto_1_factura.webp'
+    assert clave_miniatura('uploads/recibos/gasto.webp') == 'uploads/recibos/gasto_min.webp'
+    assert clave_miniatura('uploads/recibos/gasto.jpg') is None
+    assert clave_miniatura(None) is None
+
+
+def test_gasto_guarda_webp_y_la_lista_usa_la_miniatura(app):
+    usuario = Usuario(nombre='Dueño', usuario='dueno', password='x', rol='dueno')
+    db.session.add(usuario)
+    db.session.commit()
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['usuario_id'] = usuario.id
+        sesion['rol'] = 'dueno'
+
+    cliente.post('/caja/gastos/guardar', data={
+        'concepto': 'Gasolina', 'descripcion': '', 'monto': '20000', 'fecha': '2026-10-14',
+        'recibo': (foto_de_celular(), 'factura.jpg', 'image/jpeg')
+    }, content_type='multipart/form-data')
+    subidas = servicio_subidas()
+    subidas.esperar(timeout=30)
+
+    clave = Transaccion.query.one().foto_evidencia.removeprefix('memoria://')
+    assert clave.endswith('.webp')
+    assert subidas.almacen.archivos[clave][1] == 'image/webp'
+    assert clave_miniatura(clave) in subidas.almacen.archivos
+
+    pagina = cliente.get('/caja/gastos').get_data(as_text=True)
+    assert clave_miniatura(clave) in pagina
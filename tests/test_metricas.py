@@ -0,0 +1,112 @@
+"""
+Tests del servicio de métricas del dashboard (consultas agregadas)
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.models import db, Usuario, Ruta, Cliente, Prestamo, Pago
+from app.metricas import metricas_dashboard, cobra_en_dia
+from bench.contador_consultas import contar_consultas
+
+# Un miércoles: cobran DIARIO, DIARIO_LUNES_VIERNES y BISEMANAL
+MIERCOLES = datetime(2026, 10, 14).date()
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def crear_cartera(n, prefijo='A', moneda='COP', frecuencia='DIARIO'):
+    """Crea un cobrador con su ruta y n préstamos activos de 120 (cuota 10)"""
+    cobrador = Usuario(nombre='Cobrador', usuario=f'cob_{prefijo}', password='x', rol='cobrador')
+    db.session.add(cobrador)
+    db.session.flush()
+    ruta = Ruta(nombre=f'Ruta {prefijo}', cobrador_id=cobrador.id, moneda=moneda)
+    db.session.add(ruta)
+    db.session.flush()
+    prestamos = []
+    for i in range(n):
+        cliente = Cliente(nombre=f'Cliente {prefijo}{i}', documento=f'{prefijo}{i}', telefono='300')
+        db.session.add(cliente)
+        db.session.flush()
+        prestamo = Prestamo(cliente_id=cliente.id, ruta_id=ruta.id, cobrador_id=cobrador.id,
+                            monto_prestado=100, monto_a_pagar=120, saldo_actual=120, valor_cuota=10,
+                            moneda=moneda, frecuencia=frecuencia, numero_cuotas=12,
+                            cuotas_atrasadas=[0, 1, 5][i % 3])
+        db.session.add(prestamo)
+        prestamos.append(prestamo)
+    db.session.commit()
+    return cobrador, ruta, prestamos
+
+
+def pagar(prestamo, fecha, monto=10):
+    db.session.add(Pago(prestamo_id=prestamo.id, cobrador_id=prestamo.cobrador_id, monto=monto,
+                        saldo_anterior=120, saldo_nuevo=120 - monto, fecha_pago=fecha))
+
+
+def test_cobra_en_dia():
+    domingo, viernes, sabado = 6, 4, 5
+    assert not cobra_en_dia('DIARIO', domingo)
+    assert cobra_en_dia('DIARIO_LUNES_VIERNES', viernes)
+    assert not cobra_en_dia('DIARIO_LUNES_VIERNES', sabado)
+    assert cobra_en_dia('BISEMANAL', domingo)
+    assert not cobra_en_dia('BISEMANAL', domingo, incluir_bisemanal=False)
+    assert not cobra_en_dia('SEMANAL', viernes)
+
+
+def test_kpis_por_moneda_y_alcance(app):
+    cobrador, ruta, prestamos_cop = crear_cartera(3, 'A', 'COP')
+    _, _, prestamos_usd = crear_cartera(2, 'B', 'USD', frecuencia='SEMANAL')
+    ahora = datetime.combine(MIERCOLES, datetime.min.time()).replace(hour=10)
+    pagar(prestamos_cop[0], ahora)
+    pagar(prestamos_usd[0], ahora, monto=20)
+    pagar(prestamos_cop[1], ahora - timedelta(days=3))
+    db.session.commit()
+
+    global_ = metricas_dashboard(hoy=MIERCOLES)
+    assert global_['total_prestamos_activos'] == 5
+    assert global_['total_cartera'] == 600
+    assert global_['por_cobrar_hoy'] == 30  # SEMANAL no cobra a diario
+    assert (global_['prestamos_al_dia'], global_['prestamos_atrasados'], global_['prestamos_mora']) == (2, 3, 1)
+    assert global_['total_cobrado_hoy'] == 30 and global_['num_pagos_hoy'] == 2
+    assert global_['cobros_ultimos_7_dias'] == [0, 0, 0, 10, 0, 0, 30]
+    assert [m['moneda'] for m in global_['lista_monedas']] == ['COP', 'USD']
+    assert global_['lista_monedas'][1]['cobrado_hoy'] == 20
+
+    por_ruta = metricas_dashboard(ruta_id=ruta.id, hoy=MIERCOLES)
+    assert por_ruta['total_clientes'] == 3
+    assert por_ruta['total_cobrado_hoy'] == 10
+
+    del_cobrador = metricas_dashboard(cobrador_id=cobrador.id, hoy=MIERCOLES)
+    assert del_cobrador['total_cartera'] == 360
+    assert del_cobrador['cobros_ultimos_7_dias'][3] == 10
+
+
+def test_consultas_constantes_con_relaciones_precargadas(app):
+    _, _, prestamos = crear_cartera(30)
+    for prestamo in prestamos:
+        pagar(prestamo, datetime.now())
+    db.session.commit()
+    db.session.expunge_all()
+
+    with contar_consultas(db.engine) as contador:
+        metricas = metricas_dashboard()
+        nombres = [p.prestamo.cliente.nombre for p in metricas['ultimos_pagos']]
+        nombres += [p.cliente.nombre for p in metricas['prestamos_recientes']]
+
+    assert len(nombres) == 15
+    # Incluye la consulta de países de las rutas (límites del día por zona horaria)
+    # y la de cuotas que vencen hoy y mañana
+    assert contador['consultas'] <= 12
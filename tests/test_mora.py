@@ -0,0 +1,105 @@
+"""
+Tests del recálculo nocturno de mora (cuotas_atrasadas, dias_atraso y estado MORA)
+"""
+import pytest
+import sys
+import os
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.models import db, Usuario, Ruta, Cliente, Prestamo
+from app.cuotas import crear_plan_cuotas
+from app.mora import recalcular_mora
+from app.pagos import aplicar_pago
+
+# Préstamos SEMANAL desde el lunes 5 de octubre de 2026: vencen el 13 (festivo el 12), 19, 26 y 2 de noviembre
+INICIO = date(2026, 10, 5)
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def crear_prestamos(n, frecuencia='SEMANAL', plan=True):
+    """Cobrador con su ruta en Colombia y n préstamos de 120 en 4 cuotas"""
+    cobrador = Usuario(nombre='Cobrador', usuario='cob', password='x', rol='cobrador')
+    db.session.add(cobrador)
+    db.session.flush()
+    ruta = Ruta(nombre='Ruta Centro', cobrador_id=cobrador.id, pais='Colombia')
+    db.session.add(ruta)
+    db.session.flush()
+    prestamos = []
+    for i in range(n):
+        cliente = Cliente(nombre=f'Cliente {i}', documento=f'{i}', telefono='300')
+        db.session.add(cliente)
+        db.session.flush()
+        prestamo = Prestamo(cliente_id=cliente.id, ruta_id=ruta.id, cobrador_id=cobrador.id,
+                            monto_prestado=100, monto_a_pagar=120, saldo_actual=120, valor_cuota=30,
+                            frecuencia=frecuencia, numero_cuotas=4, cuotas_pagadas=0, cuotas_atrasadas=0,
+                            fecha_inicio=datetime.combine(INICIO, datetime.min.time()))
+        db.session.add(prestamo)
+        if plan:
+            crear_plan_cuotas(prestamo)
+        prestamos.append(prestamo)
+    db.session.commit()
+    return prestamos
+
+
+def test_cuenta_cuotas_vencidas_y_dias_de_atraso(app):
+    al_dia, atrasado = crear_prestamos(2)
+    aplicar_pago(al_dia, al_dia.cobrador_id, 60)
+    db.session.commit()
+
+    # El 21: vencieron las cuotas del 13 y del 19
+    resultado = recalcular_mora(date(2026, 10, 21), lote=1)
+
+    assert resultado == {'actualizados': 1, 'en_mora': 0}
+    assert (al_dia.cuotas_atrasadas, al_dia.dias_atraso, al_dia.estado) == (0, 0, 'ACTIVO')
+    assert (atrasado.cuotas_atrasadas, atrasado.dias_atraso, atrasado.estado) == (2, 8, 'ACTIVO')
+
+
+def test_mora_con_mas_de_tres_cuotas_y_vuelta_al_dia(app):
+    # DIARIO: vence del 6 al 9 de octubre
+    prestamo, = crear_prestamos(1, frecuencia='DIARIO')
+
+    assert recalcular_mora(date(2026, 10, 20))['en_mora'] == 1
+    assert (prestamo.cuotas_atrasadas, prestamo.estado) == (4, 'MORA')
+
+    # En MORA se sigue cobrando; al ponerse al día sale de mora sin esperar al recálculo
+    aplicar_pago(prestamo, prestamo.cobrador_id, 90)
+    db.session.commit()
+    assert (prestamo.cuotas_atrasadas, prestamo.estado) == (1, 'ACTIVO')
+
+    # Queda la cuota del 9
+    recalcular_mora(date(2026, 10, 20))
+    assert (prestamo.cuotas_atrasadas, prestamo.dias_atraso, prestamo.estado) == (1, 11, 'ACTIVO')
+
+
+def test_solo_escribe_los_prestamos_que_cambian(app):
+    prestamos = crear_prestamos(3)
+    recalcular_mora(date(2026, 10, 14))
+    marcas = [p.fecha_actualizacion for p in prestamos]
+
+    # Mismo día: nada cambió, la app móvil no recibe los préstamos otra vez en el sync
+    assert recalcular_mora(date(2026, 10, 14))['actualizados'] == 0
+    assert [p.fecha_actualizacion for p in prestamos] == marcas
+    # Al día siguiente cambian los días de atraso
+    assert recalcular_mora(date(2026, 10, 15))['actualizados'] == 3
+
+
+def test_prestamos_sin_plan_se_completan_antes(app):
+    prestamo, = crear_prestamos(1, plan=False)
+
+    recalcular_mora(date(2026, 10, 21))
+
+    assert len(prestamo.cuotas) == 4
+    assert (prestamo.cuotas_atrasadas, prestamo.dias_atraso) == (2, 8)
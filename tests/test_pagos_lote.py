@@ -0,0 +1,215 @@
+"""
+Tests de la carga en lote de pagos offline con claves de idempotencia
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.models import db, Usuario, Ruta, Cliente, Prestamo, Pago
+from app.fechas import a_hora_servidor
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def cartera(app):
+    """Cobrador con dos préstamos activos en su ruta"""
+    cobrador = Usuario(nombre='Cobrador', usuario='cob', password='x', rol='cobrador')
+    otro = Usuario(nombre='Otro', usuario='otro', password='x', rol='cobrador')
+    db.session.add_all([cobrador, otro])
+    db.session.flush()
+    ruta = Ruta(nombre='Ruta Centro', cobrador_id=cobrador.id)
+    db.session.add(ruta)
+    db.session.flush()
+    prestamos = []
+    for i in range(2):
+        cliente = Cliente(nombre=f'Cliente {i}', documento=str(i), telefono='300')
+        db.session.add(cliente)
+        db.session.flush()
+        prestamo = Prestamo(cliente_id=cliente.id, ruta_id=ruta.id, cobrador_id=cobrador.id,
+                            monto_prestado=100, monto_a_pagar=120, saldo_actual=120, valor_cuota=10,
+                            numero_cuotas=12)
+        db.session.add(prestamo)
+        prestamos.append(prestamo)
+    db.session.commit()
+    return {
+        'prestamos': prestamos,
+        'headers': {'Authorization': f'Bearer {create_access_token(identity=str(cobrador.id))}'},
+        'headers_otro': {'Authorization': f'Bearer {create_access_token(identity=str(otro.id))}'}
+    }
+
+
+def test_lote_aplica_y_deduplica_por_clave(client, cartera):
+    p1, p2 = cartera['prestamos']
+    lote = {'pagos': [
+        {'clave': 'a', 'prestamo_id': p1.id, 'monto': 10},
+        {'clave': 'b', 'prestamo_id': p1.id, 'monto': 10},  # mismo monto, mismo día: NO es duplicado
+        {'clave': 'c', 'prestamo_id': p2.id, 'monto': 120, 'fecha_pago': '2025-12-16T09:30:00'},
+        {'clave': 'a', 'prestamo_id': p1.id, 'monto': 10},  # reenvío dentro del lote
+    ]}
+
+    data = client.post('/api/v1/cobrador/pagos-lote', json=lote, headers=cartera['headers']).get_json()
+
+    assert [r['estado'] for r in data['resultados']] == ['APLICADO', 'APLICADO', 'APLICADO', 'DUPLICADO']
+    assert data['resultados'][3]['pago_id'] == data['resultados'][0]['pago_id']
+    assert data['resultados'][2]['prestamo_liquidado'] is True
+    assert db.session.get(Prestamo, p1.id).saldo_actual == 100
+    assert Pago.query.count() == 3
+
+    # Reenvío completo del lote (la app no recibió la respuesta): nada se aplica dos veces
+    data = client.post('/api/v1/cobrador/pagos-lote', json=lote, headers=cartera['headers']).get_json()
+    assert data['aplicados'] == 0 and data['duplicados'] == 4
+    assert Pago.query.count() == 3
+
+
+def test_lote_reporta_errores_por_item(client, cartera):
+    p1, _ = cartera['prestamos']
+    lote = {'pagos': [
+        {'prestamo_id': p1.id, 'monto': 10},
+        {'clave': 'x', 'prestamo_id': 9999, 'monto': 10},
+        {'clave': 'y', 'prestamo_id': p1.id, 'monto': 0},
+        {'clave': 'z', 'prestamo_id': p1.id, 'monto': 10},
+    ]}
+
+    data = client.post('/api/v1/cobrador/pagos-lote', json=lote, headers=cartera['headers']).get_json()
+
+    assert [r['estado'] for r in data['resultados']] == ['ERROR', 'ERROR', 'ERROR', 'APLICADO']
+
+    # Un cobrador ajeno no puede cobrar préstamos de otra ruta
+    data = client.post('/api/v1/cobrador/pagos-lote', json={'pagos': [{'clave': 'w', 'prestamo_id': p1.id, 'monto': 10}]},
+                       headers=cartera['headers_otro']).get_json()
+    assert data['resultados'][0]['estado'] == 'ERROR'
+
+
+def test_registrar_pago_individual_respeta_clave(client, cartera):
+    p1, _ = cartera['prestamos']
+    body = {'prestamo_id': p1.id, 'monto': 10, 'clave_idempotencia': 'k1'}
+
+    primero = client.post('/api/v1/cobrador/registrar-pago', json=body, headers=cartera['headers'])
+    segundo = client.post('/api/v1/cobrador/registrar-pago', json=body, headers=cartera['headers'])
+
+    assert primero.status_code == 201
+    assert segundo.status_code == 200
+    assert segundo.get_json()['pago_id'] == primero.get_json()['pago_id']
+    assert Pago.query.count() == 1
+
+
+def test_lote_valida_monto_clave_y_zona_de_la_fecha(client, cartera):
+    p1, _ = cartera['prestamos']
+    lote = {'pagos': [
+        {'clave': 'nan', 'prestamo_id': p1.id, 'monto': 'nan'},
+        {'clave': 'inf', 'prestamo_id': p1.id, 'monto': 'inf'},
+        {'clave': 123, 'prestamo_id': p1.id, 'monto': 10},
+        {'clave': 'x' * 65, 'prestamo_id': p1.id, 'monto': 10},
+        {'clave': 'ok', 'prestamo_id': p1.id, 'monto': 10, 'fecha_pago': '2026-10-14T09:30:00-05:00'},
+    ]}
+
+    respuesta = client.post('/api/v1/cobrador/pagos-lote', json=lote, headers=cartera['headers'])
+
+    # Los items inválidos fallan solos; el resto del lote se aplica
+    assert respuesta.status_code == 200
+    assert [r['estado'] for r in respuesta.get_json()['resultados']] == ['ERROR'] * 4 + ['APLICADO']
+    pago = Pago.query.one()
+    assert db.session.get(Prestamo, p1.id).saldo_actual == 110
+    # Con zona: se guarda en hora del servidor sin zona
+    assert pago.fecha_pago == a_hora_servidor(datetime(2026, 10, 14, 14, 30, tzinfo=timezone.utc))
+
+    # El pago individual también rechaza NaN y claves inválidas
+    for body in ({'prestamo_id': p1.id, 'monto': 'nan'}, {'prestamo_id': p1.id, 'monto': 10, 'clave_idempotencia': 'x' * 65}):
+        assert client.post('/api/v1/cobrador/registrar-pago', json=body, headers=cartera['headers']).status_code == 400
+    assert db.session.get(Prestamo, p1.id).saldo_actual == 110
+
+
+def test_cobro_web_simultaneo_con_la_misma_clave(client, cartera, monkeypatch):
+    import app.vistas.cobro as cobro
+
+    p1, _ = cartera['prestamos']
+    # El otro envío ya guardó el pago, pero este pasó la consulta antes de que se confirmara
+    otro = Pago(prestamo_id=p1.id, cobrador_id=p1.cobrador_id, monto=10, saldo_anterior=120, saldo_nuevo=110,
+                clave_idempotencia='k1')
+    db.session.add(otro)
+    db.session.commit()
+    consultas = []
+    original = cobro._pago_por_clave
+
+    def primera_sin_ver_el_otro(clave):
+        consultas.append(clave)
+        return original(clave) if len(consultas) > 1 else None
+    monkeypatch.setattr(cobro, '_pago_por_clave', primera_sin_ver_el_otro)
+    with client.session_transaction() as sesion:
+        sesion['usuario_id'] = p1.cobrador_id
+        sesion['rol'] = 'cobrador'
+
+    respuesta = client.post('/cobro/guardar', data={'prestamo_id': p1.id, 'monto': '10', 'tipo_pago': 'NORMAL',
+                                                   'forzar_pago': '1', 'clave_idempotencia': 'k1'})
+
+    # El índice único rechaza el segundo: se muestra el pago registrado, no un error
+    assert respuesta.status_code == 302
+    assert respuesta.headers['Location'].endswith(f'/cobro/exito/{otro.id}')
+    assert Pago.query.count() == 1
+    assert db.session.get(Prestamo, p1.id).saldo_actual == 120
+
+
+def test_api_pago_simultaneo_con_la_misma_clave(client, cartera, monkeypatch):
+    import app.api as api
+
+    p1, _ = cartera['prestamos']
+    otro = Pago(prestamo_id=p1.id, cobrador_id=p1.cobrador_id, monto=10, saldo_anterior=120, saldo_nuevo=110,
+                clave_idempotencia='k1')
+    db.session.add(otro)
+    db.session.commit()
+    consultas = []
+    original = api.pago_por_clave
+
+    def primera_sin_ver_el_otro(clave, cobrador_id):
+        consultas.append(clave)
+        return original(clave, cobrador_id) if len(consultas) > 1 else None
+    monkeypatch.setattr(api, 'pago_por_clave', primera_sin_ver_el_otro)
+
+    body = {'prestamo_id': p1.id, 'monto': 10, 'clave_idempotencia': 'k1'}
+    respuesta = client.post('/api/v1/cobrador/registrar-pago', json=body, headers=cartera['headers'])
+
+    # El índice único rechaza el segundo: se responde como reenvío, no con un 500
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['duplicado'] is True
+    assert respuesta.get_json()['pago_id'] == otro.id
+    assert Pago.query.count() == 1
+
+
+def test_clave_de_otro_cobrador_no_devuelve_su_pago(client, cartera):
+    p1, p2 = cartera['prestamos']
+    ajeno = Usuario.query.filter_by(usuario='otro').one()
+    db.session.add(Pago(prestamo_id=p2.id, cobrador_id=ajeno.id, monto=10, saldo_anterior=120, saldo_nuevo=110,
+                        clave_idempotencia='k1'))
+    db.session.commit()
+
+    body = {'prestamo_id': p1.id, 'monto': 10, 'clave_idempotencia': 'k1'}
+    respuesta = client.post('/api/v1/cobrador/registrar-pago', json=body, headers=cartera['headers'])
+    assert respuesta.status_code == 409
+    assert 'pago_id' not in respuesta.get_json()
+
+    lote = {'pagos': [{'clave': 'k1', 'prestamo_id': p1.id, 'monto': 10},
+                      {'clave': 'k2', 'prestamo_id': p1.id, 'monto': 10}]}
+    resultados = client.post('/api/v1/cobrador/pagos-lote', json=lote, headers=cartera['headers']).get_json()['resultados']
+    assert [r['estado'] for r in resultados] == ['ERROR', 'APLICADO']
+    assert 'pago_id' not in resultados[0]
+    assert Pago.query.count() == 2
@@ -0,0 +1,81 @@
+"""
+Tests del perfilador de peticiones (Server-Timing, /estado/metrics y muestreo de Sentry)
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.models import db, Usuario
+from app.perfilador import Histograma, leer_tasas_por_ruta, muestreo_por_ruta
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        db.session.add(Usuario(nombre='Dueño', usuario='dueno', password='x', rol='dueno'))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_server_timing_y_metricas_por_endpoint(app):
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion.update(usuario_id=1, rol='dueno', nombre='Dueño')
+
+    for _ in range(3):
+        respuesta = cliente.get('/usuarios')
+    db_timing, app_timing = respuesta.headers.getlist('Server-Timing')
+    assert db_timing.startswith('db;dur=') and db_timing.endswith('desc="1 consultas"')
+    assert app_timing.startswith('app;dur=')
+
+    metricas = cliente.get('/estado/metrics').get_json()
+    usuarios = next(e for e in metricas['endpoints'] if e['endpoint'] == 'usuarios.usuarios_lista')
+    assert usuarios['peticiones'] == 3
+    assert usuarios['consultas_promedio'] == 1
+    assert sum(usuarios['histograma'].values()) == 3
+    assert usuarios['p50_ms'] <= usuarios['p95_ms'] <= usuarios['max_ms']
+
+
+def test_metricas_solo_para_dueno_o_token(app):
+    assert app.test_client().get('/estado/metrics').status_code == 403
+
+
+def test_perfilador_desactivado():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'PERFILADOR': False})
+    cliente = app.test_client()
+    assert 'Server-Timing' not in cliente.get('/estado').headers
+    with cliente.session_transaction() as sesion:
+        sesion['rol'] = 'dueno'
+    assert cliente.get('/estado/metrics').status_code == 404
+
+
+def test_histograma_descarta_minutos_fuera_de_la_ventana():
+    histograma = Histograma(ventana_minutos=5)
+    for duracion in (3, 8, 40, 40, 900):
+        histograma.registrar(duracion, consultas=2, db_ms=1, ahora=600)
+    resumen = histograma.resumen(ahora=600)
+    assert resumen['peticiones'] == 5
+    assert (resumen['p50_ms'], resumen['p95_ms'], resumen['max_ms']) == (50, 900, 900)
+    assert resumen['histograma'] == {'<=5ms': 1, '<=10ms': 1, '<=50ms': 2, '<=1000ms': 1}
+
+    histograma.registrar(20, consultas=0, db_ms=0, ahora=600 + 5 * 60)
+    assert histograma.resumen(ahora=600 + 5 * 60)['peticiones'] == 1
+
+
+def test_muestreo_de_sentry_por_ruta():
+    tasas = leer_tasas_por_ruta('/api/v1=0.2, /api/v1/cobrador/registrar-pago=1,/estado=0')
+    sampler = muestreo_por_ruta(tasas, 0.05)
+    ruta = lambda path: {'wsgi_environ': {'PATH_INFO': path}}
+    assert sampler(ruta('/api/v1/cobrador/registrar-pago')) == 1
+    assert sampler(ruta('/api/v1/cobrador/clientes')) == 0.2
+    assert sampler(ruta('/estado/pool')) == 0
+    assert sampler(ruta('/dashboard')) == 0.05
+    assert sampler({'parent_sampled': True, **ruta('/estado')}) is True
@@ -0,0 +1,176 @@
+"""
+Tests del motor de imágenes de recibos y comprobantes
+"""
+import pytest
+import sys
+import os
+from io import BytesIO
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+PIL = pytest.importorskip('PIL')
+from PIL import Image
+
+from app import create_app
+from app.models import db, Usuario, Ruta, Cliente, Prestamo, Pago
+from app.recibos import imagen_recibo, imagen_comprobante, codificar, fondo, fuente
+from app.artefactos import CacheDisco
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplicación con base de datos en memoria y caché de recibos en un directorio temporal"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+                      'RECIBOS_CACHE': 'disco', 'RECIBOS_CACHE_DIR': str(tmp_path / 'cache')})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def pago(app):
+    cobrador = Usuario(nombre='Cobrador', usuario='cob', password='x', rol='cobrador')
+    db.session.add(cobrador)
+    db.session.flush()
+    ruta = Ruta(nombre='Ruta Centro', cobrador_id=cobrador.id)
+    cliente = Cliente(nombre='Ana Pérez', documento='123', telefono='300')
+    db.session.add_all([ruta, cliente])
+    db.session.flush()
+    prestamo = Prestamo(cliente_id=cliente.id, ruta_id=ruta.id, cobrador_id=cobrador.id,
+                        monto_prestado=100000, monto_a_pagar=120000, saldo_actual=110000, valor_cuota=10000,
+                        frecuencia='DIARIO', numero_cuotas=12, fecha_inicio=datetime(2026, 10, 1, 9),
+                        fecha_fin_estimada=datetime(2026, 10, 13, 9))
+    db.session.add(prestamo)
+    db.session.flush()
+    pago = Pago(prestamo_id=prestamo.id, cobrador_id=cobrador.id, monto=10000, saldo_anterior=120000,
+                saldo_nuevo=110000, fecha_pago=datetime(2026, 10, 2, 10), observaciones='Pagó en efectivo')
+    db.session.add(pago)
+    db.session.commit()
+    return pago
+
+
+def test_capa_estatica_y_fuentes_se_reutilizan(pago):
+    imagen_recibo(pago, 'Cobrador')
+    capa = fondo('recibo', 'verde').tobytes()
+    fondos, fuentes = fondo.cache_info().currsize, fuente.cache_info().currsize
+    hits = fondo.cache_info().hits
+
+    img = imagen_recibo(pago, 'Cobrador')
+    imagen_recibo(pago, 'Otro cobrador')
+
+    assert img.size == (1080, 1350)
+    assert fondo.cache_info().hits == hits + 2
+    assert fondo.cache_info().currsize == fondos
+    assert fuente.cache_info().currsize == fuentes
+    # Cada petición dibuja sobre una copia: la capa cacheada no cambia
+    assert fondo('recibo', 'verde').tobytes() == capa
+    assert imagen_comprobante(pago.prestamo).size == (1080, 1350)
+
+
+def test_codificar_formatos_y_ancho(pago):
+    img = imagen_recibo(pago, 'Cobrador')
+    png, mimetype, extension = codificar(img)
+    assert (mimetype, extension) == ('image/png', 'png')
+
+    webp, mimetype, extension = codificar(img, 'webp', 720)
+    assert (mimetype, extension) == ('image/webp', 'webp')
+    assert Image.open(webp).size == (720, 900)
+    assert len(webp.getvalue()) < len(png.getvalue())
+
+    jpg, mimetype, _ = codificar(img, 'jpg')
+    assert mimetype == 'image/jpeg'
+    assert codificar(img, 'gif')[1] == 'image/png'
+
+
+def test_endpoint_recibo_en_webp(app, pago):
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['usuario_id'] = pago.cobrador_id
+        sesion['rol'] = 'cobrador'
+        sesion['nombre'] = 'Cobrador'
+
+    respuesta = cliente.get(f'/cobro/recibo-imagen/{pago.id}?formato=webp&ancho=720')
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == 'image/webp'
+    assert Image.open(BytesIO(respuesta.data)).size == (720, 900)
+
+    respuesta = cliente.get(f'/prestamos/comprobante-imagen/{pago.prestamo_id}')
+    assert respuesta.mimetype == 'image/png'
+
+
+def test_recibo_se_sirve_desde_cache_con_etag(app, pago, monkeypatch):
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['usuario_id'] = pago.cobrador_id
+        sesion['rol'] = 'cobrador'
+        sesion['nombre'] = 'Cobrador'
+
+    generados = []
+    original = imagen_recibo
+    monkeypatch.setattr('app.vistas.cobro.imagen_recibo', lambda *args: generados.append(1) or original(*args))
+
+    primera = cliente.get(f'/cobro/recibo-imagen/{pago.id}')
+    segunda = cliente.get(f'/cobro/recibo-imagen/{pago.id}')
+    assert len(generados) == 1
+    assert primera.data == segunda.data
+    # El cliente puede corregirse: se revalida en vez de quedar inmutable en el navegador
+    assert 'no-cache' in segunda.headers['Cache-Control']
+    assert 'immutable' not in segunda.headers['Cache-Control']
+    assert 'private' in segunda.headers['Cache-Control']
+    assert 'public' not in segunda.headers['Cache-Control']
+
+    etag = segunda.headers['ETag']
+    assert not etag.startswith('W/')
+    no_modificado = cliente.get(f'/cobro/recibo-imagen/{pago.id}', headers={'If-None-Match': etag})
+    assert no_modificado.status_code == 304
+
+    # Otro formato es otro artefacto
+    cliente.get(f'/cobro/recibo-imagen/{pago.id}?formato=webp')
+    assert len(generados) == 2
+
+    # Corregir el nombre del cliente cambia lo que muestra el recibo
+    pago.prestamo.cliente.nombre = 'Ana María Pérez'
+    db.session.commit()
+    corregido = cliente.get(f'/cobro/recibo-imagen/{pago.id}', headers={'If-None-Match': etag})
+    assert corregido.status_code == 200 and corregido.data != primera.data
+    assert len(generados) == 3
+
+
+def test_comprobante_se_regenera_cuando_cambia_el_prestamo(app, pago, monkeypatch):
+    cliente = app.test_client()
+    with cliente.session_transaction() as sesion:
+        sesion['usuario_id'] = pago.cobrador_id
+        sesion['rol'] = 'cobrador'
+
+    generados = []
+    original = imagen_comprobante
+    monkeypatch.setattr('app.vistas.prestamos.imagen_comprobante', lambda *args: generados.append(1) or original(*args))
+
+    # La fecha de emisión no es la hora actual: la misma imagen sirve hasta que el préstamo cambie
+    url = f'/prestamos/comprobante-imagen/{pago.prestamo_id}'
+    respuesta = cliente.get(url)
+    monkeypatch.setattr('app.vistas.prestamos.datetime', None)  # la vista no consulta el reloj
+    assert cliente.get(url).data == respuesta.data
+    assert len(generados) == 1
+    assert 'no-cache' in respuesta.headers['Cache-Control']
+
+    pago.prestamo.estado = 'PAGADO'
+    db.session.commit()
+    cliente.get(url)
+    assert len(generados) == 2
+
+
+def test_cache_disco_expulsa_los_menos_usados(tmp_path):
+    cache = CacheDisco(str(tmp_path), max_bytes=3000)
+    for i, clave in enumerate(['aa01', 'bb02', 'cc03']):
+        cache.guardar(clave, b'x' * 1000)
+        os.utime(cache._ruta(clave), (1000 + i, 1000 + i))
+    assert cache.obtener('aa01') == b'x' * 1000  # Ahora es el más reciente
+
+    cache.guardar('dd04', b'x' * 1000)
+    assert cache.obtener('bb02') is None
+    assert cache.obtener('aa01') is not None
+    assert cache.obtener('dd04') is not None
@@ -0,0 +1,122 @@
+"""
+Tests del scoring crediticio: factores, niveles, límite sugerido, historial y alertas
+"""
+import json
+import pytest
+import sys
+import os
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.models import db, Usuario, Ruta, Cliente, Prestamo, Pago, HistorialScoring, AlertaScoring
+from app.cuotas import crear_plan_cuotas
+from app.pagos import aplicar_pago
+from app.scoring import calcular_scoring, PUNTOS
+
+# Préstamos DIARIO desde el martes 13 de octubre de 2026: vencen del 14 al 17
+INICIO = date(2026, 10, 13)
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def ruta():
+    cobrador = Usuario(nombre='Cobrador', usuario='cob', password='x', rol='cobrador')
+    db.session.add(cobrador)
+    db.session.flush()
+    ruta = Ruta(nombre='Ruta Centro', cobrador_id=cobrador.id, pais='Colombia')
+    db.session.add(ruta)
+    db.session.commit()
+    return ruta
+
+
+def crear_cliente(documento, **datos):
+    """Comerciante con 5 años de negocio, comprobante a su nombre, 3 años en la casa y margen del 50%"""
+    campos = dict(antiguedad_negocio_meses=60, tiene_comprobante_residencia=True, comprobante_a_nombre_propio=True,
+                  tiempo_residencia_meses=36, ingresos_diarios_estimados=100, gastos_mensuales_promedio=1300)
+    campos.update(datos)
+    cliente = Cliente(nombre=f'Cliente {documento}', documento=documento, telefono='300', **campos)
+    db.session.add(cliente)
+    db.session.flush()
+    return cliente
+
+
+def prestar(cliente, ruta, estado='ACTIVO'):
+    """Préstamo de 120 en 4 cuotas diarias de 30 (el CANCELADO, con su pago)"""
+    prestamo = Prestamo(cliente_id=cliente.id, ruta_id=ruta.id, cobrador_id=ruta.cobrador_id,
+                        monto_prestado=100, monto_a_pagar=120, saldo_actual=0 if estado == 'CANCELADO' else 120,
+                        valor_cuota=30, frecuencia='DIARIO', numero_cuotas=4, estado=estado,
+                        fecha_inicio=datetime.combine(INICIO, datetime.min.time()))
+    db.session.add(prestamo)
+    crear_plan_cuotas(prestamo)
+    if estado == 'CANCELADO':
+        db.session.add(Pago(prestamo_id=prestamo.id, cobrador_id=ruta.cobrador_id, monto=120,
+                            saldo_anterior=120, saldo_nuevo=0))
+    return prestamo
+
+
+def test_factores_niveles_y_limite(app, ruta):
+    estrella = crear_cliente('1')
+    for _ in range(5):
+        prestar(estrella, ruta, estado='CANCELADO')
+    moroso = crear_cliente('2', ingresos_diarios_estimados=None, tiene_comprobante_residencia=False,
+                           antiguedad_negocio_meses=6, tiempo_residencia_meses=None)
+    prestar(moroso, ruta)
+    nuevo = crear_cliente('3')
+    db.session.commit()
+
+    # El 18 de octubre el moroso debe sus 4 cuotas (la más antigua, del 14)
+    assert calcular_scoring(fecha=date(2026, 10, 18), lote=2) == {'calculados': 3, 'actualizados': 3, 'alertas': 2}
+
+    assert (estrella.score_crediticio, estrella.nivel_riesgo) == (1000, 'EXCELENTE')
+    # Margen de 1300 al mes por 1.5
+    assert estrella.limite_credito_sugerido == 1950
+    # Sin ingresos: el límite sale del mayor préstamo; CRITICO no recibe
+    assert moroso.nivel_riesgo == 'CRITICO'
+    assert moroso.score_crediticio == 130 + 15  # 13% del atraso y 6 meses de negocio
+    assert moroso.limite_credito_sugerido == 0
+    # Sin préstamos: NUEVO con media puntualidad
+    assert (nuevo.score_crediticio, nuevo.nivel_riesgo, nuevo.limite_credito_sugerido) == (675, 'NUEVO', 650)
+
+    historial = HistorialScoring.query.filter_by(cliente_id=moroso.id).one()
+    assert historial.calculado_por == 'RECALCULO_MASIVO'
+    assert (historial.score_anterior, historial.nivel_riesgo_anterior) == (500, 'NUEVO')
+    factores = json.loads(historial.factores_calculo)
+    assert set(factores) == set(PUNTOS) and sum(factores.values()) == historial.score_nuevo == 145
+    assert moroso.fecha_ultimo_calculo_score is not None
+
+    alertas = {(a.cliente_id, a.tipo_alerta, a.prioridad) for a in AlertaScoring.query}
+    assert alertas == {(estrella.id, 'CLIENTE_ESTRELLA', 'BAJA'), (moroso.id, 'BLOQUEAR', 'ALTA')}
+
+
+def test_solo_escribe_los_clientes_que_cambian(app, ruta):
+    cliente = crear_cliente('1')
+    prestamo = prestar(cliente, ruta)
+    db.session.commit()
+    marca = cliente.fecha_actualizacion
+
+    calcular_scoring(fecha=date(2026, 10, 18))
+    assert calcular_scoring(fecha=date(2026, 10, 18)) == {'calculados': 1, 'actualizados': 0, 'alertas': 0}
+    assert HistorialScoring.query.count() == 1
+    # El score no viaja en el sync: el cliente no cuenta como modificado
+    assert cliente.fecha_actualizacion == marca
+
+    # Se pone al día: sube de nivel y queda en el historial como cálculo del sistema
+    antes = cliente.score_crediticio
+    aplicar_pago(prestamo, prestamo.cobrador_id, 120)
+    db.session.commit()
+    assert calcular_scoring([cliente.id], date(2026, 10, 18), calculado_por='SISTEMA')['actualizados'] == 1
+    ultimo = HistorialScoring.query.order_by(HistorialScoring.id.desc()).first()
+    assert (ultimo.score_anterior, ultimo.calculado_por) == (antes, 'SISTEMA')
+    assert cliente.score_crediticio > antes
@@ -0,0 +1,96 @@
+"""
+Tests de los snapshots diarios de cartera
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.models import db, Usuario, Ruta, Cliente, Prestamo, Pago, SnapshotDiario
+from app.snapshots import generar_snapshot, flujos_por_dia, serie_cobrado, dias_con_pagos_tardios
+
+HOY = datetime(2026, 10, 14).date()
+AYER = HOY - timedelta(days=1)
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def prestamo(app):
+    cobrador = Usuario(nombre='Cobrador', usuario='cob', password='x', rol='cobrador')
+    db.session.add(cobrador)
+    db.session.flush()
+    ruta = Ruta(nombre='Ruta Centro', cobrador_id=cobrador.id)
+    cliente = Cliente(nombre='Cliente', documento='1', telefono='300')
+    db.session.add_all([ruta, cliente])
+    db.session.flush()
+    prestamo = Prestamo(cliente_id=cliente.id, ruta_id=ruta.id, cobrador_id=cobrador.id,
+                        monto_prestado=100, monto_a_pagar=120, saldo_actual=120, valor_cuota=10,
+                        frecuencia='DIARIO', numero_cuotas=12,
+                        fecha_inicio=datetime.combine(AYER, datetime.min.time()).replace(hour=8))
+    db.session.add(prestamo)
+    db.session.commit()
+    return prestamo
+
+
+def pagar(prestamo, fecha, monto=10):
+    db.session.add(Pago(prestamo_id=prestamo.id, cobrador_id=prestamo.cobrador_id, monto=monto,
+                        saldo_anterior=120, saldo_nuevo=120 - monto, fecha_pago=fecha))
+    db.session.commit()
+
+
+def test_snapshot_captura_flujos_y_cartera(prestamo):
+    pagar(prestamo, datetime.combine(AYER, datetime.min.time()).replace(hour=10))
+
+    assert generar_snapshot(AYER, incluir_cartera=True) == 1
+    db.session.commit()
+
+    snapshot = SnapshotDiario.query.one()
+    assert (snapshot.cobrado, snapshot.num_pagos) == (10, 1)
+    assert (snapshot.prestado, snapshot.num_prestamos_nuevos) == (100, 1)
+    assert (snapshot.cartera, snapshot.prestamos_activos) == (120, 1)
+
+
+def test_dias_cerrados_desde_snapshot_y_hoy_en_vivo(prestamo):
+    pagar(prestamo, datetime.combine(AYER, datetime.min.time()).replace(hour=10))
+    generar_snapshot(AYER)
+    db.session.commit()
+    # El snapshot manda para los días cerrados aunque la tabla de pagos cambie
+    SnapshotDiario.query.one().cobrado = 999
+    db.session.commit()
+    pagar(prestamo, datetime.combine(HOY, datetime.min.time()).replace(hour=9), monto=20)
+
+    flujos = flujos_por_dia(AYER - timedelta(days=5), HOY, hoy=HOY)
+
+    assert flujos[AYER]['cobrado'] == 999
+    assert flujos[HOY]['cobrado'] == 20
+    assert serie_cobrado(flujos) == [(AYER.isoformat(), 999), (HOY.isoformat(), 20)]
+    assert flujos_por_dia(AYER, HOY, cobrador_id=prestamo.cobrador_id + 1, hoy=HOY) == {}
+
+
+def test_recalcular_conserva_foto_de_cartera(prestamo):
+    generar_snapshot(AYER, incluir_cartera=True)
+    db.session.commit()
+    marca = datetime.utcnow() - timedelta(seconds=1)
+
+    # Pago offline con fecha de ayer sincronizado hoy
+    pagar(prestamo, datetime.combine(AYER, datetime.min.time()).replace(hour=18))
+    assert dias_con_pagos_tardios(marca, HOY) == [AYER]
+
+    generar_snapshot(AYER)
+    db.session.commit()
+    snapshot = SnapshotDiario.query.one()
+    assert snapshot.cobrado == 10
+    assert snapshot.cartera == 120
@@ -0,0 +1,160 @@
+"""
+Tests de la sincronización incremental /api/v1/sync
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.models import db, Usuario, Ruta, Cliente, Prestamo, Pago
+
+
+@pytest.fixture
+def app():
+    """Aplicación con base de datos en memoria"""
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def cartera(app):
+    """Cobrador con un préstamo activo y su token"""
+    cobrador = Usuario(nombre='Cobrador', usuario='cob', password='x', rol='cobrador')
+    db.session.add(cobrador)
+    db.session.flush()
+    ruta = Ruta(nombre='Ruta Centro', cobrador_id=cobrador.id)
+    cliente = Cliente(nombre='Ana', documento='1', telefono='300')
+    db.session.add_all([ruta, cliente])
+    db.session.flush()
+    prestamo = Prestamo(cliente_id=cliente.id, ruta_id=ruta.id, cobrador_id=cobrador.id,
+                        monto_prestado=100, monto_a_pagar=120, saldo_actual=120, valor_cuota=5,
+                        numero_cuotas=24)
+    db.session.add(prestamo)
+    db.session.commit()
+    token = create_access_token(identity=str(cobrador.id))
+    return {'cobrador': cobrador, 'prestamo': prestamo, 'cliente': cliente,
+            'headers': {'Authorization': f'Bearer {token}'}}
+
+
+def test_sync_completo_sin_cursor(client, cartera):
+    response = client.get('/api/v1/sync', headers=cartera['headers'])
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data['completo'] is True
+    assert [p['id'] for p in data['prestamos']] == [cartera['prestamo'].id]
+    assert [c['id'] for c in data['clientes']] == [cartera['cliente'].id]
+    assert data['cursor']
+
+
+def test_sync_delta_solo_cambios_y_eliminados(client, cartera):
+    cursor = (datetime.utcnow() + timedelta(seconds=1)).isoformat()
+    # Nada cambió después del cursor
+    data = client.get(f'/api/v1/sync?since={cursor}', headers=cartera['headers']).get_json()
+    assert data['completo'] is False
+    assert data['prestamos'] == [] and data['clientes'] == [] and data['pagos'] == []
+
+    # Un pago nuevo modifica el préstamo y luego se elimina
+    prestamo = cartera['prestamo']
+    pago = Pago(prestamo_id=prestamo.id, cobrador_id=cartera['cobrador'].id, monto=5,
+                saldo_anterior=120, saldo_nuevo=115, fecha_actualizacion=datetime.utcnow() + timedelta(seconds=5))
+    prestamo.saldo_actual = 115
+    prestamo.fecha_actualizacion = datetime.utcnow() + timedelta(seconds=5)
+    db.session.add(pago)
+    db.session.commit()
+
+    data = client.get(f'/api/v1/sync?since={cursor}', headers=cartera['headers']).get_json()
+    assert [p['id'] for p in data['pagos']] == [pago.id]
+    assert data['prestamos'][0]['saldo_actual'] == 115
+    assert data['clientes'] == []
+
+    antes = (datetime.utcnow() - timedelta(seconds=1)).isoformat()
+    pago_id = pago.id
+    db.session.delete(pago)
+    db.session.commit()
+
+    data = client.get(f'/api/v1/sync?since={antes}', headers=cartera['headers']).get_json()
+    assert {'tabla': 'pagos', 'id': pago_id} in [{'tabla': e['tabla'], 'id': e['id']} for e in data['eliminados']]
+
+
+def test_sync_cursor_invalido(client, cartera):
+    response = client.get('/api/v1/sync?since=ayer', headers=cartera['headers'])
+    assert response.status_code == 400
+
+
+def test_sync_eliminados_por_cobrador_y_reasignaciones(client, cartera):
+    otro = Usuario(nombre='Otro', usuario='otro', password='x', rol='cobrador')
+    db.session.add(otro)
+    db.session.commit()
+    headers_otro = {'Authorization': f'Bearer {create_access_token(identity=str(otro.id))}'}
+    antes = (datetime.utcnow() - timedelta(seconds=1)).isoformat()
+
+    def eliminados(headers):
+        data = client.get(f'/api/v1/sync?since={antes}', headers=headers).get_json()
+        return [(e['tabla'], e['id']) for e in data['eliminados']], [p['id'] for p in data['prestamos']]
+
+    # El pago eliminado solo le llega al cobrador del préstamo
+    prestamo = cartera['prestamo']
+    pago = Pago(prestamo_id=prestamo.id, cobrador_id=cartera['cobrador'].id, monto=5,
+                saldo_anterior=120, saldo_nuevo=115)
+    db.session.add(pago)
+    db.session.commit()
+    pago_id = pago.id
+    db.session.delete(pago)
+    db.session.commit()
+    assert eliminados(cartera['headers'])[0] == [('pagos', pago_id)]
+    assert eliminados(headers_otro) == ([], [])
+
+    # Reasignado: el cobrador anterior lo quita, el nuevo lo recibe
+    prestamo.cobrador_id = otro.id
+    db.session.commit()
+    assert eliminados(cartera['headers']) == ([('pagos', pago_id), ('prestamos', prestamo.id)], [])
+    assert eliminados(headers_otro) == ([], [prestamo.id])
+
+    # Y si vuelve, viaja como préstamo y no como eliminado
+    prestamo.cobrador_id = cartera['cobrador'].id
+    db.session.commit()
+    assert eliminados(cartera['headers']) == ([('pagos', pago_id)], [prestamo.id])
+    assert eliminados(headers_otro)[0] == [('prestamos', prestamo.id)]
+
+
+def test_sync_prestamo_reasignado_llega_con_cliente_y_pagos(client, cartera):
+    # Préstamo de otro cobrador, con su cliente y un pago que no cambian después del cursor
+    otro = Usuario(nombre='Otro', usuario='otro', password='x', rol='cobrador')
+    hace_una_hora = datetime.utcnow() - timedelta(hours=1)
+    beto = Cliente(nombre='Beto', documento='2', telefono='301', fecha_actualizacion=hace_una_hora)
+    db.session.add_all([otro, beto])
+    db.session.flush()
+    prestamo = Prestamo(cliente_id=beto.id, ruta_id=cartera['prestamo'].ruta_id, cobrador_id=otro.id,
+                        monto_prestado=100, monto_a_pagar=120, saldo_actual=115, valor_cuota=5,
+                        numero_cuotas=24, fecha_actualizacion=hace_una_hora)
+    db.session.add(prestamo)
+    db.session.flush()
+    pago = Pago(prestamo_id=prestamo.id, cobrador_id=otro.id, monto=5, saldo_anterior=120, saldo_nuevo=115,
+                fecha_actualizacion=hace_una_hora)
+    db.session.add(pago)
+    cartera['prestamo'].fecha_actualizacion = cartera['cliente'].fecha_actualizacion = hace_una_hora
+    db.session.commit()
+
+    cursor = (datetime.utcnow() - timedelta(minutes=1)).isoformat()
+    prestamo.cobrador_id = cartera['cobrador'].id
+    db.session.commit()
+
+    data = client.get(f'/api/v1/sync?since={cursor}', headers=cartera['headers']).get_json()
+    assert [p['id'] for p in data['prestamos']] == [prestamo.id]
+    assert [c['id'] for c in data['clientes']] == [beto.id]
+    assert [p['id'] for p in data['pagos']] == [pago.id]
+    assert data['eliminados'] == []